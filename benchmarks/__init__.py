@@ -0,0 +1 @@
+"""Latency, throughput and peak-memory benchmarks of the pricing models (see `benchmarks.run`)."""
@@ -0,0 +1,268 @@
+"""Benchmark cases: one per model entry point, for single-contract latency and batch throughput.
+
+A case is a factory registered with `@benchmark`; it does its setup (inputs, class settings) and returns the
+callable that is timed. `contracts` is how many contracts one call prices, so throughput is contracts per second.
+Class-level settings (Binomial.N, MonteCarlo.M, ...) are set inside the timed callable, since cases share them.
+"""
+
+from contextlib import contextmanager
+from itertools import cycle
+
+import numpy as np
+
+from options_pricer_European.models.Binomial import Binomial
+from options_pricer_European.models.Black_Scholes import BlackScholes
+from options_pricer_European.models.Heston import Heston
+from options_pricer_European.models.Kernel import implied_vol_batch, price_batch
+from options_pricer_European.models.Monte_Carlo import MonteCarlo
+from options_pricer_European.models.Scenarios import ScenarioStore
+from options_pricer_American.models.Binomial import BinomialAmerican
+from options_pricer_American.models.Monte_Carlo import MonteCarloAmerican
+from options_pricer_Asian.models import asian
+from options_pricer_Risk.models import IncrementalBook, Portfolio
+from options_pricer_Risk.models.Portfolio import revalue
+from options_pricer_European.utils import strategies
+from options_pricer_European.utils.Visualisation_Tools_Black_Scholes import BSOptionsVisualizer
+from options_pricer_European.utils.Visualisation_Tools_Monte_Carlo import MC_Visualiser
+from options_pricer_European.utils.IV import IV_Binomial_Bisection, IV_Brent, IV_NewRaph
+
+CASES = {}
+BATCH = 10_000
+
+
+def benchmark(name, contracts=1, quick=True):
+    """
+    Registers a case factory under `name`. Cases with quick=False are skipped by `--quick` runs.
+    """
+    def register(factory):
+        CASES[name] = {'factory': factory, 'contracts': contracts, 'quick': quick}
+        return factory
+    return register
+
+
+@contextmanager
+def settings(cls, **values):
+    saved = {name: getattr(cls, name) for name in values}
+    for name, value in values.items():
+        setattr(cls, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(cls, name, value)
+
+
+def _book(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(80, 120, n), np.full(n, 100.0), rng.uniform(0.1, 0.4, n), np.full(n, 0.03),
+            rng.uniform(0.1, 2.0, n), rng.random(n) < 0.5)
+
+
+# --- Closed form ---
+
+@benchmark('black_scholes.price')
+def _():
+    return lambda: BlackScholes(100, 100, 0.2, 0.03, 1).price('call', None)
+
+
+@benchmark('black_scholes.greeks')
+def _():
+    def run():
+        model = BlackScholes(100, 100, 0.2, 0.03, 1)
+        return model.delta('call'), model.gamma(), model.vega(), model.theta('call'), model.rho('call')
+    return run
+
+
+@benchmark('black_scholes.batch', contracts=BATCH)
+def _():
+    S, K, sigma, r, T, is_call = _book(BATCH)
+    return lambda: price_batch('black_scholes', S, K, sigma, r, T, is_call)
+
+
+# --- Trees ---
+
+for _N in (50, 200, 1000):
+    @benchmark(f'binomial.price[N={_N}]', quick=_N < 1000)
+    def _(N=_N):
+        def run():
+            with settings(Binomial, N=N):
+                return Binomial(100, 100, 0.2, 0.03, 1, 'call').price_options()
+        return run
+
+    @benchmark(f'binomial_american.price[N={_N}]', quick=_N < 1000)
+    def _(N=_N):
+        def run():
+            with settings(BinomialAmerican, N=N):
+                return BinomialAmerican(100, 100, 0.2, 0.03, 1, 'put').price_options()
+        return run
+
+
+@benchmark('binomial.batch[N=100]', contracts=BATCH)
+def _():
+    S, K, sigma, r, T, is_call = _book(BATCH)
+    return lambda: Binomial.price_batch(S, K, sigma, r, T, is_call, N=100)
+
+
+@benchmark('binomial_american.batch[N=100]', contracts=1000)
+def _():
+    S, K, sigma, r, T, is_call = _book(1000)
+    return lambda: BinomialAmerican.price_batch(S, K, sigma, r, T, is_call, N=100)
+
+
+# --- Monte Carlo ---
+
+@benchmark('monte_carlo.simulate[N=100,M=10000]')
+def _():
+    def run():
+        with settings(MonteCarlo, N=100, M=10000):
+            return MonteCarlo(100, 100, 0.2, 0.03, 1, 'call').simulate(seed=0)
+    return run
+
+
+@benchmark('monte_carlo.simulate[N=100,M=10000,float32]')
+def _():
+    def run():
+        with settings(MonteCarlo, N=100, M=10000):
+            return MonteCarlo(100, 100, 0.2, 0.03, 1, 'call', dtype=np.float32).simulate(seed=0)
+    return run
+
+
+@benchmark('monte_carlo.strikes[200,N=50,M=5000]', contracts=200, quick=False)
+def _():
+    def run():
+        with settings(MonteCarlo, N=50, M=5000):
+            return [MonteCarlo(100, K, 0.2, 0.03, 1, 'call').simulate(seed=0) for K in np.linspace(80, 120, 200)]
+    return run
+
+
+@benchmark('monte_carlo.strikes[200,N=50,M=5000,shared]', contracts=200, quick=False)
+def _():
+    def run():
+        with settings(MonteCarlo, N=50, M=5000), ScenarioStore():
+            return [MonteCarlo(100, K, 0.2, 0.03, 1, 'call').simulate(seed=0) for K in np.linspace(80, 120, 200)]
+    return run
+
+
+@benchmark('monte_carlo.batch[M=10000]', contracts=1000)
+def _():
+    S, K, sigma, r, T, is_call = _book(1000)
+    return lambda: MonteCarlo.price_batch(S, K, sigma, r, T, is_call, M=10000, seed=0)
+
+
+@benchmark('heston.price[steps=100,paths=10000]')
+def _():
+    return lambda: Heston(100, 0.04, 0.03, 1, 2.0, 0.04, 0.3, -0.7, steps=100, paths=10000, K=100).price(seed=0)
+
+
+@benchmark('heston.price[steps=100,paths=10000,float32]')
+def _():
+    return lambda: Heston(100, 0.04, 0.03, 1, 2.0, 0.04, 0.3, -0.7, steps=100, paths=10000, K=100,
+                          dtype=np.float32).price(seed=0)
+
+
+@benchmark('asian.simulate[N=252,M=10000]')
+def _():
+    def run():
+        np.random.seed(0)
+        return asian(100, 100, 0.2, 0.03, 1, 'call', N=252, M=10000).simulate()
+    return run
+
+
+@benchmark('monte_carlo_american.simulate[N=50,M=2000]', quick=False)
+def _():
+    def run():
+        np.random.seed(0)
+        with settings(MonteCarlo, N=50, M=2000):
+            return MonteCarloAmerican(100, 100, 0.2, 0.03, 1, 'put').simulate()
+    return run
+
+
+# --- Risk (a 10000 European and American position book on 10 underlyings) ---
+
+def _positions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return Portfolio(rng.choice(['european', 'american'], n), rng.choice(['call', 'put'], n), rng.uniform(80, 120, n),
+                     rng.uniform(0.1, 2.0, n), rng.uniform(0.1, 0.4, n), underlying=rng.integers(0, 10, n))
+
+
+@benchmark('risk.revalue[10000]', contracts=BATCH)
+def _():
+    portfolio, spot = _positions(BATCH), np.full(10, 100.0)
+    books = [portfolio.select(portfolio.style == style) for style in ('european', 'american')]
+    return lambda: [revalue(book, spot[book.underlying], book.sigma, book.T, 0.03, 100) for book in books]
+
+
+@benchmark('risk.incremental_tick[10000]', contracts=BATCH // 10)
+def _():
+    book = IncrementalBook(_positions(BATCH), np.full(10, 100.0), 0.03, N=100)
+    moves = cycle([100.5, 100.0])
+    return lambda: book.tick(spot={0: next(moves)})
+
+
+# --- Implied volatility ---
+
+@benchmark('iv.newton_raphson')
+def _():
+    price = BlackScholes(100, 110, 0.25, 0.03, 1).price('call', None)
+    return lambda: IV_NewRaph(100, 110, 0.03, 1, price, 'call')
+
+
+@benchmark('iv.brent')
+def _():
+    price = BlackScholes(100, 110, 0.25, 0.03, 1).price('call', None)
+    return lambda: IV_Brent(100, 110, 0.03, 1, price, 'call')
+
+
+@benchmark('iv.binomial_bisection')
+def _():
+    price = Binomial(100, 110, 0.25, 0.03, 1, 'call').price_options()
+    return lambda: IV_Binomial_Bisection(100, 110, 0.03, 1, price, 'call')
+
+
+@benchmark('iv.batch', contracts=BATCH)
+def _():
+    S, K, sigma, r, T, is_call = _book(BATCH)
+    prices = price_batch('black_scholes', S, K, sigma, r, T, is_call)
+    return lambda: implied_vol_batch('black_scholes', prices, S, K, r, T, is_call)
+
+
+# --- Visualisation data (no rendering) ---
+
+@benchmark('visualiser.black_scholes.generate_data[26x100x2]', contracts=26 * 100 * 2)
+def _():
+    vis = BSOptionsVisualizer(100, 0.03, 0.2)
+    return lambda: vis.generate_data(np.arange(7, 181, 7))
+
+
+@benchmark('visualiser.monte_carlo.report[N=100,M=10000]')
+def _():
+    def run():
+        with settings(MonteCarlo, N=100, M=10000):
+            return MC_Visualiser(MonteCarlo(100, 100, 0.2, 0.03, 1, 'call'), seed=0).report()
+    return run
+
+
+# --- Strategies (premiums plus the P&L figure, closed on a non-interactive backend) ---
+
+def _strategy(function, *args):
+    import matplotlib.pyplot as plt
+
+    def run():
+        function(*args)
+        plt.close('all')
+    return run
+
+
+@benchmark('strategies.bull_call_spread')
+def _():
+    return _strategy(strategies.Bull_Call_Spread, 100, 95, 105, 0.03, 0.2, 1)
+
+
+@benchmark('strategies.straddle')
+def _():
+    return _strategy(strategies.Straddle, 100, 100, 0.2, 0.03, 1)
+
+
+@benchmark('strategies.collar[MC]', quick=False)
+def _():
+    return _strategy(strategies.Collar, 100, 95, 105, 0.2, 0.03, 1, 'MC')
@@ -0,0 +1,309 @@
+"""Accuracy against cost: each model priced over a book of contracts at increasing resolution.
+
+    python -m benchmarks.convergence --output convergence.json --tolerance-bp 0.5
+    python -m benchmarks.convergence --models binomial pde --strikes 90 100 110 --maturities 0.5 1
+
+Every configuration (model, variance-reduction option, resolution) prices the whole book once, and its error is
+taken against a high-precision reference. Recorded per configuration:
+
+  - max_error_bp, rms_error : the largest absolute error in basis points of spot, and the RMS error
+  - hit_rate : the share of contracts within `margin` (relative) of the reference, the accuracy count of
+    ideas.txt item 4c
+  - mean_standard_error : the mean Monte Carlo standard error (NaN for deterministic methods)
+  - cpu_seconds, wall_seconds : process CPU time and wall time for the book
+  - peak_bytes : tracemalloc peak on a separate pass, so tracing does not distort the timings
+
+`frontier` keeps, per (model, option), the configurations that no cheaper configuration beats on error, and
+`cheapest` picks per model the least CPU time meeting a tolerance: how production settings should be chosen.
+
+References: Black-Scholes for European trees, Monte Carlo and the PDE; a 5000-step tree for American options;
+the semi-analytic Heston formula; and a 500000-path control-variate simulation for Asian options (its own
+standard error is reported with the results).
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from itertools import product
+
+import numpy as np
+from scipy.integrate import quad
+
+from options_pricer_European.models.Binomial import Binomial
+from options_pricer_European.models.Cache import seeded
+from options_pricer_European.models.Heston import Heston
+from options_pricer_European.models.Kernel import price_batch
+from options_pricer_European.models.Local_Vol import LocalVolatility, LocalVolPDE
+from options_pricer_European.models.Monte_Carlo import MonteCarlo
+from options_pricer_American.models.Binomial import BinomialAmerican
+from options_pricer_American.models.Monte_Carlo import MonteCarloAmerican
+from options_pricer_Asian.models import asian
+
+from .cases import settings
+
+METHODS = {}
+HESTON = {'v0': 0.04, 'kappa': 2.0, 'theta': 0.04, 'xi': 0.3, 'rho': -0.7}
+ASIAN_FIXINGS = 12
+
+
+def method(model, option, resolutions, book='european', quick=True):
+    """
+    Registers a pricing method: a function of (contract, seed, **resolution) returning (price, standard error).
+    `resolutions` maps each setting to its values, all combinations of which are run; `book` names the
+    reference the errors are taken against.
+    """
+    def register(function):
+        METHODS[(model, option)] = {'price': function, 'axes': resolutions, 'book': book, 'quick': quick}
+        return function
+    return register
+
+
+def contracts(S=100.0, strikes=(90, 100, 110), maturities=(0.25, 1.0), sigma=0.2, r=0.03, types=('call', 'put')):
+    """
+    The book: every combination of strike, maturity and option type.
+    """
+    return [{'S': S, 'K': float(K), 'T': float(T), 'sigma': sigma, 'r': r, 'type': option_type}
+            for K, T, option_type in product(strikes, maturities, types)]
+
+
+# --- References ---
+
+def _heston_price(S, K, r, T, option_type, v0, kappa, theta, xi, rho):
+    # Characteristic function in the rotation-count-free form of Albrecher et al., integrated with quad
+    def cf(u):
+        d = np.sqrt((rho * xi * 1j * u - kappa)**2 + xi**2 * (1j * u + u**2))
+        g = (kappa - rho * xi * 1j * u - d) / (kappa - rho * xi * 1j * u + d)
+        e = np.exp(-d * T)
+        C = kappa * theta / xi**2 * ((kappa - rho * xi * 1j * u - d) * T - 2 * np.log((1 - g * e) / (1 - g)))
+        D = (kappa - rho * xi * 1j * u - d) / xi**2 * (1 - e) / (1 - g * e)
+        return np.exp(1j * u * (np.log(S) + r * T) + C + D * v0)
+
+    k = np.log(K)
+    P1 = 0.5 + quad(lambda u: (np.exp(-1j * u * k) * cf(u - 1j) / (1j * u * cf(-1j))).real, 0, 200, limit=500)[0] / np.pi
+    P2 = 0.5 + quad(lambda u: (np.exp(-1j * u * k) * cf(u) / (1j * u)).real, 0, 200, limit=500)[0] / np.pi
+    call = S * P1 - K * np.exp(-r * T) * P2
+    return call if option_type == 'call' else call - S + K * np.exp(-r * T)
+
+
+def references(book, kind):
+    """
+    Reference prices (and their standard errors, zero unless simulated) of a book for one kind of contract.
+    """
+    S, K, T, sigma, r = (np.array([c[name] for c in book]) for name in ('S', 'K', 'T', 'sigma', 'r'))
+    is_call = np.array([c['type'] == 'call' for c in book])
+    if kind == 'european':
+        return price_batch('black_scholes', S, K, sigma, r, T, is_call), np.zeros(len(book))
+    if kind == 'american':
+        return BinomialAmerican.price_batch(S, K, sigma, r, T, is_call, N=5000), np.zeros(len(book))
+    if kind == 'heston':
+        return np.array([_heston_price(c['S'], c['K'], c['r'], c['T'], c['type'], **HESTON) for c in book]), np.zeros(len(book))
+    if kind == 'asian':
+        results = [_asian(c, ASIAN_FIXINGS, 500_000, True, seed=10_000 + i) for i, c in enumerate(book)]
+        return np.array([p for p, _ in results]), np.array([e for _, e in results])
+    raise ValueError(f"unknown reference: {kind}")
+
+
+# --- Methods ---
+
+@method('binomial', 'crr', {'N': (25, 50, 100, 200, 400, 800, 1600)})
+def _(c, N, seed):
+    with settings(Binomial, N=N):
+        return Binomial(c['S'], c['K'], c['sigma'], c['r'], c['T'], c['type']).price_options(), np.nan
+
+
+@method('binomial_american', 'crr', {'N': (25, 50, 100, 200, 400, 800)}, book='american')
+def _(c, N, seed):
+    with settings(BinomialAmerican, N=N):
+        return BinomialAmerican(c['S'], c['K'], c['sigma'], c['r'], c['T'], c['type']).price_options(), np.nan
+
+
+@method('pde', 'crank_nicolson', {'n_x': (50, 100, 200, 400, 800), 'n_t': (25, 100, 400)})
+def _(c, n_x, n_t, seed):
+    local_vol = LocalVolatility.constant(c['sigma'], c['S'] / 5, c['S'] * 5, c['T'])
+    return LocalVolPDE(c['S'], c['K'], local_vol, c['r'], c['T'], c['type'], n_x=n_x, n_t=n_t).price(), np.nan
+
+
+@method('monte_carlo', 'delta_control_variate', {'N': (10, 50, 100), 'M': (1000, 4000, 16000, 64000)})
+def _(c, N, M, seed):
+    with settings(MonteCarlo, N=N, M=M):
+        return MonteCarlo(c['S'], c['K'], c['sigma'], c['r'], c['T'], c['type']).simulate(seed=seed)
+
+
+@method('monte_carlo', 'exact_terminal', {'M': (1000, 4000, 16000, 64000, 256000)})
+def _(c, M, seed):
+    price, error = MonteCarlo.price_batch(c['S'], c['K'], c['sigma'], c['r'], c['T'], c['type'] == 'call', M=M, seed=seed)
+    return float(price), float(error)
+
+
+@method('heston', 'euler_full_truncation', {'steps': (25, 100, 250), 'paths': (2000, 8000, 32000)}, book='heston')
+def _(c, steps, paths, seed):
+    return Heston(c['S'], HESTON['v0'], c['r'], c['T'], HESTON['kappa'], HESTON['theta'], HESTON['xi'], HESTON['rho'],
+                  steps=steps, paths=paths, K=c['K'], option_type=c['type']).price(seed=seed)
+
+
+def _asian(c, N, M, control_variate, seed):
+    with seeded(seed):
+        return asian(c['S'], c['K'], c['sigma'], c['r'], c['T'], c['type'], N=N, M=M,
+                     control_variate=control_variate).simulate()
+
+
+@method('asian', 'geometric_control_variate', {'M': (1000, 4000, 16000, 64000)}, book='asian')
+def _(c, M, seed):
+    return _asian(c, ASIAN_FIXINGS, M, True, seed)
+
+
+@method('asian', 'plain', {'M': (1000, 4000, 16000, 64000)}, book='asian')
+def _(c, M, seed):
+    return _asian(c, ASIAN_FIXINGS, M, False, seed)
+
+
+@method('monte_carlo_american', 'lowess_regression', {'N': (10, 25), 'M': (250, 500, 1000)}, book='american',
+        quick=False)
+def _(c, N, M, seed):
+    with seeded(seed), settings(MonteCarlo, N=N, M=M):
+        return MonteCarloAmerican(c['S'], c['K'], c['sigma'], c['r'], c['T'], c['type']).simulate()
+
+
+# --- Harness ---
+
+def _price_book(function, book, resolution):
+    results = [function(c, seed=i, **resolution) for i, c in enumerate(book)]
+    return np.array([p for p, _ in results], dtype=float), np.array([e for _, e in results], dtype=float)
+
+
+def converge(book=None, models=None, options=None, quick=False, margin=0.01, memory=True, report=None):
+    """
+    Prices a book with every registered configuration and measures its error and cost.
+
+    Parameters:
+    ----------
+    book : list of dict, optional
+        Contracts with S, K, T, sigma, r and type (defaults to `contracts()`). American methods price the
+        puts only, as calls without dividends are never exercised early.
+    models, options : iterable of str, optional
+        Restrict to these models and variance-reduction options.
+    quick : bool, optional
+        Skip the slow methods and keep the lower half of each resolution axis.
+    margin : float, optional
+        Relative margin for the hit rate (default 1%).
+    memory : bool, optional
+        Measure the tracemalloc peak with an extra pass of each configuration (default True).
+    report : callable, optional
+        Called with each result row as it is produced.
+
+    Returns:
+    -------
+    dict
+        'rows': one dict per configuration, and 'references': the reference prices and standard errors.
+    """
+    book = contracts() if book is None else book
+    books = {'european': book, 'heston': book, 'asian': book, 'american': [c for c in book if c['type'] == 'put']}
+    refs, rows = {}, []
+    for (model, option), spec in METHODS.items():
+        if (models and model not in models) or (options and option not in options) or (quick and not spec['quick']):
+            continue
+        kind = spec['book']
+        subset = books[kind]
+        if not subset:
+            continue
+        if kind not in refs:
+            refs[kind] = references(subset, kind)
+        reference, reference_error = refs[kind]
+        axes = {name: values[:(len(values) + 1) // 2] if quick else values for name, values in spec['axes'].items()}
+        for values in product(*axes.values()):
+            resolution = dict(zip(axes, values))
+            cpu, wall = time.process_time(), time.perf_counter()
+            prices, errors = _price_book(spec['price'], subset, resolution)
+            cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+            peak = np.nan
+            if memory:
+                tracemalloc.start()
+                try:
+                    _price_book(spec['price'], subset, resolution)
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+            error = prices - reference
+            spot = np.array([c['S'] for c in subset])
+            row = {'model': model, 'option': option, 'resolution': resolution, 'contracts': len(subset),
+                   'max_error_bp': float(np.max(np.abs(error) / spot) * 1e4),
+                   'rms_error': float(np.sqrt(np.mean(error**2))),
+                   'hit_rate': float(np.mean(np.abs(error) <= margin * np.abs(reference))),
+                   'mean_standard_error': float(np.mean(errors)),
+                   'reference_standard_error': float(np.max(reference_error)),
+                   'cpu_seconds': cpu, 'wall_seconds': wall, 'peak_bytes': peak}
+            rows.append(row)
+            if report is not None:
+                report(row)
+    return {'rows': rows, 'references': {kind: {'price': ref.tolist(), 'standard_error': err.tolist()}
+                                         for kind, (ref, err) in refs.items()}}
+
+
+def frontier(rows):
+    """
+    The efficiency frontier per (model, option): configurations by increasing CPU time, each with a smaller
+    maximum error than every cheaper one.
+    """
+    fronts = {}
+    for row in sorted(rows, key=lambda row: row['cpu_seconds']):
+        front = fronts.setdefault(f"{row['model']}/{row['option']}", [])
+        if not front or row['max_error_bp'] < front[-1]['max_error_bp']:
+            front.append(row)
+    return fronts
+
+
+def cheapest(rows, tolerance_bp):
+    """
+    Per model, the configuration with the least CPU time whose maximum error is within `tolerance_bp` basis
+    points of spot (None when no configuration reaches it).
+    """
+    best = {row['model']: None for row in rows}
+    for row in rows:
+        if row['max_error_bp'] <= tolerance_bp and (best[row['model']] is None
+                                                    or row['cpu_seconds'] < best[row['model']]['cpu_seconds']):
+            best[row['model']] = row
+    return best
+
+
+def _format(row):
+    resolution = ','.join(f'{name}={value}' for name, value in row['resolution'].items())
+    return (f"{row['model'] + '/' + row['option']:<45} {resolution:<18} {row['max_error_bp']:>10.3f} bp "
+            f"{row['hit_rate']:>6.0%} {row['cpu_seconds']:>9.3f} s {row['peak_bytes'] / 2**20:>8.2f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.convergence',
+                                     description="Measure pricing error against CPU time for every model.")
+    parser.add_argument('--models', nargs='+')
+    parser.add_argument('--options', nargs='+', help="variance-reduction options")
+    parser.add_argument('--S', type=float, default=100.0)
+    parser.add_argument('--strikes', type=float, nargs='+', default=[90, 100, 110])
+    parser.add_argument('--maturities', type=float, nargs='+', default=[0.25, 1.0])
+    parser.add_argument('--sigma', type=float, default=0.2)
+    parser.add_argument('--r', type=float, default=0.03)
+    parser.add_argument('--margin', type=float, default=0.01, help="relative margin of the hit rate")
+    parser.add_argument('--tolerance-bp', type=float, default=0.5, help="error target for the cheapest settings")
+    parser.add_argument('--quick', action='store_true')
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--output', help="write rows, frontiers and cheapest settings to this JSON file")
+    args = parser.parse_args(argv)
+
+    book = contracts(args.S, args.strikes, args.maturities, args.sigma, args.r)
+    result = converge(book, args.models, args.options, args.quick, args.margin, not args.no_memory,
+                      report=lambda row: print(_format(row)))
+    fronts = frontier(result['rows'])
+    best = cheapest(result['rows'], args.tolerance_bp)
+    print(f"\ncheapest configuration within {args.tolerance_bp} bp of spot:")
+    for model, row in best.items():
+        print(f"  {model:<22} {'not reached' if row is None else _format(row)}")
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump({**result, 'frontier': fronts, 'cheapest': best, 'tolerance_bp': args.tolerance_bp,
+                       'book': book}, handle, indent=2, default=float)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
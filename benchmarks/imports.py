@@ -0,0 +1,99 @@
+"""Import time of each package, measured in fresh interpreters.
+
+    python -m benchmarks.imports --output imports.json
+    python -m benchmarks.imports --compare imports.json --threshold 25
+
+Every sample runs ``python -X importtime -c "import <package>"`` in a new process and takes the cumulative time
+the interpreter reports for the package, so the interpreter's own start-up is excluded. Alongside the median
+over `repeat` samples, each result lists which of the `HEAVY` libraries the import pulled in: the core
+pricing packages should load none of them, they belong to the tools (plotting, data download, regression)
+that use them. The results have the layout of `benchmarks.run`, so its `compare` applies.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from .run import compare
+
+PACKAGES = ('options_pricer_European.models', 'options_pricer_American.models', 'options_pricer_Asian.models',
+            'options_pricer_Exotic.models', 'options_pricer_Risk.models', 'options_pricer_European.utils',
+            'options_pricer')
+
+HEAVY = ('scipy.stats', 'scipy.optimize', 'scipy.interpolate', 'pandas', 'matplotlib', 'plotly', 'statsmodels',
+         'pandas_datareader')
+
+_PROBE = "import sys; import {package}; print(','.join(m for m in {heavy!r} if m in sys.modules))"
+
+
+def measure_import(package, repeat=5):
+    """
+    Import time of `package` in seconds over `repeat` fresh interpreters (min and median), and the `HEAVY`
+    libraries it loads.
+    """
+    samples, loaded = [], []
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                                  _PROBE.format(package=package, heavy=HEAVY)],
+                                 capture_output=True, text=True, check=True)
+        for line in process.stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == package:
+                samples.append(int(fields[1]) / 1e6)
+        loaded = [module for module in process.stdout.strip().split(',') if module]
+    return {'min': min(samples), 'median': statistics.median(samples), 'repeat': repeat, 'heavy': loaded}
+
+
+def run(packages=PACKAGES, repeat=5, report=None):
+    """
+    Measures every package in `packages`, returning 'meta' and per package 'results' as `benchmarks.run.run`.
+    """
+    results = {}
+    for package in packages:
+        results[package] = measure_import(package, repeat)
+        if report is not None:
+            report(package, results[package])
+    meta = {'python': platform.python_version(), 'machine': platform.machine(), 'processor': platform.processor(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    return {'meta': meta, 'results': results}
+
+
+def _format(package, result):
+    heavy = ', '.join(result['heavy']) or '-'
+    return f"{package:<35} {result['median'] * 1e3:>9.1f} ms   heavy: {heavy}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.imports', description="Time the package imports.")
+    parser.add_argument('packages', nargs='*', default=PACKAGES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=25.0, help="allowed slowdown in percent")
+    args = parser.parse_args(argv)
+
+    current = run(args.packages, args.repeat, report=lambda *result: print(_format(*result)))
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(current, handle, indent=2)
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as handle:
+        baseline = json.load(handle)
+    ratios, regressions = compare(current, baseline, args.threshold)
+    for name, ratio in ratios.items():
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f"{name:<35} {100 * (ratio - 1):>+8.1f}%{flag}")
+    if regressions:
+        print(f"{len(regressions)} import(s) slower than the baseline by more than {args.threshold}%", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Runs the benchmark cases, stores the results as JSON and compares them against a baseline.
+
+    python -m benchmarks.run --output results.json                       # record
+    python -m benchmarks.run --compare baseline.json --threshold 10      # fail on a >10% slowdown
+    python -m benchmarks.run --quick --filter binomial                   # a subset
+
+Each case is called once to warm up, then timed in `repeat` samples of `number` calls, with `number` chosen so
+a sample lasts at least `min_time` seconds. Per-call statistics are taken over the samples, and the median is
+what throughput and the baseline comparison use. Peak memory is measured with tracemalloc on a separate call,
+since tracing slows allocation-heavy code and would distort the timings.
+"""
+
+import argparse
+import fnmatch
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+from .cases import CASES
+
+
+def measure(function, repeat=5, min_time=0.05):
+    """
+    Times a callable, returning per-call seconds (min, median, mean, stdev) and the tracemalloc peak in bytes.
+    """
+    start = time.perf_counter()
+    function()
+    first = time.perf_counter() - start
+    number = max(1, int(min_time / max(first, 1e-9)))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'min': min(samples), 'median': statistics.median(samples), 'mean': statistics.fmean(samples),
+            'stdev': statistics.stdev(samples) if repeat > 1 else 0.0, 'number': number, 'repeat': repeat,
+            'peak_bytes': peak}
+
+
+def run(patterns=None, quick=False, repeat=5, min_time=0.05, report=None):
+    """
+    Runs the registered cases whose names match any of the glob `patterns` (all by default).
+
+    Returns:
+    -------
+    dict
+        'meta' (interpreter, NumPy and machine) and 'results': per case the `measure` statistics plus
+        'contracts' per call and 'throughput' in contracts per second.
+    """
+    results = {}
+    for name, case in CASES.items():
+        if patterns and not any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+            continue
+        if quick and not case['quick']:
+            continue
+        result = measure(case['factory'](), repeat, min_time)
+        result['contracts'] = case['contracts']
+        result['throughput'] = case['contracts'] / result['median']
+        results[name] = result
+        if report is not None:
+            report(name, result)
+    meta = {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+            'processor': platform.processor(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    return {'meta': meta, 'results': results}
+
+
+def compare(current, baseline, threshold=10.0):
+    """
+    Median time of each case relative to the baseline, for cases present in both runs.
+
+    Returns:
+    -------
+    tuple[dict, list]
+        The ratio (current / baseline median) per case, and the names of the cases slower than the baseline by
+        more than `threshold` percent.
+    """
+    ratios = {name: result['median'] / baseline['results'][name]['median']
+              for name, result in current['results'].items() if name in baseline['results']}
+    regressions = [name for name, ratio in ratios.items() if ratio > 1 + threshold / 100]
+    return ratios, regressions
+
+
+def _format(name, result):
+    latency = result['median']
+    unit, scale = ('ms', 1e3) if latency >= 1e-3 else ('us', 1e6)
+    return (f"{name:<45} {latency * scale:>10.2f} {unit}  {result['throughput']:>14,.1f} contracts/s  "
+            f"{result['peak_bytes'] / 2**20:>9.2f} MiB peak")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description="Run the pricing benchmarks.")
+    parser.add_argument('--filter', action='append', help="glob on case names (repeatable)")
+    parser.add_argument('--quick', action='store_true', help="skip the slow cases")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.05, help="minimum seconds per timing sample")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=10.0, help="allowed slowdown in percent")
+    parser.add_argument('--list', action='store_true', help="list the cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('\n'.join(CASES))
+        return 0
+    current = run(args.filter, args.quick, args.repeat, args.min_time, report=lambda *case: print(_format(*case)))
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(current, handle, indent=2)
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as handle:
+        baseline = json.load(handle)
+    ratios, regressions = compare(current, baseline, args.threshold)
+    for name, ratio in ratios.items():
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f"{name:<45} {100 * (ratio - 1):>+8.1f}%{flag}")
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than the baseline by more than {args.threshold}%", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""Services around the pricing models: vectorized book pricing (`engine`), the micro-batching pricing server
+(`server`) and the bulk file pricing command `price-option` (`cli`)."""
+
+from .engine import price_columns
+
+__all__ = ['price_columns']
@@ -0,0 +1,205 @@
+"""The ``price-option`` command: prices a CSV or Parquet file of contracts in bulk.
+
+Each row is one contract with the columns of `options_pricer.engine` (model, type, S, K, T, r, sigma, and
+optionally style, q, steps, paths, seed); any other columns are carried through to the output unchanged. The
+input is read in chunks, each chunk is priced with one vectorized call per engine group in a pool of worker
+processes, and priced chunks are appended to the output as soon as they are done, in input order, so memory
+stays near a few chunks whatever the file size.
+
+    price-option contracts.csv priced.parquet --chunksize 200000 --workers 8
+
+Parquet input and output need pyarrow. Throughput is printed to stderr.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .engine import price_columns
+
+FORMATS = ('csv', 'parquet')
+
+
+def _parquet():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError("Parquet files need pyarrow: pip install options_pricer[parquet]") from error
+    return pyarrow
+
+
+def file_format(path, given=None):
+    """
+    The format of a file: the one given, else 'parquet' for .parquet/.pq paths and 'csv' otherwise.
+    """
+    if given is not None:
+        return given
+    return 'parquet' if str(path).lower().endswith(('.parquet', '.pq')) else 'csv'
+
+
+def read_chunks(path, chunksize, fmt='csv'):
+    """
+    Yields the rows of a CSV ('-' for stdin) or Parquet file as DataFrames of at most `chunksize` rows.
+    """
+    if fmt == 'parquet':
+        pyarrow = _parquet()
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(sys.stdin if path == '-' else path, chunksize=chunksize)
+
+
+class ChunkWriter:
+    """
+    Appends DataFrames to a CSV ('-' for stdout) or Parquet file; the first chunk fixes the columns.
+    """
+
+    def __init__(self, path, fmt='csv'):
+        self.path = path
+        self.fmt = fmt
+        self.handle = None
+        self.schema = None
+
+    def write(self, frame):
+        """
+        Appends a DataFrame, or for CSV the (columns, text) of rows already rendered by `render`.
+        """
+        if self.fmt == 'parquet':
+            pyarrow = _parquet()
+            table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+            if self.handle is None:
+                self.schema = table.schema
+                self.handle = pyarrow.parquet.ParquetWriter(self.path, self.schema)
+            self.handle.write_table(table.cast(self.schema))
+        else:
+            columns, text = frame if isinstance(frame, tuple) else render(frame, 'csv')
+            if self.handle is None:
+                self.handle = sys.stdout if self.path == '-' else open(self.path, 'w', newline='')
+                self.handle.write(pd.DataFrame(columns=columns).to_csv(index=False))
+            self.handle.write(text)
+
+    def close(self):
+        if self.handle is not None and self.handle is not sys.stdout:
+            self.handle.close()
+        self.handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def price_chunk(frame):
+    """
+    Prices the contracts of a DataFrame, returning it with 'price' and 'standard_error' columns added.
+    """
+    result = price_columns({name: frame[name].to_numpy() for name in frame.columns})
+    return frame.assign(price=result['price'], standard_error=result['standard_error'])
+
+
+def render(frame, fmt):
+    """
+    A chunk as handed to `ChunkWriter.write`: CSV rows are formatted here, so that in a pool the (slow) float
+    formatting runs in the workers rather than in the writing process.
+    """
+    if fmt == 'csv':
+        return list(frame.columns), frame.to_csv(index=False, header=False)
+    return frame
+
+
+def _price_and_render(frame, fmt):
+    return len(frame), render(price_chunk(frame), fmt)
+
+
+def price_file(source, destination, chunksize=100_000, workers=None, input_format=None, output_format=None,
+               progress=None):
+    """
+    Prices every contract of a file and writes them, with their prices, to another.
+
+    Parameters:
+    ----------
+    source, destination : str
+        Input and output paths ('-' for stdin/stdout with CSV).
+    chunksize : int, optional
+        Rows read, priced and written at a time (default is 100000).
+    workers : int, optional
+        Worker processes (defaults to the CPU count); 0 or 1 prices in this process.
+    input_format, output_format : str, optional
+        'csv' or 'parquet' (inferred from the file extension by default).
+    progress : callable, optional
+        Called with the running totals after each chunk is written.
+
+    Returns:
+    -------
+    dict
+        'rows', 'chunks' and 'seconds' of the run.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    chunks = read_chunks(source, chunksize, file_format(source, input_format))
+    fmt = file_format(destination, output_format)
+    totals = {'rows': 0, 'chunks': 0, 'seconds': 0.0}
+    start = time.perf_counter()
+
+    def written(rows, chunk):
+        writer.write(chunk)
+        totals['rows'] += rows
+        totals['chunks'] += 1
+        totals['seconds'] = time.perf_counter() - start
+        if progress is not None:
+            progress(totals)
+
+    with ChunkWriter(destination, fmt) as writer:
+        if workers <= 1:
+            for chunk in chunks:
+                written(*_price_and_render(chunk, fmt))
+        else:
+            # Spawned workers: the parent may already run reader threads (pyarrow), which fork does not survive
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                # At most two chunks per worker in flight, written in input order
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(_price_and_render, chunk, fmt))
+                    if len(pending) >= 2 * workers:
+                        written(*pending.popleft().result())
+                while pending:
+                    written(*pending.popleft().result())
+    totals['seconds'] = time.perf_counter() - start
+    return totals
+
+
+def throughput(totals):
+    rate = totals['rows'] / totals['seconds'] if totals['seconds'] > 0 else float('inf')
+    return f"priced {totals['rows']:,} contracts in {totals['chunks']} chunks, {totals['seconds']:.2f} s ({rate:,.0f} contracts/s)"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='price-option', description="Price a CSV or Parquet file of option contracts.")
+    parser.add_argument('input', help="contracts file ('-' for CSV on stdin)")
+    parser.add_argument('output', nargs='?', default='-', help="priced contracts file (default: CSV on stdout)")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="rows priced at a time")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count, 0 for none)")
+    parser.add_argument('--input-format', choices=FORMATS)
+    parser.add_argument('--output-format', choices=FORMATS)
+    parser.add_argument('--progress', action='store_true', help="report throughput after every chunk")
+    args = parser.parse_args(argv)
+
+    report = (lambda totals: print(throughput(totals), file=sys.stderr)) if args.progress else None
+    try:
+        totals = price_file(args.input, args.output, args.chunksize, args.workers, args.input_format,
+                            args.output_format, report)
+    except (ValueError, ImportError, OSError) as error:
+        parser.exit(1, f"price-option: error: {error}\n")
+    print(throughput(totals), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
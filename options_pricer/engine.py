@@ -0,0 +1,113 @@
+"""Vectorized pricing of mixed books of contracts, shared by the pricing server and the `price-option` CLI.
+
+A book is a mapping of equal-length columns:
+
+  - model : 'black_scholes', 'black76', 'bachelier', 'binomial' or 'monte_carlo'
+  - type : 'call' or 'put'
+  - S, K, T, r, sigma : spot (forward for Black-76 and Bachelier), strike, maturity, rate and volatility
+  - style : 'european' (default) or 'american'; American rows of spot models ('black_scholes', 'binomial')
+    are priced on the CRR tree
+  - q : continuous dividend yield (default 0)
+  - steps : binomial steps (default 100), paths : Monte Carlo draws (default 10000), seed : Monte Carlo seed
+
+Rows are grouped so each engine is called once per group: closed-form rows in one masked kernel pass, tree rows
+per step count with `Binomial.price_batch` / `BinomialAmerican.price_batch`, and Monte Carlo rows per (paths,
+seed) with `MonteCarlo.price_batch`.
+"""
+
+import numpy as np
+
+from options_pricer_European.models.Binomial import Binomial
+from options_pricer_European.models.Kernel import MODEL_CODES, price_batch
+from options_pricer_European.models.Monte_Carlo import MonteCarlo
+from options_pricer_American.models.Binomial import BinomialAmerican
+
+MODELS = tuple(MODEL_CODES) + ('binomial', 'monte_carlo')
+REQUIRED = ('model', 'type', 'S', 'K', 'T', 'r', 'sigma')
+DEFAULTS = {'style': 'european', 'q': 0.0, 'steps': 100, 'paths': 10000, 'seed': np.nan}
+# Groups worth sending to a worker process; closed-form rows cost microseconds and are priced in place
+HEAVY = ('binomial', 'monte_carlo', 'american')
+
+
+def normalize(columns):
+    """
+    Validates a book and returns its columns as arrays, with defaults filled in and names lower-cased.
+    """
+    missing = [name for name in REQUIRED if name not in columns]
+    if missing:
+        raise ValueError(f"missing columns: {missing}")
+    # The row count comes from every column given, so any of them may be the only non-scalar one
+    names = [name for name in REQUIRED + tuple(DEFAULTS) if columns.get(name) is not None]
+    lengths = {name: np.shape(columns[name]) for name in names}
+    try:
+        (n,) = np.broadcast_shapes((1,), *lengths.values())
+    except ValueError:
+        shapes = {name: shape[0] if len(shape) == 1 else shape for name, shape in lengths.items() if shape}
+        raise ValueError(f"columns must be scalars or one-dimensional of a common length, got {shapes}") from None
+    book = {}
+    for name in REQUIRED + tuple(DEFAULTS):
+        value = columns.get(name, DEFAULTS.get(name))
+        value = np.broadcast_to(np.asarray(value if value is not None else np.nan), (n,))
+        if name in ('model', 'type', 'style'):
+            value = np.char.lower(np.char.strip(value.astype(str)))
+        else:
+            value = value.astype(float)
+        book[name] = value
+
+    for name, allowed in (('model', MODELS), ('type', ('call', 'put')), ('style', ('european', 'american'))):
+        unknown = sorted(set(book[name].tolist()) - set(allowed))
+        if unknown:
+            raise ValueError(f"{name} must be one of {list(allowed)}, got {unknown}")
+    american = book['style'] == 'american'
+    if np.any(american & ~np.isin(book['model'], ('black_scholes', 'binomial'))):
+        raise ValueError("American style is only priced for spot models ('black_scholes', 'binomial')")
+    return book
+
+
+def group(book):
+    """
+    The engine group of each row: the model name, or 'american' for American rows.
+    """
+    return np.where(book['style'] == 'american', 'american', book['model'])
+
+
+def price_columns(columns):
+    """
+    Prices a book of contracts.
+
+    Parameters:
+    ----------
+    columns : mapping of str to array-like
+        The book's columns (see the module docstring); scalars broadcast against the others.
+
+    Returns:
+    -------
+    dict
+        'price' and 'standard_error' arrays (the latter NaN except for Monte Carlo rows).
+    """
+    book = normalize(columns)
+    n = len(book['S'])
+    price, error = np.full(n, np.nan), np.full(n, np.nan)
+    groups = group(book)
+    is_call = book['type'] == 'call'
+    S, K, T, r, sigma, q = (book[name] for name in ('S', 'K', 'T', 'r', 'sigma', 'q'))
+
+    closed_form = np.isin(groups, tuple(MODEL_CODES))
+    if np.any(closed_form):
+        rows = closed_form
+        price[rows] = price_batch(book['model'][rows], S[rows], K[rows], sigma[rows], r[rows], T[rows],
+                                  is_call[rows], q[rows])
+
+    for name, engine in (('binomial', Binomial.price_batch), ('american', BinomialAmerican.price_batch)):
+        for steps in np.unique(book['steps'][groups == name]):
+            rows = (groups == name) & (book['steps'] == steps)
+            price[rows] = engine(S[rows], K[rows], sigma[rows], r[rows], T[rows], is_call[rows], N=int(steps), q=q[rows])
+
+    monte_carlo = groups == 'monte_carlo'
+    if np.any(monte_carlo):
+        settings = np.column_stack((book['paths'], np.nan_to_num(book['seed'], nan=-1)))[monte_carlo]
+        for paths, seed in np.unique(settings, axis=0):
+            rows = monte_carlo & (book['paths'] == paths) & (np.nan_to_num(book['seed'], nan=-1) == seed)
+            price[rows], error[rows] = MonteCarlo.price_batch(S[rows], K[rows], sigma[rows], r[rows], T[rows], is_call[rows],
+                                                              q[rows], M=int(paths), seed=None if seed < 0 else int(seed))
+    return {'price': price, 'standard_error': error}
@@ -0,0 +1,366 @@
+"""Asyncio pricing server with micro-batching.
+
+Clients POST contracts as JSON to ``/price``, over TCP or a Unix socket:
+
+    {"model": "binomial", "style": "american", "type": "put", "S": 100, "K": 95, "T": 0.5, "r": 0.03, "sigma": 0.25}
+
+or a list of such objects, or one object of equal-length lists (columns). Columns and defaults are those of
+`options_pricer.engine`. The reply holds "price" and "standard_error" in the same shape.
+
+Requests are not priced one by one. Each engine group (closed-form, European tree, American tree, Monte Carlo)
+has a queue; the first request to reach an empty queue opens a window (1 ms by default), and every request that
+arrives before it closes, or until `max_batch` rows are waiting, is priced in one vectorized call. Tree and
+Monte Carlo batches run in a process pool so they neither block the event loop nor each other; closed-form
+batches cost microseconds and run in place.
+
+``/stats`` returns request and batch latency histograms, batch sizes and the queue depth (rows waiting for a
+window plus rows being priced) as JSON, and ``/metrics`` the same in the Prometheus text format.
+
+    python -m options_pricer.server --port 8765 --window-ms 1 --processes 4 --share-scenarios
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from options_pricer_European.models.Scenarios import ScenarioStore, enable_scenarios
+
+from .engine import HEAVY, group, normalize, price_columns
+
+
+class Histogram:
+    """
+    Counts of observations in fixed buckets (milliseconds for latencies), with their sum.
+    """
+
+    BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = np.asarray(buckets, dtype=float)
+        self.counts = np.zeros(len(self.buckets) + 1, dtype=int)
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[np.searchsorted(self.buckets, value)] += 1
+        self.total += value
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def quantile(self, q):
+        """
+        Upper bound of the bucket holding the q-quantile (inf if it lies beyond the last bucket).
+        """
+        if not self.count:
+            return float('nan')
+        index = int(np.searchsorted(np.cumsum(self.counts), q * self.count))
+        return float(self.buckets[index]) if index < len(self.buckets) else float('inf')
+
+    def to_dict(self):
+        return {'count': self.count, 'sum': self.total, 'buckets': self.buckets.tolist(), 'counts': self.counts.tolist(),
+                'p50': self.quantile(0.5), 'p99': self.quantile(0.99)}
+
+    def prometheus(self, name, labels=''):
+        lines, cumulative = [], np.cumsum(self.counts)
+        prefix = labels + ',' if labels else ''
+        for bound, count in zip(self.buckets, cumulative):
+            lines.append(f'{name}_bucket{{{prefix}le="{bound:g}"}} {count}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {cumulative[-1]}')
+        suffix = f'{{{labels}}}' if labels else ''
+        lines.append(f'{name}_sum{suffix} {self.total}')
+        lines.append(f'{name}_count{suffix} {self.count}')
+        return lines
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent submissions for the same key into one call of `run(key, columns)`. When that call
+    fails, each submission is run again on its own, so only the failing ones get the error.
+    """
+
+    def __init__(self, run, window=0.001, max_batch=4096):
+        self.run = run
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = {}
+        self._timers = {}
+        self.waiting = 0
+        self.in_flight = 0
+        self.batch_sizes = Histogram((1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192))
+        self.batch_latency = {}
+
+    @property
+    def queue_depth(self):
+        return self.waiting + self.in_flight
+
+    async def submit(self, key, columns):
+        """
+        Queues a block of rows (dict of equal-length arrays) and returns the results for those rows.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        rows = len(columns['S'])
+        queue = self._pending.setdefault(key, [])
+        queue.append((columns, rows, future))
+        self.waiting += rows
+        if sum(r for _, r, _ in queue) >= self.max_batch:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        return await future
+
+    def _flush(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        queue = self._pending.pop(key, [])
+        if queue:
+            asyncio.ensure_future(self._execute(key, queue))
+
+    async def _execute(self, key, queue):
+        sizes = [rows for _, rows, _ in queue]
+        total = sum(sizes)
+        columns = {name: np.concatenate([block[name] for block, _, _ in queue]) for name in queue[0][0]}
+        self.waiting -= total
+        self.in_flight += total
+        self.batch_sizes.observe(total)
+        start = time.perf_counter()
+        failure = None
+        try:
+            results = await self.run(key, columns)
+        except Exception as error:
+            failure = error
+        finally:
+            self.in_flight -= total
+            self.batch_latency.setdefault(key, Histogram()).observe(1000 * (time.perf_counter() - start))
+        if failure is not None:
+            if len(queue) == 1:
+                _settle(queue[0][2], error=failure)
+            else:
+                # One bad request must not fail the requests it was batched with: price each on its own
+                await asyncio.gather(*(self._isolated(key, block, future) for block, _, future in queue))
+            return
+        offsets = np.cumsum([0] + sizes)
+        for (_, _, future), lo, hi in zip(queue, offsets[:-1], offsets[1:]):
+            if not future.done():
+                future.set_result({name: values[lo:hi] for name, values in results.items()})
+
+    async def _isolated(self, key, columns, future):
+        try:
+            result = await self.run(key, columns)
+        except Exception as error:
+            _settle(future, error=error)
+        else:
+            _settle(future, result)
+
+
+def _settle(future, result=None, error=None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _to_json(values, scalar):
+    values = [None if not np.isfinite(v) else float(v) for v in values]
+    return values[0] if scalar else values
+
+
+class PricingServer:
+    """
+    HTTP/JSON pricing service over TCP or a Unix socket, batching requests per engine group.
+    """
+
+    def __init__(self, window=0.001, max_batch=4096, processes=None, scenarios=None):
+        """
+        Parameters:
+        ----------
+        window : float, optional
+            Seconds a batch stays open after its first request (default is 0.001).
+        max_batch : int, optional
+            Rows that close a batch early (default is 4096).
+        processes : int, optional
+            Worker processes for tree and Monte Carlo batches (defaults to the number of CPUs); 0 prices
+            them in a thread instead.
+        scenarios : ScenarioStore, optional
+            Store through which this process and the workers share seeded Monte Carlo draws, so a seed's
+            draws are generated once rather than once per batch and worker.
+        """
+        self.processes = os.cpu_count() if processes is None else processes
+        self.pool = None
+        if scenarios is not None:
+            enable_scenarios(scenarios)
+        if self.processes:
+            # Workers are spawned, not forked: forking a process running an event loop and executor threads
+            # can deadlock the child. They are started up front so no request waits for their imports.
+            self.pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=None if scenarios is None else enable_scenarios,
+                                            initargs=() if scenarios is None else (scenarios,))
+            for _ in range(self.processes):
+                self.pool.submit(int)
+        self.batcher = MicroBatcher(self._run, window, max_batch)
+        self.request_latency = Histogram()
+        self.requests = 0
+        self.errors = 0
+
+    async def _run(self, key, columns):
+        if key in HEAVY:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, price_columns, columns)
+        return price_columns(columns)
+
+    async def price(self, payload):
+        """
+        Prices a JSON payload: one contract, a list of contracts or an object of columns.
+        """
+        scalar = isinstance(payload, dict) and np.ndim(payload.get('S')) == 0
+        if isinstance(payload, list):
+            if not payload:
+                return {'price': [], 'standard_error': []}
+            names = set().union(*payload)
+            payload = {name: [contract.get(name) for contract in payload] for name in names}
+        book = normalize(payload)
+        groups = group(book)
+        price = np.empty(len(groups))
+        error = np.empty(len(groups))
+        keys = list(dict.fromkeys(groups))
+        blocks = [{name: values[groups == key] for name, values in book.items()} for key in keys]
+        results = await asyncio.gather(*(self.batcher.submit(key, block) for key, block in zip(keys, blocks)))
+        for key, result in zip(keys, results):
+            price[groups == key] = result['price']
+            error[groups == key] = result['standard_error']
+        return {'price': _to_json(price, scalar), 'standard_error': _to_json(error, scalar)}
+
+    def stats(self):
+        return {'requests': self.requests, 'errors': self.errors, 'queue_depth': self.batcher.queue_depth,
+                'waiting': self.batcher.waiting, 'in_flight': self.batcher.in_flight,
+                'request_latency_ms': self.request_latency.to_dict(),
+                'batch_latency_ms': {key: h.to_dict() for key, h in self.batcher.batch_latency.items()},
+                'batch_size': self.batcher.batch_sizes.to_dict()}
+
+    def metrics(self):
+        lines = [f'pricing_requests_total {self.requests}', f'pricing_errors_total {self.errors}',
+                 f'pricing_queue_depth {self.batcher.queue_depth}']
+        lines += self.request_latency.prometheus('pricing_request_latency_ms')
+        for key, histogram in self.batcher.batch_latency.items():
+            lines += histogram.prometheus('pricing_batch_latency_ms', f'engine="{key}"')
+        lines += self.batcher.batch_sizes.prometheus('pricing_batch_size')
+        return '\n'.join(lines) + '\n'
+
+    async def _respond(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return 200, 'application/json', json.dumps({'status': 'ok'})
+        if method == 'GET' and path == '/stats':
+            return 200, 'application/json', json.dumps(self.stats())
+        if method == 'GET' and path == '/metrics':
+            return 200, 'text/plain; version=0.0.4', self.metrics()
+        if method == 'POST' and path == '/price':
+            start = time.perf_counter()
+            self.requests += 1
+            try:
+                result = await self.price(json.loads(body or b'null'))
+            except (ValueError, TypeError, KeyError, AttributeError) as error:
+                self.errors += 1
+                return 400, 'application/json', json.dumps({'error': str(error)})
+            except Exception as error:
+                # Anything else (a broken worker pool, a numerical error in a pricer) still gets a reply
+                self.errors += 1
+                return 500, 'application/json', json.dumps({'error': f'{type(error).__name__}: {error}'})
+            finally:
+                self.request_latency.observe(1000 * (time.perf_counter() - start))
+            return 200, 'application/json', json.dumps(result)
+        return 404, 'application/json', json.dumps({'error': f'no route for {method} {path}'})
+
+    async def handle(self, reader, writer):
+        """
+        Serves HTTP/1.1 requests on one connection, keeping it open between requests.
+        """
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                headers = dict(line.split(':', 1) for line in header_lines if ':' in line)
+                headers = {k.strip().lower(): v.strip() for k, v in headers.items()}
+                try:
+                    method, path, version = request_line.split(' ', 2)
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    # Without a request line or body length the stream cannot be resynchronized: reply and close
+                    data = json.dumps({'error': 'malformed request'}).encode()
+                    writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Type: application/json\r\n'
+                                 b'Content-Length: %d\r\nConnection: close\r\n\r\n' % len(data) + data)
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(length)
+                status, content_type, text = await self._respond(method, path.split('?')[0], body)
+                data = text.encode()
+                keep_alive = version.strip() == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}[status]
+                writer.write(f'HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n'
+                             f'Content-Length: {len(data)}\r\nConnection: {"keep-alive" if keep_alive else "close"}'
+                             f'\r\n\r\n'.encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        """
+        Starts listening on host:port, or on the Unix socket `path` when given, and returns the asyncio server.
+        """
+        # A deep backlog, so bursts of new connections are queued rather than refused and retried
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path=path, backlog=4096)
+        return await asyncio.start_server(self.handle, host, port, backlog=4096)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the micro-batching option pricing server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="serve on this Unix socket path instead of TCP")
+    parser.add_argument('--window-ms', type=float, default=1.0, help="batching window in milliseconds")
+    parser.add_argument('--max-batch', type=int, default=4096)
+    parser.add_argument('--processes', type=int, default=None, help="worker processes (0 for none)")
+    parser.add_argument('--share-scenarios', action='store_true',
+                        help="share seeded Monte Carlo draws between batches and workers in shared memory")
+    args = parser.parse_args(argv)
+    scenarios = ScenarioStore() if args.share_scenarios else None
+
+    async def serve():
+        server = PricingServer(args.window_ms / 1000, args.max_batch, args.processes, scenarios)
+        listener = await server.start(args.host, args.port, args.unix)
+        print(f"pricing server listening on {args.unix or f'{args.host}:{args.port}'}")
+        try:
+            async with listener:
+                await listener.serve_forever()
+        finally:
+            server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if scenarios is not None:
+            scenarios.close()
+
+
+if __name__ == '__main__':
+    main()
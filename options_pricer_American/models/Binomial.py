@@ -1,34 +1,70 @@
 import numpy as np
 
+from options_pricer_European.models.Cache import cached
+from options_pricer_European.models.Profiling import profiled, stage
+from options_pricer_European.models.Term_Structure import as_curve, as_dividends, escrowed, step_carry
+
 class BinomialAmerican:
     N = 100  # Number of time steps
 
-    def __init__(self, S, K, sigma, r, T, option_type='call', eps_1=0, eps_2=0, eps_3=0):
+    def __init__(self, S, K, sigma, r, T, option_type='call', eps_1=0, eps_2=0, eps_3=0, dividends=None):
+        """
+        r may be a YieldCurve and dividends a continuous yield or a Dividends schedule. The tree then has
+        per-level probabilities and discount factors, and is built on the spot less the cash dividends
+        (escrowed model), with the value of the dividends still to come added back when testing exercise.
+        """
         self.S = S + eps_1
         self.K = K
         self.sigma = sigma + eps_3
         self.r = r
         self.T = T + eps_2
         self.option_type = option_type
+        self.dividends = as_dividends(dividends)
 
     def compute_constants(self):
         self.dt = self.T / BinomialAmerican.N
         self.u = np.exp(self.sigma * np.sqrt(self.dt))
         self.d = 1 / self.u
-        self.p = (np.exp(self.r * self.dt) - self.d) / (self.u - self.d)
-        self.discount = np.exp(-self.r * self.T)
+        # Per-level rates: scalars for a flat rate without dividends, arrays of length N otherwise
+        carry, rates = step_carry(self.r, self.dividends, self.T, BinomialAmerican.N)
+        self.p = np.broadcast_to((np.exp(carry * self.dt) - self.d) / (self.u - self.d), BinomialAmerican.N)
+        self.step_discount = np.broadcast_to(np.exp(-rates * self.dt), BinomialAmerican.N)
+        self.discount = np.exp(-np.mean(rates) * self.T)
+        self.S0 = escrowed(self.S, self.r, self.dividends, self.T)
+        self.remaining = self.remaining_dividends()
 
-    def price_options(self):
-        self.compute_constants()
+    def remaining_dividends(self):
+        # Value at each level of the cash dividends still to be paid
+        if self.dividends is None or not len(self.dividends.times):
+            return np.zeros(BinomialAmerican.N + 1)
+        levels = np.linspace(0, self.T, BinomialAmerican.N + 1)
+        return self.dividends.present_value(as_curve(self.r), levels, self.T)
 
+    @cached
+    @profiled('binomial_american.price_options')
+    def price_options(self):
+        # Handling edge cases, before the tree constants divide by T and sigma
         if self.S <= 0 or self.K <= 0 or self.T < 0 or self.sigma < 0 or BinomialAmerican.N < 1:
             raise ValueError("Invalid input values.")
+        sign = 1 if self.option_type == 'call' else -1
+        if self.T == 0:
+            return max(sign * (self.S - self.K), 0)
+        carry, rates = step_carry(self.r, self.dividends, self.T, BinomialAmerican.N)
+        dt = self.T / BinomialAmerican.N
+        if self.sigma * np.sqrt(dt) <= np.max(np.abs(carry)) * dt:
+            # Too little volatility for a probability in [0, 1] (as in `lattice`): the tree collapses to one
+            # path growing at the carry, exercised at its best level
+            growth, discount = (np.exp(np.concatenate(([0], np.cumsum(np.broadcast_to(x, BinomialAmerican.N)) * dt)))
+                                for x in (carry, -rates))
+            path = escrowed(self.S, self.r, self.dividends, self.T) * growth + self.remaining_dividends()
+            return np.max(discount * np.maximum(sign * (path - self.K), 0))
+        self.compute_constants()
 
         # Vector of indices 0 to N
         i = np.arange(BinomialAmerican.N + 1)
 
         # Calculate asset prices at maturity
-        ST = self.S * (self.u ** (BinomialAmerican.N - i)) * (self.d ** i)
+        ST = self.S0 * (self.u ** (BinomialAmerican.N - i)) * (self.d ** i)
 
         # Option values at maturity
         if self.option_type == 'call':
@@ -37,16 +73,128 @@ class BinomialAmerican:
             option_values = np.maximum(0, self.K - ST)
 
         # Step backward through the tree with early exercise check (American style)
-        for j in range(BinomialAmerican.N - 1, -1, -1):
-            ST = self.S * (self.u ** (j - i[:j+1])) * (self.d ** i[:j+1])  # Asset prices at time j
-            option_values = np.exp(-self.r * self.dt) * (
-                self.p * option_values[:-1] + (1 - self.p) * option_values[1:]
-            )
-
-            # Immediate exercise value at node
-            if self.option_type == 'call':
-                option_values = np.maximum(option_values, ST - self.K)
-            else:
-                option_values = np.maximum(option_values, self.K - ST)
+        with stage('tree_sweep', size=(BinomialAmerican.N + 1) * (BinomialAmerican.N + 2) // 2):
+            for j in range(BinomialAmerican.N - 1, -1, -1):
+                ST = self.S0 * (self.u ** (j - i[:j+1])) * (self.d ** i[:j+1]) + self.remaining[j]  # Asset prices at time j
+                option_values = self.step_discount[j] * (
+                    self.p[j] * option_values[:-1] + (1 - self.p[j]) * option_values[1:]
+                )
+
+                # Immediate exercise value at node
+                if self.option_type == 'call':
+                    option_values = np.maximum(option_values, ST - self.K)
+                else:
+                    option_values = np.maximum(option_values, self.K - ST)
 
         return option_values[0]
+
+    @staticmethod
+    @cached
+    @profiled('binomial_american.price_batch')
+    def price_batch(S, K, sigma, r, T, is_call, N=None, q=0.0):
+        """
+        Prices a batch of American options in one vectorized backward induction.
+
+        Every argument is an array of a common shape (or a scalar). The tree for each contract is the
+        same CRR tree as `price_options`, but all contracts step backward together, so the Python loop
+        runs N times for the whole batch instead of N times per contract. Memory is O(batch * N).
+
+        Parameters:
+        ----------
+        S, K, sigma, r, T : array-like
+            Stock price, strike, volatility, risk-free rate and time to maturity of each contract.
+        q : array-like, optional
+            Continuous dividend yield of each contract (default is 0).
+        is_call : array-like of bool
+            True for calls, False for puts.
+        N : int, optional
+            Number of binomial steps (defaults to BinomialAmerican.N).
+
+        Returns:
+        -------
+        np.ndarray
+            The option prices, with contracts at or past expiry worth their intrinsic value and contracts
+            with (near) zero volatility their value on the deterministic forward path.
+        """
+        N = BinomialAmerican.N if N is None else N
+        S, K, sigma, r, T, q, is_call = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, sigma, r, T, q)),
+                                                            np.asarray(is_call, dtype=bool))
+        shape = S.shape
+        S, K, sigma, r, T, q, is_call = (x.ravel() for x in (S, K, sigma, r, T, q, is_call))
+        lattice = BinomialAmerican.lattice(sigma, r, T, N, q)
+        return BinomialAmerican.sweep(lattice, S, K, is_call).reshape(shape)
+
+    @staticmethod
+    def lattice(sigma, r, T, N=None, q=0.0):
+        """
+        The spot-independent part of the CRR trees of a batch: node multipliers and discounted probabilities.
+
+        Node prices are the spot times these multipliers, so the lattice of a position can be kept and swept
+        again at a new spot without being rebuilt.
+
+        Returns:
+        -------
+        dict
+            'multipliers' (batch, N + 1) terminal node prices per unit spot, 'inv_u', 'up' and 'down' (batch, 1),
+            'expired' (batch,) for contracts at or past expiry, which are worth their intrinsic value, and
+            'degenerate' (batch,) for live contracts whose volatility is too low for the tree, with their
+            per-step 'carry' and 'discount' factors (batch, 1).
+        """
+        N = BinomialAmerican.N if N is None else N
+        sigma, r, T, q = (x[:, None] for x in np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float))
+                                                                      for x in (sigma, r, T, q))))
+        expired = T <= 0
+        dt = np.where(expired, 1.0, T) / N
+        # The CRR probability lies in [0, 1] only while sigma sqrt(dt) > |r - q| dt; below that (and at zero
+        # volatility) the price is that of the deterministic forward path instead
+        degenerate = ~expired & (sigma * np.sqrt(dt) <= np.abs(r - q) * dt)
+        tree = ~(expired | degenerate)
+        u = np.exp(np.where(tree, sigma, 1.0) * np.sqrt(dt))
+        growth = np.exp(np.where(tree, r - q, 0.0) * dt)
+        p = (growth - 1 / u) / (u - 1 / u)
+        discount = np.exp(-r * dt)
+
+        # With d = 1/u the node price at level j, index i is S * u^(j - 2i), so stepping back a level
+        # drops the last node and divides by u instead of recomputing powers.
+        return {'multipliers': u ** (N - 2 * np.arange(N + 1)), 'inv_u': 1 / u, 'up': discount * p,
+                'down': discount * (1 - p), 'expired': expired[:, 0], 'degenerate': degenerate[:, 0],
+                'carry': np.exp((r - q) * dt), 'discount': discount}
+
+    @staticmethod
+    def forward_value(S, K, is_call, carry, discount, N, american=True):
+        """
+        Value on the deterministic path S carry^j of a zero-volatility contract: the discounted payoff at
+        maturity, or for an American contract the best discounted exercise value over the N + 1 levels.
+        `carry` and `discount` are the per-step growth and discount factors, of shape (batch, 1).
+        """
+        S, K = (np.asarray(x, dtype=float)[:, None] for x in (S, K))
+        sign = np.where(np.asarray(is_call, dtype=bool), 1.0, -1.0)[:, None]
+        levels = np.arange(N + 1) if american else np.array([N])
+        exercise = discount ** levels * np.maximum(sign * (S * carry ** levels - K), 0)
+        return exercise.max(axis=1)
+
+    @staticmethod
+    def sweep(lattice, S, K, is_call):
+        """
+        Backward induction over a `lattice` (see `lattice`) at spots S, for strikes K, returning the prices.
+        """
+        S, K = (np.asarray(x, dtype=float)[:, None] for x in (S, K))
+        sign = np.where(np.asarray(is_call, dtype=bool), 1.0, -1.0)[:, None]
+        ST = S * lattice['multipliers']
+        option_values = np.maximum(sign * (ST - K), 0)
+        inv_u, up, down = lattice['inv_u'], lattice['up'], lattice['down']
+        N = ST.shape[1] - 1
+        with stage('tree_sweep', size=S.size * (N + 1) * (N + 2) // 2):
+            for j in range(N - 1, -1, -1):
+                option_values = up * option_values[:, :-1] + down * option_values[:, 1:]
+                ST = ST[:, :-1] * inv_u
+                np.maximum(option_values, sign * (ST - K), out=option_values)
+
+        intrinsic = np.maximum(sign * (S - K), 0)
+        values = np.where(lattice['expired'][:, None], intrinsic, option_values)[:, 0]
+        degenerate = lattice['degenerate']
+        if degenerate.any():
+            values[degenerate] = BinomialAmerican.forward_value(
+                S[degenerate, 0], K[degenerate, 0], sign[degenerate, 0] > 0, lattice['carry'][degenerate],
+                lattice['discount'][degenerate], N)
+        return values
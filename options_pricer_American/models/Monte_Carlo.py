@@ -4,23 +4,22 @@ simulation.
 """
 
 from options_pricer_European.models.Monte_Carlo import MonteCarlo   # MonteCarlo class imported to access the stock price simulation
+from options_pricer_European.models.Cache import seeded
+from options_pricer_European.models.Profiling import profiled, stage
 import numpy as np
-from statsmodels.nonparametric.smoothers_lowess import lowess
-from scipy.interpolate import interp1d
-import statsmodels.api as sm
-import matplotlib.pyplot as plt
 
 class MonteCarloAmerican():
-    def __init__(self, S, K, vol, r, T, option_type):
+    def __init__(self, S, K, vol, r, T, option_type, dtype=np.float64):
         self.S = S
         self.K = K
         self.vol = vol
         self.r = r
         self.T = T
         self.option_type = option_type
+        self.dtype = np.dtype(dtype)
         self.discount = np.exp(-self.r*self.T/MonteCarlo.N)  # Discount factor for each time step
         self.CF=0
-        self.S=0
+        self.paths=0
         
         """
         S: stock price
@@ -29,62 +28,130 @@ class MonteCarloAmerican():
         r: risk-free interest rate
         T: time to maturity in years
         type: 'call' or 'put'
+        dtype: float type of the simulated paths and cash flow matrix (np.float32 halves their memory); the
+               price and standard error are accumulated in float64
         """
 
-    def calculate_stock_price_ame(self):
-        mc = MonteCarlo(self.S, self.K, self.vol, self.r, self.T, 'put')
+    def calculate_stock_price_ame(self, seed=None):
+        mc = MonteCarlo(self.S, self.K, self.vol, self.r, self.T, self.option_type, dtype=self.dtype)
 
         """
-        calculate_stock_price() is expected to yield - average stock price and cv (control variate using delta hedging)
+        calculate_stock_price() yields the (N+1, M) stock price matrix and the delta hedging control variate; the
+        backward induction works path by path, so the matrix is returned transposed to (M, N+1). Seeded paths come
+        from an enabled ScenarioStore, shared with European pricers on the same underlying.
         """
-        ST, cv = mc.calculate_stock_price()     # Stock price and delta hedging control variate
+        ST, cv = mc.calculate_stock_price(seed)     # Stock price and delta hedging control variate
 
-        return ST, cv
+        return ST.T, cv
 
-    def intrinsic_value(self, ST, cv):
-        CF = np.maximum(self.K - ST, 0) + cv
+    def intrinsic_value(self, ST, cv=None):
+        # The delta hedging control variate is a terminal quantity and cannot be added to early exercise cash flows
+        if self.option_type == 'call':
+            CF = np.maximum(ST - self.K, 0)
+        else:
+            CF = np.maximum(self.K - ST, 0)
         
         return CF
 
-    def backtrack(self):
-        
-        self.CF = self.intrinsic_value(*self.calculate_stock_price_ame())  # Cash flow matrix initialized with intrinsic values
-        self.S = self.calculate_stock_price_ame()[0]  # Stock price matrix
+    @staticmethod
+    def continuation(S_itm, Y, S):
+        """
+        Carriere: non-parametric (lowess) regression of the discounted next-step cash flows Y on the prices of the
+        ITM paths S_itm, evaluated at the prices S of all paths.
+        """
+        # Imported on first use: statsmodels alone takes over a second to import
+        from statsmodels.nonparametric.smoothers_lowess import lowess
+        from scipy.interpolate import interp1d
+
+        cont_val  = lowess(endog=Y, exog=S_itm, frac=0.3, return_sorted=False)
+
+        # Predict continuation value for *all* paths using nearest-neighbor rule
+        f = interp1d(S_itm, cont_val, fill_value="extrapolate")
+        return f(S)
+
+    @profiled('monte_carlo_american.backtrack')
+    def backtrack(self, seed=None):
+        self.paths, cv = self.calculate_stock_price_ame(seed)   # Stock price matrix, one row per path
+        with stage('payoff', size=self.paths.size):
+            self.CF = self.intrinsic_value(self.paths)           # Cash flow matrix initialized with intrinsic values
 
         for n in range(MonteCarlo.N-1, 0, -1):                 # walk from T-Δt to Δt
             itm = self.CF[:,n] > 0                      # in-the-money mask
-            if not itm.any():                      # no ITM path → go to previous step
+            if itm.sum() < 2:                      # too few ITM paths to regress → go to previous step
                 self.CF[:,n] = self.CF[:,n+1]*self.discount
                 continue
 
-            # --- Carriere: non-parametric regression on ITM paths only ---
-            S_itm, Y  = self.S[itm,n], self.CF[itm,n+1]*self.discount
-        
-            cont_val  = lowess(endog=Y, exog=S_itm, frac=0.3, return_sorted=False)
+            # --- Carriere: non-parametric regression on ITM paths only, timed per step (items = ITM paths) ---
+            with stage('regression', size=itm.sum(), step=n):
+                S_itm, Y  = self.paths[itm,n], self.CF[itm,n+1]*self.discount
+                C_hat = self.continuation(S_itm, Y, self.paths[:,n])     # continuation estimate
+
+            # --- Optimal decision (only ITM paths may exercise) ---
+            with stage('exercise', size=len(itm)):
+                exercise = itm & (self.CF[:,n] > C_hat)     # boolean exercise decision
+                self.CF[~exercise, n] = self.CF[~exercise,n+1]*self.discount
 
-            # Predict continuation value for *all* paths using nearest-neighbor rule
-        
-            f = interp1d(S_itm, cont_val, fill_value="extrapolate")
-            C_hat = f(self.S[:,n])                       # continuation estimate
 
-            # --- Optimal decision ---
-            exercise = self.CF[:,n] > C_hat             # boolean exercise decision
-            self.CF[exercise, n]  = self.CF[exercise, n]     # keep immediate payoff
-            self.CF[~exercise, n] = self.CF[~exercise,n+1]*self.discount
+        # Price estimate (high bias), never below immediate exercise
+        V0_high = max(self.CF[:,1].mean(dtype=np.float64)*self.discount, self.intrinsic_value(self.S))
 
+        return V0_high
 
-        # Price estimate (high bias)                
-        V0_high = self.CF[:,1].mean()*self.discount
+
+    @profiled('monte_carlo_american.simulate_scenarios')
+    def simulate_scenarios(self, scenarios, read_ahead=2):
+        """
+        Prices the option by the same Longstaff-Schwartz backward induction as simulate(), sweeping the time slices
+        of a time-major ScenarioSet from maturity back to today with `read_ahead` chunks loaded in the background.
+
+        Only the realised cash flow of each path is kept rather than the (M, N+1) cash flow matrix, so memory is a
+        few chunks plus O(M) vectors; plot_data() is not available afterwards. The set must have N = MonteCarlo.N
+        steps and have been simulated for this underlying (see `ScenarioSet.check`).
+
+        Returns:
+        -------
+        tuple[float, float]
+            The price and its standard error.
+        """
+        if scenarios.layout != 'time':
+            raise ValueError("the backward induction needs a time-major ('time' layout) scenario set")
+        scenarios.check(MonteCarlo.N, S=self.S, T=self.T, vol=self.vol, r=self.r)
+
+        cash = None
+        for n, S_n in scenarios.slices(reverse=True, read_ahead=read_ahead):
+            if n == MonteCarlo.N:
+                with stage('payoff', size=scenarios.paths):
+                    cash = self.intrinsic_value(S_n).astype(np.float64)   # cash flow of each path at maturity
+                continue
+            if n == 0:
+                break
+            cash *= self.discount                           # continuation: the path's cash flow seen from step n
+            with stage('payoff', size=scenarios.paths):
+                exercise_value = self.intrinsic_value(S_n)
+                itm = exercise_value > 0
+            if itm.sum() < 2:
+                continue
+            with stage('regression', size=itm.sum(), step=n):
+                C_hat = self.continuation(S_n[itm], cash[itm], S_n)
+            with stage('exercise', size=len(itm)):
+                exercise = itm & (exercise_value > C_hat)
+                cash[exercise] = exercise_value[exercise]
+
+        V0 = max(cash.mean()*self.discount, self.intrinsic_value(self.S))
+        SE = np.std(cash, ddof=1)*self.discount/np.sqrt(scenarios.paths)
+        return V0, SE
 
 
     def plot_data(self):
         """
         Preparing data for plotting
         """
+        import matplotlib.pyplot as plt
+        import statsmodels.api as sm
 
         n_plot = 6
         exercise_flag = (self.CF[:,n_plot] > self.CF[:,n_plot+1]*self.discount)
-        stock_n  = self.S[:, n_plot]
+        stock_n  = self.paths[:, n_plot]
         payoff_n = self.CF[:, n_plot]                   # realised cash flow at that step
         cont_n  = self.CF[:, n_plot+1]*self.discount        # continuation value
         ex_flag = payoff_n > cont_n        #exercise flag
@@ -108,17 +175,15 @@ class MonteCarloAmerican():
         plt.legend();  plt.show()
 
 
-    def simulate(self):
-
-        if(self.option_type == 'call'):
-            # For call option
-            CT = np.maximum(0, self.ST - self.K)
-            C0 = np.exp(-self.r*self.T)*np.sum(CT[-1])/MonteCarlo.M
-        elif(self.option_type == 'put'):
-            # For put option 
-            self.backtrack()  # Backtracking to find the optimal exercise strategy
-            self.plot_data()  # Plotting the results
-
-
-
+    @profiled('monte_carlo_american.simulate')
+    def simulate(self, seed=None):
+        """
+        Prices the option by Longstaff-Schwartz backward induction, returning the price and its standard error.
+        A seed makes the run reproducible; the global random state is restored afterwards.
+        Call plot_data() afterwards to see the exercise decision at one time step.
+        """
+        with seeded(seed):
+            V0 = self.backtrack(seed)
+        SE = np.std(self.CF[:,1], ddof=1, dtype=np.float64)*self.discount/np.sqrt(MonteCarlo.M)
 
+        return V0, SE
@@ -1,4 +1,4 @@
-from models.Monte_Carlo import MonteCarloAmerican
-from models.Binomial import BinomialAmerican
+from .Monte_Carlo import MonteCarloAmerican
+from .Binomial import BinomialAmerican
 
 __all__ = ['MonteCarloAmerican', 'BinomialAmerican']
\ No newline at end of file
@@ -0,0 +1,247 @@
+import numpy as np
+from options_pricer_European.models.Kernel import norm
+
+
+def _fixing_schedule(T, N, fixings):
+    """
+    Returns the sorted fixing times, defaulting to N + 1 equally spaced fixings on [0, T].
+    """
+    if fixings is None:
+        return np.linspace(0, T, N + 1)
+
+    fixings = np.sort(np.asarray(fixings, dtype=float))
+    if fixings.ndim != 1 or len(fixings) == 0:
+        raise ValueError("fixings must be a non-empty one-dimensional array of times")
+    if fixings[0] < 0 or fixings[-1] > T:
+        raise ValueError("fixings must lie between today (0) and maturity (T)")
+    return fixings
+
+
+class AsianAnalytic:
+    """
+    Closed-form and moment-matching approximations for Asian options.
+
+    The geometric-average price is exact (Kemna-Vorst) for the discrete fixing schedule used by
+    `asian.simulate`, which makes it the natural control variate for the Monte Carlo estimator.
+    Turnbull-Wakeman and Levy approximate the arithmetic-average price by fitting a lognormal
+    distribution to the first two moments of the average, giving instant quotes for screening.
+
+    Seasoned contracts are handled by strike adjustment: with n_past fixings averaging A_past already
+    observed and n_future remaining, the option is n_future / n worth of options on the future average
+    struck at (n K - n_past A_past) / n_future.
+    """
+
+    def __init__(self, S, K, vol, r, T, option_type, N=1000, fixings=None, past_average=0.0, n_past=0):
+        """
+        Initializes the analytic pricer with the same contract parameters as `asian`.
+
+        Parameters:
+        ----------
+        S : float
+            Current stock price.
+        K : float
+            Strike price of the option.
+        vol : float
+            Annualized volatility of the underlying stock.
+        r : float
+            Annualized risk-free interest rate.
+        T : float
+            Time to maturity (payment date) in years.
+        option_type : str
+            Type of the option, must be either 'call' or 'put'.
+        N : int, optional
+            Number of averaging intervals (default is 1000). Without `fixings`, the average is taken over
+            the N + 1 equally spaced fixings 0, T/N, ..., T, matching `asian.simulate`.
+        fixings : array-like, optional
+            Times in years from today of the remaining fixings, each in [0, T]. Overrides `N`.
+        past_average : float, optional
+            Average of the fixings already observed for a seasoned contract (default is 0).
+        n_past : int, optional
+            Number of fixings already observed (default is 0).
+        """
+        if option_type.lower() not in ('call', 'put'):
+            raise ValueError("option_type must be 'call' or 'put'")
+
+        self.S = S
+        self.K = K
+        self.vol = vol
+        self.r = r
+        self.T = T
+        self.option_type = option_type.lower()
+        self.N = N
+        self.fixings = _fixing_schedule(T, N, fixings)
+        self.past_average = past_average
+        self.n_past = n_past
+
+        # A seasoned option on the full average is `weight` options on the average of the remaining
+        # fixings, struck at the adjusted strike below.
+        n_future = len(self.fixings)
+        n_total = n_past + n_future
+        self.weight = n_future / n_total
+        self.strike = (n_total * K - n_past * past_average) / n_future
+
+    def _lognormal_price(self, forward, variance):
+        """
+        Prices an option on a lognormal quantity with the given forward and total log-variance.
+
+        When the adjusted strike is not positive the call is certain to finish in the money and is
+        worth its discounted forward intrinsic value, while the put is worthless.
+        """
+        discount = np.exp(-self.r * self.T)
+        K = self.strike
+
+        if K <= 0:
+            if self.option_type == 'call':
+                return self.weight * discount * (forward - K)
+            return 0.0
+
+        std = np.sqrt(variance)
+        d1 = (np.log(forward / K) + 0.5 * variance) / std
+        d2 = d1 - std
+
+        if self.option_type == 'call':
+            price = discount * (forward * norm.cdf(d1) - K * norm.cdf(d2))
+        else:
+            price = discount * (K * norm.cdf(-d2) - forward * norm.cdf(-d1))
+        return self.weight * price
+
+    def geometric_moments(self):
+        """
+        Mean and variance of the log of the discrete geometric average.
+
+        For sorted fixing times t_0 <= ... <= t_{n-1}, the double sum of min(t_i, t_j) collapses to
+        sum_k t_k * (2(n - k) - 1), so the moments cost O(n) rather than O(n^2).
+
+        Returns:
+        -------
+        tuple[float, float]
+            The mean and the variance of ln(G).
+        """
+        t = self.fixings
+        n = len(t)
+        mean = np.log(self.S) + (self.r - 0.5 * self.vol**2) * np.mean(t)
+        weights = 2 * (n - np.arange(n)) - 1
+        variance = self.vol**2 * np.sum(t * weights) / n**2
+        return mean, variance
+
+    def geometric(self):
+        """
+        Exact price of the discretely monitored geometric-average Asian option (Kemna-Vorst).
+
+        Returns:
+        -------
+        float
+            The option price.
+        """
+        mean, variance = self.geometric_moments()
+        return self._lognormal_price(np.exp(mean + 0.5 * variance), variance)
+
+    def arithmetic_moments(self):
+        """
+        First and second raw moments of the discrete arithmetic average under GBM.
+
+        E[A^2] is a double sum over fixing pairs; with sorted times each term factorises as
+        exp((r + vol^2) t_i) * exp(r t_j) for t_i <= t_j, so a reversed cumulative sum gives it in O(n).
+
+        Returns:
+        -------
+        tuple[float, float]
+            E[A] and E[A^2].
+        """
+        t = self.fixings
+        n = len(t)
+        growth = np.exp(self.r * t)
+        M1 = self.S * np.sum(growth) / n
+
+        # Sum of exp(r t_j) over j > i for every i
+        tail = np.cumsum(growth[::-1])[::-1] - growth
+        M2 = self.S**2 * np.sum(np.exp((self.r + self.vol**2) * t) * (growth + 2 * tail)) / n**2
+        return M1, M2
+
+    def levy(self):
+        """
+        Levy's approximation: the discrete arithmetic average is replaced by a lognormal variable
+        with the same first two moments.
+
+        Returns:
+        -------
+        float
+            The approximate option price.
+        """
+        M1, M2 = self.arithmetic_moments()
+        return self._lognormal_price(M1, np.log(M2 / M1**2))
+
+    def turnbull_wakeman(self):
+        """
+        Turnbull-Wakeman approximation for a continuously averaged arithmetic Asian option.
+
+        The average is taken continuously over the window spanned by the remaining fixings. Its
+        moments are matched to a lognormal variable with cost of carry b_A and volatility vol_A,
+        which is then priced with the generalized Black-Scholes formula. Elapsed fixings enter
+        through the adjusted strike.
+
+        Returns:
+        -------
+        float
+            The approximate option price.
+        """
+        b = self.r
+        v2 = self.vol**2
+        t1, t2 = self.fixings[0], self.fixings[-1]
+        tau = t2 - t1
+
+        if tau <= 0:
+            # A single fixing date: the average is lognormal and Levy's formula is exact.
+            return self.levy()
+
+        if abs(b) < 1e-12:
+            M1 = 1.0
+            M2 = 2 * (np.exp(v2 * t2) - np.exp(v2 * t1) * (1 + v2 * tau)) / (v2**2 * tau**2)
+        else:
+            M1 = (np.exp(b * t2) - np.exp(b * t1)) / (b * tau)
+            M2 = (2 * np.exp((2 * b + v2) * t2) / ((b + v2) * (2 * b + v2) * tau**2)
+                  + 2 * np.exp((2 * b + v2) * t1) / (b * tau**2)
+                  * (1 / (2 * b + v2) - np.exp(b * tau) / (b + v2)))
+
+        return self._lognormal_price(self.S * M1, np.log(M2 / M1**2))
+
+    @staticmethod
+    def levy_batch(S, K, vol, r, T, is_call, n_fixings=12):
+        """
+        Levy's approximation for a batch of unseasoned Asian options in one vectorized pass.
+
+        Each contract averages `n_fixings` equally spaced fixings T/n, 2T/n, ..., T. Every argument is
+        an array of a common shape (or a scalar); the fixing dimension is added as a trailing axis, so
+        memory is O(batch * n_fixings).
+
+        Returns:
+        -------
+        np.ndarray
+            The approximate option prices, with contracts at or past expiry worth their intrinsic value and
+            contracts with zero volatility the discounted payoff on the forward of the average.
+        """
+        S, K, vol, r, T, is_call = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, vol, r, T)),
+                                                       np.asarray(is_call, dtype=bool))
+        alive = T > 0
+        T_safe = np.where(alive, T, 1.0)[..., None]
+        t = T_safe * np.arange(1, n_fixings + 1) / n_fixings
+        r_, v2 = r[..., None], vol[..., None] ** 2
+
+        growth = np.exp(r_ * t)
+        tail = np.cumsum(growth[..., ::-1], axis=-1)[..., ::-1] - growth
+        M1 = S * growth.sum(axis=-1) / n_fixings
+        M2 = S**2 * np.sum(np.exp((r_ + v2) * t) * (growth + 2 * tail), axis=-1) / n_fixings**2
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(np.log(M2 / M1**2))
+            d1 = (np.log(M1 / K) + 0.5 * std**2) / std
+            d2 = d1 - std
+            discount = np.exp(-r * T_safe[..., 0])
+            call = discount * (M1 * norm.cdf(d1) - K * norm.cdf(d2))
+            put = discount * (K * norm.cdf(-d2) - M1 * norm.cdf(-d1))
+
+        # At zero volatility the average is its forward M1: the value is the discounted payoff on it
+        forward = discount * np.maximum(np.where(is_call, M1 - K, K - M1), 0)
+        value = np.where(vol > 0, np.where(is_call, call, put), forward)
+        intrinsic = np.maximum(np.where(is_call, S - K, K - S), 0)
+        return np.where(alive, value, intrinsic)
@@ -1,10 +1,25 @@
 import math
 import numpy as np
-import pandas as pd
-import datetime
-import scipy.stats as stats
-import matplotlib.pyplot as plt
-from pandas_datareader import data as pdr
+
+from options_pricer_European.models.Cache import seeded
+from options_pricer_European.models.Kernel import StandardNormal, norm
+from options_pricer_European.models.Profiling import profiled, stage
+from options_pricer_European.models.Scenarios import active_scenarios, scenario
+from options_pricer_European.models.Term_Structure import YieldCurve, as_curve, as_dividends, escrowed
+from .Analytic import AsianAnalytic, _fixing_schedule
+
+def _standard_normal(distribution):
+    # The geometric control variate's closed form holds for Gaussian shocks only: accept the kernel's normal
+    # and a scipy.stats normal (frozen or not) with zero mean and unit variance
+    if isinstance(distribution, StandardNormal):
+        return True
+    if getattr(getattr(distribution, 'dist', distribution), 'name', None) != 'norm':
+        return False
+    try:
+        return distribution.mean() == 0 and distribution.std() == 1
+    except TypeError:
+        return False
+
 
 class asian:
     """
@@ -14,7 +29,8 @@ class asian:
     to estimate the option's value, where the payoff is determined by the average stock price over the path.
     """
 
-    def __init__(self, S, K, vol, r, T, option_type, N=1000, M=10000, distribution=stats.norm):
+    def __init__(self, S, K, vol, r, T, option_type, N=1000, M=10000, distribution=norm, control_variate=True,
+                 fixings=None, past_average=0.0, n_past=0, dividends=None, dtype=np.float64):
         """
         Initializes the Monte Carlo pricer with option and simulation parameters.
 
@@ -26,8 +42,9 @@ class asian:
             Strike price of the option (e.g., 105).
         vol : float
             Annualized volatility of the underlying stock (e.g., 0.2 for 20%).
-        r : float
-            Annualized risk-free interest rate (e.g., 0.05 for 5%).
+        r : float or YieldCurve
+            Annualized risk-free interest rate (e.g., 0.05 for 5%), or a yield curve giving the forward rate
+            between consecutive fixings.
         T : float
             Time to maturity in years (e.g., 1 for one year).
         option_type : str
@@ -39,7 +56,28 @@ class asian:
             Number of simulation paths to generate (default is 10000).
             More paths lead to a more accurate price estimate and lower standard error.
         distribution : scipy.stats distribution object, optional
-            The distribution for generating random shocks (default is stats.norm for a standard normal distribution).
+            The distribution for generating random shocks (default is the standard normal, drawing the same
+            shocks as scipy.stats.norm).
+        control_variate : bool, optional
+            Whether to use the geometric-average option, priced exactly by `AsianAnalytic.geometric`, as a
+            control variate (default is True). Only valid when `distribution` is standard normal, so it is
+            skipped for any other distribution.
+        fixings : array-like, optional
+            Times in years from today of the remaining averaging dates, each in [0, T]. When given, paths
+            are only simulated at these dates using exact GBM increments, so a monthly-fixed contract needs
+            12 steps regardless of `N`. Defaults to the N + 1 equally spaced dates 0, T/N, ..., T.
+        past_average : float, optional
+            Average of the fixings already observed for a seasoned contract (default is 0).
+        n_past : int, optional
+            Number of fixings already observed (default is 0).
+        dividends : float or Dividends, optional
+            Continuous dividend yield, or a schedule of yield and cash dividends (escrowed: the value of the
+            dividends still to be paid is added back to the simulated price at each fixing). The geometric
+            control variate assumes a flat rate without dividends, so it is skipped when either is given.
+        dtype : data-type, optional
+            Float type in which the shocks and log-returns are generated and evolved (default is np.float64).
+            With np.float32 the per-path state takes half the memory and bandwidth; the running averages,
+            payoffs and their statistics are accumulated in float64 either way.
         """
         self.S = S  
         self.K = K
@@ -50,15 +88,52 @@ class asian:
         self.N = N
         self.M = M
         self.distribution = distribution
+        self.control_variate = control_variate
+        self.fixings = _fixing_schedule(T, N, fixings)
+        self.past_average = past_average
+        self.n_past = n_past
+        self.dividends = as_dividends(dividends)
+        self.dtype = np.dtype(dtype)
+
 
+    def log_returns(self, drift, diffusion, dt):
+        """
+        Yields the M simulated log-returns since today at each fixing, evolving one array in place.
+        """
+        ln_return = np.zeros(self.M, dtype=self.dtype)
+        for i in range(len(self.fixings)):
+            if dt[i] > 0:
+                with stage('rng', size=self.M):
+                    Z = self.distribution.rvs(size=self.M).astype(self.dtype, copy=False)
+                with stage('path_build', size=self.M):
+                    ln_return += drift[i] + diffusion[i] * Z
+            yield ln_return
 
-    def simulate(self):
+    def _stored_log_returns(self, drift, diffusion, dt):
+        paths = np.empty((len(self.fixings), self.M), dtype=self.dtype)
+        for i, ln_return in enumerate(self.log_returns(drift, diffusion, dt)):
+            paths[i] = ln_return
+        return paths
+
+    @profiled('asian.simulate')
+    def simulate(self, seed=None):
         """
         Calculates the Asian option price and its standard error using Monte Carlo simulation.
 
         The method follows the standard procedure for risk-neutral simulation of
         Geometric Brownian Motion (GBM). The payoff is based on the arithmetic
-        average of the stock prices at discrete time steps, including the initial price.
+        average of the stock prices at the fixing dates (by default every time step, including the initial
+        price), combined with any fixings already observed.
+
+        With `control_variate` enabled, the payoff of the geometric-average option on the same paths is used
+        as a control: its exact price is known in closed form and it is highly correlated with the arithmetic
+        payoff, so the estimator Y - beta * (X - E[X]) typically has a variance 100x smaller or more.
+
+        Parameters:
+        ----------
+        seed : int, optional
+            Seed for a reproducible run; the global random state is restored afterwards. Seeded runs share their
+            paths with other strikes and option types through an enabled ScenarioStore.
 
         Returns:
         -------
@@ -74,41 +149,83 @@ class asian:
             If the `option_type` is not 'call' or 'put'.
         """
         # --- 1. Set up Simulation Parameters for Geometric Brownian Motion ---
-        # Time step size
-        dt = self.T / self.N
+        # Step sizes between consecutive fixing dates; a fixing at t = 0 is S itself and needs no step.
+        dt = np.diff(self.fixings, prepend=0.0)
+        starts = self.fixings - dt
+        term_structure = isinstance(self.r, YieldCurve) or self.dividends is not None
+        carry = self.r
+        if term_structure:
+            # Forward rate less dividend yield between consecutive fixings, in one vectorized lookup
+            carry = as_curve(self.r).forward_rate(starts, self.fixings)
+            if self.dividends is not None:
+                carry = carry - self.dividends.q.forward_rate(starts, self.fixings)
         # Risk-neutral drift component for the log-price process
-        drift = (self.r - 0.5 * self.vol**2) * dt
+        drift = (carry - 0.5 * self.vol**2) * dt
         # Diffusion (random) component for the log-price process
         diffusion = self.vol * np.sqrt(dt)
+        drift, diffusion = (np.broadcast_to(x, dt.shape).astype(self.dtype) for x in (drift, diffusion))
+
+        # --- 2. Simulate Stock Prices at the Fixing Dates ---
+        # Only running sums of the price and log-price are kept, so memory is O(M) whatever the number
+        # of fixings. Shocks are drawn one step at a time, in the same order as an (N, M) matrix. Paths are
+        # evolved as log-returns since today, which being small lose little to rounding even in float32.
+        # With a ScenarioStore the (fixings, M) log-returns are kept instead, to be shared by other contracts.
+        ln_S0 = np.log(escrowed(self.S, self.r, self.dividends, self.T))
+        S0 = np.exp(ln_S0)
+        remaining = np.zeros(len(self.fixings))
+        if self.dividends is not None and len(self.dividends.times):
+            remaining = self.dividends.present_value(as_curve(self.r), self.fixings, self.T)
+        sum_S = np.zeros(self.M)
+        sum_ln_S = np.zeros(self.M)
+        with seeded(seed):
+            paths = self.log_returns(drift, diffusion, dt)
+            if active_scenarios() is not None and seed is not None:
+                paths = scenario('gbm_fixings', seed, lambda: self._stored_log_returns(drift, diffusion, dt),
+                                 drift=drift, diffusion=diffusion, dt=dt, M=self.M, dtype=self.dtype.str,
+                                 distribution=None if self.distribution is norm else self.distribution)
+            for i, ln_return in enumerate(paths):
+                with stage('averaging', size=self.M):
+                    sum_S += S0 * np.exp(ln_return) + remaining[i]
+                    sum_ln_S += ln_return
 
-        # --- 2. Generate Random Shocks ---
-        # Create a matrix of random numbers from the specified distribution.
-        # Dimensions are (N steps) x (M simulations).
-        Z = self.distribution.rvs(size=(self.N, self.M))
-
-        # --- 3. Simulate Stock Price Paths ---
-        # Calculate the change in log price at each step for every simulation path.
-        delta_ln_S = drift + diffusion * Z
-        # Cumulatively sum the log changes to get the log-price path for N steps.
-        ln_S_paths = np.log(self.S) + np.cumsum(delta_ln_S, axis=0)
-        # Prepend the initial log price to each path to include it in the average.
-        ln_S_paths = np.vstack([np.full(self.M, np.log(self.S)), ln_S_paths])
-        # Convert log-price paths to price paths.
-        price_paths = np.exp(ln_S_paths)
-        # Calculate the arithmetic average price for each simulation path.
-        average_prices = np.mean(price_paths, axis=0)
-
-        # --- 4. Calculate Option Payoff for Each Path ---
-        if self.option_type.lower() == 'call':
-            payoffs = np.maximum(0, average_prices - self.K)
-        elif self.option_type.lower() == 'put':
-            payoffs = np.maximum(0, self.K - average_prices)
-        else:
-            raise ValueError("option_type must be 'call' or 'put'")
-
-        # --- 5. Discount Payoffs and Calculate Final Price and Standard Error ---
+        # Average over all fixings, including those already observed for a seasoned contract.
+        n_future = len(self.fixings)
+        n_total = self.n_past + n_future
+        average_prices = (self.n_past * self.past_average + sum_S) / n_total
+
+        # --- 3. Calculate Option Payoff for Each Path ---
+        with stage('payoff', size=self.M):
+            if self.option_type.lower() == 'call':
+                payoffs = np.maximum(0, average_prices - self.K)
+            elif self.option_type.lower() == 'put':
+                payoffs = np.maximum(0, self.K - average_prices)
+            else:
+                raise ValueError("option_type must be 'call' or 'put'")
+
+        # --- 4. Discount Payoffs and Calculate Final Price and Standard Error ---
         # Discount each individual payoff back to its present value.
-        discounted_payoffs = np.exp(-self.r * self.T) * payoffs
+        with stage('discounting', size=self.M):
+            discounted_payoffs = as_curve(self.r).discount(self.T) * payoffs if term_structure else np.exp(-self.r * self.T) * payoffs
+
+        if self.control_variate and not term_structure and _standard_normal(self.distribution):
+            with stage('control_variate', size=self.M):
+                # Geometric average of the remaining fixings against the adjusted strike, whose expectation
+                # is known exactly (see `AsianAnalytic.geometric`).
+                analytic = AsianAnalytic(self.S, self.K, self.vol, self.r, self.T, self.option_type, self.N,
+                                         self.fixings, self.past_average, self.n_past)
+                geometric_prices = np.exp(ln_S0 + sum_ln_S / n_future)
+                if self.option_type.lower() == 'call':
+                    control = np.maximum(0, geometric_prices - analytic.strike)
+                else:
+                    control = np.maximum(0, analytic.strike - geometric_prices)
+                control = analytic.weight * np.exp(-self.r * self.T) * control
+                control_mean = analytic.geometric()
+
+                # Optimal coefficient beta = Cov(Y, X) / Var(X), estimated from the same sample.
+                centred = control - np.mean(control)
+                variance = np.dot(centred, centred)
+                beta = np.dot(centred, discounted_payoffs) / variance if variance > 0 else 0.0
+                discounted_payoffs = discounted_payoffs - beta * (control - control_mean)
 
         # The final option price is the average (mean) of all discounted payoffs.
         option_price = np.mean(discounted_payoffs)
@@ -1,3 +1,4 @@
 from .Monte_Carlo import asian
+from .Analytic import AsianAnalytic
 
-__all__ = ['asian']
\ No newline at end of file
+__all__ = ['asian', 'AsianAnalytic']
\ No newline at end of file
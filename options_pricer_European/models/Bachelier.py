@@ -0,0 +1,15 @@
+from .Black_76 import Black76
+from .Kernel import BACHELIER
+
+
+class Bachelier(Black76):
+    """
+    Bachelier (normal) model for European options: the forward F follows an arithmetic Brownian motion with
+    absolute volatility sigma (in price units per sqrt(year)), so it handles underlyings near or below zero,
+    such as rates and spreads. The API and Greek conventions are those of `Black76`.
+
+    `implied_vol` uses the closed-form approximation of Choi, Kim and Kwak (2009) with one Newton polish,
+    so no iterative root search is needed.
+    """
+
+    model = BACHELIER
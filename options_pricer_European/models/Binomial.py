@@ -1,6 +1,11 @@
 
 import numpy as np
 import math
+from scipy.special import gammaln, xlog1py, xlogy
+
+from .Cache import cached
+from .Profiling import profiled, stage
+from .Term_Structure import as_dividends, escrowed, step_carry
 
 """
     European style binomial option pricing model.
@@ -12,14 +17,21 @@ import math
         Strike price
     T : float
         Time to maturity (in years)
-    r : float
-        Risk-free interest rate (annualized, as a decimal)
-    sigma : float
-        Volatility of the underlying stock (annualized, as a decimal)
+    r : float or YieldCurve
+        Risk-free interest rate (annualized, as a decimal), or a yield curve
+    sigma : float or volatility model
+        Volatility of the underlying stock (annualized, as a decimal), or an object with a
+        vol(K, T) method such as a fitted GARCH or a VolSurface
     N : int
         Number of binomial steps
     option_type : str
         'call' for call option, 'put' for put option
+    dividends : float or Dividends, optional
+        Continuous dividend yield, or a schedule of yield and cash dividends
+
+    With a yield curve or dividends, each level of the tree has its own risk-neutral probability and
+    discount factor from the per-step forward rates, and the tree is built on the spot less the value
+    of the cash dividends (escrowed model).
 
     Returns:
     float
@@ -30,13 +42,17 @@ class Binomial:
 
     N = 100     #Number of time steps
 
-    def __init__(self, S, K, sigma, r, T, option_type='call', eps_1=0, eps_2=0, eps_3=0):
+    def __init__(self, S, K, sigma, r, T, option_type='call', eps_1=0, eps_2=0, eps_3=0, dividends=None):
+        # sigma may be a volatility model (a fitted GARCH or a VolSurface) queried at the strike and maturity
+        if hasattr(sigma, 'vol'):
+            sigma = sigma.vol(K, T+eps_2)
         self.S = S+eps_1  
         self.K = K
         self.sigma = sigma+eps_3
         self.r = r
         self.T = T+eps_2
         self.option_type = option_type
+        self.dividends = as_dividends(dividends)
 
         """
         S: stock price
@@ -50,20 +66,36 @@ class Binomial:
         self.dt = self.T / Binomial.N
         self.u = math.exp(self.sigma * math.sqrt(self.dt))
         self.d = 1 / self.u
-        self.p = (math.exp(self.r * self.dt) - self.d) / (self.u - self.d)
-        self.discount = math.exp(-self.r * self.T)
+        # Per-level rates: scalars for a flat rate without dividends, arrays of length N otherwise
+        carry, rates = step_carry(self.r, self.dividends, self.T, Binomial.N)
+        self.p = (np.exp(carry * self.dt) - self.d) / (self.u - self.d)
+        self.step_discount = np.exp(-rates * self.dt)
+        self.discount = np.exp(-np.mean(rates) * self.T)
+        self.S0 = escrowed(self.S, self.r, self.dividends, self.T)
         
+    @cached
+    @profiled('binomial.price_options')
     def price_options(self):
-        self.compute_constants()
-
-        # Handling edge cases
+        # Handling edge cases, before the tree constants divide by T and sigma
         if self.S <= 0 or self.K <= 0 or self.T < 0 or self.sigma < 0 or Binomial.N < 1:
             raise ValueError("Invalid input values.")
+        sign = 1 if self.option_type == 'call' else -1
+        if self.T == 0:
+            return max(sign * (self.S - self.K), 0)
+        carry, rates = step_carry(self.r, self.dividends, self.T, Binomial.N)
+        if self.sigma * math.sqrt(self.T / Binomial.N) <= np.max(np.abs(carry)) * self.T / Binomial.N:
+            # Too little volatility for a probability in [0, 1]: the tree collapses to one path growing at
+            # the carry, and the value is the discounted forward payoff
+            growth, discount = (np.exp(np.sum(np.broadcast_to(x, Binomial.N)) * self.T / Binomial.N) for x in (carry, -rates))
+            forward = escrowed(self.S, self.r, self.dividends, self.T) * growth
+            return discount * max(sign * (forward - self.K), 0)
+        self.compute_constants()
+
         # Vector of indices 0 to N
         i = np.arange(Binomial.N + 1)
 
         # Calculate asset prices at maturity
-        ST = self.S * (self.u ** (Binomial.N - i)) * (self.d ** i)
+        ST = self.S0 * (self.u ** (Binomial.N - i)) * (self.d ** i)
 
         # Option values at maturity
         if self.option_type == 'call':
@@ -72,7 +104,54 @@ class Binomial:
             option_values = np.maximum(0, self.K - ST)
 
         # Step backward through the tree
-        for j in range(Binomial.N - 1, -1, -1):
-            option_values = np.exp(-self.r * self.dt) * (self.p * option_values[:-1] + (1 - self.p) * option_values[1:])
+        p = np.broadcast_to(self.p, Binomial.N)
+        step_discount = np.broadcast_to(self.step_discount, Binomial.N)
+        with stage('tree_sweep', size=(Binomial.N + 1) * (Binomial.N + 2) // 2):
+            for j in range(Binomial.N - 1, -1, -1):
+                option_values = step_discount[j] * (p[j] * option_values[:-1] + (1 - p[j]) * option_values[1:])
             
         return option_values[0]
+
+    @staticmethod
+    @cached
+    @profiled('binomial.price_batch')
+    def price_batch(S, K, sigma, r, T, is_call, N=None, q=0.0):
+        """
+        Prices a batch of European options on the same CRR tree as `price_options`, without a backward loop.
+
+        Without early exercise the tree price is the discounted binomial expectation of the N + 1 terminal
+        payoffs, so every contract is one row of a (batch, N + 1) array operation. Arguments are as for
+        `BinomialAmerican.price_batch`.
+
+        Returns:
+        -------
+        np.ndarray
+            The option prices, with contracts at or past expiry worth their intrinsic value and contracts
+            with (near) zero volatility their discounted payoff on the forward.
+        """
+        N = Binomial.N if N is None else N
+        S, K, sigma, r, T, q, is_call = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, sigma, r, T, q)),
+                                                            np.asarray(is_call, dtype=bool))
+        shape = S.shape
+        S, K, sigma, r, T, q, is_call = (x.ravel()[:, None] for x in (S, K, sigma, r, T, q, is_call))
+        sign = np.where(is_call, 1.0, -1.0)
+
+        expired = T <= 0
+        dt = np.where(expired, 1.0, T) / N
+        # As in `BinomialAmerican.lattice`, volatility too low for a CRR probability in [0, 1] (including zero)
+        # prices on the deterministic forward path
+        degenerate = ~expired & (sigma * np.sqrt(dt) <= np.abs(r - q) * dt)
+        tree = ~(expired | degenerate)
+        u = np.exp(np.where(tree, sigma, 1.0) * np.sqrt(dt))
+        p = (np.exp(np.where(tree, r - q, 0.0) * dt) - 1 / u) / (u - 1 / u)
+        downs = np.arange(N + 1)
+        with stage('payoff', size=S.size * (N + 1)):
+            payoff = np.maximum(sign * (S * u ** (N - 2 * downs) - K), 0)
+        with stage('tree_expectation', size=S.size * (N + 1)):
+            # Binomial pmf of the number of down moves, in logs (scipy.stats.binom without importing scipy.stats)
+            pmf = np.exp(gammaln(N + 1) - gammaln(downs + 1) - gammaln(N - downs + 1)
+                         + xlogy(downs, 1 - p) + xlog1py(N - downs, -(1 - p)))
+            values = np.exp(-r * T) * np.sum(pmf * payoff, axis=1, keepdims=True)
+        forward = np.exp(-r * T) * np.maximum(sign * (S * np.exp((r - q) * T) - K), 0)
+        intrinsic = np.maximum(sign * (S - K), 0)
+        return np.where(expired, intrinsic, np.where(degenerate, forward, values))[:, 0].reshape(shape)
@@ -0,0 +1,63 @@
+import numpy as np
+
+from .Cache import cached
+from .Kernel import BLACK76, greeks_batch, implied_vol_batch, price_batch
+
+
+class Black76:
+    """
+    Black-76 model for European options on futures and forwards: the forward F is lognormal with volatility
+    sigma, and the payoff is discounted at r. Prices, Greeks and implied volatilities come from the same
+    vectorized kernel as `BlackScholes`, so every argument may be an array.
+
+    Greeks follow the `BlackScholes` conventions: delta and gamma with respect to F, vega per 0.01 of sigma,
+    theta per calendar day and rho per 1% of r with F held fixed.
+    """
+
+    model = BLACK76
+
+    def __init__(self, F, K, sigma, r, T):
+        self.F = F
+        self.K = K
+        self.sigma = sigma
+        self.r = r
+        self.T = T
+
+    def _greeks(self, option_type):
+        return greeks_batch(self.model, self.F, self.K, self.sigma, self.r, self.T, option_type == 'call')
+
+    @staticmethod
+    def _value(x):
+        return x.item() if np.ndim(x) == 0 else x
+
+    @cached
+    def price(self, option_type, decimals=3):
+        price = self._value(price_batch(self.model, self.F, self.K, self.sigma, self.r, self.T, option_type == 'call'))
+        return price if decimals is None else round(price, decimals)
+
+    @cached
+    def delta(self, option_type):
+        return self._value(self._greeks(option_type)['delta'])
+
+    @cached
+    def gamma(self):
+        return self._value(self._greeks('call')['gamma'])
+
+    @cached
+    def vega(self):
+        return self._value(self._greeks('call')['vega'])
+
+    @cached
+    def theta(self, option_type):
+        return self._value(self._greeks(option_type)['theta'])
+
+    @cached
+    def rho(self, option_type):
+        return self._value(self._greeks(option_type)['rho'])
+
+    @classmethod
+    def implied_vol(cls, market_price, F, K, r, T, option_type='call'):
+        """
+        Implied volatility from option prices (vectorized); NaN where the price violates no-arbitrage bounds.
+        """
+        return cls._value(implied_vol_batch(cls.model, market_price, F, K, r, T, option_type == 'call'))
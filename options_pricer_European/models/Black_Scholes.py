@@ -1,41 +1,64 @@
 import numpy as np
-import pandas as pd
-from scipy.stats import norm
+
+from .Cache import cached
+from .Kernel import lognormal, norm
+from .Term_Structure import as_dividends, escrowed, zero_rate
 
 
 class BlackScholes:
-    def __init__(self, S, K, sigma, r, T):
-        self.S = S
+    def __init__(self, S, K, sigma, r, T, dividends=None):
+        # sigma may be a volatility model (a fitted GARCH or a VolSurface) queried at each strike and maturity
+        if hasattr(sigma, 'vol'):
+            sigma = sigma.vol(K, T)
+        # r may be a YieldCurve and dividends a yield or a Dividends schedule: the curve's zero rate to T is
+        # used, and cash dividends before T are taken off the spot (escrowed model)
+        dividends = as_dividends(dividends)
+        self.S = escrowed(S, r, dividends, T)
         self.K = K
         self.sigma = sigma
-        self.r = r
+        self.r = zero_rate(r, T)
+        self.q = 0.0 if dividends is None else dividends.q.zero_rate(T)
         self.T = T
         self._compute_d1_d2()
 
     def _compute_d1_d2(self):
-        self.d1 = (np.log(self.S / self.K) + (self.r + 0.5 * self.sigma ** 2) * self.T) / (self.sigma * np.sqrt(self.T))
+        self.d1 = (np.log(self.S / self.K) + (self.r - self.q + 0.5 * self.sigma ** 2) * self.T) / (self.sigma * np.sqrt(self.T))
         self.d2 = self.d1 - self.sigma * np.sqrt(self.T)
+        self.dividend_discount = np.exp(-self.q * self.T)
 
-    def price(self, option_type):
-        if option_type == 'call':
-            return round(self.S * norm.cdf(self.d1) - self.K * np.exp(-self.r * self.T) * norm.cdf(self.d2),3)
-        else:
-            return round(self.K * np.exp(-self.r * self.T) * norm.cdf(-self.d2) - self.S * norm.cdf(-self.d1),3)
+    @cached
+    def price(self, option_type, decimals=3):
+        # decimals=None skips rounding, e.g. for P&L on arrays of contracts
+        # Priced on the forward by the kernel shared with Black76 and Bachelier
+        forward = self.S * np.exp((self.r - self.q) * self.T)
+        sign = 1 if option_type == 'call' else -1
+        price = np.exp(-self.r * self.T) * lognormal(forward, self.K, self.sigma, self.T, sign)
+        return price if decimals is None else round(price, decimals)
 
+    @cached
     def delta(self, option_type):
-        return norm.cdf(self.d1) if option_type == 'call' else norm.cdf(self.d1) - 1
+        delta = norm.cdf(self.d1) if option_type == 'call' else norm.cdf(self.d1) - 1
+        return self.dividend_discount * delta
 
+    @cached
     def gamma(self):
-        return norm.pdf(self.d1) / (self.S * self.sigma * np.sqrt(self.T))
+        return self.dividend_discount * norm.pdf(self.d1) / (self.S * self.sigma * np.sqrt(self.T))
 
+    @cached
     def vega(self):
-        return self.S * norm.pdf(self.d1) * np.sqrt(self.T) / 100
+        return self.S * self.dividend_discount * norm.pdf(self.d1) * np.sqrt(self.T) / 100
 
+    @cached
     def theta(self, option_type):
-        term1 = -self.S * norm.pdf(self.d1) * self.sigma / (2 * np.sqrt(self.T))
+        forward_value = self.S * self.dividend_discount
+        term1 = -forward_value * norm.pdf(self.d1) * self.sigma / (2 * np.sqrt(self.T))
         term2 = self.r * self.K * np.exp(-self.r * self.T)
-        return (term1 - term2 * norm.cdf(self.d2)) / 365 if option_type == 'call' else (term1 + term2 * norm.cdf(-self.d2)) / 365
+        term3 = self.q * forward_value
+        if option_type == 'call':
+            return (term1 - term2 * norm.cdf(self.d2) + term3 * norm.cdf(self.d1)) / 365
+        return (term1 + term2 * norm.cdf(-self.d2) - term3 * norm.cdf(-self.d1)) / 365
 
+    @cached
     def rho(self, option_type):
         rho_val = self.K * self.T * np.exp(-self.r * self.T)
         return rho_val * norm.cdf(self.d2) / 100 if option_type == 'call' else -rho_val * norm.cdf(-self.d2) / 100
@@ -0,0 +1,293 @@
+"""Opt-in memoization of model evaluations.
+
+The price and Greek entry points of the pricers (``BlackScholes``, ``Black76``, ``Bachelier``, ``Binomial``,
+``BinomialAmerican``, ``MonteCarlo``, ``Heston``, the local volatility pricers) are wrapped with ``cached``. While no
+cache is enabled the wrapper only checks a module global and calls through, so behaviour and cost are unchanged.
+After ``enable_cache()`` every call is looked up in a shared ``PricingCache`` first:
+
+  - The key is the method, the state of the pricer object (its constructor inputs and class-level settings such
+    as ``Binomial.N``) and the call arguments. Floats, including the contents of float arrays, are quantized to the
+    cache's ``tolerance``, so inputs equal up to rounding noise share an entry; other hashable objects (a
+    ``YieldCurve``, a ``VolSurface``) are keyed by identity.
+  - Entries are evicted least recently used beyond ``maxsize`` entries or ``max_bytes`` of cached values, and
+    expire ``ttl`` seconds after being stored.
+  - Monte Carlo entry points take a ``seed``: they are cached only when one is given, and a seeded run draws
+    from a freshly seeded generator, so a cached result is exactly what rerunning would return.
+
+Because ``utils.Greeks``, the implied volatility solvers and the strategy functions build pricers and call these
+entry points, their repeated (S, K, sigma, r, T) evaluations are served from the cache too. The cache is guarded
+by a lock and can be shared by concurrent request handlers; two threads missing the same key at once may both
+compute it.
+
+    with PricingCache(maxsize=50_000, ttl=1.0, tolerance=1e-6):
+        ...
+"""
+
+import functools
+import inspect
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+_active = None
+# Names of the attributes each pricer object had when first keyed, before any cached call added derived ones
+_inputs = weakref.WeakKeyDictionary()
+
+
+class _Uncacheable(Exception):
+    pass
+
+
+@contextmanager
+def seeded(seed):
+    """
+    Runs the block with NumPy's global generator seeded with `seed`, restoring its previous state afterwards,
+    so seeded simulations are reproducible without disturbing the caller's random stream. A None seed leaves
+    the generator alone.
+    """
+    if seed is None:
+        yield
+        return
+    state = np.random.get_state()
+    np.random.seed(seed)
+    try:
+        yield
+    finally:
+        np.random.set_state(state)
+
+
+def _sizeof(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes + sys.getsizeof(value[:0])
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_sizeof(x) for x in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(x) for x in value.values())
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    """
+    Read-only copies of the arrays in a result, so a caller cannot change a cached value in place.
+    """
+    if isinstance(value, np.ndarray):
+        value = value.copy()
+        value.setflags(write=False)
+        return value
+    if isinstance(value, tuple):
+        return tuple(_freeze(x) for x in value)
+    if isinstance(value, dict):
+        return {k: _freeze(x) for k, x in value.items()}
+    return value
+
+
+class PricingCache:
+    """
+    A thread-safe LRU cache with optional time-to-live and memory bounds, keyed on quantized pricer inputs.
+    """
+
+    def __init__(self, maxsize=10000, ttl=None, max_bytes=None, tolerance=1e-9):
+        """
+        Parameters:
+        ----------
+        maxsize : int, optional
+            Maximum number of entries (default is 10000).
+        ttl : float, optional
+            Seconds an entry stays valid after it is stored (default is no expiry).
+        max_bytes : int, optional
+            Maximum total size of the cached values in bytes (default is no limit).
+        tolerance : float, optional
+            Quantum to which float inputs are rounded when building keys (default is 1e-9).
+        """
+        if maxsize < 1 or tolerance <= 0 or (ttl is not None and ttl <= 0):
+            raise ValueError("Invalid input values.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.tolerance = tolerance
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._previous = []
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def _normalize(self, x):
+        if x is None or isinstance(x, (bool, str, np.bool_)):
+            return x
+        if isinstance(x, (int, float, np.integer, np.floating)):
+            x = float(x)
+            return ('f', round(x / self.tolerance)) if np.isfinite(x) else ('f', repr(x))
+        if isinstance(x, np.ndarray):
+            if x.dtype.kind == 'f':
+                return ('a', x.shape, np.rint(x / self.tolerance).tobytes())
+            if x.dtype.kind == 'O':
+                return ('o', x.shape, tuple(self._normalize(v) for v in x.ravel()))
+            return ('a', x.shape, x.dtype.str, x.tobytes())
+        if isinstance(x, (tuple, list)):
+            return tuple(self._normalize(v) for v in x)
+        if isinstance(x, dict):
+            return tuple(sorted((k, self._normalize(v)) for k, v in x.items()))
+        try:
+            hash(x)
+        except TypeError:
+            raise _Uncacheable from None
+        # Other objects (curves, surfaces, volatility models) by identity; the key keeps them alive
+        return ('id', x)
+
+    def _state(self, obj):
+        """
+        Key of a pricer object: its constructor inputs plus the numeric class-level settings (e.g. N, M) it
+        inherits.
+
+        The inputs are the attributes the object had when it was first keyed. The constants that
+        `compute_constants` derives from them during the call are left out, so calling the same object again
+        finds the entry, while changing an input (e.g. `obj.K = 105`) changes the key.
+        """
+        settings = {}
+        for klass in reversed(type(obj).__mro__):
+            settings.update((k, v) for k, v in vars(klass).items()
+                            if not k.startswith('_') and isinstance(v, (int, float)) and not isinstance(v, bool))
+        try:
+            names = _inputs.setdefault(obj, tuple(vars(obj)))
+        except TypeError:
+            names = tuple(vars(obj))    # objects that cannot be weakly referenced are keyed on every attribute
+        attributes = vars(obj)
+        inputs = {name: attributes.get(name) for name in names}
+        return (type(obj).__qualname__, self._normalize(settings), self._normalize(inputs))
+
+    def key(self, name, arguments, instance=None):
+        """
+        The cache key of a call: the entry point's name, the state of `instance` and the bound arguments.
+        """
+        state = None if instance is None else self._state(instance)
+        return (name, state, self._normalize(arguments))
+
+    def lookup(self, key):
+        """
+        Returns (True, value) for a live entry, marking it most recently used, else (False, None).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires, size = entry
+                if expires is None or time.monotonic() < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def store(self, key, value):
+        value = _freeze(value)
+        size = _sizeof(value)
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (value, expires, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize or (self.max_bytes is not None and self._bytes > self.max_bytes
+                                                        and len(self._entries) > 1):
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Counters since creation: 'hits', 'misses', 'hit_rate', 'evictions' (size or memory), 'expirations'
+        (TTL), and the current 'entries' and 'bytes'.
+        """
+        with self._lock:
+            calls = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / calls if calls else 0.0,
+                    'evictions': self.evictions, 'expirations': self.expirations,
+                    'entries': len(self._entries), 'bytes': self._bytes}
+
+    def __enter__(self):
+        self._previous.append(active_cache())
+        enable_cache(self)
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = self._previous.pop()
+        return False
+
+
+def enable_cache(cache=None, **options):
+    """
+    Routes the pricers' entry points through `cache` (a new PricingCache built from `options` by default)
+    and returns it.
+    """
+    global _active
+    _active = PricingCache(**options) if cache is None else cache
+    return _active
+
+
+def disable_cache():
+    global _active
+    _active = None
+# Names of the attributes each pricer object had when first keyed, before any cached call added derived ones
+_inputs = weakref.WeakKeyDictionary()
+
+
+def active_cache():
+    return _active
+
+
+def cached(function=None, *, random=False):
+    """
+    Decorates a price or Greek entry point so calls are served from the active cache, if any.
+
+    Parameters:
+    ----------
+    random : bool, optional
+        The entry point is a simulation with a `seed` argument: calls without a seed are never cached.
+    """
+    if function is None:
+        return functools.partial(cached, random=random)
+    signature = inspect.signature(function)
+    parameters = list(signature.parameters)
+    method = bool(parameters) and parameters[0] == 'self'
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        cache = _active
+        if cache is None:
+            return function(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        if random and arguments.get('seed') is None:
+            return function(*args, **kwargs)
+        instance = arguments.pop('self') if method else None
+        try:
+            key = cache.key(function.__qualname__, arguments, instance)
+        except _Uncacheable:
+            return function(*args, **kwargs)
+        found, value = cache.lookup(key)
+        if found:
+            return value
+        value = function(*args, **kwargs)
+        cache.store(key, value)
+        return value
+
+    return wrapper
@@ -1,5 +1,10 @@
 import numpy as np
-import scipy.stats as stats
+
+from .Cache import cached, seeded
+from .Kernel import norm
+from .Profiling import profiled, stage
+from .Scenarios import scenario
+from .Term_Structure import as_curve, as_dividends, escrowed, step_carry
 
 class Heston:
     """
@@ -13,7 +18,8 @@ class Heston:
     This class uses a Monte Carlo simulation with an Euler-Maruyama discretization
     scheme to generate paths for both the stock price and its variance.
     """
-    def __init__(self, S0, v0, r, T, kappa, theta, xi, rho, steps=250, paths=10000):
+    def __init__(self, S0, v0, r, T, kappa, theta, xi, rho, steps=250, paths=10000, K=None, option_type='call',
+                 dividends=None, dtype=np.float64):
         """
         Initializes the Heston model parameters.
 
@@ -23,8 +29,8 @@ class Heston:
             Initial stock price.
         v0 : float
             Initial variance of the stock price.
-        r : float
-            Annualized risk-free interest rate.
+        r : float or YieldCurve
+            Annualized risk-free interest rate, or a yield curve giving a forward rate per step.
         T : float
             Time to maturity in years.
         kappa : float
@@ -45,6 +51,16 @@ class Heston:
             Number of time steps in the simulation (default is 250).
         paths : int, optional
             Number of simulation paths to generate (default is 10000).
+        K : float, optional
+            Strike price, needed by `price`.
+        option_type : str, optional
+            'call' (default) or 'put', used by `price`.
+        dividends : float or Dividends, optional
+            Continuous dividend yield, or a schedule of yield and cash dividends. Cash dividends are
+            escrowed: simulated prices are those of the stock less the dividends still to be paid.
+        dtype : data-type, optional
+            Float type of the simulated paths (default is np.float64). np.float32 halves the memory and bandwidth
+            of the path matrices; `price` still accumulates the payoffs in float64.
         """
         self.S0 = S0
         self.v0 = v0
@@ -56,7 +72,11 @@ class Heston:
         self.rho = rho
         self.steps = steps
         self.paths = paths
+        self.K = K
+        self.option_type = option_type
+        self.dividends = as_dividends(dividends)
         self.dt = T / steps
+        self.dtype = np.dtype(dtype)
 
     def simulate(self):
         """
@@ -73,48 +93,66 @@ class Heston:
             A tuple containing two numpy arrays: (S, v).
             - S: The simulated stock price paths with shape (paths, steps + 1).
             - v: The simulated variance paths with shape (paths, steps + 1).
+            Both are of type `dtype`.
         """
         # Initialize arrays to store the paths for stock price and variance
-        S = np.zeros((self.paths, self.steps + 1))
-        v = np.zeros((self.paths, self.steps + 1))
+        S = np.zeros((self.paths, self.steps + 1), dtype=self.dtype)
+        v = np.zeros((self.paths, self.steps + 1), dtype=self.dtype)
+
+        # Parameters in the path type, so that NumPy does not promote float32 steps back to float64
+        kappa, theta, xi, rho, dt, sqrt_dt = (self.dtype.type(x) for x in
+                                              (self.kappa, self.theta, self.xi, self.rho, self.dt, np.sqrt(self.dt)))
+        rho_bar = self.dtype.type(np.sqrt(1 - self.rho ** 2))
 
         # Set the initial values for the first time step
-        S[:, 0] = self.S0
+        S[:, 0] = escrowed(self.S0, self.r, self.dividends, self.T)
         v[:, 0] = self.v0
 
+        # Per-step carry (r - q), cached on the curves; a plain number for a flat rate without dividends
+        carry, _ = step_carry(self.r, self.dividends, self.T, self.steps)
+        carry = np.broadcast_to(carry, self.steps).astype(self.dtype)
+
         for t in range(1, self.steps + 1):
             # Generate correlated random shocks for the stock and variance processes
-            Z1 = stats.norm.rvs(size=self.paths)
-            Z2_indep = stats.norm.rvs(size=self.paths)
-            Z2 = self.rho * Z1 + np.sqrt(1 - self.rho ** 2) * Z2_indep
-
-            # Full Truncation Scheme: Ensure the variance used in the calculation is non-negative
-            v_t_prev = np.maximum(v[:, t - 1], 0)
-
-            # Update variance using the Euler-Maruyama scheme for the CIR process
-            # We apply maximum(..., 0) again to ensure the resulting variance is not negative
-            v[:, t] = np.maximum(
-                v[:, t - 1]
-                + self.kappa * (self.theta - v[:, t - 1]) * self.dt
-                + self.xi * np.sqrt(v_t_prev) * np.sqrt(self.dt) * Z2,
-                0
-            )
-
-            # Update stock price using the Euler-Maruyama scheme for GBM with stochastic volatility
-            S[:, t] = S[:, t - 1] * np.exp(
-                (self.r - 0.5 * v_t_prev) * self.dt
-                + np.sqrt(v_t_prev) * np.sqrt(self.dt) * Z1
-            )
+            with stage('rng', size=2 * self.paths):
+                Z1 = norm.rvs(size=self.paths).astype(self.dtype, copy=False)
+                Z2_indep = norm.rvs(size=self.paths).astype(self.dtype, copy=False)
+                Z2 = rho * Z1 + rho_bar * Z2_indep
+            with stage('path_build', size=self.paths):
+                # Full Truncation Scheme: Ensure the variance used in the calculation is non-negative
+                v_t_prev = np.maximum(v[:, t - 1], 0)
+
+                # Update variance using the Euler-Maruyama scheme for the CIR process
+                # We apply maximum(..., 0) again to ensure the resulting variance is not negative
+                v[:, t] = np.maximum(
+                    v[:, t - 1]
+                    + kappa * (theta - v[:, t - 1]) * dt
+                    + xi * np.sqrt(v_t_prev) * sqrt_dt * Z2,
+                    0
+                )
+
+                # Update stock price using the Euler-Maruyama scheme for GBM with stochastic volatility
+                S[:, t] = S[:, t - 1] * np.exp(
+                    (carry[t - 1] - 0.5 * v_t_prev) * dt
+                    + np.sqrt(v_t_prev) * sqrt_dt * Z1
+                )
 
         return S, v
     
-    def price(self):
+    @cached(random=True)
+    @profiled('heston.price')
+    def price(self, seed=None):
         """
         Calculates the European option price using the simulated Heston paths.
 
         This method first simulates the stock and variance paths and then calculates
         the discounted average payoff of the option at maturity.
 
+        Parameters:
+        ----------
+        seed : int, optional
+            Seed for a reproducible run; the global random state is restored afterwards.
+
         Returns:
         -------
         tuple[float, float]
@@ -127,24 +165,31 @@ class Heston:
         ValueError
             If the `option_type` is not 'call' or 'put'.
         """
-        # 1. Simulate the paths for the stock price
-        S, _ = self.simulate_paths()
+        # 1. Simulate the paths for the stock price, shared with other strikes through an enabled ScenarioStore
+        with seeded(seed):
+            S, _ = scenario('heston', seed, lambda: np.stack(self.simulate()), S0=self.S0, v0=self.v0, r=self.r,
+                            T=self.T, kappa=self.kappa, theta=self.theta, xi=self.xi, rho=self.rho,
+                            steps=self.steps, paths=self.paths, dividends=self.dividends, dtype=self.dtype.str)
 
         # 2. Get the terminal stock prices from the last time step
         ST = S[:, -1]
 
         # 3. Calculate the option payoff for each path
-        if self.option_type.lower() == 'call':
-            payoffs = np.maximum(0, ST - self.K)
-        elif self.option_type.lower() == 'put':
-            payoffs = np.maximum(0, self.K - ST)
-        else:
-            raise ValueError("option_type must be 'call' or 'put'")
+        if self.K is None:
+            raise ValueError("a strike K is needed to price an option")
+        with stage('payoff', size=self.paths):
+            if self.option_type.lower() == 'call':
+                payoffs = np.maximum(0, ST - self.K)
+            elif self.option_type.lower() == 'put':
+                payoffs = np.maximum(0, self.K - ST)
+            else:
+                raise ValueError("option_type must be 'call' or 'put'")
 
         # 4. Discount payoffs and calculate the final price and standard error
-        discounted_payoffs = np.exp(-self.r * self.T) * payoffs
-        C0 = np.mean(discounted_payoffs)
-        SE = np.std(discounted_payoffs, ddof=1) / np.sqrt(self.paths)
+        with stage('discounting', size=self.paths):
+            discounted_payoffs = as_curve(self.r).discount(self.T) * payoffs
+            C0 = np.mean(discounted_payoffs, dtype=np.float64)
+            SE = np.std(discounted_payoffs, ddof=1, dtype=np.float64) / np.sqrt(self.paths)
 
         return C0, SE
 
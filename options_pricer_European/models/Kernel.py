@@ -0,0 +1,246 @@
+"""Vectorized pricing kernel shared by the Black-Scholes, Black-76 and Bachelier models.
+
+All three models price a European option as a discount factor times an undiscounted expectation over the
+forward F at expiry:
+
+  - Black-Scholes: F = S exp((r - q) T) and a lognormal forward (the spot model written as Black-76).
+  - Black-76: F is the quoted futures/forward price, lognormal.
+  - Bachelier: F is the forward, normal with absolute volatility sigma, so it prices underlyings that can
+    be near or below zero.
+
+``price_batch``, ``greeks_batch`` and ``implied_vol_batch`` take a per-row model code, so a mixed book is
+priced in one call: each model's rows are evaluated as one masked array operation instead of a Python loop
+over positions.
+"""
+
+import numpy as np
+from scipy.special import ndtr
+
+from .Profiling import profiled
+
+BLACK_SCHOLES, BLACK76, BACHELIER = 0, 1, 2
+MODEL_CODES = {'black_scholes': BLACK_SCHOLES, 'black76': BLACK76, 'bachelier': BACHELIER}
+
+
+class StandardNormal:
+    """
+    The standard normal cdf, pdf and rvs of `scipy.stats.norm` (same values, same draws from NumPy's global
+    generator), without importing scipy.stats, which costs about half a second per process.
+    """
+
+    @staticmethod
+    def cdf(x):
+        return ndtr(x)
+
+    @staticmethod
+    def pdf(x):
+        return np.exp(-0.5 * np.square(x)) / np.sqrt(2 * np.pi)
+
+    @staticmethod
+    def rvs(size=None):
+        return np.random.standard_normal(size)
+
+
+norm = StandardNormal()
+
+
+def model_codes(model):
+    """
+    Converts model names ('black_scholes', 'black76', 'bachelier') or integer codes to an array of codes.
+    """
+    model = np.asarray(model)
+    if model.dtype.kind in 'iu':
+        codes = model
+    else:
+        names = np.char.lower(model.astype(str))
+        unknown = ~np.isin(names, list(MODEL_CODES))
+        if np.any(unknown):
+            raise ValueError(f"model must be one of {list(MODEL_CODES)}")
+        codes = np.select([names == name for name in MODEL_CODES], list(MODEL_CODES.values()))
+    if np.any((codes < 0) | (codes > BACHELIER)):
+        raise ValueError("model codes must be 0 (Black-Scholes), 1 (Black-76) or 2 (Bachelier)")
+    return codes
+
+
+def _ratio(x, y):
+    """
+    x / y for y >= 0, with its limit where y is zero: 0 where x is, +-inf elsewhere.
+    """
+    positive = y > 0
+    limit = np.where(x == 0, 0.0, np.copysign(np.inf, x))
+    return np.where(positive, x / np.where(positive, y, 1.0), limit)
+
+
+def lognormal(F, K, sigma, T, sign):
+    """
+    Undiscounted Black price: sign * (F N(sign d1) - K N(sign d2)).
+    """
+    sd = sigma * np.sqrt(T)
+    d1 = _ratio(np.log(F / K), sd) + 0.5 * sd
+    return sign * (F * norm.cdf(sign * d1) - K * norm.cdf(sign * (d1 - sd)))
+
+
+def normal(F, K, sigma, T, sign):
+    """
+    Undiscounted Bachelier price: sign * (F - K) N(sign d) + sigma sqrt(T) n(d), d = (F - K) / (sigma sqrt(T)).
+    """
+    sd = sigma * np.sqrt(T)
+    d = _ratio(F - K, sd)
+    return sign * (F - K) * norm.cdf(sign * d) + sd * norm.pdf(d)
+
+
+def _prepare(model, S, K, sigma, r, T, is_call, q):
+    codes = model_codes(model)
+    codes, S, K, sigma, r, T, q, is_call = np.broadcast_arrays(codes, *(np.asarray(x, dtype=float) for x in (S, K, sigma, r, T, q)),
+                                                               np.asarray(is_call, dtype=bool))
+    # Black-Scholes rows are priced on their forward, like Black-76 rows
+    F = np.where(codes == BLACK_SCHOLES, S * np.exp((r - q) * T), S)
+    return codes, F, K, sigma, r, T, q, np.where(is_call, 1.0, -1.0)
+
+
+@profiled('kernel.price_batch')
+def price_batch(model, S, K, sigma, r, T, is_call, q=0.0):
+    """
+    Prices a book of European options under a per-row model in one pass.
+
+    Parameters:
+    ----------
+    model : array-like of str or int
+        Model of each row: 'black_scholes' (0), 'black76' (1) or 'bachelier' (2).
+    S : array-like
+        Spot price for Black-Scholes rows, forward/futures price for Black-76 and Bachelier rows.
+    K, sigma, r, T : array-like
+        Strike, volatility (lognormal, or absolute for Bachelier), risk-free rate and time to maturity.
+    is_call : array-like of bool
+        True for calls, False for puts.
+    q : array-like, optional
+        Continuous dividend yield of Black-Scholes rows (default is 0).
+
+    Returns:
+    -------
+    np.ndarray
+        Option prices with the broadcast shape of the inputs.
+    """
+    codes, F, K, sigma, r, T, q, sign = _prepare(model, S, K, sigma, r, T, is_call, q)
+    values = np.empty(F.shape)
+    rows = codes != BACHELIER
+    values[rows] = lognormal(F[rows], K[rows], sigma[rows], T[rows], sign[rows])
+    values[~rows] = normal(F[~rows], K[~rows], sigma[~rows], T[~rows], sign[~rows])
+    return np.exp(-r * T) * values
+
+
+def greeks_batch(model, S, K, sigma, r, T, is_call, q=0.0):
+    """
+    Delta, gamma, vega, theta and rho of a mixed book, in the conventions of `BlackScholes`: delta and gamma
+    with respect to the row's underlying input (spot or forward), vega per 0.01 of sigma, theta per calendar
+    day and rho per 1% of r (holding the forward fixed for Black-76 and Bachelier rows).
+
+    Parameters are as for `price_batch`. Rows with no uncertainty left (T = 0 or sigma = 0) get the limits of
+    the Greeks: delta is the step of the payoff, gamma is zero away from the strike, and theta and rho are
+    those of the discounted payoff on the forward.
+
+    Returns:
+    -------
+    dict
+        'price', 'delta', 'gamma', 'vega', 'theta' and 'rho' arrays.
+    """
+    codes, F, K, sigma, r, T, q, sign = _prepare(model, S, K, sigma, r, T, is_call, q)
+    DF = np.exp(-r * T)
+    log_rows = codes != BACHELIER
+    spot_rows = codes == BLACK_SCHOLES
+
+    price, delta, gamma, vega, decay = (np.empty(F.shape) for _ in range(5))
+
+    # Lognormal rows, with respect to the forward
+    f, k, s, t, g = F[log_rows], K[log_rows], sigma[log_rows], T[log_rows], sign[log_rows]
+    sd = s * np.sqrt(t)
+    d1 = _ratio(np.log(f / k), sd) + 0.5 * sd
+    price[log_rows] = lognormal(f, k, s, t, g)
+    delta[log_rows] = g * norm.cdf(g * d1)
+    gamma[log_rows] = _ratio(norm.pdf(d1), f * sd)
+    vega[log_rows] = f * norm.pdf(d1) * np.sqrt(t)
+    decay[log_rows] = _ratio(f * norm.pdf(d1) * s, 2 * np.sqrt(t))
+
+    # Normal rows
+    f, k, s, t, g = F[~log_rows], K[~log_rows], sigma[~log_rows], T[~log_rows], sign[~log_rows]
+    sd = s * np.sqrt(t)
+    d = _ratio(f - k, sd)
+    price[~log_rows] = normal(f, k, s, t, g)
+    delta[~log_rows] = g * norm.cdf(g * d)
+    gamma[~log_rows] = _ratio(norm.pdf(d), sd)
+    vega[~log_rows] = norm.pdf(d) * np.sqrt(t)
+    decay[~log_rows] = _ratio(norm.pdf(d) * s, 2 * np.sqrt(t))
+
+    value = DF * price
+    # Black-Scholes rows: the forward F = S exp((r - q) T) moves with S, r and the time to maturity
+    growth = np.where(spot_rows, np.exp((r - q) * T), 1.0)
+    carry = np.where(spot_rows, r - q, 0.0)
+    theta = r * value - DF * (carry * F * delta + decay)
+    rho = np.where(spot_rows, T * DF * (F * delta - price), -T * value)
+    return {'price': value, 'delta': DF * delta * growth, 'gamma': DF * gamma * growth**2,
+            'vega': DF * vega / 100, 'theta': theta / 365, 'rho': rho / 100}
+
+
+def _normal_implied_vol(price, F, K, T, sign):
+    """
+    Bachelier implied volatility from undiscounted prices by the closed-form rational approximation of
+    Choi, Kim and Kwak (2009), polished by one Newton step.
+    """
+    straddle = 2 * price - sign * (F - K)
+    v = np.clip(np.abs(F - K) / straddle, 0, 1 - 1e-15)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        eta = np.where(v < 1e-8, 1 / (1 + v**2 * (1 / 3 + v**2 / 5)), v / np.arctanh(v))
+    a = [3.994961687345134e-1, 2.100960795068497e+1, 4.980340217855084e+1, 5.988761102690991e+2,
+         1.848489695437094e+3, 6.106322407867059e+3, 2.493415285349361e+4, 1.266458051348246e+4]
+    b = [1.0, 4.990534153589422e+1, 3.093573936743112e+1, 1.495105008310999e+3, 1.323614537899738e+3,
+         1.598919697679745e+4, 2.392008891720782e+4, 3.608817108375034e+3, -2.067719486400926e+2,
+         1.174240599306013e+1]
+    h = np.sqrt(eta) * np.polyval(a[::-1], eta) / np.polyval(b[::-1], eta)
+    sigma = np.sqrt(np.pi / (2 * T)) * straddle * h
+
+    sd = sigma * np.sqrt(T)
+    d = (F - K) / sd
+    sigma = sigma - (normal(F, K, sigma, T, sign) - price) / (norm.pdf(d) * np.sqrt(T))
+    return sigma
+
+
+def _lognormal_implied_vol(price, F, K, T, sign, tol=1e-10, max_iter=100):
+    """
+    Black implied volatility from undiscounted prices by Newton's method safeguarded with bisection,
+    all rows iterating together.
+    """
+    lo, hi = np.full(F.shape, 1e-8), np.full(F.shape, 10.0)
+    # Brenner-Subrahmanyam starting point
+    sigma = np.clip(np.sqrt(2 * np.pi / T) * price / F, 0.01, 5.0)
+    for _ in range(max_iter):
+        sd = sigma * np.sqrt(T)
+        d1 = (np.log(F / K) + 0.5 * sd**2) / sd
+        diff = lognormal(F, K, sigma, T, sign) - price
+        if np.all(np.abs(diff) < tol * np.maximum(price, 1e-12) + 1e-14):
+            break
+        lo = np.where(diff < 0, sigma, lo)
+        hi = np.where(diff > 0, sigma, hi)
+        vega = F * norm.pdf(d1) * np.sqrt(T)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = sigma - diff / vega
+        sigma = np.where((newton > lo) & (newton < hi), newton, 0.5 * (lo + hi))
+    return sigma
+
+
+def implied_vol_batch(model, price, S, K, r, T, is_call, q=0.0):
+    """
+    Implied volatility of a mixed book from option prices, with a per-row model as in `price_batch`.
+
+    Lognormal rows use a vectorized safeguarded Newton iteration; Bachelier rows use a closed-form
+    approximation. Prices outside the no-arbitrage bounds give NaN.
+    """
+    codes, F, K, _, r, T, q, sign = _prepare(model, S, K, 0.0, r, T, is_call, q)
+    price = np.broadcast_to(np.asarray(price, dtype=float), F.shape) * np.exp(r * T)
+    intrinsic = np.maximum(sign * (F - K), 0)
+    vols = np.full(F.shape, np.nan)
+
+    log_rows = (codes != BACHELIER) & (price > intrinsic) & (price < np.where(sign > 0, F, K))
+    normal_rows = (codes == BACHELIER) & (price > intrinsic)
+    vols[log_rows] = _lognormal_implied_vol(price[log_rows], F[log_rows], K[log_rows], T[log_rows], sign[log_rows])
+    vols[normal_rows] = _normal_implied_vol(price[normal_rows], F[normal_rows], K[normal_rows], T[normal_rows], sign[normal_rows])
+    return vols
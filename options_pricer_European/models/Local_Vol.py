@@ -0,0 +1,294 @@
+"""Dupire local volatility built from an implied volatility surface.
+
+``LocalVolatility`` evaluates Dupire's formula once on a regular (t, ln S) grid, using Gatheral's form in total
+implied variance w(k, T) with k = ln(K / F(T)):
+
+    sigma_loc^2 = dw/dT / (1 - k/w dw/dk + 1/4 (-1/4 - 1/w + k^2/w^2) (dw/dk)^2 + 1/2 d2w/dk2).
+
+Derivatives are central differences of the surface's vectorized ``total_variance``. Because the axes are regular,
+``lookup(t, ln_S)`` finds its cell by arithmetic and interpolates bilinearly, so each Monte Carlo step or PDE
+time level costs one gather from the cached grid. ``LocalVolatility.from_surface`` caches grids per surface, so
+the Monte Carlo, PDE and path-engine pricers built on one surface share a single grid.
+"""
+
+import numpy as np
+from scipy.linalg import solve_banded
+
+from .Cache import cached, seeded
+from .Profiling import profiled, stage
+from .Monte_Carlo import MonteCarlo
+
+
+class LocalVolatility:
+    """
+    A Dupire local volatility grid sigma(t, S) on regular axes in time and log-price.
+
+    Attributes:
+    ----------
+    t : np.ndarray
+        Time axis from 0 to `T_max`.
+    x : np.ndarray
+        Log-price axis from ln(S_min) to ln(S_max).
+    grid : np.ndarray
+        (len(t), len(x)) local volatilities.
+    """
+
+    def __init__(self, surface, T_max, S_min=None, S_max=None, n_t=100, n_x=200, floor=0.01, cap=3.0):
+        """
+        Parameters:
+        ----------
+        surface : VolSurface
+            The fitted implied volatility surface (anything with S, r and a vectorized total_variance(k, T)).
+        T_max : float
+            Last time covered by the grid.
+        S_min, S_max : float, optional
+            Price range of the grid (defaults to 4 at-the-money standard deviations around the spot at T_max).
+        n_t, n_x : int, optional
+            Number of time and log-price intervals (defaults are 100 and 200).
+        floor, cap : float, optional
+            Bounds applied to the local volatility where the surface's derivatives are unreliable
+            (defaults are 0.01 and 3.0).
+        """
+        if T_max <= 0 or n_t < 1 or n_x < 2:
+            raise ValueError("Invalid input values.")
+        self.S = surface.S
+        self.r = surface.r
+        self.T_max = T_max
+
+        if S_min is None or S_max is None:
+            width = 4 * np.sqrt(max(float(surface.total_variance(0.0, T_max)), 1e-4))
+            S_min = self.S * np.exp(-width) if S_min is None else S_min
+            S_max = self.S * np.exp(width) if S_max is None else S_max
+        self.t = np.linspace(0, T_max, n_t + 1)
+        self.x = np.linspace(np.log(S_min), np.log(S_max), n_x + 1)
+        self.dt = self.t[1] - self.t[0]
+        self.dx = self.x[1] - self.x[0]
+
+        # Evaluate at a small positive time instead of t = 0, where w = 0 and Dupire's formula is 0/0.
+        T = np.maximum(self.t, min(1e-3, 0.5 * self.dt))[:, None]
+        k = self.x[None, :] - np.log(self.S) - self.r * T
+        h_T, h_k = 1e-4, 1e-3
+        w = surface.total_variance(k, T)
+        dw_dT = (surface.total_variance(k, T + h_T) - surface.total_variance(k, T - np.minimum(h_T, 0.5 * T))) / (h_T + np.minimum(h_T, 0.5 * T))
+        w_up, w_down = surface.total_variance(k + h_k, T), surface.total_variance(k - h_k, T)
+        dw_dk = (w_up - w_down) / (2 * h_k)
+        d2w_dk2 = (w_up - 2 * w + w_down) / h_k**2
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            denominator = (1 - k / w * dw_dk + 0.25 * (-0.25 - 1 / w + k**2 / w**2) * dw_dk**2 + 0.5 * d2w_dk2)
+            local_variance = dw_dT / denominator
+        local_variance = np.where((w > 0) & (denominator > 0) & np.isfinite(local_variance), local_variance, floor**2)
+        self.grid = np.sqrt(np.clip(local_variance, floor**2, cap**2))
+
+    @classmethod
+    def from_surface(cls, surface, T_max, **grid):
+        """
+        Returns the local volatility grid of a surface, building it only on the first request for these
+        grid settings.
+        """
+        cache = surface.__dict__.setdefault('_local_vol_cache', {})
+        key = (T_max,) + tuple(sorted(grid.items()))
+        if key not in cache:
+            cache[key] = cls(surface, T_max, **grid)
+        return cache[key]
+
+    @classmethod
+    def constant(cls, sigma, S_min, S_max, T_max):
+        """
+        A flat local volatility sigma on [S_min, S_max] x [0, T_max], so the PDE pricer can run at a constant
+        volatility without a fitted surface.
+        """
+        if sigma <= 0 or not 0 < S_min < S_max or T_max <= 0:
+            raise ValueError("Invalid input values.")
+        flat = cls.__new__(cls)
+        flat.S, flat.r, flat.T_max = None, None, T_max
+        flat.t = np.array([0.0, T_max])
+        flat.x = np.log([S_min, S_max])
+        flat.dt, flat.dx = T_max, flat.x[1] - flat.x[0]
+        flat.grid = np.full((2, 2), float(sigma))
+        return flat
+
+    def lookup(self, t, ln_S):
+        """
+        Local volatility at times t and log-prices ln_S (broadcast together), by bilinear interpolation.
+        Points outside the grid take the value at its edge.
+        """
+        n_t, n_x = len(self.t) - 1, len(self.x) - 1
+        ft = np.clip((np.asarray(t, dtype=float) - self.t[0]) / self.dt, 0, n_t)
+        fx = np.clip((np.asarray(ln_S, dtype=float) - self.x[0]) / self.dx, 0, n_x)
+        i = np.minimum(ft.astype(int), n_t - 1) if n_t > 0 else np.zeros_like(ft, dtype=int)
+        j = np.minimum(fx.astype(int), n_x - 1)
+        wt, wx = ft - i, fx - j
+        g = self.grid
+        return ((1 - wt) * ((1 - wx) * g[i, j] + wx * g[i, j + 1])
+                + wt * ((1 - wx) * g[i + 1, j] + wx * g[i + 1, j + 1]))
+
+    def local_vol(self, S, t):
+        """
+        Local volatility at price S and time t. Not named `vol`: pricers taking a volatility model query
+        `vol(K, T)` for an implied volatility, which a local volatility is not.
+        """
+        return self.lookup(t, np.log(S))
+
+
+class LocalVolMonteCarlo(MonteCarlo):
+    """
+    European option pricing by Monte Carlo under local volatility.
+
+    Extends the GBM stepping of `MonteCarlo` (same class-level N and M) with a state-dependent volatility:
+    at each of the N steps, the volatility of every path is gathered from the cached local volatility grid
+    before the log-price step.
+    """
+
+    def __init__(self, S, K, local_vol, r, T, option_type, dev_0=0, dev_1=0):
+        """
+        Parameters:
+        ----------
+        S, K, r, T, option_type :
+            As for `MonteCarlo`.
+        local_vol : LocalVolatility or VolSurface
+            The local volatility grid; a surface is converted (and cached) with `LocalVolatility.from_surface`.
+        """
+        if not hasattr(local_vol, 'lookup'):
+            local_vol = LocalVolatility.from_surface(local_vol, T + dev_1)
+        self.local_vol = local_vol
+        super().__init__(S, K, float(local_vol.lookup(0.0, np.log(S + dev_0))), r, T, option_type, dev_0, dev_1)
+
+    def calculate_stock_price(self):
+        """
+        Simulated prices of shape (N + 1, M), starting from the spot.
+        """
+        self.compute_constants()
+        sqrt_dt = np.sqrt(self.dt)
+        Z = np.random.normal(size=(MonteCarlo.N, MonteCarlo.M))
+        ST = np.empty((MonteCarlo.N + 1, MonteCarlo.M))
+        ST[0] = self.S
+        ln_S = np.full(MonteCarlo.M, self.lnS)
+        for i in range(MonteCarlo.N):
+            vol = self.local_vol.lookup(i * self.dt, ln_S)
+            ln_S = ln_S + (self.r - 0.5 * vol**2) * self.dt + vol * sqrt_dt * Z[i]
+            ST[i + 1] = np.exp(ln_S)
+        return ST
+
+    @cached(random=True)
+    def simulate(self, seed=None):
+        with seeded(seed):
+            ST = self.calculate_stock_price()
+        sign = 1 if self.option_type == 'call' else -1
+        CT = np.exp(-self.r * self.T) * np.maximum(sign * (ST[-1] - self.K), 0)
+        C0 = np.mean(CT)
+        SE = np.std(CT, ddof=1) / np.sqrt(MonteCarlo.M)
+        return C0, SE
+
+
+class LocalVolPDE:
+    """
+    European or American option pricing under local volatility with a Crank-Nicolson finite difference scheme.
+
+    The pricing PDE is solved in x = ln S on a uniform grid, backward from maturity. At each time level the
+    volatilities of all grid nodes are one gather from the cached `LocalVolatility` grid, and the tridiagonal
+    system is solved in O(n_x). The first two steps are fully implicit (Rannacher smoothing) to damp the payoff
+    kink; American exercise projects onto the intrinsic value after every step.
+    """
+
+    def __init__(self, S, K, local_vol, r, T, option_type='call', american=False, n_x=400, n_t=200):
+        """
+        Parameters:
+        ----------
+        S, K, r, T : float
+            Stock price, strike, risk-free rate and time to maturity.
+        local_vol : LocalVolatility or VolSurface
+            The local volatility grid; a surface is converted (and cached) with `LocalVolatility.from_surface`.
+        option_type : str, optional
+            'call' (default) or 'put'.
+        american : bool, optional
+            Allow early exercise (default is False).
+        n_x, n_t : int, optional
+            Number of log-price and time intervals (defaults are 400 and 200). The log-price range is that of
+            the local volatility grid.
+        """
+        if S <= 0 or K <= 0 or T <= 0 or n_x < 3 or n_t < 1:
+            raise ValueError("Invalid input values.")
+        if not hasattr(local_vol, 'lookup'):
+            local_vol = LocalVolatility.from_surface(local_vol, T)
+        self.S = S
+        self.K = K
+        self.local_vol = local_vol
+        self.r = r
+        self.T = T
+        self.option_type = option_type
+        self.american = american
+        self.n_x = n_x
+        self.n_t = n_t
+
+    @cached
+    def price(self):
+        return float(self.values(self.S, self.T)[0, 0])
+
+    @profiled('local_vol_pde.values')
+    def values(self, S, tau):
+        """
+        Option values at prices S with tau left to maturity, i.e. at times T - tau, from a single backward
+        solve. When the volatility does not depend on time (e.g. `LocalVolatility.constant`), these are
+        today's prices of options maturing at each tau <= T.
+
+        Returns:
+        -------
+        np.ndarray
+            (len(S), len(tau)) values, interpolated linearly between grid nodes and time levels.
+        """
+        S, tau = np.atleast_1d(np.asarray(S, dtype=float)), np.atleast_1d(np.asarray(tau, dtype=float))
+        x = np.linspace(self.local_vol.x[0], self.local_vol.x[-1], self.n_x + 1)
+        if np.any(np.log(S) <= x[0]) or np.any(np.log(S) >= x[-1]):
+            raise ValueError("spot price lies outside the local volatility grid")
+        if np.any(tau < 0) or np.any(tau > self.T):
+            raise ValueError("times to maturity must lie in [0, T]")
+        S_grid = np.exp(x)
+        dx, dt, r = x[1] - x[0], self.T / self.n_t, self.r
+        sign = 1 if self.option_type == 'call' else -1
+        intrinsic = np.maximum(sign * (S_grid - self.K), 0)
+        V = intrinsic.copy()
+        # levels[k] holds the solution with k * dt left to maturity
+        levels = np.empty((self.n_t + 1, self.n_x + 1))
+        levels[0] = V
+
+        def operator(t):
+            # Coefficients of V_{j-1}, V_j, V_{j+1} in 1/2 sigma^2 V_xx + (r - 1/2 sigma^2) V_x - r V
+            var = self.local_vol.lookup(t, x[1:-1]) ** 2
+            diffusion, drift = 0.5 * var / dx**2, (r - 0.5 * var) / (2 * dx)
+            return diffusion - drift, -2 * diffusion - r, diffusion + drift
+
+        with stage('pde_sweep', size=self.n_t * (self.n_x + 1)):
+            for n in range(self.n_t - 1, -1, -1):
+                t, to_go = n * dt, self.T - n * dt
+                theta = 1.0 if n >= self.n_t - 2 else 0.5
+                lower, centre, upper = operator(t + 0.5 * dt)
+
+                # Boundary values at the new time level
+                if sign > 0:
+                    low, high = 0.0, S_grid[-1] - self.K * (1 if self.american else np.exp(-r * to_go))
+                else:
+                    low, high = self.K * (1 if self.american else np.exp(-r * to_go)) - S_grid[0], 0.0
+                low, high = max(low, 0.0), max(high, 0.0)
+
+                explicit = (1 - theta) * dt
+                rhs = V[1:-1] + explicit * (lower * V[:-2] + centre * V[1:-1] + upper * V[2:])
+                rhs[0] += theta * dt * lower[0] * low
+                rhs[-1] += theta * dt * upper[-1] * high
+
+                banded = np.zeros((3, self.n_x - 1))
+                banded[0, 1:] = -theta * dt * upper[:-1]
+                banded[1] = 1 - theta * dt * centre
+                banded[2, :-1] = -theta * dt * lower[1:]
+                V[1:-1] = solve_banded((1, 1), banded, rhs)
+                V[0], V[-1] = low, high
+                if self.american:
+                    np.maximum(V, intrinsic, out=V)
+                levels[self.n_t - n] = V
+
+        k = np.minimum((tau / dt).astype(int), self.n_t - 1)
+        w = tau / dt - k
+        at_tau = (1 - w)[:, None] * levels[k] + w[:, None] * levels[k + 1]
+        j = np.minimum(((np.log(S) - x[0]) / dx).astype(int), self.n_x - 1)
+        wx = ((np.log(S) - x[0]) / dx - j)[:, None]
+        return ((1 - wx) * at_tau[:, j].T + wx * at_tau[:, j + 1].T)
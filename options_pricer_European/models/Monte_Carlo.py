@@ -9,9 +9,13 @@ obtained standard error is exceptionally high.
 
 import math
 import numpy as np
-import pandas as pd
-import datetime
-import scipy.stats as stats
+
+from .Cache import cached, seeded
+from .Kernel import norm
+from .Profiling import profiled, stage
+from .Scenario_Set import RunningMoments, ScenarioSet
+from .Scenarios import scenario
+from .Term_Structure import as_dividends, escrowed, step_carry, zero_rate
 
 
 
@@ -27,21 +31,36 @@ class MonteCarlo:
     In order to implement theta option Greek we need to accept a deviation parameter 'dev' for time to maturiy.
     """
 
-    def __init__(self, S, K, vol, r, T, option_type, dev_0=0, dev_1=0, dev_2=0):
+    def __init__(self, S, K, vol, r, T, option_type, dev_0=0, dev_1=0, dev_2=0, dividends=None, dtype=np.float64):
+        # vol may be a volatility model: a VolSurface gives the implied volatility at (K, T), and a model with a
+        # term structure (e.g. a fitted GARCH) gives each time step its own forward volatility
+        self.vol_curve = None
+        self.dev_vol = dev_2
+        if hasattr(vol, 'forward_volatility'):
+            self.vol_curve = vol
+        if hasattr(vol, 'vol'):
+            vol = vol.vol(K, T+dev_1)
         self.S = S+dev_0
         self.K = K
         self.vol = vol+dev_2
-        self.r = r
         self.T = T+dev_1
+        self.rates = r
+        self.r = zero_rate(r, self.T)
+        self.dividends = as_dividends(dividends)
         self.option_type = option_type
+        self.dtype = np.dtype(dtype)
 
         """
         S: stock price
         K: strike price
-        vol: volatility
-        r: risk-free interest rate
+        vol: volatility, or a volatility model with vol(K, T) (and optionally forward_volatility(t0, t1))
+        r: risk-free interest rate, or a YieldCurve
         T: time to maturity in years
         type: 'call' or 'put'
+        dividends: continuous dividend yield, or a Dividends schedule (cash dividends are escrowed: paths
+                   start from the spot less their present value)
+        dtype: float type of the simulated paths; with np.float32 paths take half the memory and bandwidth,
+               while payoff sums and the standard error are still accumulated in float64
         """
 
 
@@ -50,65 +69,62 @@ class MonteCarlo:
     Parses data from the CSV file, to get the value of the volatility.
     This requires a CSV file path to be passed from the user as an argument of this function implemented on the class while creating
     an instance of the class.
+    The file is read in chunks with explicit dtypes and date format by MarketData, and volatility is estimated with any of the
+    estimators in utils.Volatility (close-to-close by default; OHLC estimators need the open, high and low columns).
+    N and M, when given, apply to this simulation only; the class-wide MonteCarlo.N and MonteCarlo.M are restored.
     """
     @classmethod
-    def from_csv_simulate(self, cls, csv_path, K, r, T, option_type, N=1000, M=10000,
-                 date_column='Date', price_column='Close',
-                 trading_days=252):
-        try:
-            data = pd.read_csv(csv_path)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Error: The file at path '{csv_path}' was not found.")
-
-        # --- Column Name Robustness (Case-Insensitive) ---
-        col_map = {c.lower(): c for c in data.columns}
-        lower_date_col, lower_price_col = date_column.lower(), price_column.lower()
-
-        if lower_date_col not in col_map:
-            raise ValueError(f"Date column '{date_column}' not found. Available columns: {list(data.columns)}")
-        if lower_price_col not in col_map:
-            raise ValueError(f"Price column '{price_column}' not found. Available columns: {list(data.columns)}")
-            
-        actual_date_col, actual_price_col = col_map[lower_date_col], col_map[lower_price_col]
-
-        # --- Data Processing and Integrity Checks ---
-        try:
-            data[actual_date_col] = pd.to_datetime(data[actual_date_col])
-        except Exception as e:
-            raise TypeError(f"Could not parse date column '{actual_date_col}'. Ensure it contains valid date formats. Error: {e}")
+    def from_csv_simulate(cls, csv_path, K, r, T, option_type, N=None, M=None,
+                 date_column='Date', price_column='Close', date_format='%Y-%m-%d',
+                 vol_method='close_to_close', trading_days=252):
+        # Imported here as utils imports this module
+        from options_pricer_European.utils.Market_Data import MarketData
 
-        data.set_index(actual_date_col, inplace=True)
-        data.sort_index(inplace=True)
-
-        if data[actual_price_col].isnull().any():
-            raise ValueError(f"Price column '{actual_price_col}' contains missing (NaN) values. Please clean the data.")
-
-        if len(data) < 3:
-            raise ValueError(f"Insufficient data to calculate volatility. Need at least 3 data points, but found {len(data)}.")
+        columns = {'close': price_column}
+        if vol_method not in ('close_to_close', 'ewma'):
+            columns.update({'open': 'Open', 'high': 'High', 'low': 'Low'})
+        data = MarketData.from_csv(csv_path, date_column=date_column, date_format=date_format, columns=columns)
 
         # --- Parameter Calculation ---
-        S = data[actual_price_col].iloc[-1]
-        log_returns = np.log(data[actual_price_col] / data[actual_price_col].shift(1))
-        volatility = log_returns.std() * np.sqrt(trading_days)
+        S = data.spot[0]
+        volatility = data.volatility(vol_method, trading_days=trading_days)
+        volatility = float(np.ravel(volatility)[-1])
 
-        if pd.isna(volatility) or volatility == 0:
+        if np.isnan(volatility) or volatility == 0:
             raise ValueError("Calculated volatility is zero or NaN. Check for constant prices in the data.")
-        
-        instance = cls(S=S, K=K, vol=volatility, r=r, T=T, option_type=option_type, N=N, M=M, distribution=distribution)   
-        instance.data = data  
-        C0, CT = self.calculate_option_price(data)
-        sigma = np.sqrt( np.sum( (CT[-1] - C0)**2) / (MonteCarlo.M-1) )
-        SE = sigma/np.sqrt(MonteCarlo.M)
+
+        instance = cls(S=S, K=K, vol=volatility, r=r, T=T, option_type=option_type)
+        instance.data = data
+        # N and M are class-wide settings: override them for this run only
+        saved = MonteCarlo.N, MonteCarlo.M
+        try:
+            if N is not None:
+                MonteCarlo.N = N
+            if M is not None:
+                MonteCarlo.M = M
+            C0, SE = instance.simulate()
+        finally:
+            MonteCarlo.N, MonteCarlo.M = saved
 
         return C0, SE
 
 
     def compute_constants(self):
         self.dt = self.T/MonteCarlo.N
-        self.nudt = (self.r - 0.5*self.vol**2)*self.dt
-        self.volsdt = self.vol*np.sqrt(self.dt)
-        self.lnS = np.log(self.S)
-        self.erdt = np.exp(self.r*self.dt)
+        step_vol = self.vol
+        if self.vol_curve is not None:
+            # One forecast volatility per step, as a column broadcasting over the simulations
+            times = np.linspace(0, self.T, MonteCarlo.N + 1)
+            step_vol = self.vol_curve.forward_volatility(times[:-1], times[1:])[:, None] + self.dev_vol
+        # Per-step carry (r - q) from the cached curve grids; the plain scalar rate when both are flat
+        carry, _ = step_carry(self.rates, self.dividends, self.T, MonteCarlo.N)
+        if np.ndim(carry):
+            carry = carry[:, None]
+        self.nudt = (carry - 0.5*step_vol**2)*self.dt
+        self.volsdt = step_vol*np.sqrt(self.dt)
+        self.S0 = escrowed(self.S, self.rates, self.dividends, self.T)
+        self.lnS = np.log(self.S0)
+        self.erdt = np.exp(carry*self.dt)
         self.cv = 0
         self.beta1 = -1
 
@@ -121,9 +137,9 @@ class MonteCarlo:
         d1 = (np.log(self.S/self.K) + (self.r + self.vol**2/2)*self.T)/(self.vol*np.sqrt(self.T))
         try:
             if self.option_type == "call":
-                delta_calc = stats.norm.cdf(d1, 0, 1)
+                delta_calc = norm.cdf(d1)
             elif self.option_type == "put":
-                delta_calc = -stats.norm.cdf(-d1, 0, 1)
+                delta_calc = -norm.cdf(-d1)
             return delta_calc
         except:
             print("Please confirm option type, either 'call' for Call or 'put' for Put!")
@@ -133,14 +149,16 @@ class MonteCarlo:
     """
 
     def calculate_option_price(self, ST, cv=None):
-        if self.option_type == 'call':
-            #For call option
-            CT = np.maximum(0, ST[-1] - self.K) + self.beta1*cv[-1]
-        elif self.option_type == 'put':
-            #For put option
-            CT = np.maximum(0, self.K - ST[-1]) + self.beta1*cv[-1]
+        with stage('payoff', size=MonteCarlo.M):
+            if self.option_type == 'call':
+                #For call option
+                CT = np.maximum(0, ST[-1] - self.K) + self.beta1*cv[-1]
+            elif self.option_type == 'put':
+                #For put option
+                CT = np.maximum(0, self.K - ST[-1]) + self.beta1*cv[-1]
 
-        C0 = np.exp(-self.r*self.T)*np.sum(CT)/MonteCarlo.M
+        with stage('discounting', size=MonteCarlo.M):
+            C0 = np.exp(-self.r*self.T)*np.sum(CT, dtype=np.float64)/MonteCarlo.M
 
         return C0, CT
 
@@ -170,18 +188,134 @@ class MonteCarlo:
     Stock price functions for each variance reduction method
     """
 
-    def calculate_stock_price(self):
+    def generate_paths(self, M=None):
+        """
+        Simulates the (N+1, M) stock price matrix (M defaults to MonteCarlo.M); compute_constants() must have been
+        called.
+        """
+        M = MonteCarlo.M if M is None else M
+        # The draws are those of the float64 generator, rounded, so a seed gives the same paths in either precision;
+        # the float64 constants are cast too, as NumPy would otherwise promote the paths back to float64
+        dtype = self.dtype
+        with stage('rng', size=MonteCarlo.N*M):
+            Z = np.random.normal(size=(MonteCarlo.N, M)).astype(dtype, copy=False)
+        with stage('path_build', size=MonteCarlo.N*M):
+            delta_St=np.asarray(self.nudt, dtype) + np.asarray(self.volsdt, dtype)*Z
+            S0 = dtype.type(self.S0)
+            ST = S0*np.cumprod( np.exp(delta_St), axis=0)
+            ST = np.concatenate( (np.full(shape=(1, M), fill_value=S0, dtype=dtype), ST ) )
+        return ST
+
+    def _path_blocks(self, M, length):
+        for start in range(0, M, length):
+            yield np.ascontiguousarray(self.generate_paths(min(length, M - start)).T)
+
+    def _time_blocks(self, M, length):
+        # Evolves all M paths through consecutive blocks of time points, keeping only the latest prices between blocks
+        dtype = self.dtype
+        nudt, volsdt = (np.broadcast_to(np.asarray(x, dtype).reshape(-1, 1), (MonteCarlo.N, 1))
+                        for x in (self.nudt, self.volsdt))
+        S = np.full(M, self.S0, dtype=dtype)
+        for start in range(0, MonteCarlo.N + 1, length):
+            stop = min(start + length, MonteCarlo.N + 1)
+            first = max(start, 1)       # point 0 is today's price, not a step
+            with stage('rng', size=(stop - first)*M):
+                Z = np.random.normal(size=(stop - first, M)).astype(dtype, copy=False)
+            with stage('path_build', size=(stop - first)*M):
+                block = np.exp(nudt[first-1:stop-1] + volsdt[first-1:stop-1]*Z)
+                np.cumprod(block, axis=0, out=block)
+                block *= S
+                if start == 0:
+                    block = np.concatenate((S[None], block))
+            S = block[-1]
+            yield block
+
+    def write_scenarios(self, path, M=None, layout='path', chunk_bytes=64 * 2**20, seed=None):
+        """
+        Simulates M paths of N steps into an on-disk ScenarioSet, one chunk of about `chunk_bytes` at a time, so
+        the cube may be far larger than memory.
+
+        Parameters:
+        ----------
+        path : str
+            Directory of the new set.
+        M : int, optional
+            Number of paths (defaults to MonteCarlo.M).
+        layout : str, optional
+            'path' (default) for chunks of whole paths, or 'time' for chunks of time slices, which the
+            backward induction of MonteCarloAmerican.simulate_scenarios needs.
+        chunk_bytes : int, optional
+            Approximate size of a chunk (default is 64 MiB).
+        seed : int, optional
+            Seed for a reproducible set (for a given layout and chunk size); the global random state is restored
+            afterwards.
+
+        Returns:
+        -------
+        ScenarioSet
+        """
+        M = MonteCarlo.M if M is None else M
+        self.compute_constants()
+        length = ScenarioSet.chunk_length(M, MonteCarlo.N + 1, self.dtype, layout, chunk_bytes)
+        attrs = {'model': 'gbm', 'S': float(self.S0), 'T': self.T, 'N': MonteCarlo.N, 'seed': seed,
+                 'vol': None if self.vol_curve is not None else float(self.vol), 'r': float(self.r)}
+        with seeded(seed):
+            blocks = self._path_blocks(M, length) if layout == 'path' else self._time_blocks(M, length)
+            return ScenarioSet.create(path, blocks, M, MonteCarlo.N + 1, self.dtype, layout, attrs)
+
+    @profiled('monte_carlo.price_scenarios')
+    def price_scenarios(self, scenarios, read_ahead=2):
+        """
+        Prices the option, with the delta hedge control variate, from the paths of a ScenarioSet, reading one chunk
+        at a time with `read_ahead` chunks loaded in the background.
+
+        The set must have N = MonteCarlo.N steps and have been simulated for this underlying (same S, T, vol and r,
+        see `ScenarioSet.check`). Memory is a few chunks for a path-major set, and a few chunks plus O(M) running
+        sums for a time-major one.
+
+        Returns:
+        -------
+        tuple[float, float]
+            The price and its standard error.
+        """
+        self.compute_constants()
+        scenarios.check(MonteCarlo.N, S=self.S0, T=self.T, vol=self.vol, r=self.r)
+        hedge = self.beta1*self.delta_calc()
+        erdt = np.asarray(self.erdt).reshape(-1)
+        sign = 1.0 if self.option_type == 'call' else -1.0
+        moments = RunningMoments()
+        if scenarios.layout == 'path':
+            for _, _, block in scenarios.chunks(read_ahead=read_ahead):
+                with stage('payoff', size=block.size):
+                    gains = np.sum(block[:, 1:] - block[:, :-1]*erdt, axis=1, dtype=np.float64)
+                    moments.add(np.maximum(0, sign*(block[:, -1] - self.K)) + hedge*gains)
+        else:
+            gains, previous = np.zeros(scenarios.paths), None
+            for n, prices in scenarios.slices(read_ahead=read_ahead):
+                with stage('control_variate', size=scenarios.paths):
+                    if n > 0:
+                        gains += prices - previous*erdt[min(n - 1, erdt.size - 1)]
+                previous = prices
+            with stage('payoff', size=scenarios.paths):
+                moments.add(np.maximum(0, sign*(previous - self.K)) + hedge*gains)
+
+        discount = np.exp(-self.r*self.T)
+        return discount*moments.mean, discount*np.sqrt(moments.variance()/moments.count)
+
+    def calculate_stock_price(self, seed=None):
         self.compute_constants()
 
         # Monte Carlo Simulation
-        Z = np.random.normal(size=(MonteCarlo.N, MonteCarlo.M))
-        delta_St=self.nudt + self.volsdt*Z
-        ST = self.S*np.cumprod( np.exp(delta_St), axis=0)
-        ST = np.concatenate( (np.full(shape=(1, MonteCarlo.M), fill_value=self.S), ST ) )
+        # The paths do not depend on the strike or option type: with a ScenarioStore enabled, seeded runs on the
+        # same underlying, grid and seed share one read-only copy
+        ST = scenario('gbm', seed, self.generate_paths, S0=self.S0, nudt=self.nudt, volsdt=self.volsdt,
+                      N=MonteCarlo.N, M=MonteCarlo.M, dtype=self.dtype.str)
+        dtype = self.dtype
         # bs=BlackScholes(ST[:-1].T, self.K, self.vol, self.r, np.linspace(self.T,0,MonteCarlo.N))
         # deltaSt = bs.delta('call').T
-        deltaSt = self.delta_calc()
-        cv = np.cumsum(deltaSt*(ST[1:] - ST[:-1]*self.erdt), axis=0)
+        with stage('control_variate', size=MonteCarlo.N*MonteCarlo.M):
+            deltaSt = dtype.type(self.delta_calc())
+            cv = np.cumsum(deltaSt*(ST[1:] - ST[:-1]*np.asarray(self.erdt, dtype)), axis=0)
 
         return ST, cv
 
@@ -205,15 +339,75 @@ class MonteCarlo:
 
     #     return lnSt1, lnSt2
 
-    def simulate(self):
+    @cached(random=True)
+    @profiled('monte_carlo.simulate')
+    def simulate(self, seed=None):
+        # A seed makes the run reproducible (and cacheable); the global random state is restored afterwards
+        with seeded(seed):
+            C0, CT = self.calculate_option_price(*self.calculate_stock_price(seed))
 
-        C0, CT = self.calculate_option_price(self.calculate_stock_price()[0], self.calculate_stock_price()[1])
-
-        sigma = np.sqrt( np.sum( (CT - C0)**2) / (MonteCarlo.M-1) )
+        sigma = np.sqrt( np.sum( (CT - C0)**2, dtype=np.float64) / (MonteCarlo.M-1) )
         SE = sigma/np.sqrt(MonteCarlo.M)
 
         return C0, SE
-    
+
+    @staticmethod
+    @cached(random=True)
+    @profiled('monte_carlo.price_batch')
+    def price_batch(S, K, sigma, r, T, is_call, q=0.0, M=None, seed=None, dtype=np.float64):
+        """
+        Prices a batch of European options by Monte Carlo in one vectorized pass.
+
+        Under GBM with constant parameters the terminal price is sampled exactly, so each contract needs
+        M draws of S_T rather than M paths of N steps. All contracts share the same M normal draws (common
+        random numbers), which keeps the batch's relative prices smooth; rows are processed in chunks so
+        memory stays near one million draws.
+
+        Parameters:
+        ----------
+        S, K, sigma, r, T : array-like
+            Stock price, strike, volatility, risk-free rate and time to maturity of each contract.
+        is_call : array-like of bool
+            True for calls, False for puts.
+        q : array-like, optional
+            Continuous dividend yield of each contract (default is 0).
+        M : int, optional
+            Number of draws (defaults to MonteCarlo.M).
+        seed : int, optional
+            Seed for a reproducible run; the global random state is restored afterwards.
+        dtype : data-type, optional
+            Float type of the terminal prices (default is np.float64); means and errors are accumulated in float64.
+
+        Returns:
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Prices and their standard errors.
+        """
+        M = MonteCarlo.M if M is None else M
+        S, K, sigma, r, T, q, is_call = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, sigma, r, T, q)),
+                                                            np.asarray(is_call, dtype=bool))
+        shape = S.shape
+        S, K, sigma, r, T, q, is_call = (x.ravel() for x in (S, K, sigma, r, T, q, is_call))
+        def draw():
+            with stage('rng', size=M):
+                return np.random.normal(size=M).astype(dtype, copy=False)
+        # Seeded draws are shared through an enabled ScenarioStore, across calls and worker processes
+        with seeded(seed):
+            Z = scenario('normal', seed, draw, M=M, dtype=np.dtype(dtype).str)
+        prices, errors = np.empty(S.size), np.empty(S.size)
+        rows = max(1, 1_000_000 // M)
+        for start in range(0, S.size, rows):
+            part = slice(start, start + rows)
+            s, k, v, rate, t, y = (x[part, None].astype(dtype, copy=False) for x in (S, K, sigma, r, T, q))
+            sign = np.where(is_call[part], 1.0, -1.0).astype(dtype)[:, None]
+            with stage('path_build', size=s.size * M):
+                ST = s * np.exp((rate - y - 0.5 * v**2) * t + v * np.sqrt(t) * Z)
+            with stage('payoff', size=s.size * M):
+                CT = np.exp(-rate * t) * np.maximum(sign * (ST - k), 0)
+                prices[part] = CT.mean(axis=1, dtype=np.float64)
+                errors[part] = CT.std(axis=1, ddof=1, dtype=np.float64) / np.sqrt(M)
+        return prices.reshape(shape), errors.reshape(shape)
+
     
 # mc=MonteCarlo(S=101.15, K=98.01, vol=0.0991, r=0.015, T=0.164, option_type='call')    
 # print(f"Option Price: {mc.simulate()[0]}")
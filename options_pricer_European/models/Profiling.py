@@ -0,0 +1,269 @@
+"""Per-stage timing instrumentation of the pricing engines.
+
+The engines mark their stages (random number generation, path building, payoff, regression, discounting, tree
+sweeps, PDE sweeps) with ``stage`` blocks, and their entry points are wrapped with ``profiled``. While no
+``Profiler`` is active both only check a module global and return a shared no-op, so the cost is one function
+call per stage. Inside ``with Profiler() as profile:`` every stage records:
+
+  - calls and wall seconds (total, min, max), keyed by its nesting path, e.g.
+    ``monte_carlo_american.backtrack/regression``, and by its labels, e.g. ``{step=42}``
+  - items: the summed size of the arrays the stage processed (paths, nodes, contracts)
+  - with ``memory=True``, the bytes a stage left allocated and its peak allocation, from tracemalloc (which
+    slows allocation-heavy code, so timings taken with it are pessimistic)
+  - with ``trace=True`` (the default), one event per call for the Chrome trace viewer / Perfetto
+
+and is exported with ``to_dict()``, ``prometheus()`` or ``chrome_trace()``:
+
+    with Profiler() as profile:
+        MonteCarloAmerican(100, 100, 0.2, 0.05, 1, 'put').simulate()
+    profile.save_chrome_trace('lsm.json')
+
+A profiler records stages from every thread, each thread with its own nesting.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+_active = None
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'size', 'labels', 'path', 'start', 'memory', 'child_peak')
+
+    def __init__(self, profiler, name, size, labels):
+        self.profiler = profiler
+        self.name = name
+        self.size = size
+        self.labels = labels
+
+    def __enter__(self):
+        profiler = self.profiler
+        stack = profiler._stack()
+        self.path = f'{stack[-1].path}/{self.name}' if stack else self.name
+        self.memory = None
+        if profiler.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak)
+            tracemalloc.reset_peak()
+            self.memory = current
+            self.child_peak = current
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        profiler = self.profiler
+        stack = profiler._stack()
+        stack.pop()
+        allocated = peak = None
+        if self.memory is not None:
+            current, traced_peak = tracemalloc.get_traced_memory()
+            absolute_peak = max(traced_peak, self.child_peak)
+            allocated, peak = current - self.memory, absolute_peak - self.memory
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, absolute_peak)
+        profiler._record(self.path, self.labels, self.start, end, self.size, allocated, peak)
+        return False
+
+
+def profiling():
+    """
+    The active profiler, or None.
+    """
+    return _active
+
+
+def stage(name, size=None, **labels):
+    """
+    Marks a block as a stage of the running computation.
+
+    Parameters:
+    ----------
+    name : str
+        Stage name, nested under the enclosing stage.
+    size : int, optional
+        Number of items (paths, nodes, contracts) the stage processes.
+    **labels
+        Distinguish calls of one stage, e.g. step=n for per-time-step costs.
+    """
+    if _active is None:
+        return _NO_STAGE
+    return _Stage(_active, name, size, labels)
+
+
+def profiled(name):
+    """
+    Decorator recording every call of an engine entry point as the stage `name`.
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return function(*args, **kwargs)
+            with _Stage(_active, name, None, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _key(path, labels):
+    if not labels:
+        return path
+    return path + '{' + ','.join(f'{name}={value}' for name, value in labels) + '}'
+
+
+class Profiler:
+    """
+    Collects stage timings while active (as a context manager, or between `start` and `stop`).
+
+    Parameters:
+    ----------
+    memory : bool, optional
+        Record allocations per stage with tracemalloc (default is False).
+    trace : bool, optional
+        Keep one event per stage call for `chrome_trace` (default is True).
+    """
+
+    def __init__(self, memory=False, trace=True):
+        self.memory = memory
+        self.trace = trace
+        self.stats = {}
+        self.events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._previous = None
+        self._origin = time.perf_counter()
+        self._started_tracing = False
+
+    def _stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def _record(self, path, labels, start, end, size, allocated, peak):
+        labels = tuple(sorted(labels.items()))
+        seconds = end - start
+        with self._lock:
+            entry = self.stats.get((path, labels))
+            if entry is None:
+                entry = self.stats[(path, labels)] = {'calls': 0, 'seconds': 0.0, 'min_seconds': seconds,
+                                                      'max_seconds': seconds, 'items': 0}
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            entry['min_seconds'] = min(entry['min_seconds'], seconds)
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            if size is not None:
+                entry['items'] += int(size)
+            if allocated is not None:
+                entry['allocated_bytes'] = entry.get('allocated_bytes', 0) + allocated
+                entry['peak_bytes'] = max(entry.get('peak_bytes', 0), peak)
+            if self.trace:
+                self.events.append((path, labels, start, seconds, size, threading.get_ident()))
+
+    def start(self):
+        global _active
+        self._previous, _active = _active, self
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def stop(self):
+        global _active
+        _active = self._previous
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def clear(self):
+        with self._lock:
+            self.stats.clear()
+            self.events.clear()
+
+    def to_dict(self):
+        """
+        The statistics per stage, keyed by nesting path and labels, with the mean seconds per call added.
+        """
+        with self._lock:
+            return {_key(path, labels): {**entry, 'mean_seconds': entry['seconds'] / entry['calls']}
+                    for (path, labels), entry in self.stats.items()}
+
+    def total(self, name):
+        """
+        Seconds, calls and items of every stage whose path ends with `name`, summed over labels.
+        """
+        total = {'calls': 0, 'seconds': 0.0, 'items': 0}
+        with self._lock:
+            for (path, _), entry in self.stats.items():
+                if path == name or path.endswith('/' + name):
+                    for field in total:
+                        total[field] += entry[field]
+        return total
+
+    def prometheus(self, prefix='options_pricer'):
+        """
+        The statistics in the Prometheus text exposition format, one series per stage and label set.
+        """
+        metrics = (('stage_seconds_total', 'counter', 'seconds'), ('stage_calls_total', 'counter', 'calls'),
+                   ('stage_items_total', 'counter', 'items'), ('stage_allocated_bytes', 'gauge', 'allocated_bytes'),
+                   ('stage_peak_bytes', 'gauge', 'peak_bytes'))
+        with self._lock:
+            stats = list(self.stats.items())
+        lines = []
+        for metric, kind, field in metrics:
+            series = [(path, labels, entry[field]) for (path, labels), entry in stats if field in entry]
+            if not series:
+                continue
+            lines.append(f'# TYPE {prefix}_{metric} {kind}')
+            for path, labels, value in series:
+                label_text = ','.join([f'stage="{path}"'] + [f'{name}="{value}"' for name, value in labels])
+                lines.append(f'{prefix}_{metric}{{{label_text}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def chrome_trace(self):
+        """
+        The recorded stage calls as Chrome trace events (complete events, microseconds since the profiler was
+        created), for chrome://tracing or https://ui.perfetto.dev.
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+        trace = []
+        for path, labels, start, seconds, size, thread in events:
+            args = dict(labels)
+            if size is not None:
+                args['size'] = int(size)
+            trace.append({'name': path.rsplit('/', 1)[-1], 'cat': path, 'ph': 'X', 'pid': pid, 'tid': thread,
+                          'ts': (start - self._origin) * 1e6, 'dur': seconds * 1e6, 'args': args})
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def save_chrome_trace(self, path):
+        with open(path, 'w') as handle:
+            json.dump(self.chrome_trace(), handle)
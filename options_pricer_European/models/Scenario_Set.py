@@ -0,0 +1,245 @@
+"""Chunked on-disk scenario sets, for simulations larger than memory.
+
+A ``ScenarioSet`` is a directory holding a scenario cube of `paths` x `points` prices (points = steps + 1,
+including today) as a ``meta.json`` and a sequence of ``.npy`` chunk files, each a block along one axis:
+
+  - layout 'path' (path-major): chunks of whole paths, shape (paths in chunk, points). Every chunk can be
+    priced on its own, which suits path-dependent payoffs (averages, barriers, the delta-hedge control variate).
+  - layout 'time' (time-major): chunks of whole time slices, shape (steps in chunk, paths). A terminal payoff
+    reads only the last chunk, and backward induction (the Longstaff-Schwartz sweep) reads the slices in
+    reverse with all paths of a step at hand for the regression.
+
+Sets are written one chunk at a time by ``MonteCarlo.write_scenarios`` and read with ``chunks``, which loads
+the next `read_ahead` chunks in a background thread while the caller works on the current one, so the disk and
+the CPU overlap and memory holds at most read_ahead + 2 chunks. ``MonteCarlo.price_scenarios`` and
+``MonteCarloAmerican.simulate_scenarios`` price from a set with O(paths) memory besides the chunks.
+
+    simulation = MonteCarlo(100, 100, 0.2, 0.05, 1, 'put', dtype=np.float32)
+    scenarios = simulation.write_scenarios('cube', M=20_000_000, layout='time', seed=1)
+    price, SE = MonteCarloAmerican(100, 100, 0.2, 0.05, 1, 'put').simulate_scenarios(scenarios)
+
+The simulation's inputs are kept in the set's ``attrs``, and the pricers refuse a set simulated for another
+underlying (see ``check``).
+"""
+
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+LAYOUTS = ('path', 'time')
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def _put(channel, item, stop):
+    while not stop.is_set():
+        try:
+            channel.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def prefetch(load, items, depth=2):
+    """
+    Yields load(item) for each item, loading up to `depth` items ahead in a background thread.
+    """
+    if depth < 1:
+        for item in items:
+            yield load(item)
+        return
+    channel, stop = queue.Queue(maxsize=depth), threading.Event()
+
+    def work():
+        try:
+            for item in items:
+                if not _put(channel, load(item), stop):
+                    return
+            _put(channel, _DONE, stop)
+        except BaseException as error:
+            _put(channel, _Failure(error), stop)
+
+    thread = threading.Thread(target=work, name='scenario-read-ahead', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = channel.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        # Also reached when the caller stops early: release the loader and wait for it
+        stop.set()
+        thread.join()
+
+
+class RunningMoments:
+    """
+    Count, mean and variance of values added in batches, combined in float64 (Chan et al.'s pairwise update).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, values):
+        values = np.asarray(values)
+        count = values.size
+        if count == 0:
+            return
+        mean = values.mean(dtype=np.float64)
+        m2 = np.sum(np.square(values - mean, dtype=np.float64))
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta**2 * self.count * count / total
+        self.count = total
+
+    def variance(self, ddof=1):
+        return self.m2 / (self.count - ddof)
+
+
+class ScenarioSet:
+    """
+    A scenario cube stored as chunk files in a directory.
+
+    Parameters:
+    ----------
+    path : str
+        Directory written by `ScenarioSet.create` (or `MonteCarlo.write_scenarios`).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as handle:
+            meta = json.load(handle)
+        self.paths = meta['paths']
+        self.points = meta['points']
+        self.layout = meta['layout']
+        self.dtype = np.dtype(meta['dtype'])
+        self.bounds = [tuple(bound) for bound in meta['chunks']]
+        self.attrs = meta.get('attrs', {})
+
+    @property
+    def steps(self):
+        return self.points - 1
+
+    @property
+    def shape(self):
+        return (self.paths, self.points)
+
+    @property
+    def nbytes(self):
+        return self.paths * self.points * self.dtype.itemsize
+
+    @staticmethod
+    def chunk_length(paths, points, dtype, layout, chunk_bytes):
+        """
+        Paths (layout 'path') or time points (layout 'time') per chunk so a chunk takes about `chunk_bytes`.
+        """
+        row = (points if layout == 'path' else paths) * np.dtype(dtype).itemsize
+        return int(max(1, min(paths if layout == 'path' else points, chunk_bytes // row)))
+
+    @classmethod
+    def create(cls, path, blocks, paths, points, dtype=np.float64, layout='path', attrs=None):
+        """
+        Writes the arrays of `blocks`, consecutive along the chunked axis, as the chunks of a new set.
+
+        Parameters:
+        ----------
+        path : str
+            Directory to create (it may exist, but must not hold a set).
+        blocks : iterable of np.ndarray
+            For layout 'path', arrays of shape (n, points) holding consecutive paths; for layout 'time', arrays
+            of shape (n, paths) holding consecutive time points. Each is written as soon as it is produced.
+        paths, points : int
+            Size of the cube.
+        dtype : data-type, optional
+            Type of the stored prices (default is np.float64).
+        layout : str, optional
+            'path' (default) or 'time'.
+        attrs : dict, optional
+            JSON-serializable description of the simulation, e.g. its parameters and seed.
+
+        Returns:
+        -------
+        ScenarioSet
+        """
+        if layout not in LAYOUTS:
+            raise ValueError("layout must be 'path' or 'time'")
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, 'meta.json')):
+            raise FileExistsError(f"{path} already holds a scenario set")
+        width, length = (points, paths) if layout == 'path' else (paths, points)
+        bounds, start = [], 0
+        for block in blocks:
+            block = np.asarray(block, dtype=dtype)
+            if block.ndim != 2 or block.shape[1] != width:
+                raise ValueError(f"chunk of shape {block.shape} does not fit a {layout}-major cube of "
+                                 f"{paths} paths x {points} points")
+            np.save(os.path.join(path, f'chunk-{len(bounds):06d}.npy'), block)
+            bounds.append((start, start + len(block)))
+            start += len(block)
+        if start != length:
+            raise ValueError(f"the chunks hold {start} {layout}s, not {length}")
+        meta = {'paths': paths, 'points': points, 'layout': layout, 'dtype': np.dtype(dtype).str,
+                'chunks': bounds, 'attrs': attrs or {}}
+        # meta.json is written last, so a set interrupted while writing cannot be opened
+        with open(os.path.join(path, 'meta.json'), 'w') as handle:
+            json.dump(meta, handle)
+        return cls(path)
+
+    def check(self, steps, tolerance=1e-9, **expected):
+        """
+        Raises ValueError unless the set has `steps` steps and each of `expected` (e.g. S, T, vol, r) matches the
+        value recorded in `attrs` to a relative `tolerance`. Values the set does not record are not checked.
+        """
+        if self.steps != steps:
+            raise ValueError(f"the scenarios have {self.steps} steps, not {steps}")
+        for name, value in expected.items():
+            recorded = self.attrs.get(name)
+            if recorded is not None and not np.isclose(recorded, value, rtol=tolerance, atol=0):
+                raise ValueError(f"the scenarios were simulated with {name} = {recorded}, not {value}")
+
+    def _load(self, index):
+        return np.load(os.path.join(self.path, f'chunk-{index:06d}.npy'))
+
+    def chunks(self, reverse=False, read_ahead=2):
+        """
+        Yields (start, stop, block) for every chunk, `block` covering paths (layout 'path') or time points
+        (layout 'time') start to stop, with the next `read_ahead` chunks loaded in a background thread.
+        """
+        order = range(len(self.bounds) - 1, -1, -1) if reverse else range(len(self.bounds))
+        blocks = prefetch(self._load, order, read_ahead)
+        for index, block in zip(order, blocks):
+            yield (*self.bounds[index], block)
+
+    def slices(self, reverse=False, read_ahead=2):
+        """
+        Yields (n, prices) for every time point n of a time-major set, prices being the n-th slice of all paths.
+        """
+        if self.layout != 'time':
+            raise ValueError("time slices need a time-major ('time' layout) scenario set")
+        for start, stop, block in self.chunks(reverse, read_ahead):
+            points = range(stop - 1, start - 1, -1) if reverse else range(start, stop)
+            for n in points:
+                yield n, block[n - start]
+
+    def load(self):
+        """
+        The whole cube as an in-memory (paths, points) array.
+        """
+        blocks = [block for _, _, block in self.chunks()]
+        return np.concatenate(blocks) if self.layout == 'path' else np.concatenate(blocks).T
@@ -0,0 +1,228 @@
+"""Opt-in store of simulated scenarios shared by the Monte Carlo pricers and worker processes.
+
+Pricing many contracts on one underlying with ``MonteCarlo``, ``MonteCarloAmerican``, ``Heston`` or ``asian``
+regenerates the same paths for every contract: the paths depend on the underlying, the model parameters, the
+time grid and the seed, not on the strike or the payoff. While a ``ScenarioStore`` is enabled, a seeded
+simulation first looks its paths up by those inputs and generates them only on a miss:
+
+  - Paths are written once to a ``.npy`` file in the store's directory, on the shared-memory file system
+    (``/dev/shm``) where there is one, and every reader maps the file read-only, so a pricer, another pricer
+    on the same underlying, or a worker process gets the same physical pages without copying.
+  - File names are a hash of the key, so worker processes given the store (it pickles to its directory) find
+    the scenarios the parent or another worker generated, and add theirs for the others. Keys holding curves
+    or volatility models are keyed by identity, like those of ``PricingCache``, and are only shared in-process.
+  - Only seeded runs use the store: a seeded run draws from a freshly seeded generator, so stored paths are
+    exactly what regenerating would produce.
+  - With ``max_bytes``, the least recently used scenarios beyond it are deleted; pricers still holding them
+    keep their mapping.
+
+    with ScenarioStore() as store:
+        for K in strikes:
+            MonteCarlo(100, K, 0.2, 0.05, 1, 'call').simulate(seed=7)    # paths generated once
+
+Scenarios are arrays of the engine's path type; ``MonteCarlo`` stores its (N + 1, M) price matrix, ``Heston``
+the stacked (2, paths, steps + 1) price and variance matrices, and ``asian`` its (fixings, M) log-returns.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .Cache import PricingCache, _Uncacheable
+
+_active = None
+
+
+def _shared_directory():
+    # tmpfs on Linux: files there live in memory and map straight into every process that opens them
+    return '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def _by_identity(key):
+    return any(isinstance(part, tuple) and (part[:1] == ('id',) or _by_identity(part)) for part in key)
+
+
+class ScenarioStore:
+    """
+    Simulated paths keyed by model, parameters, grid and seed, held in memory-mapped files shared by processes.
+
+    Parameters:
+    ----------
+    directory : str, optional
+        Where the store creates its directory of scenario files (defaults to /dev/shm, else the temp directory).
+    max_bytes : int, optional
+        Size beyond which the least recently used scenarios this process stored are deleted (default unbounded).
+    tolerance : float, optional
+        Quantum to which float parameters are rounded when building keys (default is 1e-9).
+    """
+
+    def __init__(self, directory=None, max_bytes=None, tolerance=1e-9):
+        self.path = tempfile.mkdtemp(prefix='scenarios-', dir=directory or _shared_directory())
+        self.max_bytes = max_bytes
+        self.tolerance = tolerance
+        self._keys = PricingCache(tolerance=tolerance)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._owner = os.getpid()
+        self._previous = []
+        self.hits = self.misses = self.evictions = 0
+
+    def __getstate__(self):
+        # A worker's copy shares the directory but starts with an empty index and never deletes it
+        return {'path': self.path, 'max_bytes': self.max_bytes, 'tolerance': self.tolerance}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._keys = PricingCache(tolerance=self.tolerance)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._owner = None
+        self._previous = []
+        self.hits = self.misses = self.evictions = 0
+
+    def key(self, model, seed, **parameters):
+        """
+        The key of a scenario: the model name, the seed and the quantized parameters and grid.
+        """
+        return self._keys.key(model, dict(parameters, seed=seed))
+
+    def _file(self, key):
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        if _by_identity(key):
+            # The key names objects by identity, whose addresses another process may reuse for other objects
+            name = f'{os.getpid()}-{name}'
+        return os.path.join(self.path, name + '.npy')
+
+    def lookup(self, key):
+        """
+        The stored scenario of `key` as a read-only memory map, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        if _by_identity(key):
+            return None
+        try:
+            paths = np.load(self._file(key), mmap_mode='r')
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self.hits += 1
+        return paths
+
+    def store(self, key, paths):
+        """
+        Writes `paths` to the store and returns the read-only memory map that replaces it.
+        """
+        paths = np.asarray(paths)
+        file = self._file(key)
+        # Written under a private name and renamed, so concurrent readers never see a partial file
+        partial = f'{file}.{os.getpid()}.{threading.get_ident()}'
+        with open(partial, 'wb') as handle:
+            np.save(handle, paths)
+        os.replace(partial, file)
+        paths = np.load(file, mmap_mode='r')
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[key] = paths
+            self._bytes += paths.nbytes
+            while self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+                try:
+                    os.unlink(self._file(evicted_key))
+                except OSError:
+                    pass
+        return paths
+
+    def paths(self, model, seed, generate, **parameters):
+        """
+        The paths of the scenario (`model`, `seed`, `parameters`), calling `generate()` only if not yet stored.
+
+        Returns the freshly generated array instead when the parameters cannot be keyed.
+        """
+        try:
+            key = self.key(model, seed, **parameters)
+        except _Uncacheable:
+            return generate()
+        paths = self.lookup(key)
+        if paths is None:
+            paths = self.store(key, generate())
+        return paths
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Counters since creation: 'hits' and 'misses' (scenarios generated), 'evictions', and the 'entries' and
+        'bytes' this process stored.
+        """
+        with self._lock:
+            calls = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / calls if calls else 0.0,
+                    'evictions': self.evictions, 'entries': len(self._entries), 'bytes': self._bytes}
+
+    def close(self):
+        """
+        Deletes the scenario files; only the process that created the store removes its directory.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self._owner == os.getpid():
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        self._previous.append(active_scenarios())
+        enable_scenarios(self)
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = self._previous.pop()
+        self.close()
+        return False
+
+
+def enable_scenarios(store=None, **options):
+    """
+    Makes seeded simulations share their paths through `store` (a new ScenarioStore built from `options` by
+    default) and returns it. Also usable as a worker process initializer.
+    """
+    global _active
+    _active = ScenarioStore(**options) if store is None else store
+    return _active
+
+
+def disable_scenarios():
+    global _active
+    _active = None
+
+
+def active_scenarios():
+    return _active
+
+
+def scenario(model, seed, generate, **parameters):
+    """
+    The paths of a simulation: from the active store when there is one and the run is seeded, else `generate()`.
+    """
+    store = _active
+    if store is None or seed is None:
+        return generate()
+    return store.paths(model, seed, generate, **parameters)
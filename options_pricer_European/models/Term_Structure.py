@@ -0,0 +1,175 @@
+"""Interest rate and dividend term structures shared by all pricers.
+
+``YieldCurve`` holds continuously compounded zero rates at pillar times. The log-discount factor r(t) * t is
+precomputed at the pillars and interpolated linearly, i.e. forward rates are piecewise constant, so discount
+factors, zero rates and forward rates at arrays of times are one ``np.interp`` each. Per-step forward rates for
+an N-step grid to maturity T are cached on the curve, so trees and Monte Carlo engines priced repeatedly on the
+same grid reuse them.
+
+``Dividends`` combines a continuous dividend yield (a number or a ``YieldCurve`` of yields) with a schedule of
+discrete cash dividends. Cash dividends follow the escrowed model: the risky part of the stock, S minus the
+present value of the dividends paid before maturity, follows the usual lognormal dynamics, and the present value
+of the dividends still to come is added back wherever the full stock price is needed (e.g. early exercise).
+
+Every pricer's `r` may be a number or a ``YieldCurve``, and its `dividends` a number (continuous yield) or a
+``Dividends`` object.
+"""
+
+import numpy as np
+
+
+def _scalar(x):
+    x = np.asarray(x)
+    return x.item() if x.ndim == 0 else x
+
+
+class YieldCurve:
+    """
+    A zero-rate curve with piecewise-constant forward rates, extrapolated flat in the last forward rate.
+    """
+
+    def __init__(self, times, rates):
+        """
+        Parameters:
+        ----------
+        times : array-like
+            Positive pillar times in years.
+        rates : array-like
+            Continuously compounded zero rates at the pillars.
+        """
+        times, rates = np.broadcast_arrays(np.atleast_1d(np.asarray(times, dtype=float)),
+                                           np.atleast_1d(np.asarray(rates, dtype=float)))
+        if np.any(times <= 0):
+            raise ValueError("pillar times must be positive")
+        order = np.argsort(times)
+        self.times = times[order]
+        self.rates = rates[order]
+        self._t = np.concatenate(([0.0], self.times))
+        self._log_discount = np.concatenate(([0.0], self.rates * self.times))
+        self._tail_forward = (self._log_discount[-1] - self._log_discount[-2]) / (self._t[-1] - self._t[-2])
+        self._steps = {}
+
+    @classmethod
+    def flat(cls, r):
+        return cls([1.0], [r])
+
+    def log_discount(self, t):
+        """
+        -ln(discount factor) at times t.
+        """
+        t = np.asarray(t, dtype=float)
+        inside = np.interp(t, self._t, self._log_discount)
+        return np.where(t > self._t[-1], self._log_discount[-1] + self._tail_forward * (t - self._t[-1]), inside)
+
+    def discount(self, t):
+        return _scalar(np.exp(-self.log_discount(t)))
+
+    def zero_rate(self, t):
+        """
+        Zero rate to time t; at t = 0, the short rate.
+        """
+        t = np.asarray(t, dtype=float)
+        safe = np.where(t > 0, t, 1.0)
+        return _scalar(np.where(t > 0, self.log_discount(safe) / safe, self._log_discount[1] / self._t[1]))
+
+    def forward_rate(self, t0, t1):
+        """
+        Continuously compounded forward rate over [t0, t1], vectorized.
+        """
+        t0, t1 = np.asarray(t0, dtype=float), np.asarray(t1, dtype=float)
+        span = np.where(t1 > t0, t1 - t0, 1.0)
+        forward = (self.log_discount(t1) - self.log_discount(t0)) / span
+        return _scalar(np.where(t1 > t0, forward, self.zero_rate(t0)))
+
+    def step_forwards(self, T, N):
+        """
+        Forward rates over each of N equal steps to T, computed once per (T, N) and cached.
+        """
+        key = (float(T), int(N))
+        if key not in self._steps:
+            times = np.linspace(0, T, N + 1)
+            self._steps[key] = np.atleast_1d(self.forward_rate(times[:-1], times[1:]))
+        return self._steps[key]
+
+
+class Dividends:
+    """
+    A continuous dividend yield plus discrete cash dividends.
+    """
+
+    def __init__(self, q=0.0, times=(), amounts=()):
+        """
+        Parameters:
+        ----------
+        q : float or YieldCurve, optional
+            Continuous dividend yield, flat or as a term structure (default is 0).
+        times : array-like, optional
+            Payment (ex-dividend) times of cash dividends in years.
+        amounts : array-like, optional
+            Cash amount of each dividend.
+        """
+        self.q = q if isinstance(q, YieldCurve) else YieldCurve.flat(q)
+        times, amounts = np.broadcast_arrays(np.atleast_1d(np.asarray(times, dtype=float)),
+                                             np.atleast_1d(np.asarray(amounts, dtype=float)))
+        if np.any(times < 0) or np.any(amounts < 0):
+            raise ValueError("dividend times and amounts must be non-negative")
+        order = np.argsort(times)
+        self.times = times[order]
+        self.amounts = amounts[order]
+
+    def present_value(self, rates, t, T):
+        """
+        Value at time(s) t of the cash dividends paid in (t, T], discounted on the curve `rates`.
+        """
+        t = np.asarray(t, dtype=float)
+        if not len(self.times):
+            return _scalar(np.zeros(t.shape))
+        paid = (self.times > t[..., None]) & (self.times <= np.asarray(T)[..., None])
+        growth = np.asarray(rates.discount(self.times)) / np.asarray(rates.discount(t))[..., None]
+        return _scalar(np.sum(paid * self.amounts * growth, axis=-1))
+
+
+def as_curve(r):
+    """
+    The rate argument of a pricer as a YieldCurve.
+    """
+    return r if isinstance(r, YieldCurve) else YieldCurve.flat(r)
+
+
+def as_dividends(dividends):
+    """
+    The dividends argument of a pricer as a Dividends object, or None when there are none.
+    """
+    if dividends is None or isinstance(dividends, Dividends):
+        return dividends
+    return Dividends(q=dividends)
+
+
+def zero_rate(r, T):
+    """
+    Zero rate to T of a number or curve; a number is returned unchanged.
+    """
+    return r.zero_rate(T) if isinstance(r, YieldCurve) else r
+
+
+def step_carry(r, dividends, T, N):
+    """
+    Per-step rates (r - q) and discount rates r on N equal steps to T.
+
+    With a flat numeric r and no dividends both are the number r itself, so engines keep their scalar
+    arithmetic; otherwise they are arrays of length N taken from the cached step grids of the curves.
+    """
+    if not isinstance(r, YieldCurve) and dividends is None:
+        return r, r
+    rates = as_curve(r).step_forwards(T, N)
+    carry = rates if dividends is None else rates - dividends.q.step_forwards(T, N)
+    return carry, rates
+
+
+def escrowed(S, r, dividends, T):
+    """
+    The spot less the present value of the cash dividends paid before T.
+    """
+    if dividends is None or not len(dividends.times):
+        return S
+    return S - dividends.present_value(as_curve(r), 0.0, T)
@@ -2,5 +2,13 @@ from .Monte_Carlo import MonteCarlo
 from .Black_Scholes import BlackScholes
 from .Heston import Heston
 from .Binomial import Binomial
+from .Black_76 import Black76
+from .Bachelier import Bachelier
+from .Term_Structure import YieldCurve, Dividends
+from .Local_Vol import LocalVolatility, LocalVolMonteCarlo, LocalVolPDE
+from .Cache import PricingCache, enable_cache, disable_cache
+from .Profiling import Profiler
+from .Scenarios import ScenarioStore, enable_scenarios, disable_scenarios
+from .Scenario_Set import ScenarioSet
 
-__all__ = ['MonteCarlo', 'BlackScholes', 'Heston', 'Binomial']
\ No newline at end of file
+__all__ = ['MonteCarlo', 'BlackScholes', 'Heston', 'Binomial', 'LocalVolatility', 'LocalVolMonteCarlo', 'LocalVolPDE', 'YieldCurve', 'Dividends', 'Black76', 'Bachelier', 'PricingCache', 'enable_cache', 'disable_cache', 'Profiler', 'ScenarioStore', 'enable_scenarios', 'disable_scenarios', 'ScenarioSet']
\ No newline at end of file
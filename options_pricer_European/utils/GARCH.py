@@ -0,0 +1,224 @@
+"""GARCH(1,1) and GJR-GARCH(1,1) volatility forecasting.
+
+The conditional variance of daily log-returns follows
+
+    sigma^2_t = omega + (alpha + gamma * I[eps_{t-1} < 0]) * eps^2_{t-1} + beta * sigma^2_{t-1},
+
+with gamma = 0 for plain GARCH. For fixed parameters this recursion is a first-order linear filter, so the whole
+variance series, and the derivatives of every variance with respect to every parameter, are each computed by one
+``scipy.signal.lfilter`` call rather than a Python loop over observations. The Gaussian likelihood and its analytic
+gradient therefore cost a couple of C-level passes per optimizer iteration, and a fit on a few years of daily data
+takes milliseconds.
+
+A fitted ``GARCH`` object can be passed as ``sigma`` (or ``vol``) to ``BlackScholes``, ``Binomial`` and
+``MonteCarlo``: they call ``vol(K, T)``, the average volatility to maturity, and ``MonteCarlo`` additionally
+uses ``forward_volatility`` to give each time step its own forecast volatility.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Returns are fitted in percent so the parameters are of order one for the optimizer.
+SCALE = 100.0
+
+
+def _variance_path(params, e2, e2_neg, initial):
+    """
+    Conditional variances sigma^2_0..sigma^2_{n-1} and their derivatives with respect to (omega, alpha, gamma, beta).
+    """
+    from scipy.signal import lfilter
+
+    omega, alpha, gamma, beta = params
+    drive = omega + alpha * e2[:-1] + gamma * e2_neg[:-1]
+    tail, _ = lfilter([1.0], [1.0, -beta], drive, zi=[beta * initial])
+    variance = np.concatenate(([initial], tail))
+
+    # d sigma^2_t = x_t + beta * d sigma^2_{t-1}: the same filter applied to every parameter's input at once.
+    inputs = np.column_stack((np.ones(len(drive)), e2[:-1], e2_neg[:-1], variance[:-1]))
+    derivatives = lfilter([1.0], [1.0, -beta], inputs, axis=0)
+    derivatives = np.vstack((np.zeros((1, 4)), derivatives))
+    return variance, derivatives
+
+
+def _negative_log_likelihood(free, mask, e2, e2_neg, initial):
+    """
+    Gaussian negative log-likelihood (without constants) and its analytic gradient in the free parameters.
+    """
+    params = np.zeros(4)
+    params[mask] = free
+    variance, derivatives = _variance_path(params, e2, e2_neg, initial)
+    if np.any(variance <= 0):
+        return np.inf, np.zeros(len(free))
+    nll = 0.5 * np.sum(np.log(variance) + e2 / variance)
+    gradient = 0.5 * ((1 / variance - e2 / variance**2) @ derivatives)
+    return nll, gradient[mask]
+
+
+class GARCH:
+    """
+    A fitted GARCH(1,1) or GJR-GARCH(1,1) model of daily log-returns, with variance forecasts.
+
+    Parameters are stored for returns in natural units (not percent): omega is a daily variance.
+    """
+
+    def __init__(self, omega, alpha, beta, gamma=0.0, mu=0.0, next_variance=None, trading_days=252):
+        """
+        Parameters:
+        ----------
+        omega, alpha, beta, gamma : float
+            GARCH parameters; gamma is the GJR leverage term (0 for plain GARCH).
+        mu : float, optional
+            Mean daily log-return removed before fitting (default is 0).
+        next_variance : float, optional
+            One-step-ahead conditional variance; defaults to the long-run variance.
+        trading_days : int, optional
+            Trading days per year (default is 252).
+        """
+        self.omega = omega
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.mu = mu
+        self.trading_days = trading_days
+        if self.persistence >= 1:
+            raise ValueError("alpha + gamma / 2 + beta must be below 1 for a stationary variance")
+        self.next_variance = self.long_run_variance if next_variance is None else next_variance
+
+    @property
+    def persistence(self):
+        return self.alpha + 0.5 * self.gamma + self.beta
+
+    @property
+    def long_run_variance(self):
+        return self.omega / (1 - self.persistence)
+
+    @classmethod
+    def fit(cls, returns, model='garch', trading_days=252):
+        """
+        Fits the model to daily log-returns by maximum likelihood.
+
+        Parameters:
+        ----------
+        returns : array-like
+            Daily log-returns, oldest first.
+        model : str, optional
+            'garch' (default) or 'gjr'.
+        trading_days : int, optional
+            Trading days per year (default is 252).
+
+        Returns:
+        -------
+        GARCH
+            The fitted model, with `next_variance` set to the forecast for the day after the sample.
+        """
+        if model not in ('garch', 'gjr'):
+            raise ValueError("model must be 'garch' or 'gjr'")
+        returns = np.asarray(returns, dtype=float)
+        returns = returns[~np.isnan(returns)]
+        if len(returns) < 10:
+            raise ValueError("at least 10 returns are needed to fit a GARCH model")
+        from scipy.optimize import minimize
+
+        mu = returns.mean()
+        eps = (returns - mu) * SCALE
+        e2 = eps**2
+        e2_neg = e2 * (eps < 0)
+        sample_variance = e2.mean()
+
+        # Free parameters are (omega, alpha, beta) for GARCH and (omega, alpha, gamma, beta) for GJR.
+        mask = np.array([True, True, model == 'gjr', True])
+        start = np.array([0.05 * sample_variance, 0.05, 0.05, 0.9])[mask]
+        bounds = [(1e-8 * sample_variance, 10 * sample_variance), (0, 1), (0, 1), (0, 1)]
+        bounds = [b for b, free in zip(bounds, mask) if free]
+        stationarity = np.array([0, 1, 0.5, 1])[mask]
+        constraint = {'type': 'ineq', 'fun': lambda x: 1 - 1e-6 - stationarity @ x,
+                      'jac': lambda x: -stationarity}
+
+        result = minimize(_negative_log_likelihood, start, args=(mask, e2, e2_neg, sample_variance), jac=True,
+                          method='SLSQP', bounds=bounds, constraints=[constraint])
+        params = np.zeros(4)
+        params[mask] = result.x
+        omega, alpha, gamma, beta = params
+
+        variance, _ = _variance_path(params, e2, e2_neg, sample_variance)
+        next_variance = omega + (alpha + gamma * (eps[-1] < 0)) * e2[-1] + beta * variance[-1]
+
+        fitted = cls(omega / SCALE**2, alpha, beta, gamma, mu, next_variance / SCALE**2, trading_days)
+        fitted.converged = result.success
+        fitted.log_likelihood = -result.fun
+        return fitted
+
+    def variance_forecast(self, horizon):
+        """
+        Expected daily variance h = 1, 2, ... days ahead:
+        E[sigma^2_{t+h}] = long_run + persistence^(h-1) * (next_variance - long_run).
+        """
+        h = np.asarray(horizon, dtype=float)
+        return self.long_run_variance + self.persistence ** (h - 1) * (self.next_variance - self.long_run_variance)
+
+    def term_volatility(self, T):
+        """
+        Annualized volatility to maturity T: the square root of the average forecast variance over the next
+        T * trading_days days, in closed form. This is the flat sigma that reprices a European option under the
+        forecast variance path. Vectorized over T.
+        """
+        T = np.asarray(T, dtype=float)
+        days = T * self.trading_days
+        phi = self.persistence
+        excess = self.next_variance - self.long_run_variance
+        with np.errstate(divide='ignore', invalid='ignore'):
+            decay = np.where(days > 0, (1 - phi**days) / ((1 - phi) * days), 1.0)
+        vol = np.sqrt(self.trading_days * (self.long_run_variance + excess * decay))
+        return vol.item() if vol.ndim == 0 else vol
+
+    def vol(self, K, T):
+        """
+        Volatility for an option struck at K maturing at T: the term volatility, the same for every strike.
+        """
+        K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+        return self.term_volatility(T)
+
+    def forward_volatility(self, t0, t1):
+        """
+        Annualized volatility over the forward period [t0, t1], such that the variance integrated over
+        [0, t1] equals that over [0, t0] plus the forward variance times (t1 - t0). Vectorized.
+        """
+        t0, t1 = np.asarray(t0, dtype=float), np.asarray(t1, dtype=float)
+        total = t1 * np.asarray(self.term_volatility(t1)) ** 2 - t0 * np.asarray(self.term_volatility(t0)) ** 2
+        vol = np.sqrt(np.maximum(total, 0) / (t1 - t0))
+        return vol.item() if vol.ndim == 0 else vol
+
+
+def _fit_column(args):
+    returns, model, trading_days = args
+    return GARCH.fit(returns, model, trading_days)
+
+
+def fit_many(returns, model='garch', trading_days=252, processes=None):
+    """
+    Fits one model per column of a (days, tickers) panel of daily log-returns.
+
+    Parameters:
+    ----------
+    returns : array-like
+        (days, tickers) log-returns; NaNs (e.g. before a listing) are dropped per ticker.
+    model : str, optional
+        'garch' (default) or 'gjr'.
+    trading_days : int, optional
+        Trading days per year (default is 252).
+    processes : int, optional
+        Number of worker processes. None uses one per CPU; 1 fits serially in this process.
+
+    Returns:
+    -------
+    list[GARCH]
+        One fitted model per ticker, in column order.
+    """
+    returns = np.asarray(returns, dtype=float)
+    returns = returns[:, None] if returns.ndim == 1 else returns
+    jobs = [(returns[:, k], model, trading_days) for k in range(returns.shape[1])]
+    if processes == 1:
+        return [_fit_column(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_fit_column, jobs, chunksize=max(1, len(jobs) // 64)))
@@ -1,12 +1,15 @@
 """Finding immplied volatility using option contract parameters and the market price of option by various two different root finding algorithms:
   - Newton-Raphson method
   - Brent's Method (Using the scipy.optimize module)
+Options on futures (Black-76) and normal-model (Bachelier) volatilities are inverted by the vectorized pricing kernel.
 """
 
 from scipy import optimize
 from ..models.Black_Scholes import BlackScholes
 import numpy as np
 from ..models.Binomial import Binomial
+from ..models.Black_76 import Black76
+from ..models.Bachelier import Bachelier
 
 def IV_NewRaph(S0,K,r,T,market_price,op_type='call',tol=0.00001):
     """
@@ -74,7 +77,8 @@ def IV_Brent(S0,K,r,T,market_price,op_type='call'):
       IV_Brent(250,245,0.06,30/365,0.65,op_type='put')    #IV for option of type "put"
     """
     def object_func(sigma):
-        model_price = BlackScholes(S0,K,sigma,r,T).price(op_type)
+        # unrounded price, so quotes with small vega still invert accurately
+        model_price = BlackScholes(S0,K,sigma,r,T).price(op_type, decimals=None)
         return model_price - market_price
     try:
         IV = optimize.brentq(object_func,-0.5,5.0)
@@ -130,3 +134,42 @@ def IV_Binomial_Bisection(S, K, r, T, market_price, option_type='call', N=100, t
             low_vol = mid_vol
 
     return None  # did not converge within max_iter
+
+
+def IV_Black76(F, K, r, T, market_price, op_type='call'):
+    """
+    Implied volatility of options on futures under the Black-76 model.
+
+    Usage:
+      IV_Black76(F, K, r, T, market_price, op_type='call')
+
+    Parameters:
+      - F : float or array - Futures (forward) price.
+      - K, r, T, market_price, op_type : as for IV_Brent; arrays are inverted together in one vectorized pass.
+
+    Returns:
+      - Implied volatility, or ```np.nan``` where the price violates the no-arbitrage bounds.
+
+    Example:
+      IV_Black76(100, 105, 0.03, 0.5, 3.2)
+    """
+    return Black76.implied_vol(market_price, F, K, r, T, op_type)
+
+def IV_Bachelier(F, K, r, T, market_price, op_type='call'):
+    """
+    Normal (Bachelier) implied volatility, in price units, from a closed-form approximation.
+
+    Usage:
+      IV_Bachelier(F, K, r, T, market_price, op_type='call')
+
+    Parameters:
+      - F : float or array - Forward price, which may be near or below zero.
+      - K, r, T, market_price, op_type : as for IV_Brent; arrays are inverted together.
+
+    Returns:
+      - Normal implied volatility, or ```np.nan``` where the price is below intrinsic value.
+
+    Example:
+      IV_Bachelier(0.02, 0.025, 0.03, 2.0, 0.0021)
+    """
+    return Bachelier.implied_vol(market_price, F, K, r, T, op_type)
@@ -0,0 +1,248 @@
+"""Loading OHLC price panels for volatility estimation.
+
+``MarketData`` holds prices as (days, tickers) float64 arrays, so every estimator in ``Volatility`` runs over
+thousands of tickers in one vectorized pass. It can be built from:
+  - CSV files, read in chunks with explicit column dtypes and an explicit date format, so neither pandas'
+    type inference nor its date-format guessing runs per row; each chunk is cut to the requested tickers and
+    dates before it is kept, so memory follows the selection rather than the file;
+  - Parquet files, reading only the needed columns (requires pyarrow or fastparquet);
+  - NumPy ``.npy`` files, memory-mapped so that only the rows actually used are read from disk.
+
+Files can be in wide form (one price column, one column per ticker) or long form (one row per date and
+ticker, with a ticker column and OHLC columns).
+"""
+
+import numpy as np
+import pandas as pd
+
+from .Volatility import ESTIMATORS
+
+FIELDS = ('open', 'high', 'low', 'close')
+
+
+class MarketData:
+    """
+    A panel of daily OHLC prices for one or more tickers.
+
+    Attributes:
+    ----------
+    dates : np.ndarray
+        Sorted trading dates of length `days`.
+    tickers : list[str]
+        Ticker names of length `tickers`.
+    open, high, low, close : np.ndarray or None
+        (days, tickers) price arrays; only `close` is required.
+    """
+
+    def __init__(self, dates, tickers, close, open=None, high=None, low=None):
+        self.dates = np.asarray(dates)
+        self.tickers = list(tickers)
+        self.close = np.asarray(close, dtype=float).reshape(len(self.dates), -1)
+        self.open = None if open is None else np.asarray(open, dtype=float).reshape(self.close.shape)
+        self.high = None if high is None else np.asarray(high, dtype=float).reshape(self.close.shape)
+        self.low = None if low is None else np.asarray(low, dtype=float).reshape(self.close.shape)
+
+        if self.close.shape[1] != len(self.tickers):
+            raise ValueError("number of tickers does not match the price columns")
+        if len(self.dates) < 3:
+            raise ValueError(f"Insufficient data to calculate volatility. Need at least 3 data points, but found {len(self.dates)}.")
+        if np.isnan(self.close).any():
+            raise ValueError("Close prices contain missing (NaN) values. Please clean the data.")
+
+    @staticmethod
+    def _resolve_columns(available, requested):
+        """
+        Maps requested column names to the file's columns case-insensitively.
+        """
+        col_map = {c.lower(): c for c in available}
+        resolved = {}
+        for name in requested:
+            if name.lower() not in col_map:
+                raise ValueError(f"Column '{name}' not found. Available columns: {list(available)}")
+            resolved[name] = col_map[name.lower()]
+        return resolved
+
+    @classmethod
+    def _from_frame(cls, frame, date_column, ticker_column, fields):
+        """
+        Builds a panel from a long or single-ticker frame whose columns are already resolved.
+        """
+        if ticker_column is None:
+            frame = frame.sort_values(date_column)
+            return cls(frame[date_column].to_numpy(), ['price'],
+                       **{field: frame[column].to_numpy() for field, column in fields.items()})
+
+        # Long form: pivot once into (dates, tickers) panels.
+        panels = {field: frame.pivot(index=date_column, columns=ticker_column, values=column)
+                  for field, column in fields.items()}
+        close = panels['close'].sort_index()
+        return cls(close.index.to_numpy(), [str(t) for t in close.columns],
+                   **{field: panel.reindex(index=close.index, columns=close.columns).to_numpy()
+                      for field, panel in panels.items()})
+
+    @classmethod
+    def from_csv(cls, path, date_column='Date', date_format='%Y-%m-%d', ticker_column=None,
+                 columns=None, chunksize=1_000_000, tickers=None, start=None, end=None):
+        """
+        Reads a CSV file of daily prices in chunks, keeping only the rows of the requested tickers and dates.
+
+        Parameters:
+        ----------
+        path : str
+            Path to the CSV file.
+        date_column : str, optional
+            Name of the date column (default is 'Date'). Column names match case-insensitively.
+        date_format : str, optional
+            strftime format of the dates (default is '%Y-%m-%d'). Pass None to let pandas infer it.
+        ticker_column : str, optional
+            Name of the ticker column for long-form files; omit for a single ticker.
+        columns : dict, optional
+            Mapping from 'open', 'high', 'low', 'close' to column names. Defaults to the capitalized field
+            names, keeping only those present; a close column is required.
+        chunksize : int, optional
+            Number of rows parsed per chunk (default is 1,000,000).
+        tickers : list[str], optional
+            Tickers to keep from a long-form file (default all).
+        start, end : str or datetime, optional
+            First and last dates to keep, inclusive (default the whole file).
+
+        Returns:
+        -------
+        MarketData
+        """
+        try:
+            header = pd.read_csv(path, nrows=0).columns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Error: The file at path '{path}' was not found.")
+
+        if columns is None:
+            lower = {c.lower() for c in header}
+            columns = {field: field.capitalize() for field in FIELDS if field in lower}
+        if 'close' not in columns:
+            raise ValueError(f"Close column not found. Available columns: {list(header)}")
+
+        keys = [date_column] + ([ticker_column] if ticker_column else []) + list(columns.values())
+        resolved = cls._resolve_columns(header, keys)
+        fields = {field: resolved[name] for field, name in columns.items()}
+        dtypes = {column: np.float64 for column in fields.values()}
+        if ticker_column:
+            dtypes[resolved[ticker_column]] = str
+
+        if tickers is not None and not ticker_column:
+            raise ValueError("tickers can only be selected from a long-form file (give ticker_column)")
+        date = resolved[date_column]
+        frames = []
+        for chunk in pd.read_csv(path, usecols=list(resolved.values()), dtype=dtypes, chunksize=chunksize):
+            try:
+                chunk[date] = pd.to_datetime(chunk[date], format=date_format)
+            except (ValueError, TypeError) as e:
+                raise TypeError(f"Could not parse date column '{date}' with format '{date_format}'. Error: {e}")
+            # Rows outside the selection are dropped before the chunk is kept
+            keep = np.ones(len(chunk), dtype=bool)
+            if start is not None:
+                keep &= (chunk[date] >= pd.Timestamp(start)).to_numpy()
+            if end is not None:
+                keep &= (chunk[date] <= pd.Timestamp(end)).to_numpy()
+            if tickers is not None:
+                keep &= chunk[resolved[ticker_column]].isin([str(t) for t in tickers]).to_numpy()
+            if not keep.all():
+                chunk = chunk[keep]
+            if ticker_column:
+                chunk[resolved[ticker_column]] = chunk[resolved[ticker_column]].astype('category')
+            frames.append(chunk)
+        if not frames:
+            raise ValueError(f"The file at path '{path}' holds no rows.")
+
+        frame = pd.concat(frames, ignore_index=True)
+        return cls._from_frame(frame, resolved[date_column], resolved.get(ticker_column), fields)
+
+    @classmethod
+    def from_parquet(cls, path, date_column='Date', ticker_column=None, columns=None):
+        """
+        Reads a Parquet file of daily prices, loading only the date, ticker and price columns.
+
+        Parameters are as for `from_csv`; dates are expected to be stored as timestamps.
+        """
+        columns = columns or {field: field.capitalize() for field in FIELDS}
+        keys = [date_column] + ([ticker_column] if ticker_column else []) + list(columns.values())
+        try:
+            frame = pd.read_parquet(path, columns=keys)
+        except ImportError:
+            raise ImportError("Reading Parquet files requires pyarrow or fastparquet to be installed.")
+        fields = {field: name for field, name in columns.items()}
+        return cls._from_frame(frame, date_column, ticker_column, fields)
+
+    @classmethod
+    def from_npy(cls, path, dates=None, tickers=None):
+        """
+        Memory-maps a NumPy file of prices.
+
+        The array is either (days, tickers) closing prices or (4, days, tickers) in open, high, low, close
+        order. Nothing is read until the prices are used.
+
+        Parameters:
+        ----------
+        path : str
+            Path to the .npy file.
+        dates : array-like, optional
+            Dates of the rows (defaults to 0, 1, 2, ...).
+        tickers : list[str], optional
+            Names of the columns (defaults to '0', '1', ...).
+        """
+        prices = np.load(path, mmap_mode='r')
+        if prices.ndim == 3:
+            open, high, low, close = prices
+        else:
+            open = high = low = None
+            close = prices.reshape(len(prices), -1)
+        dates = np.arange(close.shape[0]) if dates is None else dates
+        tickers = [str(i) for i in range(close.shape[1])] if tickers is None else tickers
+        data = cls.__new__(cls)
+        data.dates, data.tickers = np.asarray(dates), list(tickers)
+        data.open, data.high, data.low, data.close = open, high, low, close
+        return data
+
+    @property
+    def spot(self):
+        """
+        Latest close of each ticker.
+        """
+        return np.asarray(self.close[-1], dtype=float)
+
+    def volatility(self, method='close_to_close', window=None, trading_days=252, **kwargs):
+        """
+        Annualized historical volatility of every ticker.
+
+        Parameters:
+        ----------
+        method : str, optional
+            One of 'close_to_close' (default), 'parkinson', 'garman_klass', 'rogers_satchell', 'yang_zhang'
+            or 'ewma'.
+        window : int, optional
+            Rolling window in days; None (default) gives one full-sample estimate per ticker. Ignored by
+            'ewma', which is always a full time series.
+        trading_days : int, optional
+            Trading days per year (default is 252).
+        **kwargs
+            Extra estimator arguments, such as `lam` for 'ewma'.
+
+        Returns:
+        -------
+        np.ndarray
+            Volatility per ticker, or per day and ticker for rolling estimates.
+        """
+        if method not in ESTIMATORS:
+            raise ValueError(f"method must be one of {list(ESTIMATORS)}")
+
+        if method in ('close_to_close', 'ewma'):
+            prices = (self.close,)
+        elif method == 'parkinson':
+            prices = (self.high, self.low)
+        else:
+            prices = (self.open, self.high, self.low, self.close)
+        if any(p is None for p in prices):
+            raise ValueError(f"'{method}' needs open, high, low and close prices as applicable")
+
+        if method == 'ewma':
+            return ESTIMATORS[method](*prices, trading_days=trading_days, **kwargs)
+        return ESTIMATORS[method](*prices, window=window, trading_days=trading_days, **kwargs)
@@ -1,10 +1,11 @@
 
+import os
+
 import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-from options_pricer_European.models.Black_Scholes import BlackScholes
+from options_pricer_European.models.Kernel import greeks_batch
+
+COLUMNS = ['Stock Price', 'Option Type', 'T_days', 'Price', 'Delta', 'Gamma', 'Vega', 'Theta', 'Rho']
 
 class BSOptionsVisualizer:
     """
@@ -37,13 +38,31 @@ class BSOptionsVisualizer:
     
     ### Methods
 
+        - grid()
+            - computes price and Greeks on the whole (expiry, stock price, option type) grid in one broadcast pass
+            - Parameters:
+                - T_days_range : *array-type* - days to expiry.
+                - n_prices : *int, optional* - number of stock prices. Defaults to ```100```.
+                - S_range : *tuple, optional* - lowest and highest stock price as multiples of K. Defaults to ```(0.8, 1.2)```.
+            - Returns:
+                - days to expiry, stock prices and a dict of (days, prices, option types) arrays keyed by column name
+
         - generate_data()
             - returns a Pandas dataframe containing prices calculated for various option contracts
             - Parameters:
                 - T_days_range : *array-type* - a range like object that is used for choosing values of time of expiration.
                 - mode : *str, optional* - mode that specifies what to make the graph against. Accepts ```stock```or ```time```.
+                - n_prices, S_range : *optional* - grid resolution, as for ```grid()```.
             - Returns:
-                - a Pandas dataframe containing prices data for options dataframe
+                - a tidy Pandas dataframe, one row per (days to expiry, stock price, option type)
+
+        - export()
+            - writes the data of ```generate_data()``` to a Parquet (needs pyarrow or fastparquet) or JSON file without plotting
+            - Parameters:
+                - path : *str* - output file; the format follows its extension (```.parquet``` or ```.json```) unless ```format``` is given.
+                - T_days_range, mode, n_prices, S_range : *optional* - as for ```generate_data()```.
+            - Returns:
+                - the exported dataframe
 
         - visualize()
             - The visualize function generates visualizations of option pricing metrics (Greeks and price) against the underlying stock price. It offers two primary modes of operation: 'stock' for a static visualization at a single point in time, and 'time' for an animated visualization showing the evolution of the metrics as the time to expiration changes. The function relies on a self.generate_data method (assumed to exist within the class) to produce the necessary data for plotting.
@@ -53,6 +72,7 @@ class BSOptionsVisualizer:
                 - option_type: *str, optional* - The type of option to visualize. Defaults to ```call```. Valid values: ```call```, ```put```. This parameter is only used in    ```time``` mode.
                 - T_days_static: *int, optional* - The fixed number of days to expiry for the ```stock``` mode. Defaults to ```30```.
                 - T_days_range: *numpy.ndarray, optional* - A range of days to expiry for the ```time``` mode. Defaults to ```np.arange(7, 181, 7)```.
+                - n_prices: *int, optional* - Number of stock prices on the grid. Defaults to ```100```.
     """
     def __init__(self, K, r, sigma, option_types=('call', 'put')):
         self.K = K
@@ -60,36 +80,51 @@ class BSOptionsVisualizer:
         self.sigma = sigma
         self.option_types = option_types
 
-    def generate_data(self, T_days_range, mode='time'):
-        stock_prices = np.linspace(self.K * 0.8, self.K * 1.2, 100)
-        rows = []
-
-        for T_days in T_days_range:
-            T = T_days / 365
-            for S in stock_prices:
-                for opt_type in self.option_types:
-                    bs = BlackScholes(S, self.K, self.sigma, self.r, T)
-                    rows.append({
-                        'Stock Price': S,
-                        'Option Type': opt_type,
-                        'T_days': T_days,
-                        'Price': bs.price(opt_type),
-                        'Delta': bs.delta(opt_type),
-                        'Gamma': bs.gamma(),
-                        'Vega': bs.vega(),
-                        'Theta': bs.theta(opt_type),
-                        'Rho': bs.rho(opt_type)
-                    })
-            if mode == 'stock':
-                break  # Only use the first T_days for static plot
-        return pd.DataFrame(rows)
-
-    def visualize(self, mode='stock', y_metric='Delta', option_type='call', T_days_static=30, T_days_range=np.arange(7, 181, 7)):
+    def grid(self, T_days_range, n_prices=100, S_range=(0.8, 1.2)):
+        T_days = np.atleast_1d(np.asarray(T_days_range))
+        stock_prices = np.linspace(self.K * S_range[0], self.K * S_range[1], n_prices)
+        is_call = np.array([opt_type == 'call' for opt_type in self.option_types])
+        # (T, S, type) grid priced in one broadcast pass
+        greeks = greeks_batch('black_scholes', stock_prices[None, :, None], self.K, self.sigma, self.r,
+                              (T_days / 365)[:, None, None], is_call[None, None, :])
+        values = {name.capitalize(): greeks[name] for name in ('price', 'delta', 'gamma', 'vega', 'theta', 'rho')}
+        values['Price'] = np.round(values['Price'], 3)
+        return T_days, stock_prices, values
+
+    def generate_data(self, T_days_range, mode='time', n_prices=100, S_range=(0.8, 1.2)):
+        if mode == 'stock':
+            T_days_range = list(T_days_range)[:1]  # Only use the first T_days for static plot
+        T_days, stock_prices, values = self.grid(T_days_range, n_prices, S_range)
+        shape = (len(T_days), len(stock_prices), len(self.option_types))
+        index = np.indices(shape).reshape(3, -1)
+        data = {'Stock Price': stock_prices[index[1]], 'Option Type': np.asarray(self.option_types)[index[2]],
+                'T_days': T_days[index[0]]}
+        data.update((name, value.ravel()) for name, value in values.items())
+        return pd.DataFrame(data, columns=COLUMNS)
+
+    def export(self, path, T_days_range=np.arange(7, 181, 7), mode='time', n_prices=100, S_range=(0.8, 1.2),
+               format=None):
+        format = format or os.path.splitext(path)[1].lstrip('.').lower()
+        if format not in ('parquet', 'json'):
+            raise ValueError("Invalid format. Choose 'parquet' or 'json'.")
+        df = self.generate_data(T_days_range, mode, n_prices, S_range)
+        if format == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_json(path, orient='records')
+        return df
+
+    def visualize(self, mode='stock', y_metric='Delta', option_type='call', T_days_static=30, T_days_range=np.arange(7, 181, 7),
+                  n_prices=100):
         """
         mode: 'stock' (for static) or 'time' (for animation)
         y_metric: Greek or 'Price'
         option_type: 'call' or 'put'
+        n_prices: number of stock prices on the grid
         """
+        import plotly.express as px
+        import plotly.graph_objects as go
+
         if mode not in ['stock', 'time']:
             raise ValueError("Invalid mode. Choose 'stock' or 'time'.")
 
@@ -97,7 +132,7 @@ class BSOptionsVisualizer:
             raise ValueError("Invalid metric. Choose from Delta, Gamma, Vega, Theta, Rho, Price.")
 
         if mode == 'stock':
-            df = self.generate_data([T_days_static], mode='stock')
+            df = self.generate_data([T_days_static], mode='stock', n_prices=n_prices)
             fig = go.Figure()
 
             for opt_type in self.option_types:
@@ -118,7 +153,7 @@ class BSOptionsVisualizer:
             fig.show()
 
         elif mode == 'time':
-            df = self.generate_data(T_days_range, mode='time')
+            df = self.generate_data(T_days_range, mode='time', n_prices=n_prices)
             df = df[df['Option Type'] == option_type]
 
             fig = px.line(
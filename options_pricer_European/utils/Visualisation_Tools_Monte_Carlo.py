@@ -1,93 +1,192 @@
-#Visualisation tools for Greeks are not functioning.
+"""Visualisation of a Monte Carlo simulation.
+
+Every plot and data method of ``MC_Visualiser`` works from one simulation of the model, run on first use and
+kept (see ``simulation``), so a report of several figures simulates once. The Greeks over time come from the
+same paths: the simulated price at step i is the terminal price of the option maturing at t_i, so pathwise
+estimators give each Greek at every maturity on the grid. The data methods return plain arrays and ``export``
+writes them all to JSON, without matplotlib.
+"""
+
+import json
 
-import matplotlib.pyplot as plt
-from options_pricer_European.models.Monte_Carlo import MonteCarlo 
 import numpy as np
-from scipy import stats
-from options_pricer_European.utils.Greeks import delta, gamma, vega, theta
 
+from options_pricer_European.models.Cache import seeded
+from options_pricer_European.models.Kernel import norm
+from options_pricer_European.models.Monte_Carlo import MonteCarlo
+
+GREEKS = ('delta', 'gamma', 'vega', 'theta', 'rho')
 
 
 class MC_Visualiser:
-    def __init__(self, obj):        
-        self.mc=obj
+    def __init__(self, obj, seed=None, max_paths=100):
+        """
+        obj: MonteCarlo model to visualise
+        seed: seed of the simulation, for reproducible figures
+        max_paths: number of paths drawn by stock_graph
+        """
+        self.mc = obj
+        self.seed = seed
+        self.max_paths = max_paths
+        self._simulation = None
+
+    def _key(self):
+        # Everything the paths and payoffs depend on; curves and volatility models by identity
+        mc = self.mc
+        return (MonteCarlo.N, MonteCarlo.M, self.seed, mc.S, mc.K, mc.vol, mc.T, mc.option_type, mc.dtype,
+                id(mc.rates), id(mc.dividends), id(mc.vol_curve))
+
+    def simulation(self):
+        """
+        The simulation behind every figure: the (N+1, M) price paths, the discounted payoffs at maturity, and the
+        control-variate price and standard error of `simulate`. It is run again only when the model's inputs,
+        the seed or MonteCarlo.N and MonteCarlo.M have changed since the last figure.
+        """
+        key = self._key()
+        if self._simulation is None or self._simulation['key'] != key:
+            with seeded(self.seed):
+                ST, cv = self.mc.calculate_stock_price(self.seed)
+                C0, CT = self.mc.calculate_option_price(ST, cv)
+            SE = np.sqrt(np.sum((CT - C0)**2, dtype=np.float64) / (MonteCarlo.M - 1)) / np.sqrt(MonteCarlo.M)
+            sign = 1 if self.mc.option_type == 'call' else -1
+            payoffs = np.exp(-self.mc.r*self.mc.T) * np.maximum(0, sign*(ST[-1] - self.mc.K))
+            self._simulation = {'key': key, 'paths': ST, 'payoffs': payoffs, 'price': C0, 'SE': SE}
+        return self._simulation
+
+    def times(self):
+        return np.linspace(0, self.mc.T, MonteCarlo.N + 1)
+
+    def sample_paths(self, max_paths=None, max_points=500):
+        """
+        Evenly spaced paths and time points of the simulation, for plotting: (times, prices of shape
+        (points, paths)). The last time point is always kept.
+        """
+        paths = self.simulation()['paths']
+        max_paths = self.max_paths if max_paths is None else max_paths
+        columns = np.unique(np.linspace(0, paths.shape[1] - 1, min(max_paths, paths.shape[1])).astype(int))
+        rows = np.unique(np.linspace(0, paths.shape[0] - 1, min(max_points, paths.shape[0])).astype(int))
+        return self.times()[rows], np.asarray(paths[np.ix_(rows, columns)])
+
+    def path_percentiles(self, percentiles=(5, 25, 50, 75, 95)):
+        """
+        Percentiles of the simulated price at every time step, from all paths: shape (len(percentiles), N+1).
+        """
+        return np.percentile(self.simulation()['paths'], percentiles, axis=1)
+
+    def histogram_data(self, bins=12, percentiles=(5, 25, 50, 75, 95)):
+        """
+        Histogram of the discounted payoffs at maturity with their mean and percentiles.
+        """
+        payoffs = self.simulation()['payoffs']
+        counts, edges = np.histogram(payoffs, bins=bins)
+        return {'counts': counts, 'edges': edges, 'mean': float(payoffs.mean(dtype=np.float64)),
+                'percentiles': dict(zip(percentiles, np.percentile(payoffs, percentiles)))}
+
+    def greek_curves(self):
+        """
+        Price, its standard error and the Greeks of the option for each maturity t_i on the time grid (i >= 1),
+        estimated from the simulated paths in the conventions of `BlackScholes` (vega and rho per 1%, theta per
+        calendar day). Delta, vega, theta and rho are pathwise estimators; gamma, whose payoff derivative has a
+        kink, uses the likelihood-ratio form of the pathwise delta. Rate and volatility are the model's, flat, so
+        a model with a volatility term structure (e.g. GARCH forward volatilities) is refused.
+        """
+        if self.mc.vol_curve is not None:
+            raise ValueError("pathwise Greeks need a flat volatility, not a volatility term structure")
+        simulation = self.simulation()
+        if 'greeks' in simulation:
+            return simulation['greeks']
+        mc = self.mc
+        paths = simulation['paths']
+        t = self.times()[1:, None]
+        S0, K, r, vol = mc.S0, mc.K, mc.r, mc.vol
+        # Carry to each t_i, from the per-step growth factors used to simulate
+        carry = np.cumsum(np.broadcast_to(np.log(np.ravel(mc.erdt)), (MonteCarlo.N,)))[:, None]
+        drift = carry - 0.5*vol**2*t
+
+        ST = paths[1:].astype(np.float64)
+        sign = 1 if mc.option_type == 'call' else -1
+        itm = sign*(ST - K) > 0
+        discount = np.exp(-r*t[:, 0])
+        log_return = np.log(ST/S0)
+        z = (log_return - drift) / (vol*np.sqrt(t))
+
+        payoff = np.maximum(0, sign*(ST - K))
+        price = discount*payoff.mean(axis=1)
+        dpayoff = sign*itm*ST           # f'(S_T) S_T: every pathwise derivative below is a multiple of it
+        mean = lambda x: (dpayoff*x).mean(axis=1)
+        simulation['greeks'] = curves = {
+            'time': t[:, 0],
+            'price': price,
+            'SE': discount*payoff.std(axis=1, ddof=1)/np.sqrt(payoff.shape[1]),
+            'delta': discount*mean(1/S0),
+            'gamma': discount*mean((z/(vol*np.sqrt(t)) - 1)/S0**2),
+            'vega': discount*mean((log_return - drift)/vol - vol*t)/100,
+            'theta': -(-r*price + discount*mean(drift/t + (log_return - drift)/(2*t))) / 365,
+            'rho': (-t[:, 0]*price + discount*mean(t))/100,
+        }
+        return curves
+
+    def report(self, bins=12, percentiles=(5, 25, 50, 75, 95), max_paths=None, max_points=500):
+        """
+        All the data behind the figures, without rendering: the price and standard error, the Greek curves
+        (None under a volatility term structure), the path percentiles, sampled paths and the payoff histogram.
+        """
+        simulation = self.simulation()
+        times, paths = self.sample_paths(max_paths, max_points)
+        return {
+            'price': float(simulation['price']), 'SE': float(simulation['SE']),
+            'greeks': None if self.mc.vol_curve is not None else self.greek_curves(),
+            'path_percentiles': {'time': self.times(), 'percentiles': list(percentiles),
+                                 'values': self.path_percentiles(percentiles)},
+            'paths': {'time': times, 'values': paths},
+            'histogram': self.histogram_data(bins, percentiles),
+        }
+
+    def export(self, path, **options):
+        """
+        Writes `report(**options)` to a JSON file.
+        """
+        def plain(value):
+            if isinstance(value, dict):
+                return {str(key): plain(item) for key, item in value.items()}
+            if isinstance(value, (np.ndarray, np.generic)):
+                return value.tolist()
+            return value
+
+        with open(path, 'w') as handle:
+            json.dump(plain(self.report(**options)), handle)
 
     def visualise_greeks(self,type):
-        stock_data= (np.exp(self.mc.calculate_stock_price()[0]) + np.exp(self.mc.calculate_stock_price()[1]))*0.5
-        payoffs=np.maximum(0,(stock_data-self.mc.K))   #Payoff matrix
-        option_prices=[np.exp(-self.mc.r*(MonteCarlo.N - i)*self.mc.T/MonteCarlo.N)*payoffs[i,:] 
-                       for i in range(MonteCarlo.N+1)][-1]  #Option price matrix obtained from simulations
-        k=0
-        risk_metric_values=[]
-        match type:
-            case 'delta':
-                for p in option_prices:
-                    temp_obj=MonteCarlo(p, self.mc.K, self.mc.vol, self.mc.r, 
-                                        (MonteCarlo.N-k)*self.mc.T/MonteCarlo.N, self.mc.option_type)
-                    risk_metric_values.append(delta('MC',temp_obj))
-                    k+=1
-
-                plt.plot(risk_metric_values)
-                plt.ylabel('Delta')
-                plt.xlabel('Time Steps')
-                plt.title('Variation of Delta')
-        
-            case 'gamma':
-                for p in option_prices:
-                    temp_obj=MonteCarlo(p, self.mc.K, self.mc.vol, self.mc.r, 
-                                        (MonteCarlo.N-k)*self.mc.T/MonteCarlo.N, self.mc.option_type)
-                    risk_metric_values.append(delta('MC',temp_obj))
-                    k+=1
-
-                plt.plot(risk_metric_values)
-                plt.ylabel('Gamma')
-                plt.xlabel('Time Steps')
-                plt.title('Variation of Gamma')
-
-            case 'theta':
-                for p in option_prices:
-                    temp_obj=MonteCarlo(p, self.mc.K, self.mc.vol, self.mc.r, 
-                                        (MonteCarlo.N-k)*self.mc.T/MonteCarlo.N, self.mc.option_type)
-                    risk_metric_values.append(delta('MC',temp_obj))
-                    k+=1
-
-                plt.plot(risk_metric_values)
-                plt.ylabel('Theta')
-                plt.xlabel('Time Steps')
-                plt.title('Variation of Theta')
-
-            case 'vega':
-                for p in option_prices:
-                    temp_obj=MonteCarlo(p, self.mc.K, self.mc.vol, self.mc.r, 
-                                        (MonteCarlo.N-k)*self.mc.T/MonteCarlo.N, self.mc.option_type)
-                    risk_metric_values.append(delta('MC',temp_obj))
-                    k+=1
-                
-                plt.plot(risk_metric_values)
-                plt.ylabel('Vega')
-                plt.xlabel('Time Steps')
-                plt.title('Variation of Vega')
-
-
+        import matplotlib.pyplot as plt
+
+        if type not in GREEKS:
+            raise ValueError(f"Invalid Greek. Choose from {', '.join(GREEKS)}.")
+        curves = self.greek_curves()
+        plt.plot(curves['time'], curves[type])
+        plt.ylabel(type.capitalize())
+        plt.xlabel('Time to Maturity (years)')
+        plt.title(f'Variation of {type.capitalize()}')
         plt.show()
 
 
     """
-    The function below helps the user understand the accuracy of the simulation against a test input (where 
+    The function below helps the user understand the accuracy of the simulation against a test input (where
     market price is already known).
     """
 
     def probability_distribution(self, market_value):
-        C0=self.mc.simulate()[0]
-        SE=self.mc.simulate()[1]
+        import matplotlib.pyplot as plt
+
+        simulation = self.simulation()
+        C0, SE = simulation['price'], simulation['SE']
 
         x1 = np.linspace(C0-3*SE, C0-1*SE, 100)
         x2 = np.linspace(C0-1*SE, C0+1*SE, 100)
         x3 = np.linspace(C0+1*SE, C0+3*SE, 100)
 
-        s1 = stats.norm.pdf(x1, C0, SE)
-        s2 = stats.norm.pdf(x2, C0, SE)
-        s3 = stats.norm.pdf(x3, C0, SE)
+        s1 = norm.pdf((x1 - C0)/SE)/SE
+        s2 = norm.pdf((x2 - C0)/SE)/SE
+        s3 = norm.pdf((x3 - C0)/SE)/SE
 
         plt.fill_between(x1, s1, color='tab:blue',label='> StDev')
         plt.fill_between(x2, s2, color='cornflowerblue',label='1 StDev')
@@ -103,36 +202,43 @@ class MC_Visualiser:
         plt.legend()
         plt.show()
 
-    def histogram(self):
-        C0=self.mc.simulate()[0]
-        SE=self.mc.simulate()[1]
-        payoffs=np.maximum(0,(np.exp(self.mc.calculate_stock_price())-self.mc.K))   #Payoff matrix
-        option_prices=[np.exp(-self.mc.r*(MonteCarlo.N - i)*self.mc.T/MonteCarlo.N)*payoffs[i,:] 
-                       for i in range(MonteCarlo.N+1)][-1]  #Option price matrix obtained from simulations
-        # print(C0)
-        # print(payoffs)
-        # print(f"\n{option_prices}")
-        plt.hist(option_prices, bins=12, edgecolor='black')
+    def histogram(self, bins=12, percentiles=(5, 50, 95)):
+        import matplotlib.pyplot as plt
+
+        data = self.histogram_data(bins, percentiles)
+        plt.stairs(data['counts'], data['edges'], fill=True, edgecolor='black')
+        plt.axvline(data['mean'], color='k', label=f"Mean {data['mean']:.4f}")
+        for q, value in data['percentiles'].items():
+            plt.axvline(value, color='r', linestyle='--', alpha=0.6)
+            plt.annotate(f'{q}%', (value, data['counts'].max()), rotation=90, va='top', ha='right')
+        plt.ylabel('Paths')
+        plt.xlabel('Discounted Payoff')
+        plt.title('Distribution of simulated option prices')
+        plt.legend()
         plt.show()
 
-    def stock_graph(self):
-        stock_data= (np.exp(self.mc.calculate_stock_price()[0]) + np.exp(self.mc.calculate_stock_price()[1]))*0.5     #Predicted stock price matrix
-        plt.plot(stock_data)
+    def stock_graph(self, max_paths=None):
+        import matplotlib.pyplot as plt
+
+        times, paths = self.sample_paths(max_paths)
+        band = self.path_percentiles((5, 50, 95))
+        plt.plot(times, paths, linewidth=0.5, alpha=0.5)
+        plt.fill_between(self.times(), band[0], band[2], color='grey', alpha=0.3, label='5-95%')
+        plt.plot(self.times(), band[1], 'k', label='Median')
         plt.ylabel('Stock Price')
-        plt.xlabel('Time Steps')
+        plt.xlabel('Time (years)')
         plt.title('MC simulation of a stock price')
+        plt.legend()
         plt.show()
 
     def option_price_graph(self):
-        stock_data= (np.exp(self.mc.calculate_stock_price()[0]) + np.exp(self.mc.calculate_stock_price()[1]))*0.5
-        payoffs=np.maximum(0,(stock_data-self.mc.K))   #Payoff matrix
-        option_prices=[np.exp(-self.mc.r*(MonteCarlo.N - i)*self.mc.T/MonteCarlo.N)*payoffs[i,:] 
-                       for i in range(MonteCarlo.N+1)]      #option price matrix obtained from simulations
-        plt.plot(option_prices)
+        import matplotlib.pyplot as plt
+
+        curves = self.greek_curves()
+        plt.plot(curves['time'], curves['price'])
+        plt.fill_between(curves['time'], curves['price'] - 2*curves['SE'], curves['price'] + 2*curves['SE'],
+                         alpha=0.3)
         plt.ylabel('Option Premium')
-        plt.xlabel('Time Steps')
+        plt.xlabel('Time to Maturity (years)')
         plt.title('MC simulation of an option premium')
         plt.show()
-
-
-
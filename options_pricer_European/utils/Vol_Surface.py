@@ -0,0 +1,216 @@
+"""Implied volatility surface fitted to option quotes.
+
+Each expiry's smile is a raw SVI slice in forward log-moneyness k = ln(K / F(T)),
+
+    w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + s^2)),
+
+where w = sigma_imp^2 * T is the total implied variance. Slices are fitted either independently ('svi') or
+jointly as an SSVI surface ('ssvi', Gatheral and Jacquier, 2014), which is converted to the same raw SVI
+parameters. Between expiries the total variance is interpolated linearly in T at fixed k, which keeps the
+surface free of calendar arbitrage whenever the fitted slices do not cross.
+
+The fitted parameters are kept as one (expiries, 5) array, so ``vol(K, T)`` over arrays of any shape is a
+``searchsorted`` plus two gathered SVI evaluations: no fitting or Python loop happens at lookup time.
+
+A ``VolSurface`` can be passed as ``sigma`` (or ``vol``) to ``BlackScholes``, ``Binomial``, ``MonteCarlo``,
+the strategy functions and ``Portfolio``, which all look up ``vol(K, T)`` for their strikes and maturities.
+"""
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from .IV import IV_Brent
+
+
+def _svi(params, k):
+    """
+    Raw SVI total variance for parameters of shape (..., 5) broadcast against k.
+    """
+    a, b, rho, m, s = np.moveaxis(params, -1, 0)
+    x = k - m
+    return a + b * (rho * x + np.sqrt(x * x + s * s))
+
+
+def _svi_derivatives(params, k):
+    """
+    Total variance and its first and second derivatives in k.
+    """
+    a, b, rho, m, s = np.moveaxis(params, -1, 0)
+    x = k - m
+    root = np.sqrt(x * x + s * s)
+    return a + b * (rho * x + root), b * (rho + x / root), b * s * s / root**3
+
+
+def _ssvi_to_svi(theta, rho, eta, gamma):
+    """
+    Raw SVI parameters of SSVI slices with ATM total variances theta and a power-law phi(theta).
+    """
+    phi = eta / (theta**gamma * (1 + theta) ** (1 - gamma))
+    return np.column_stack((0.5 * theta * (1 - rho**2), 0.5 * theta * phi, np.full_like(theta, rho),
+                            -rho / phi, np.sqrt(1 - rho**2) / phi))
+
+
+class VolSurface:
+    """
+    An implied volatility surface made of SVI slices at a set of expiries.
+
+    Attributes:
+    ----------
+    S : float
+        Spot price of the underlying.
+    r : float
+        Risk-free rate used for the forwards F(T) = S exp(rT).
+    expiries : np.ndarray
+        Sorted slice maturities in years.
+    params : np.ndarray
+        (expiries, 5) raw SVI parameters (a, b, rho, m, s) of each slice.
+    """
+
+    def __init__(self, S, r, expiries, params):
+        expiries = np.asarray(expiries, dtype=float)
+        params = np.asarray(params, dtype=float).reshape(len(expiries), 5)
+        order = np.argsort(expiries)
+        self.S = S
+        self.r = r
+        self.expiries = expiries[order]
+        self.params = params[order]
+        if np.any(self.expiries <= 0):
+            raise ValueError("expiries must be positive")
+
+    @classmethod
+    def from_quotes(cls, S, r, K, T, iv, model='svi'):
+        """
+        Fits a surface to implied volatilities, e.g. the output of the IV solvers.
+
+        Parameters:
+        ----------
+        S : float
+            Spot price of the underlying.
+        r : float
+            Risk-free rate (annualized, as a decimal).
+        K, T, iv : array-like
+            Strike, maturity and implied volatility of each quote. Quotes sharing a maturity form one slice.
+        model : str, optional
+            'svi' (default) fits each slice independently, which needs at least 5 quotes per expiry; 'ssvi'
+            fits one three-parameter surface through the at-the-money variances of all slices.
+
+        Returns:
+        -------
+        VolSurface
+        """
+        K, T, iv = (np.ravel(np.asarray(x, dtype=float)) for x in (K, T, iv))
+        K, T, iv = np.broadcast_arrays(K, T, iv)
+        valid = np.isfinite(iv) & (iv > 0)
+        K, T, iv = K[valid], T[valid], iv[valid]
+        k = np.log(K / (S * np.exp(r * T)))
+        w = iv**2 * T
+        expiries = np.unique(T)
+
+        if model == 'svi':
+            params = [cls._fit_svi_slice(k[T == t], w[T == t]) for t in expiries]
+        elif model == 'ssvi':
+            params = cls._fit_ssvi(k, w, T, expiries)
+        else:
+            raise ValueError("model must be 'svi' or 'ssvi'")
+        return cls(S, r, expiries, params)
+
+    @classmethod
+    def from_prices(cls, S, r, K, T, prices, option_type='call', model='svi'):
+        """
+        Inverts option prices with `IV_Brent` and fits a surface to the resulting implied volatilities.
+
+        Quotes whose implied volatility cannot be found are dropped. Other parameters are as for `from_quotes`.
+        """
+        K, T, prices, option_type = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float),
+                                                        np.asarray(prices, dtype=float), np.asarray(option_type))
+        iv = [IV_Brent(S, k, r, t, p, op_type=o) for k, t, p, o in zip(K.ravel(), T.ravel(), prices.ravel(), option_type.ravel())]
+        return cls.from_quotes(S, r, K, T, iv, model)
+
+    @staticmethod
+    def _fit_svi_slice(k, w):
+        if len(k) < 5:
+            raise ValueError("an SVI slice needs at least 5 quotes; use model='ssvi' for sparse expiries")
+        span = k.max() - k.min()
+        start = [w.min(), 0.1, -0.5, 0.0, 0.1]
+        lower = [0.0, 0.0, -0.999, k.min() - span, 1e-4]
+        upper = [w.max(), 10.0, 0.999, k.max() + span, 10.0]
+        fit = least_squares(lambda p: _svi(p, k) - w, np.clip(start, lower, upper), bounds=(lower, upper))
+        return fit.x
+
+    @staticmethod
+    def _fit_ssvi(k, w, T, expiries):
+        # ATM total variance of each slice, made non-decreasing so the surface has no calendar arbitrage
+        theta = np.empty(len(expiries))
+        for i, t in enumerate(expiries):
+            order = np.argsort(k[T == t])
+            theta[i] = np.interp(0.0, k[T == t][order], w[T == t][order])
+        theta = np.maximum.accumulate(np.maximum(theta, 1e-8))
+        slice_index = np.searchsorted(expiries, T)
+
+        def residuals(x):
+            return _svi(_ssvi_to_svi(theta, *x)[slice_index], k) - w
+
+        fit = least_squares(residuals, [-0.3, 1.0, 0.5], bounds=([-0.999, 1e-4, 1e-4], [0.999, 4.0, 0.5]))
+        return _ssvi_to_svi(theta, *fit.x)
+
+    def forward(self, T):
+        return self.S * np.exp(self.r * np.asarray(T, dtype=float))
+
+    def total_variance(self, k, T):
+        """
+        Total implied variance w(k, T) at forward log-moneyness k, vectorized over k and T.
+
+        Between expiries w is linear in T at fixed k; before the first and after the last expiry the implied
+        volatility of the nearest slice is held constant.
+        """
+        k, T = np.broadcast_arrays(np.asarray(k, dtype=float), np.asarray(T, dtype=float))
+        E, n = self.expiries, len(self.expiries)
+        lo = np.clip(np.searchsorted(E, T, side='right') - 1, 0, n - 1)
+        hi = np.minimum(lo + 1, n - 1)
+        w_lo, w_hi = _svi(self.params[lo], k), _svi(self.params[hi], k)
+
+        span = np.where(hi > lo, E[hi] - E[lo], 1.0)
+        w = w_lo + (T - E[lo]) / span * (w_hi - w_lo)
+        w = np.where(T < E[0], w_lo * T / E[0], w)
+        return np.where(T >= E[-1], w_hi * T / E[-1], w)
+
+    def vol(self, K, T):
+        """
+        Implied volatility at strikes K and maturities T, which broadcast against each other.
+        """
+        K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+        # At T = 0 the short-end volatility of the first slice is returned.
+        safe_T = np.where(T > 0, T, np.minimum(self.expiries[0], 1e-8))
+        w = self.total_variance(np.log(K / self.forward(safe_T)), safe_T)
+        vol = np.sqrt(np.maximum(w, 0) / safe_T)
+        return vol.item() if vol.ndim == 0 else vol
+
+    def check_arbitrage(self, k=None):
+        """
+        Checks the fitted slices for static arbitrage on a grid of log-moneyness.
+
+        Calendar: total variance must not decrease from one expiry to the next at any k.
+        Butterfly: Durrleman's density condition
+        g(k) = (1 - k w'/(2w))^2 - w'^2/4 (1/w + 1/4) + w''/2 >= 0 must hold on every slice.
+
+        Parameters:
+        ----------
+        k : array-like, optional
+            Log-moneyness grid (default is 201 points on [-1.5, 1.5]).
+
+        Returns:
+        -------
+        dict
+            'calendar': minimum of w_{i+1} - w_i for each adjacent pair of expiries,
+            'butterfly': minimum of g for each expiry,
+            'arbitrage_free': True if every minimum is non-negative.
+        """
+        k = np.linspace(-1.5, 1.5, 201) if k is None else np.asarray(k, dtype=float)
+        w, dw, d2w = _svi_derivatives(self.params[:, None, :], k)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            g = (1 - k * dw / (2 * w)) ** 2 - dw**2 / 4 * (1 / w + 0.25) + d2w / 2
+        g = np.where(w > 0, g, -np.inf)
+        calendar = np.diff(w, axis=0).min(axis=1) if len(w) > 1 else np.array([])
+        butterfly = g.min(axis=1)
+        return {'calendar': calendar, 'butterfly': butterfly,
+                'arbitrage_free': bool(np.all(calendar >= -1e-12) and np.all(butterfly >= -1e-12))}
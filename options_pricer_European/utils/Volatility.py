@@ -0,0 +1,148 @@
+"""Historical volatility estimators on price panels.
+
+Every estimator takes 2-D arrays of shape (days, tickers), oldest first, and works on all tickers at once. With
+``window=None`` a single full-sample estimate per ticker is returned; with an integer window the estimate is
+rolling, computed from cumulative sums in O(days) regardless of the window length, and the first rows without a
+full window are NaN. All results are annualized with ``trading_days``.
+
+Estimators:
+  - close_to_close : standard deviation of log close-to-close returns.
+  - parkinson : high-low range estimator (Parkinson, 1980).
+  - garman_klass : open-high-low-close estimator (Garman and Klass, 1980).
+  - rogers_satchell : drift-independent OHLC estimator (Rogers and Satchell, 1991).
+  - yang_zhang : combines overnight, open-to-close and Rogers-Satchell variances (Yang and Zhang, 2000).
+  - ewma : exponentially weighted moving average volatility (RiskMetrics).
+"""
+
+import numpy as np
+from scipy.signal import lfilter
+
+
+def _panel(x):
+    x = np.asarray(x, dtype=float)
+    return x[:, None] if x.ndim == 1 else x
+
+
+def _rolling_mean(x, window):
+    """
+    Mean over the trailing `window` rows (or all rows when window is None).
+    """
+    if window is None:
+        return x.mean(axis=0)
+    if window > len(x):
+        raise ValueError("window is longer than the price history")
+    cumulative = np.cumsum(np.vstack([np.zeros((1, x.shape[1])), x]), axis=0)
+    means = np.full(x.shape, np.nan)
+    means[window - 1:] = (cumulative[window:] - cumulative[:-window]) / window
+    return means
+
+
+def _rolling_var(x, window):
+    """
+    Sample variance (ddof=1) over the trailing `window` rows (or all rows when window is None).
+    """
+    if window is None:
+        return x.var(axis=0, ddof=1)
+    # Centering on the full-sample mean keeps the sum-of-squares formula numerically stable.
+    x = x - np.nanmean(x, axis=0)
+    n = window
+    return np.maximum(_rolling_mean(x**2, window) - _rolling_mean(x, window) ** 2, 0) * n / (n - 1)
+
+
+def _annualize(variance, trading_days):
+    return np.sqrt(variance * trading_days)
+
+
+def close_to_close(close, window=None, trading_days=252):
+    """
+    Close-to-close volatility: the standard deviation of daily log-returns.
+
+    Returns:
+    -------
+    np.ndarray
+        Annualized volatility per ticker, or per day and ticker for a rolling window (aligned with the
+        returns, i.e. one row shorter than `close`).
+    """
+    returns = np.diff(np.log(_panel(close)), axis=0)
+    return _annualize(_rolling_var(returns, window), trading_days)
+
+
+def parkinson(high, low, window=None, trading_days=252):
+    """
+    Parkinson range volatility: sigma^2 = mean(ln(H/L)^2) / (4 ln 2).
+    """
+    range_sq = np.log(_panel(high) / _panel(low)) ** 2
+    return _annualize(_rolling_mean(range_sq, window) / (4 * np.log(2)), trading_days)
+
+
+def garman_klass(open, high, low, close, window=None, trading_days=252):
+    """
+    Garman-Klass volatility: sigma^2 = mean(0.5 ln(H/L)^2 - (2 ln 2 - 1) ln(C/O)^2).
+    """
+    hl = np.log(_panel(high) / _panel(low))
+    co = np.log(_panel(close) / _panel(open))
+    daily = 0.5 * hl**2 - (2 * np.log(2) - 1) * co**2
+    return _annualize(_rolling_mean(daily, window), trading_days)
+
+
+def _rogers_satchell_daily(open, high, low, close):
+    open, high, low, close = (_panel(x) for x in (open, high, low, close))
+    return np.log(high / close) * np.log(high / open) + np.log(low / close) * np.log(low / open)
+
+
+def rogers_satchell(open, high, low, close, window=None, trading_days=252):
+    """
+    Rogers-Satchell volatility: sigma^2 = mean(ln(H/C) ln(H/O) + ln(L/C) ln(L/O)), unbiased under drift.
+    """
+    daily = _rogers_satchell_daily(open, high, low, close)
+    return _annualize(_rolling_mean(daily, window), trading_days)
+
+
+def yang_zhang(open, high, low, close, window=None, trading_days=252):
+    """
+    Yang-Zhang volatility: sigma^2 = var(overnight) + k var(open-to-close) + (1 - k) RS,
+    with k = 0.34 / (1.34 + (n + 1) / (n - 1)).
+
+    The first day has no previous close, so results are aligned with days 1, 2, ... like close_to_close.
+    """
+    open, high, low, close = (_panel(x) for x in (open, high, low, close))
+    overnight = np.log(open[1:] / close[:-1])
+    open_close = np.log(close[1:] / open[1:])
+    rs = _rogers_satchell_daily(open[1:], high[1:], low[1:], close[1:])
+
+    n = len(overnight) if window is None else window
+    if n < 2:
+        raise ValueError("Yang-Zhang needs at least two observations per estimate")
+    k = 0.34 / (1.34 + (n + 1) / (n - 1))
+    variance = _rolling_var(overnight, window) + k * _rolling_var(open_close, window) + (1 - k) * _rolling_mean(rs, window)
+    return _annualize(variance, trading_days)
+
+
+def ewma(close, lam=0.94, trading_days=252):
+    """
+    Exponentially weighted moving average volatility, sigma^2_t = lam sigma^2_{t-1} + (1 - lam) r^2_t.
+
+    The recursion runs as a linear filter along the time axis for all tickers at once and is seeded with
+    the first squared return.
+
+    Returns:
+    -------
+    np.ndarray
+        Annualized volatility per day and ticker, aligned with the returns.
+    """
+    if not 0 < lam < 1:
+        raise ValueError("lam must be between 0 and 1")
+    returns_sq = np.diff(np.log(_panel(close)), axis=0) ** 2
+    initial = lam * returns_sq[:1]
+    variance, _ = lfilter([1 - lam], [1, -lam], returns_sq, axis=0, zi=initial)
+    return _annualize(variance, trading_days)
+
+
+ESTIMATORS = {
+    'close_to_close': close_to_close,
+    'parkinson': parkinson,
+    'garman_klass': garman_klass,
+    'rogers_satchell': rogers_satchell,
+    'yang_zhang': yang_zhang,
+    'ewma': ewma,
+}
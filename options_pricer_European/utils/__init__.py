@@ -1,9 +1,38 @@
-from .Greeks import delta, gamma, theta, vega
-from .Visualisation_Tools_Black_Scholes import BSOptionsVisualizer
-from .Visualisation_Tools_Monte_Carlo import MC_Visualiser
-from .strategies import Bull_Call_Spread, Bull_Put_Spread, Bear_Call_Spread, Bear_Put_Spread, Collar, Straddle, Strangle
-from .IV import IV_NewRaph, IV_Brent, IV_Binomial_Bisection
-
-__all__ = ['delta', 'gamma', 'theta', 'vega', 'Bull_Call_Spread', 'Bull_Put_Spread', 'Bear_Call_Spread', 'Bear_Put_Spread', 
-           'Collar', 'Straddle', 'Strangle', 'BSOptionsVisualizer', 'MC_Visualiser', 'IV_NewRaph', 'IV_Brent', 
-           'IV_Binomial_Bisection']
+"""Greeks, implied volatility, strategies, market data, volatility models and visualisation tools.
+
+Names are imported from their submodule on first access (PEP 562), so importing this package costs nothing
+until a tool is used: the visualisers pull in matplotlib or plotly, MarketData pandas and IV scipy.optimize.
+GARCH is imported eagerly because its name is also its submodule's, which a direct import of
+``options_pricer_European.utils.GARCH`` would otherwise bind here; it defers scipy to its first fit.
+"""
+
+import importlib
+
+from .GARCH import GARCH, fit_many
+
+_SUBMODULES = {
+    'delta': 'Greeks', 'gamma': 'Greeks', 'theta': 'Greeks', 'vega': 'Greeks',
+    'BSOptionsVisualizer': 'Visualisation_Tools_Black_Scholes',
+    'MC_Visualiser': 'Visualisation_Tools_Monte_Carlo',
+    'Bull_Call_Spread': 'strategies', 'Bull_Put_Spread': 'strategies', 'Bear_Call_Spread': 'strategies',
+    'Bear_Put_Spread': 'strategies', 'Collar': 'strategies', 'Straddle': 'strategies', 'Strangle': 'strategies',
+    'IV_NewRaph': 'IV', 'IV_Brent': 'IV', 'IV_Binomial_Bisection': 'IV', 'IV_Black76': 'IV', 'IV_Bachelier': 'IV',
+    'MarketData': 'Market_Data',
+    'VolSurface': 'Vol_Surface',
+}
+
+__all__ = ['delta', 'gamma', 'theta', 'vega', 'Bull_Call_Spread', 'Bull_Put_Spread', 'Bear_Call_Spread', 'Bear_Put_Spread',
+           'Collar', 'Straddle', 'Strangle', 'BSOptionsVisualizer', 'MC_Visualiser', 'IV_NewRaph', 'IV_Brent',
+           'IV_Binomial_Bisection', 'IV_Black76', 'IV_Bachelier', 'MarketData', 'GARCH', 'fit_many', 'VolSurface']
+
+
+def __getattr__(name):
+    if name not in _SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_SUBMODULES[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
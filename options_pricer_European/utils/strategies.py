@@ -7,6 +7,7 @@ from ..models.Binomial import Binomial
 
 #Classic Option Strategies
 #Functions that return PnL graphs based on option premium prices calculated using model chosen by user - BS, BIN, MC
+#sigma may be a single volatility or a VolSurface, in which case each leg is priced at its own strike's volatility
 
 #Bull Spreads
 """Bull Call Spread - buy a call at a strike price K1, and sell a put at a higher strike price K2
@@ -0,0 +1,105 @@
+import numpy as np
+
+from options_pricer_European.models.Kernel import norm
+
+
+class BarrierAnalytic:
+    """
+    Closed-form prices of continuously monitored single barrier options (Reiner-Rubinstein).
+
+    All inputs may be numpy arrays of a common shape, so a whole book of barriers is priced in one
+    vectorized call. Knock-in options are priced directly and knock-out options through in-out
+    parity (knock-in + knock-out = vanilla).
+    """
+
+    BARRIER_TYPES = ('down-and-in', 'down-and-out', 'up-and-in', 'up-and-out')
+
+    def __init__(self, S, K, H, sigma, r, T, option_type, barrier_type):
+        """
+        Initializes the barrier pricer.
+
+        Parameters:
+        ----------
+        S : float or np.ndarray
+            Current stock price.
+        K : float or np.ndarray
+            Strike price.
+        H : float or np.ndarray
+            Barrier level.
+        sigma : float or np.ndarray
+            Annualized volatility.
+        r : float or np.ndarray
+            Annualized risk-free interest rate.
+        T : float or np.ndarray
+            Time to maturity in years.
+        option_type : str
+            'call' or 'put'.
+        barrier_type : str
+            One of 'down-and-in', 'down-and-out', 'up-and-in', 'up-and-out'.
+        """
+        if option_type not in ('call', 'put'):
+            raise ValueError("option_type must be 'call' or 'put'")
+        if barrier_type not in BarrierAnalytic.BARRIER_TYPES:
+            raise ValueError(f"barrier_type must be one of {BarrierAnalytic.BARRIER_TYPES}")
+
+        self.S = np.asarray(S, dtype=float)
+        self.K = np.asarray(K, dtype=float)
+        self.H = np.asarray(H, dtype=float)
+        self.sigma = np.asarray(sigma, dtype=float)
+        self.r = np.asarray(r, dtype=float)
+        self.T = np.asarray(T, dtype=float)
+        self.option_type = option_type
+        self.barrier_type = barrier_type
+
+    def _terms(self):
+        """
+        The four building blocks A, B, C, D of the Reiner-Rubinstein formulas.
+        """
+        S, K, H, sigma, r, T = self.S, self.K, self.H, self.sigma, self.r, self.T
+        phi = 1.0 if self.option_type == 'call' else -1.0
+        eta = 1.0 if self.barrier_type.startswith('down') else -1.0
+
+        sqrtT = sigma * np.sqrt(T)
+        mu = (r - 0.5 * sigma**2) / sigma**2
+        discount = np.exp(-r * T)
+
+        x1 = np.log(S / K) / sqrtT + (1 + mu) * sqrtT
+        x2 = np.log(S / H) / sqrtT + (1 + mu) * sqrtT
+        y1 = np.log(H**2 / (S * K)) / sqrtT + (1 + mu) * sqrtT
+        y2 = np.log(H / S) / sqrtT + (1 + mu) * sqrtT
+
+        reflect_S = (H / S) ** (2 * (mu + 1))
+        reflect_K = (H / S) ** (2 * mu)
+
+        A = phi * S * norm.cdf(phi * x1) - phi * K * discount * norm.cdf(phi * (x1 - sqrtT))
+        B = phi * S * norm.cdf(phi * x2) - phi * K * discount * norm.cdf(phi * (x2 - sqrtT))
+        C = phi * S * reflect_S * norm.cdf(eta * y1) - phi * K * discount * reflect_K * norm.cdf(eta * (y1 - sqrtT))
+        D = phi * S * reflect_S * norm.cdf(eta * y2) - phi * K * discount * reflect_K * norm.cdf(eta * (y2 - sqrtT))
+        return A, B, C, D
+
+    def price(self):
+        """
+        Prices the barrier option.
+
+        Returns:
+        -------
+        float or np.ndarray
+            The option price(s).
+        """
+        A, B, C, D = self._terms()
+        above = self.K > self.H
+        down = self.barrier_type.startswith('down')
+
+        if self.option_type == 'call':
+            knock_in = np.where(above, C, A - B + D) if down else np.where(above, A, B - C + D)
+        else:
+            knock_in = np.where(above, B - C + D, A) if down else np.where(above, A - B + D, C)
+
+        # Paths starting beyond the barrier are knocked in (or out) from the outset.
+        breached = self.S <= self.H if down else self.S >= self.H
+        knock_in = np.where(breached, A, knock_in)
+
+        # A is the vanilla Black-Scholes price, so in-out parity gives the knock-out price.
+        price = knock_in if self.barrier_type.endswith('in') else A - knock_in
+        price = np.maximum(price, 0.0)
+        return price.item() if price.ndim == 0 else price
@@ -0,0 +1,267 @@
+import numpy as np
+
+from options_pricer_European.models.Kernel import norm
+
+
+def _check_option_type(option_type):
+    if option_type not in ('call', 'put'):
+        raise ValueError("option_type must be 'call' or 'put'")
+
+
+def _vanilla_payoff(X, K, option_type):
+    if option_type == 'call':
+        return np.maximum(X - K, 0)
+    return np.maximum(K - X, 0)
+
+
+class BasketPayoff:
+    """
+    Call or put on a weighted basket, paying max(sum_i w_i S_i(T) - K, 0) for a call.
+    """
+
+    def __init__(self, weights, K, option_type):
+        _check_option_type(option_type)
+        self.weights = np.asarray(weights, dtype=float)
+        self.K = K
+        self.option_type = option_type
+
+    def value(self, S_T):
+        return _vanilla_payoff(S_T @ self.weights, self.K, self.option_type)
+
+
+class SpreadPayoff:
+    """
+    Call or put on the spread between two assets, paying max(S_a(T) - S_b(T) - K, 0) for a call.
+    """
+
+    def __init__(self, K, option_type, legs=(0, 1)):
+        _check_option_type(option_type)
+        self.K = K
+        self.option_type = option_type
+        self.legs = legs
+
+    def value(self, S_T):
+        a, b = self.legs
+        return _vanilla_payoff(S_T[:, a] - S_T[:, b], self.K, self.option_type)
+
+
+class RainbowPayoff:
+    """
+    Best-of or worst-of call or put, paying max(max_i S_i(T) - K, 0) for a best-of call.
+    """
+
+    def __init__(self, K, option_type, kind='best'):
+        _check_option_type(option_type)
+        if kind not in ('best', 'worst'):
+            raise ValueError("kind must be 'best' or 'worst'")
+        self.K = K
+        self.option_type = option_type
+        self.kind = kind
+
+    def value(self, S_T):
+        extreme = S_T.max(axis=1) if self.kind == 'best' else S_T.min(axis=1)
+        return _vanilla_payoff(extreme, self.K, self.option_type)
+
+
+class SpreadAnalytic:
+    """
+    Kirk's approximation for a European spread option paying max(S1(T) - S2(T) - K, 0) for a call.
+
+    S2 + K is treated as a single lognormal asset, which reduces the spread option to a Margrabe
+    exchange option. Inputs may be numpy arrays for vectorized pricing.
+    """
+
+    def __init__(self, S1, S2, K, vol1, vol2, rho, r, T, option_type):
+        _check_option_type(option_type)
+        self.S1 = np.asarray(S1, dtype=float)
+        self.S2 = np.asarray(S2, dtype=float)
+        self.K = np.asarray(K, dtype=float)
+        self.vol1 = np.asarray(vol1, dtype=float)
+        self.vol2 = np.asarray(vol2, dtype=float)
+        self.rho = np.asarray(rho, dtype=float)
+        self.r = np.asarray(r, dtype=float)
+        self.T = np.asarray(T, dtype=float)
+        self.option_type = option_type
+
+    def kirk(self):
+        """
+        Returns:
+        -------
+        float or np.ndarray
+            The approximate option price(s).
+        """
+        discount = np.exp(-self.r * self.T)
+        F1 = self.S1 / discount
+        F2 = self.S2 / discount
+        share = F2 / (F2 + self.K)
+
+        vol = np.sqrt(self.vol1**2 - 2 * self.rho * self.vol1 * self.vol2 * share + (self.vol2 * share) ** 2)
+        std = vol * np.sqrt(self.T)
+        F = F1 / (F2 + self.K)
+        d1 = (np.log(F) + 0.5 * std**2) / std
+        d2 = d1 - std
+
+        if self.option_type == 'call':
+            price = discount * (F2 + self.K) * (F * norm.cdf(d1) - norm.cdf(d2))
+        else:
+            price = discount * (F2 + self.K) * (norm.cdf(-d2) - F * norm.cdf(-d1))
+        return price.item() if price.ndim == 0 else price
+
+
+class MultiAssetMonteCarlo:
+    """
+    Monte Carlo simulation of several correlated underlyings under GBM or Heston dynamics.
+
+    The correlation matrix is Cholesky-factorized once in the constructor. For each chunk of paths the
+    independent shocks are drawn as one (steps, paths, assets) cube and correlated with a single matrix
+    product against the factor, rather than looping over assets. Paths are processed in chunks sized to
+    `max_memory`, so a 20-asset, 100k-path, 252-step run (a ~4 GB cube in float64) never materializes.
+    """
+
+    def __init__(self, S, vol, corr, r, T, N=252, M=10000, model='gbm', heston_params=None,
+                 max_memory=256 * 2**20, distribution=norm):
+        """
+        Initializes the multi-asset simulation.
+
+        Parameters:
+        ----------
+        S : array-like
+            Current prices of the n underlyings.
+        vol : array-like
+            Annualized volatilities of the underlyings. Ignored by the Heston model, whose initial
+            variances are given in `heston_params`.
+        corr : array-like
+            (n, n) correlation matrix of the underlyings' Brownian motions.
+        r : float
+            Annualized risk-free interest rate.
+        T : float
+            Time to maturity in years.
+        N : int, optional
+            Number of time steps of the Heston discretization (default is 252). GBM terminal prices are
+            sampled exactly in a single step, so N does not affect GBM cost or accuracy.
+        M : int, optional
+            Number of simulated paths (default is 10000).
+        model : str, optional
+            'gbm' (default) or 'heston'.
+        heston_params : dict, optional
+            Per-asset arrays (or scalars) for the Heston model with keys 'v0', 'kappa', 'theta', 'xi' and
+            'rho', where 'rho' is the correlation between each asset and its own variance.
+        max_memory : int, optional
+            Approximate upper bound in bytes on the shock cubes held at once (default is 256 MiB).
+        distribution : scipy.stats distribution object, optional
+            The distribution for generating random shocks (default is the standard normal, drawing the same
+            shocks as scipy.stats.norm).
+        """
+        self.S = np.atleast_1d(np.asarray(S, dtype=float))
+        self.vol = np.broadcast_to(np.asarray(vol, dtype=float), self.S.shape)
+        self.corr = np.asarray(corr, dtype=float)
+        n = len(self.S)
+
+        if self.corr.shape != (n, n):
+            raise ValueError(f"corr must have shape ({n}, {n})")
+        if not np.allclose(self.corr, self.corr.T) or not np.allclose(np.diag(self.corr), 1):
+            raise ValueError("corr must be symmetric with a unit diagonal")
+        try:
+            self.cholesky = np.linalg.cholesky(self.corr)
+        except np.linalg.LinAlgError:
+            raise ValueError("corr must be positive definite")
+
+        if model not in ('gbm', 'heston'):
+            raise ValueError("model must be 'gbm' or 'heston'")
+        if model == 'heston':
+            if heston_params is None:
+                raise ValueError("heston_params are required for the Heston model")
+            self.heston = {key: np.broadcast_to(np.asarray(heston_params[key], dtype=float), self.S.shape)
+                           for key in ('v0', 'kappa', 'theta', 'xi', 'rho')}
+
+        self.r = r
+        self.T = T
+        self.N = N
+        self.M = M
+        self.model = model
+        self.max_memory = max_memory
+        self.distribution = distribution
+        self.dt = T / N
+
+    def chunk_size(self):
+        """
+        Number of paths per chunk such that the shock cubes stay within `max_memory`.
+        """
+        # Heston holds the asset and variance shock cubes; GBM a single step of asset shocks.
+        steps, cubes = (self.N, 2) if self.model == 'heston' else (1, 1)
+        bytes_per_path = steps * len(self.S) * 8 * cubes
+        return int(max(1, min(self.M, self.max_memory // bytes_per_path)))
+
+    def _correlated_shocks(self, steps, paths):
+        """
+        Draws a (steps, paths, assets) cube of correlated standard normal shocks with one GEMM.
+        """
+        Z = self.distribution.rvs(size=(steps, paths, len(self.S)))
+        return Z @ self.cholesky.T
+
+    def _terminal_gbm(self, paths):
+        drift = (self.r - 0.5 * self.vol**2) * self.T
+        # GBM log increments are exact and additive, so one step of length T samples S(T) exactly.
+        W = self._correlated_shocks(1, paths)[0] * np.sqrt(self.T)
+        return self.S * np.exp(drift + self.vol * W)
+
+    def _terminal_heston(self, paths):
+        h = self.heston
+        Z_S = self._correlated_shocks(self.N, paths)
+        Z_v = h['rho'] * Z_S + np.sqrt(1 - h['rho'] ** 2) * self.distribution.rvs(size=Z_S.shape)
+        sqrt_dt = np.sqrt(self.dt)
+
+        ln_S = np.broadcast_to(np.log(self.S), (paths, len(self.S))).copy()
+        v = np.broadcast_to(h['v0'], (paths, len(self.S))).copy()
+        for t in range(self.N):
+            # Full truncation scheme, as in `Heston.simulate`
+            v_pos = np.maximum(v, 0)
+            ln_S += (self.r - 0.5 * v_pos) * self.dt + np.sqrt(v_pos) * sqrt_dt * Z_S[t]
+            v = np.maximum(v + h['kappa'] * (h['theta'] - v) * self.dt + h['xi'] * np.sqrt(v_pos) * sqrt_dt * Z_v[t], 0)
+        return np.exp(ln_S)
+
+    def terminal_prices(self):
+        """
+        Yields the simulated terminal prices chunk by chunk.
+
+        Yields:
+        ------
+        np.ndarray
+            Terminal prices of shape (paths in chunk, assets).
+        """
+        chunk = self.chunk_size()
+        simulate = self._terminal_heston if self.model == 'heston' else self._terminal_gbm
+        for start in range(0, self.M, chunk):
+            yield simulate(min(chunk, self.M - start))
+
+    def price(self, payoffs):
+        """
+        Prices every payoff against one set of simulated paths.
+
+        Payoff sums and sums of squares are accumulated across chunks, so memory stays bounded by the
+        chunk size whatever the number of paths.
+
+        Parameters:
+        ----------
+        payoffs : list
+            Objects with a `value(S_T)` method taking terminal prices of shape (paths, assets), such as
+            `BasketPayoff`, `SpreadPayoff` and `RainbowPayoff`.
+
+        Returns:
+        -------
+        list[tuple[float, float]]
+            The estimated price and standard error of each payoff, in order.
+        """
+        total = np.zeros(len(payoffs))
+        total_sq = np.zeros(len(payoffs))
+        for S_T in self.terminal_prices():
+            for k, payoff in enumerate(payoffs):
+                values = payoff.value(S_T)
+                total[k] += values.sum()
+                total_sq[k] += np.dot(values, values)
+
+        discount = np.exp(-self.r * self.T)
+        mean = total / self.M
+        variance = (total_sq - self.M * mean**2) / (self.M - 1)
+        SE = np.sqrt(np.maximum(variance, 0) / self.M)
+        return [(discount * m, discount * se) for m, se in zip(mean, SE)]
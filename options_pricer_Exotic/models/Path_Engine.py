@@ -0,0 +1,118 @@
+import numpy as np
+
+from options_pricer_European.models.Kernel import norm
+
+
+class PathEngine:
+    """
+    A shared Monte Carlo path engine that prices many payoffs on the same underlying from one simulation.
+
+    Stock prices follow Geometric Brownian Motion on N equal steps and are generated exactly once per
+    call to `price`. At every step, each payoff updates its own running statistics (see `Payoffs`), so
+    dozens of exotic contracts cost one path generation plus a cheap per-payoff update, and only the
+    current price vector is ever held in memory.
+
+    Passing a `LocalVolatility` grid as `vol` replaces the constant volatility with a local volatility
+    gathered for every path at every step, so path-dependent contracts are priced consistently with the
+    smile the grid was built from.
+    """
+
+    def __init__(self, S, vol, r, T, N=252, M=10000, distribution=norm):
+        """
+        Initializes the engine with the parameters of the underlying.
+
+        Parameters:
+        ----------
+        S : float
+            Current stock price.
+        vol : float or LocalVolatility
+            Annualized volatility of the underlying stock, or a local volatility grid (anything with a
+            vectorized lookup(t, ln_S)).
+        r : float
+            Annualized risk-free interest rate.
+        T : float
+            Time to maturity in years, shared by all payoffs.
+        N : int, optional
+            Number of time steps (default is 252).
+        M : int, optional
+            Number of simulated paths (default is 10000).
+        distribution : scipy.stats distribution object, optional
+            The distribution for generating random shocks (default is the standard normal, drawing the same
+            shocks as scipy.stats.norm).
+        """
+        self.local_vol = vol if hasattr(vol, 'lookup') else None
+        if self.local_vol is not None:
+            # The spot local volatility stands in where a single volatility is needed, e.g. for validation.
+            vol = float(self.local_vol.lookup(0.0, np.log(S)))
+        if S <= 0 or vol <= 0 or T <= 0 or N < 1 or M < 2:
+            raise ValueError("Invalid input values.")
+
+        self.S = S
+        self.vol = vol
+        self.r = r
+        self.T = T
+        self.N = N
+        self.M = M
+        self.distribution = distribution
+        self.dt = T / N
+
+    def price(self, payoffs, control=None):
+        """
+        Prices every payoff against one set of simulated paths.
+
+        Parameters:
+        ----------
+        payoffs : list[Payoff]
+            The contracts to price.
+        control : Payoff, optional
+            A payoff with a closed-form `analytic` price (e.g. a `VanillaPayoff`, or a `BarrierPayoff`
+            with bridge monitoring) used as a control variate for all payoffs. The coefficient
+            beta = Cov(Y, X) / Var(X) is estimated separately for each payoff.
+
+        Returns:
+        -------
+        list[tuple[float, float]]
+            The estimated price and standard error of each payoff, in order.
+        """
+        if control is not None and self.local_vol is not None:
+            raise ValueError("closed-form controls assume a constant volatility and cannot be used with local volatility")
+        contracts = list(payoffs) + ([control] if control is not None else [])
+        for payoff in contracts:
+            payoff.reset(self)
+
+        drift = (self.r - 0.5 * self.vol**2) * self.dt
+        diffusion = self.vol * np.sqrt(self.dt)
+        # Variance of the log-price over the current step, per path under local volatility.
+        self.step_variance = self.vol**2 * self.dt
+
+        # The current log-prices are exposed as `ln_S` so payoffs working in log space can share them.
+        self.ln_S = np.full(self.M, np.log(self.S))
+        S_prev = np.full(self.M, float(self.S))
+        for i in range(1, self.N + 1):
+            if self.local_vol is not None:
+                vol = self.local_vol.lookup((i - 1) * self.dt, self.ln_S)
+                self.step_variance = vol**2 * self.dt
+                drift = self.r * self.dt - 0.5 * self.step_variance
+                diffusion = np.sqrt(self.step_variance)
+            self.ln_S = self.ln_S + (drift + diffusion * self.distribution.rvs(size=self.M))
+            S_new = np.exp(self.ln_S)
+            for payoff in contracts:
+                payoff.update(i, S_prev, S_new)
+            S_prev = S_new
+
+        discount = np.exp(-self.r * self.T)
+
+        if control is not None:
+            X = discount * control.value(S_prev)
+            X_centred = X - np.mean(X)
+            X_variance = np.dot(X_centred, X_centred)
+            X_error = X - control.analytic(self)
+
+        results = []
+        for payoff in payoffs:
+            Y = discount * payoff.value(S_prev)
+            if control is not None and X_variance > 0:
+                beta = np.dot(X_centred, Y) / X_variance
+                Y = Y - beta * X_error
+            results.append((np.mean(Y), np.std(Y, ddof=1) / np.sqrt(self.M)))
+        return results
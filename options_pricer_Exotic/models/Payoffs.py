@@ -0,0 +1,267 @@
+"""
+Payoffs evaluated on streamed path statistics.
+
+Each payoff keeps only the running statistics it needs (a maximum, a survival probability, a running
+sum...), updated once per time step by `PathEngine`. Nothing path-shaped is stored, so any number of
+contracts can be evaluated against one simulation with O(M) memory per contract.
+
+A payoff implements:
+  - reset(engine): allocate its accumulators for engine.M paths.
+  - update(i, S_prev, S_new): consume the move from step i - 1 to step i.
+  - value(S_T): undiscounted payoff at maturity for every path.
+  - analytic(engine), optional: exact price, which lets the payoff serve as a control variate.
+"""
+
+import warnings
+
+import numpy as np
+
+from options_pricer_European.models.Kernel import norm
+
+from .Barrier import BarrierAnalytic
+
+
+def _check_option_type(option_type):
+    if option_type not in ('call', 'put'):
+        raise ValueError("option_type must be 'call' or 'put'")
+
+
+def _fixing_steps(engine, times, tolerance=1e-6):
+    """
+    Maps fixing times in years to the indices of the nearest steps of the engine's grid.
+
+    A time further than `tolerance` (in steps) from the grid is moved to its nearest step with a warning;
+    two times on the same step raise, since the payoff would silently lose a fixing.
+    """
+    if times is None:
+        return None
+    times = np.asarray(times, dtype=float)
+    if np.any(times < 0) or np.any(times > engine.T):
+        raise ValueError("fixing times must lie between today (0) and maturity (T)")
+    positions = times / engine.dt
+    steps = np.rint(positions).astype(int)
+    offset = np.abs(positions - steps)
+    if len(np.unique(steps)) < len(steps):
+        raise ValueError(f"several fixing times fall on the same step of the {engine.N}-step grid; increase N")
+    if np.any(offset > tolerance):
+        warnings.warn(f"fixing times are not on the {engine.N}-step grid and are moved to the nearest step "
+                      f"(by up to {offset.max():.2f} steps); choose N so that they fall on it", stacklevel=3)
+    return set(steps.tolist())
+
+
+class Payoff:
+    """
+    Base class for payoffs consumed by `PathEngine`. Stateless payoffs only need `value`.
+    """
+
+    def reset(self, engine):
+        pass
+
+    def update(self, i, S_prev, S_new):
+        pass
+
+    def value(self, S_T):
+        raise NotImplementedError
+
+    def analytic(self, engine):
+        raise NotImplementedError(f"{type(self).__name__} has no closed-form price")
+
+
+class VanillaPayoff(Payoff):
+    """
+    European call or put, priced exactly by Black-Scholes.
+    """
+
+    def __init__(self, K, option_type):
+        _check_option_type(option_type)
+        self.K = K
+        self.option_type = option_type
+
+    def value(self, S_T):
+        if self.option_type == 'call':
+            return np.maximum(S_T - self.K, 0)
+        return np.maximum(self.K - S_T, 0)
+
+    def analytic(self, engine):
+        sqrtT = engine.vol * np.sqrt(engine.T)
+        d1 = (np.log(engine.S / self.K) + (engine.r + 0.5 * engine.vol**2) * engine.T) / sqrtT
+        d2 = d1 - sqrtT
+        discount = np.exp(-engine.r * engine.T)
+        if self.option_type == 'call':
+            return engine.S * norm.cdf(d1) - self.K * discount * norm.cdf(d2)
+        return self.K * discount * norm.cdf(-d2) - engine.S * norm.cdf(-d1)
+
+
+class DigitalPayoff(Payoff):
+    """
+    Cash-or-nothing digital paying `cash` if the option finishes in the money.
+    """
+
+    def __init__(self, K, option_type, cash=1.0):
+        _check_option_type(option_type)
+        self.K = K
+        self.option_type = option_type
+        self.cash = cash
+
+    def value(self, S_T):
+        if self.option_type == 'call':
+            return self.cash * (S_T > self.K)
+        return self.cash * (S_T < self.K)
+
+    def analytic(self, engine):
+        sqrtT = engine.vol * np.sqrt(engine.T)
+        d2 = (np.log(engine.S / self.K) + (engine.r - 0.5 * engine.vol**2) * engine.T) / sqrtT
+        sign = 1 if self.option_type == 'call' else -1
+        return self.cash * np.exp(-engine.r * engine.T) * norm.cdf(sign * d2)
+
+
+class BarrierPayoff(Payoff):
+    """
+    Single barrier knock-in or knock-out call or put.
+
+    With `bridge=True` the barrier is monitored continuously: instead of checking only the simulated
+    prices, each step multiplies the path's survival probability by the Brownian-bridge probability
+    of not crossing H between the two endpoints,
+        1 - exp(-2 ln(H / S_prev) ln(H / S_new) / (vol^2 dt)).
+    This removes the discrete-monitoring bias and, because the payoff is a conditional expectation,
+    also lowers the variance. With `bridge=False` only the simulated dates are monitored.
+    """
+
+    def __init__(self, K, H, option_type, barrier_type, bridge=True):
+        _check_option_type(option_type)
+        if barrier_type not in BarrierAnalytic.BARRIER_TYPES:
+            raise ValueError(f"barrier_type must be one of {BarrierAnalytic.BARRIER_TYPES}")
+        self.vanilla = VanillaPayoff(K, option_type)
+        self.K = K
+        self.H = H
+        self.option_type = option_type
+        self.barrier_type = barrier_type
+        self.bridge = bridge
+        self.down = barrier_type.startswith('down')
+
+    def _beyond(self, S):
+        return S <= self.H if self.down else S >= self.H
+
+    def reset(self, engine):
+        self.survival = np.full(engine.M, 0.0 if self._beyond(engine.S) else 1.0)
+        self.engine = engine
+        self.ln_H = np.log(self.H)
+        self.log_distance = np.full(engine.M, self.ln_H - np.log(engine.S))
+
+    def update(self, i, S_prev, S_new):
+        crossed = self._beyond(S_new)
+        if self.bridge:
+            # ln(H / S) reuses the engine's log-prices, and ln(H / S_prev) is carried over from the
+            # previous step, so no logarithms are taken here.
+            log_new = self.ln_H - self.engine.ln_S
+            # Both logs share a sign when neither endpoint has crossed, so the product is positive.
+            # The bridge variance is the engine's step variance, per path under local volatility.
+            p_cross = np.exp(-2.0 * np.maximum(self.log_distance * log_new, 0) / self.engine.step_variance)
+            p_cross[crossed] = 1.0
+            self.survival *= 1.0 - p_cross
+            self.log_distance = log_new
+        else:
+            self.survival[crossed] = 0.0
+
+    def value(self, S_T):
+        knocked_out = 1.0 - self.survival
+        alive = self.survival if self.barrier_type.endswith('out') else knocked_out
+        return self.vanilla.value(S_T) * alive
+
+    def analytic(self, engine):
+        if not self.bridge:
+            return super().analytic(engine)
+        return BarrierAnalytic(engine.S, self.K, self.H, engine.vol, engine.r, engine.T,
+                               self.option_type, self.barrier_type).price()
+
+
+class LookbackPayoff(Payoff):
+    """
+    Discretely monitored lookback option.
+
+    With `K=None` the option has a floating strike: the call pays S_T - min(S) and the put
+    max(S) - S_T. With a fixed strike the call pays max(max(S) - K, 0) and the put max(K - min(S), 0).
+    """
+
+    def __init__(self, option_type, K=None):
+        _check_option_type(option_type)
+        self.option_type = option_type
+        self.K = K
+
+    def reset(self, engine):
+        self.running_max = np.full(engine.M, float(engine.S))
+        self.running_min = np.full(engine.M, float(engine.S))
+
+    def update(self, i, S_prev, S_new):
+        np.maximum(self.running_max, S_new, out=self.running_max)
+        np.minimum(self.running_min, S_new, out=self.running_min)
+
+    def value(self, S_T):
+        if self.K is None:
+            return S_T - self.running_min if self.option_type == 'call' else self.running_max - S_T
+        if self.option_type == 'call':
+            return np.maximum(self.running_max - self.K, 0)
+        return np.maximum(self.K - self.running_min, 0)
+
+
+class AsianPayoff(Payoff):
+    """
+    Arithmetic-average Asian call or put, averaged over the given fixing times (in years) or over
+    every step of the grid including today when `fixings` is None.
+    """
+
+    def __init__(self, K, option_type, fixings=None):
+        _check_option_type(option_type)
+        self.K = K
+        self.option_type = option_type
+        self.fixings = fixings
+
+    def reset(self, engine):
+        self.steps = _fixing_steps(engine, self.fixings)
+        self.count = 0
+        self.total = np.zeros(engine.M)
+        if self.steps is None or 0 in self.steps:
+            self.total += engine.S
+            self.count += 1
+
+    def update(self, i, S_prev, S_new):
+        if self.steps is None or i in self.steps:
+            self.total += S_new
+            self.count += 1
+
+    def value(self, S_T):
+        average = self.total / self.count
+        if self.option_type == 'call':
+            return np.maximum(average - self.K, 0)
+        return np.maximum(self.K - average, 0)
+
+
+class CliquetPayoff(Payoff):
+    """
+    Cliquet (ratchet) paying notional * clip(sum of clipped period returns, global_floor, global_cap).
+
+    Each period return S(t_k) / S(t_{k-1}) - 1 between consecutive reset times is clipped to
+    [local_floor, local_cap] before being summed.
+    """
+
+    def __init__(self, resets, local_floor=0.0, local_cap=np.inf, global_floor=0.0, global_cap=np.inf,
+                 notional=1.0):
+        self.resets = resets
+        self.local_floor = local_floor
+        self.local_cap = local_cap
+        self.global_floor = global_floor
+        self.global_cap = global_cap
+        self.notional = notional
+
+    def reset(self, engine):
+        self.steps = _fixing_steps(engine, self.resets)
+        self.last_fixing = np.full(engine.M, float(engine.S))
+        self.total = np.zeros(engine.M)
+
+    def update(self, i, S_prev, S_new):
+        if i in self.steps:
+            self.total += np.clip(S_new / self.last_fixing - 1, self.local_floor, self.local_cap)
+            self.last_fixing = S_new.copy()
+
+    def value(self, S_T):
+        return self.notional * np.clip(self.total, self.global_floor, self.global_cap)
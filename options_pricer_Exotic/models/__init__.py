@@ -0,0 +1,8 @@
+from .Path_Engine import PathEngine
+from .Payoffs import Payoff, VanillaPayoff, DigitalPayoff, BarrierPayoff, LookbackPayoff, AsianPayoff, CliquetPayoff
+from .Barrier import BarrierAnalytic
+from .Multi_Asset import MultiAssetMonteCarlo, BasketPayoff, SpreadPayoff, RainbowPayoff, SpreadAnalytic
+
+__all__ = ['PathEngine', 'Payoff', 'VanillaPayoff', 'DigitalPayoff', 'BarrierPayoff', 'LookbackPayoff', 'AsianPayoff',
+           'CliquetPayoff', 'BarrierAnalytic', 'MultiAssetMonteCarlo', 'BasketPayoff', 'SpreadPayoff', 'RainbowPayoff',
+           'SpreadAnalytic']
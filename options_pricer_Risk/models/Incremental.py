@@ -0,0 +1,263 @@
+"""Incremental revaluation of a book as spot and time tick.
+
+Intraday most ticks move one underlying's spot, or the clock. ``IncrementalBook`` keeps a portfolio valued and
+on every tick recomputes only what the tick changes:
+
+  - ``affected`` finds the positions a market-data change touches: a spot move those on that underlying, the
+    passing of time the positions not yet expired, a rate change all of them and a volatility change the
+    positions whose volatility moved. Only those are revalued.
+  - Each style keeps the part of its pricer that the spot does not enter. Black-Scholes positions keep log K,
+    sigma sqrt(tau), the drift of d1 and the discounted strike, so a spot tick costs a log and two normal cdfs.
+    American positions keep their CRR lattice (node multipliers and discounted probabilities), so a spot tick
+    is one backward sweep with no tree set-up. European positions priced by Monte Carlo keep the growth factor
+    S_T / S of each of their paths: under GBM the paths from a new spot are the cached ones rescaled by
+    S_new / S_old, exactly, so a tick evaluates the payoff without drawing or exponentiating anything.
+  - Time ticks and rate or volatility changes rebuild the cached state of the positions they affect.
+
+    book = IncrementalBook(portfolio, spot=[100, 50], r=0.03)
+    changed = book.tick(spot={0: 100.5})          # indices of the positions revalued
+    total = book.value()
+"""
+
+import numpy as np
+
+from options_pricer_European.models.Cache import seeded
+from options_pricer_European.models.Kernel import norm
+from options_pricer_American.models.Binomial import BinomialAmerican
+from options_pricer_Asian.models.Analytic import AsianAnalytic
+from .Portfolio import STYLES
+
+
+def _intrinsic(S, K, is_call):
+    return np.maximum(np.where(is_call, S - K, K - S), 0)
+
+
+class _BlackScholesState:
+    """
+    The spot-independent ingredients of d1 and d2 for European positions.
+    """
+
+    def __init__(self, book, r, options):
+        self.K, self.is_call, self.sigma, self.T, self.r = book.K, book.is_call, book.sigma, book.T.copy(), r
+        self.prepare()
+
+    def prepare(self):
+        self.alive = self.T > 0
+        self.random = self.alive & (self.sigma > 0)
+        tau = np.where(self.alive, self.T, 1.0)
+        self.vol_time = np.where(self.random, self.sigma, 1.0) * np.sqrt(tau)
+        self.shift = self.vol_time**2 / 2 + self.r * tau - np.log(self.K)
+        self.discounted_K = self.K * np.exp(-self.r * tau)
+
+    def values(self, S, index):
+        vol_time, discounted_K = self.vol_time[index], self.discounted_K[index]
+        K, is_call = self.K[index], self.is_call[index]
+        with np.errstate(divide='ignore'):
+            d1 = (np.log(S) + self.shift[index]) / vol_time
+        call = S * norm.cdf(d1) - discounted_K * norm.cdf(d1 - vol_time)
+        value = np.where(is_call, call, call - S + discounted_K)
+        # At zero volatility the value is the discounted payoff on the forward
+        value = np.where(self.random[index], value, _intrinsic(S, discounted_K, is_call))
+        return np.where(self.alive[index], value, _intrinsic(S, K, is_call))
+
+
+class _TreeState:
+    """
+    The CRR lattice of each American position, swept again at every new spot.
+    """
+
+    def __init__(self, book, r, options):
+        self.K, self.is_call, self.sigma, self.T, self.r = book.K, book.is_call, book.sigma, book.T.copy(), r
+        self.N = options['N']
+        self.prepare()
+
+    def prepare(self):
+        self.lattice = BinomialAmerican.lattice(self.sigma, self.r, self.T, self.N)
+
+    def values(self, S, index):
+        lattice = {name: value[index] for name, value in self.lattice.items()}
+        return BinomialAmerican.sweep(lattice, S, self.K[index], self.is_call[index])
+
+
+class _LevyState:
+    """
+    Asian positions, whose approximation has no spot-independent part worth keeping: revalued when affected.
+    """
+
+    def __init__(self, book, r, options):
+        self.K, self.is_call, self.sigma, self.T, self.r = book.K, book.is_call, book.sigma, book.T.copy(), r
+        self.n_fixings = book.n_fixings
+
+    def prepare(self):
+        pass
+
+    def values(self, S, index):
+        values = np.empty(len(index))
+        n_fixings = self.n_fixings[index]
+        for n in np.unique(n_fixings):
+            rows = n_fixings == n
+            positions = index[rows]
+            values[rows] = AsianAnalytic.levy_batch(S[rows], self.K[positions], self.sigma[positions], self.r,
+                                                    self.T[positions], self.is_call[positions], int(n))
+        return values
+
+
+class _MonteCarloState:
+    """
+    Per-path growth factors S_T / S of European positions priced by Monte Carlo, rescaled by each new spot.
+
+    All positions share the same M normal draws (common random numbers), as in `MonteCarlo.price_batch` with the
+    same seed; the cached factors take M floats per position.
+    """
+
+    def __init__(self, book, r, options):
+        self.K, self.is_call, self.sigma, self.T, self.r = book.K, book.is_call, book.sigma, book.T.copy(), r
+        with seeded(options['seed']):
+            self.Z = np.random.normal(size=options['M'])
+        self.prepare()
+
+    def prepare(self):
+        # At zero volatility every path grows at the rate, which prices the discounted forward payoff exactly
+        self.alive = self.T > 0
+        tau, sigma = self.T[:, None], self.sigma[:, None]
+        self.growth = np.exp((self.r - 0.5 * sigma**2) * tau + sigma * np.sqrt(tau) * self.Z)
+        self.discount = np.exp(-self.r * self.T)
+
+    def values(self, S, index):
+        K, is_call = self.K[index], self.is_call[index]
+        sign = np.where(is_call, 1.0, -1.0)[:, None]
+        payoffs = np.maximum(sign * (S[:, None] * self.growth[index] - K[:, None]), 0)
+        value = self.discount[index] * payoffs.mean(axis=1)
+        return np.where(self.alive[index], value, _intrinsic(S, K, is_call))
+
+
+_STATES = {'black_scholes': _BlackScholesState, 'monte_carlo': _MonteCarloState, 'american': _TreeState,
+           'asian': _LevyState}
+
+
+class IncrementalBook:
+    """
+    A `Portfolio` kept valued through market ticks, revaluing only the positions each tick affects.
+    """
+
+    def __init__(self, portfolio, spot, r, N=None, european='black_scholes', M=10000, seed=0):
+        """
+        Parameters:
+        ----------
+        portfolio : Portfolio
+            The positions.
+        spot : array-like
+            Current price of each underlying, indexed by `portfolio.underlying`.
+        r : float
+            Annualized risk-free interest rate.
+        N : int, optional
+            Number of binomial steps for American positions (defaults to BinomialAmerican.N).
+        european : str, optional
+            Pricer of the European positions: 'black_scholes' (default) or 'monte_carlo'.
+        M : int, optional
+            Number of paths for 'monte_carlo' (default is 10000).
+        seed : int, optional
+            Seed of the Monte Carlo draws (default is 0).
+        """
+        if european not in ('black_scholes', 'monte_carlo'):
+            raise ValueError("european must be 'black_scholes' or 'monte_carlo'")
+        self.portfolio = portfolio
+        self.spot = np.atleast_1d(np.asarray(spot, dtype=float)).copy()
+        self.r = r
+        self.T = portfolio.T.copy()
+        self.sigma = portfolio.sigma.copy()
+        self.european = european
+        self.options = {'N': BinomialAmerican.N if N is None else N, 'M': M, 'seed': seed}
+        if len(portfolio) and portfolio.underlying.max() >= len(self.spot):
+            raise ValueError("portfolio refers to an underlying with no spot price")
+
+        self.values = np.empty(len(portfolio))
+        self.ticks = 0
+        self.revalued = 0
+        self.groups = []
+        for style in STYLES:
+            rows = np.flatnonzero(portfolio.style == style)
+            if len(rows):
+                book = portfolio.select(rows)
+                state = _STATES[european if style == 'european' else style](book, r, self.options)
+                self.groups.append((rows, book, state))
+                self.values[rows] = state.values(self.spot[book.underlying], np.arange(len(rows)))
+
+    def value(self):
+        """
+        The value of the book: quantities times the current unit values.
+        """
+        return float(self.portfolio.quantity @ self.values)
+
+    def _new_spot(self, spot):
+        new = self.spot.copy()
+        if isinstance(spot, dict):
+            for underlying, price in spot.items():
+                new[underlying] = price
+        else:
+            new[:] = np.broadcast_to(np.asarray(spot, dtype=float), new.shape)
+        return new
+
+    def affected(self, spot=None, elapsed=0.0, r=None, sigma=None):
+        """
+        The positions whose value a market-data change affects.
+
+        Parameters:
+        ----------
+        spot : array-like or dict, optional
+            New prices of all underlyings, or {underlying index: new price} for some of them.
+        elapsed : float, optional
+            Years since the last tick (default is 0).
+        r : float, optional
+            New risk-free rate.
+        sigma : array-like, optional
+            New volatility of every position.
+
+        Returns:
+        -------
+        np.ndarray
+            Boolean mask over the positions.
+        """
+        mask = np.zeros(len(self.portfolio), dtype=bool)
+        if spot is not None:
+            moved = np.flatnonzero(self._new_spot(spot) != self.spot)
+            mask |= np.isin(self.portfolio.underlying, moved)
+        if elapsed > 0:
+            mask |= self.T > 0
+        if r is not None and r != self.r:
+            mask[:] = True
+        if sigma is not None:
+            mask |= np.broadcast_to(np.asarray(sigma, dtype=float), self.sigma.shape) != self.sigma
+        return mask
+
+    def tick(self, spot=None, elapsed=0.0, r=None, sigma=None):
+        """
+        Applies a market-data change (see `affected`) and revalues the positions it affects.
+
+        Returns:
+        -------
+        np.ndarray
+            Indices of the revalued positions.
+        """
+        mask = self.affected(spot, elapsed, r, sigma)
+        if spot is not None:
+            self.spot = self._new_spot(spot)
+        rebuild = elapsed > 0 or (r is not None and r != self.r) or sigma is not None
+        if elapsed > 0:
+            self.T = np.maximum(self.T - elapsed, 0.0)
+        if r is not None:
+            self.r = r
+        if sigma is not None:
+            self.sigma = np.broadcast_to(np.asarray(sigma, dtype=float), self.sigma.shape).copy()
+
+        for rows, book, state in self.groups:
+            if rebuild:
+                # Time, rate and volatility enter the cached state itself, which is rebuilt
+                state.T, state.r, state.sigma = self.T[rows], self.r, self.sigma[rows]
+                state.prepare()
+            index = np.flatnonzero(mask[rows])
+            if len(index):
+                self.values[rows[index]] = state.values(self.spot[book.underlying[index]], index)
+        self.ticks += 1
+        self.revalued += int(mask.sum())
+        return np.flatnonzero(mask)
@@ -0,0 +1,133 @@
+import numpy as np
+
+from options_pricer_European.models.Black_Scholes import BlackScholes
+from options_pricer_American.models.Binomial import BinomialAmerican
+from options_pricer_Asian.models.Analytic import AsianAnalytic
+
+
+STYLES = ('european', 'american', 'asian')
+
+
+class Portfolio:
+    """
+    A book of European, American and Asian option positions stored column-wise.
+
+    Positions are held as parallel numpy arrays rather than a list of objects, so a book of tens of
+    thousands of positions is revalued by array operations grouped by style.
+
+    European positions are priced with Black-Scholes, American positions with the batched CRR tree
+    `BinomialAmerican.price_batch` and Asian positions with Levy's approximation
+    (`AsianAnalytic.levy_batch`) over `n_fixings` equally spaced fixings of the remaining life.
+    """
+
+    def __init__(self, style, option_type, K, T, sigma, quantity=1.0, underlying=0, n_fixings=12):
+        """
+        Parameters:
+        ----------
+        style : array-like of str
+            'european', 'american' or 'asian' for each position.
+        option_type : array-like of str
+            'call' or 'put' for each position.
+        K : array-like
+            Strike prices.
+        T : array-like
+            Times to maturity in years.
+        sigma : array-like or VolSurface
+            Volatilities used to price each position, or a volatility surface of the (single) underlying
+            looked up once at every position's strike and maturity.
+        quantity : array-like, optional
+            Signed number of contracts held (default is 1).
+        underlying : array-like of int, optional
+            Index of each position's underlying in the spot vector (default is 0).
+        n_fixings : array-like of int, optional
+            Number of averaging dates of Asian positions (default is 12).
+        """
+        if hasattr(sigma, 'vol'):
+            sigma = sigma.vol(K, T)
+        style, option_type, K, T, sigma, quantity, underlying, n_fixings = np.broadcast_arrays(
+            np.asarray(style), np.asarray(option_type), np.asarray(K, dtype=float), np.asarray(T, dtype=float),
+            np.asarray(sigma, dtype=float), np.asarray(quantity, dtype=float), np.asarray(underlying, dtype=int),
+            np.asarray(n_fixings, dtype=int))
+
+        style = np.char.lower(np.atleast_1d(style).astype(str))
+        option_type = np.char.lower(np.atleast_1d(option_type).astype(str))
+        if not np.all(np.isin(style, STYLES)):
+            raise ValueError(f"style must be one of {STYLES}")
+        if not np.all(np.isin(option_type, ('call', 'put'))):
+            raise ValueError("option_type must be 'call' or 'put'")
+
+        self.style = style
+        self.is_call = option_type == 'call'
+        self.K = np.atleast_1d(K)
+        self.T = np.atleast_1d(T)
+        self.sigma = np.atleast_1d(sigma)
+        self.quantity = np.atleast_1d(quantity)
+        self.underlying = np.atleast_1d(underlying)
+        self.n_fixings = np.atleast_1d(n_fixings)
+
+    def __len__(self):
+        return len(self.K)
+
+    def select(self, index):
+        """
+        Returns the sub-portfolio at the given integer or boolean index.
+        """
+        sub = Portfolio.__new__(Portfolio)
+        for name in ('style', 'is_call', 'K', 'T', 'sigma', 'quantity', 'underlying', 'n_fixings'):
+            setattr(sub, name, getattr(self, name)[index])
+        return sub
+
+
+def revalue(portfolio, S, sigma, T, r, N=None):
+    """
+    Values every position of a single-style slice of a portfolio.
+
+    S, sigma and T broadcast against each other with a trailing positions axis, so passing S of
+    shape (scenarios, positions) revalues the slice under every scenario in one call.
+
+    Parameters:
+    ----------
+    portfolio : Portfolio
+        Positions that all share one style.
+    S, sigma, T : np.ndarray
+        Spot price, volatility and time to maturity per position (and scenario).
+    r : float
+        Annualized risk-free interest rate.
+    N : int, optional
+        Number of binomial steps for American positions (defaults to BinomialAmerican.N).
+
+    Returns:
+    -------
+    np.ndarray
+        Value of one unit of each position, with the broadcast shape of the inputs.
+    """
+    S, sigma, T = np.broadcast_arrays(S, sigma, T)
+    is_call = np.broadcast_to(portfolio.is_call, S.shape)
+    K = np.broadcast_to(portfolio.K, S.shape)
+    style = portfolio.style[0] if len(portfolio) else 'european'
+    intrinsic = np.maximum(np.where(is_call, S - K, K - S), 0)
+
+    if style == 'european':
+        alive = T > 0
+        random = alive & (sigma > 0)
+        safe_T = np.where(alive, T, 1.0)
+        safe_sigma = np.where(random, sigma, 1.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            call = BlackScholes(S, K, safe_sigma, r, safe_T).price('call', decimals=None)
+        discounted_K = K * np.exp(-r * safe_T)
+        put = call - S + discounted_K
+        # At zero volatility the value is the discounted payoff on the forward
+        forward = np.maximum(np.where(is_call, S - discounted_K, discounted_K - S), 0)
+        value = np.where(random, np.where(is_call, call, put), forward)
+        return np.where(alive, value, intrinsic)
+
+    if style == 'american':
+        return BinomialAmerican.price_batch(S, K, sigma, r, T, is_call, N)
+
+    # Asian: one vectorized call per distinct number of fixings
+    values = np.empty(S.shape)
+    n_fixings = np.broadcast_to(portfolio.n_fixings, S.shape)
+    for n in np.unique(portfolio.n_fixings):
+        rows = n_fixings == n
+        values[rows] = AsianAnalytic.levy_batch(S[rows], K[rows], sigma[rows], r, T[rows], is_call[rows], int(n))
+    return values
@@ -0,0 +1,363 @@
+"""Precomputed pricing grids for real-time quoting.
+
+A ``PricingGrid`` prices one contract (strike, rate, option type) under an expensive model once, on a tensor grid
+of spot S, volatility sigma and time to maturity T, and then answers price and Greek queries by interpolation:
+
+  - 'chebyshev' (default): Chebyshev-Lobatto nodes on each axis and a tensor Chebyshev series, which converges
+    spectrally for the smooth value surface of an option away from expiry. Greeks are exact derivatives of the
+    series.
+  - 'cubic': uniform nodes and a tensor cubic B-spline (``scipy.interpolate.NdBSpline``).
+
+A query of q points is three Chebyshev-Vandermonde (or B-spline) basis evaluations and one contraction with the
+coefficient tensor, i.e. a few matrix products for the whole batch, so spot ticks against an American tree,
+a Heston Monte Carlo or a PDE cost microseconds per point instead of a full revaluation.
+
+Models evaluate whole slabs of the grid at once: the European and American trees price all nodes in one
+vectorized batch, the PDE solves once per volatility and reads every spot and maturity off its time levels, and
+Heston simulates once per volatility (with common random numbers) and reuses the paths for every spot, by
+homogeneity, and every maturity. When only one axis changes, ``update`` reuses every node that is still on the
+grid and prices only the new slab: shifting a 'cubic' S axis by whole steps, or refining a 'chebyshev' axis from
+n to 2n - 1 nodes, which nests the old nodes.
+"""
+
+import time
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+from options_pricer_European.models.Binomial import Binomial
+from options_pricer_European.models.Cache import seeded
+from options_pricer_European.models.Heston import Heston
+from options_pricer_European.models.Local_Vol import LocalVolatility, LocalVolPDE
+from options_pricer_American.models.Binomial import BinomialAmerican
+
+
+MODELS = ('binomial', 'american', 'pde', 'heston')
+
+
+def _binomial_grid(S, sigma, T, K, r, sign, N=100):
+    S, sigma, T = np.meshgrid(S, sigma, T, indexing='ij')
+    return Binomial.price_batch(S, K, sigma, r, T, sign > 0, N=N), 0.0
+
+
+def _american_grid(S, sigma, T, K, r, sign, N=None):
+    S, sigma, T = np.meshgrid(S, sigma, T, indexing='ij')
+    return BinomialAmerican.price_batch(S, K, sigma, r, T, sign > 0, N=N), 0.0
+
+
+def _pde_grid(S, sigma, T, K, r, sign, american=False, n_x=400, n_t=200):
+    """
+    One Crank-Nicolson solve to the longest maturity per volatility; its time levels give every shorter one.
+    """
+    values = np.empty((len(S), len(sigma), len(T)))
+    low, high = min(S.min(), K), max(S.max(), K)
+    for j, vol in enumerate(sigma):
+        width = 6 * vol * np.sqrt(T.max())
+        flat = LocalVolatility.constant(vol, low * np.exp(-width), high * np.exp(width), T.max())
+        pde = LocalVolPDE(S[0], K, flat, r, T.max(), 'call' if sign > 0 else 'put', american, n_x, n_t)
+        values[:, j, :] = pde.values(S, T)
+    return values, 0.0
+
+
+def _heston_grid(S, sigma, T, K, r, sign, kappa, theta, xi, rho, paths=10000, dt=1 / 252, seed=0):
+    """
+    Heston Monte Carlo with sigma = sqrt(v0). Paths of S_t / S_0 do not depend on S_0, so one simulation per
+    volatility prices every spot, and maturities between time steps interpolate the log-price. Every
+    simulation restarts from `seed`, so prices are smooth across the grid and a rerun at any node reproduces
+    it (the shocks are drawn step by step, so shorter horizons see the same initial shocks).
+    """
+    steps = max(int(np.ceil(T.max() / dt - 1e-9)), 1)
+    k = np.minimum((T / dt).astype(int), steps - 1)
+    w = T / dt - k
+    discount = np.exp(-r * T)
+    values = np.empty((len(S), len(sigma), len(T)))
+    standard_error = 0.0
+    for j, vol in enumerate(sigma):
+        with seeded(seed):
+            paths_S, _ = Heston(1.0, vol**2, r, steps * dt, kappa, theta, xi, rho, steps=steps, paths=paths).simulate()
+        log_S = np.log(paths_S)
+        growth = np.exp((1 - w) * log_S[:, k] + w * log_S[:, k + 1])
+        payoff = discount * np.maximum(sign * (S[:, None, None] * growth - K), 0)
+        values[:, j, :] = payoff.mean(axis=1)
+        standard_error = max(standard_error, float(payoff.std(axis=1, ddof=1).max()) / np.sqrt(paths))
+    return values, standard_error
+
+
+_EVALUATORS = {'binomial': _binomial_grid, 'american': _american_grid, 'pde': _pde_grid, 'heston': _heston_grid}
+
+
+class PricingGrid:
+    """
+    An interpolated price surface V(S, sigma, T) of one contract under a chosen model.
+
+    Attributes:
+    ----------
+    nodes : tuple of np.ndarray
+        The S, sigma and T nodes.
+    values : np.ndarray
+        (len(S), len(sigma), len(T)) model prices at the nodes.
+    error_estimate : float
+        For 'chebyshev' grids, the sum of the absolute highest-order coefficients along each axis, which bounds
+        the size of the last term kept and so estimates the truncation error of a converged series; None for
+        'cubic' grids.
+    max_error : float
+        Largest absolute interpolation error found by the last `validate`, None before.
+    stats : dict
+        'builds', 'nodes_priced', 'build_seconds' (of the last build or update) and 'standard_error' (largest
+        Monte Carlo standard error at a node, 0 for deterministic models).
+    """
+
+    def __init__(self, model, K, r, option_type='call', S_range=(50, 150), sigma_range=(0.1, 0.5),
+                 T_range=(0.05, 2.0), n=(33, 9, 9), method='chebyshev', **params):
+        """
+        Parameters:
+        ----------
+        model : str or callable
+            'binomial' (European CRR tree; `N`), 'american' (`BinomialAmerican.price_batch`; `N`), 'pde'
+            (Crank-Nicolson at constant volatility; `american`, `n_x`, `n_t`) or 'heston' (Monte Carlo with
+            sigma = sqrt(v0); `kappa`, `theta`, `xi`, `rho`, `paths`, `dt`, `seed`), configured by `params`.
+            A callable f(S, sigma, T) -> prices, vectorized over arrays that broadcast together, is priced
+            at every node.
+        K : float
+            Strike price.
+        r : float
+            Risk-free rate (flat).
+        option_type : str, optional
+            'call' (default) or 'put'.
+        S_range, sigma_range, T_range : tuple of float, optional
+            Bounds of each axis. Keep T away from 0, where the payoff kink makes the surface non-smooth.
+        n : tuple of int, optional
+            Number of nodes on each axis (default is (33, 9, 9); at least 4 each for 'cubic').
+        method : str, optional
+            'chebyshev' (default) or 'cubic'.
+        """
+        if method not in ('chebyshev', 'cubic'):
+            raise ValueError("method must be 'chebyshev' or 'cubic'")
+        if not callable(model) and model not in MODELS:
+            raise ValueError(f"model must be one of {list(MODELS)} or a callable")
+        self.model = model
+        self.K = K
+        self.r = r
+        self.option_type = option_type
+        self.method = method
+        self.params = params
+        self.stats = {'builds': 0, 'nodes_priced': 0, 'build_seconds': 0.0, 'standard_error': 0.0}
+        self.max_error = None
+        ranges = (S_range, sigma_range, T_range)
+        self.nodes = tuple(self._axis(lo, hi, size) for (lo, hi), size in zip(ranges, n))
+        self._build()
+
+    def _axis(self, lo, hi, size):
+        if not 0 < lo < hi or size < (4 if self.method == 'cubic' else 2):
+            raise ValueError("axes need 0 < lower < upper bound and enough nodes")
+        if self.method == 'cubic':
+            return np.linspace(lo, hi, size)
+        # Chebyshev-Lobatto points, in increasing order
+        return 0.5 * (lo + hi) - 0.5 * (hi - lo) * np.cos(np.pi * np.arange(size) / (size - 1))
+
+    def _evaluate(self, S, sigma, T):
+        sign = 1.0 if self.option_type == 'call' else -1.0
+        if callable(self.model):
+            grid = np.meshgrid(S, sigma, T, indexing='ij')
+            values, standard_error = np.asarray(self.model(*grid), dtype=float), 0.0
+        else:
+            values, standard_error = _EVALUATORS[self.model](S, sigma, T, self.K, self.r, sign, **self.params)
+        self.stats['nodes_priced'] += values.size
+        self.stats['standard_error'] = max(self.stats['standard_error'], standard_error)
+        return values
+
+    def _build(self, values=None):
+        start = time.perf_counter()
+        if values is None:
+            self.stats['standard_error'] = 0.0
+            values = self._evaluate(*self.nodes)
+        self.values = values
+        self._fit()
+        self.stats['builds'] += 1
+        self.stats['build_seconds'] = time.perf_counter() - start
+
+    def _fit(self):
+        self.bounds = tuple((x[0], x[-1]) for x in self.nodes)
+        if self.method == 'cubic':
+            from scipy.interpolate import NdBSpline, make_interp_spline
+
+            coefficients, knots = self.values, []
+            for axis, x in enumerate(self.nodes):
+                spline = make_interp_spline(x, coefficients, k=3, axis=axis)
+                coefficients, knots = np.moveaxis(spline.c, 0, axis), knots + [spline.t]
+            self._spline = NdBSpline(tuple(knots), coefficients, 3)
+            self.error_estimate = None
+            return
+        # Chebyshev coefficients: invert the Vandermonde matrix of each axis at its nodes
+        coefficients = self.values
+        for axis, x in enumerate(self.nodes):
+            inverse = np.linalg.inv(chebyshev.chebvander(self._unit(axis, x), len(x) - 1))
+            coefficients = np.moveaxis(np.tensordot(inverse, coefficients, axes=(1, axis)), 0, axis)
+        self.coefficients = coefficients
+        # Maps from series coefficients to those of the first and second derivatives, in the axis' own units
+        self._derivatives = [[chebyshev.chebder(np.eye(len(x)), m=order, axis=0) * (2 / (x[-1] - x[0])) ** order
+                              for order in (1, 2) if order < len(x)] for x in self.nodes]
+        self.error_estimate = float(sum(np.abs(np.take(coefficients, -1, axis=axis)).sum() for axis in range(3)))
+
+    def _unit(self, axis, x):
+        lo, hi = self.bounds[axis]
+        return (2 * x - (lo + hi)) / (hi - lo)
+
+    def _basis(self, axis, x, order=0):
+        """
+        Values (order 0) or derivatives of the Chebyshev polynomials of one axis at points x, shape (q, n).
+        """
+        size = len(self.nodes[axis])
+        # T_k(u) = cos(k arccos u) on [-1, 1]: one vectorized cosine instead of the recurrence
+        angle = np.arccos(np.clip(self._unit(axis, x), -1.0, 1.0))
+        if order == 0:
+            return np.cos(angle[:, None] * np.arange(size))
+        if order >= size:
+            return np.zeros((len(x), size))
+        return np.cos(angle[:, None] * np.arange(size - order)) @ self._derivatives[axis][order - 1]
+
+    def _points(self, S, sigma, T):
+        S, sigma, T = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, sigma, T)))
+        inside = np.ones(S.shape, dtype=bool)
+        for x, (lo, hi) in zip((S, sigma, T), self.bounds):
+            inside &= (x >= lo) & (x <= hi)
+        return S.ravel(), sigma.ravel(), T.ravel(), inside
+
+    def _finish(self, result, inside):
+        result = np.where(inside.ravel(), result, np.nan).reshape(inside.shape)
+        return result.item() if result.ndim == 0 else result
+
+    def price(self, S, sigma, T):
+        """
+        Interpolated prices at points (S, sigma, T), which broadcast together. Points outside the grid give NaN.
+        """
+        S, sigma, T, inside = self._points(S, sigma, T)
+        if self.method == 'cubic':
+            return self._finish(self._spline(np.column_stack((S, sigma, T))), inside)
+        # Contract the S axis with one matrix product, then sigma and T row by row
+        partial = (self._basis(0, S) @ self.coefficients.reshape(len(self.nodes[0]), -1))
+        partial = partial.reshape(len(S), len(self.nodes[1]), len(self.nodes[2]))
+        value = np.einsum('qj,qjk,qk->q', self._basis(1, sigma), partial, self._basis(2, T))
+        return self._finish(value, inside)
+
+    def greeks(self, S, sigma, T):
+        """
+        Price, delta, gamma, vega (per 0.01 of sigma) and theta (per calendar day) from the interpolant, in the
+        conventions of `BlackScholes`.
+
+        Returns:
+        -------
+        dict
+            'price', 'delta', 'gamma', 'vega' and 'theta' arrays (NaN outside the grid).
+        """
+        S, sigma, T, inside = self._points(S, sigma, T)
+        if self.method == 'cubic':
+            xi = np.column_stack((S, sigma, T))
+            derivatives = {name: self._spline(xi, nu=nu) for name, nu in
+                           (('price', (0, 0, 0)), ('delta', (1, 0, 0)), ('gamma', (2, 0, 0)),
+                            ('vega', (0, 1, 0)), ('theta', (0, 0, 1)))}
+        else:
+            flat = self.coefficients.reshape(len(self.nodes[0]), -1)
+            shape = (len(S), len(self.nodes[1]), len(self.nodes[2]))
+            by_S = [(self._basis(0, S, order) @ flat).reshape(shape) for order in range(3)]
+            B_sigma, B_T = self._basis(1, sigma), self._basis(2, T)
+            dB_sigma, dB_T = self._basis(1, sigma, 1), self._basis(2, T, 1)
+            contract = lambda b_sigma, partial, b_T: np.einsum('qj,qjk,qk->q', b_sigma, partial, b_T)
+            derivatives = {'price': contract(B_sigma, by_S[0], B_T), 'delta': contract(B_sigma, by_S[1], B_T),
+                           'gamma': contract(B_sigma, by_S[2], B_T), 'vega': contract(dB_sigma, by_S[0], B_T),
+                           'theta': contract(B_sigma, by_S[0], dB_T)}
+        derivatives['vega'] = derivatives['vega'] / 100
+        # Theta is the decay as calendar time passes, i.e. minus the derivative in time to maturity
+        derivatives['theta'] = -derivatives['theta'] / 365
+        return {name: self._finish(value, inside) for name, value in derivatives.items()}
+
+    def update(self, S_range=None, sigma_range=None, T_range=None, n=None, **params):
+        """
+        Moves or resizes the axes, and/or changes model parameters, repricing as little as possible.
+
+        Changed model parameters (or `K`, `r`, `option_type`) reprice the whole grid. Otherwise, when only one
+        axis changes, nodes still on the grid keep their prices and only the new slab is priced. A 'cubic'
+        axis keeps its spacing, so its bounds are moved by whole steps.
+
+        Parameters:
+        ----------
+        S_range, sigma_range, T_range : tuple of float, optional
+            New bounds of each axis (unchanged when None).
+        n : tuple of int, optional
+            New number of nodes on each axis ('chebyshev' only: a 'cubic' axis keeps its spacing).
+        **params :
+            New model parameters, including K, r or option_type.
+        """
+        reprice = any(self.params.get(key) != value for key, value in params.items()
+                      if key not in ('K', 'r', 'option_type'))
+        for name in ('K', 'r', 'option_type'):
+            if name in params:
+                reprice |= params[name] != getattr(self, name)
+                setattr(self, name, params.pop(name))
+        self.params.update(params)
+
+        n = tuple(len(x) for x in self.nodes) if n is None else n
+        nodes = []
+        for axis, (bounds, size) in enumerate(zip((S_range, sigma_range, T_range), n)):
+            old = self.nodes[axis]
+            lo, hi = (old[0], old[-1]) if bounds is None else bounds
+            if self.method == 'cubic':
+                step = old[1] - old[0]
+                lo = old[0] + np.round((lo - old[0]) / step) * step
+                size = int(np.round((hi - lo) / step)) + 1
+                hi = lo + (size - 1) * step
+            candidate = self._axis(lo, hi, size)
+            same = len(candidate) == len(old) and np.allclose(candidate, old, rtol=0, atol=1e-12 * (hi - lo))
+            nodes.append(old if same else candidate)
+
+        changed = [axis for axis in range(3) if nodes[axis] is not self.nodes[axis]]
+        if reprice or len(changed) > 1:
+            self.nodes = tuple(nodes)
+            self._build()
+            return self
+        if not changed:
+            return self
+
+        start = time.perf_counter()
+        axis = changed[0]
+        old, new = self.nodes[axis], nodes[axis]
+        tolerance = 1e-9 * (new[-1] - new[0])
+        position = np.searchsorted(old, new).clip(0, len(old) - 1)
+        previous = np.clip(position - 1, 0, len(old) - 1)
+        nearest = np.where(np.abs(old[previous] - new) < np.abs(old[position] - new), previous, position)
+        kept = np.abs(old[nearest] - new) <= tolerance
+
+        values = np.empty(tuple(len(x) for x in nodes))
+        index = [slice(None)] * 3
+        index[axis] = kept
+        values[tuple(index)] = np.take(self.values, nearest[kept], axis=axis)
+        if not np.all(kept):
+            slab = list(nodes)
+            slab[axis] = new[~kept]
+            index[axis] = ~kept
+            values[tuple(index)] = self._evaluate(*slab)
+        self.nodes = tuple(nodes)
+        self._build(values)
+        self.stats['build_seconds'] = time.perf_counter() - start
+        return self
+
+    def validate(self, n_points=32, seed=None):
+        """
+        Measures the interpolation error against the model at random points inside the grid.
+
+        Each point is priced directly as a one-node grid, so this costs n_points model evaluations. The Heston
+        grid reuses its random numbers, so noise shared by all points cancels; what remains comes mostly from
+        maturities between T nodes and is of the order of `stats['standard_error']`.
+
+        Returns:
+        -------
+        float
+            The largest absolute error, also stored as `max_error`.
+        """
+        rng = np.random.default_rng(seed)
+        points = [rng.uniform(lo, hi, n_points) for lo, hi in self.bounds]
+        standard_error = self.stats['standard_error']
+        exact = np.array([self._evaluate(np.array([s]), np.array([v]), np.array([t]))[0, 0, 0] for s, v, t in zip(*points)])
+        self.stats['standard_error'] = standard_error
+        self.max_error = float(np.max(np.abs(self.price(*points) - exact)))
+        return self.max_error
@@ -0,0 +1,265 @@
+import numpy as np
+
+from options_pricer_American.models.Binomial import BinomialAmerican
+from .Portfolio import STYLES, revalue
+
+
+class RiskEngine:
+    """
+    Value-at-Risk and Expected Shortfall for an option `Portfolio`.
+
+    Scenarios are joint log-returns of the underlyings (and optionally absolute volatility shifts) over a
+    horizon of a few trading days, either resampled from history or drawn from a multivariate normal.
+    Each scenario is then turned into a portfolio P&L in one of two modes:
+
+      - 'full': every position is revalued with its pricer at the shocked spot, shocked volatility and
+        shortened maturity. The scenario x position value matrix is built in blocks of at most
+        `max_elements` entries, and each block is reduced to per-scenario P&L by a matrix-vector
+        product with the quantities, so the full matrix is never held in memory.
+      - 'delta-gamma': the P&L is approximated by per-underlying delta, gamma and vega plus the exact
+        time decay, all computed once at the base point. This costs O(scenarios x underlyings).
+
+    `report` runs both modes on the same scenarios and reports how far the approximation diverges.
+    """
+
+    def __init__(self, portfolio, spot, r, trading_days=252, N=None, max_elements=2**22):
+        """
+        Parameters:
+        ----------
+        portfolio : Portfolio
+            The positions to measure.
+        spot : array-like
+            Current price of each underlying, indexed by `portfolio.underlying`.
+        r : float
+            Annualized risk-free interest rate.
+        trading_days : int, optional
+            Trading days per year, used to convert the horizon into years (default is 252).
+        N : int, optional
+            Number of binomial steps used for American positions (defaults to BinomialAmerican.N).
+        max_elements : int, optional
+            Maximum number of scenario x position values held at once (default is 2**22). American
+            positions divide this by the tree size.
+        """
+        self.portfolio = portfolio
+        self.spot = np.atleast_1d(np.asarray(spot, dtype=float))
+        self.r = r
+        self.trading_days = trading_days
+        self.N = N
+        self.max_elements = max_elements
+
+        if len(portfolio) and portfolio.underlying.max() >= len(self.spot):
+            raise ValueError("portfolio refers to an underlying with no spot price")
+
+        # Positions are revalued one style at a time, since each style has its own pricer.
+        self.books = [portfolio.select(portfolio.style == style) for style in STYLES]
+        self.books = [book for book in self.books if len(book)]
+        self.base_values = [revalue(book, self.spot[book.underlying], book.sigma, book.T, r, N) for book in self.books]
+
+    # --- Scenario generation ---
+
+    def historical_scenarios(self, prices, horizon=1, vol_history=None):
+        """
+        Overlapping `horizon`-day log-returns of the underlyings from a price history.
+
+        Parameters:
+        ----------
+        prices : array-like
+            (days, underlyings) history of closing prices, oldest first.
+        horizon : int, optional
+            Horizon in trading days (default is 1).
+        vol_history : array-like, optional
+            (days, underlyings) history of volatilities, whose `horizon`-day changes become the
+            volatility shifts of each scenario.
+
+        Returns:
+        -------
+        tuple[np.ndarray, np.ndarray or None]
+            Log-returns of shape (scenarios, underlyings) and the matching volatility shifts.
+        """
+        prices = np.asarray(prices, dtype=float).reshape(len(prices), -1)
+        if len(prices) <= horizon:
+            raise ValueError("price history must be longer than the horizon")
+        log_prices = np.log(prices)
+        returns = log_prices[horizon:] - log_prices[:-horizon]
+
+        vol_shifts = None
+        if vol_history is not None:
+            vols = np.asarray(vol_history, dtype=float).reshape(len(vol_history), -1)
+            vol_shifts = vols[horizon:] - vols[:-horizon]
+        return returns, vol_shifts
+
+    def monte_carlo_scenarios(self, prices=None, horizon=1, n_scenarios=10000, cov=None, mean=None):
+        """
+        Multivariate normal `horizon`-day log-returns.
+
+        The daily covariance is either given or estimated from a price history, scaled by the horizon
+        and factorized once; the scenarios are then a single matrix product of standard normals.
+
+        Parameters:
+        ----------
+        prices : array-like, optional
+            (days, underlyings) price history used to estimate the daily covariance.
+        horizon : int, optional
+            Horizon in trading days (default is 1).
+        n_scenarios : int, optional
+            Number of scenarios to draw (default is 10000).
+        cov : array-like, optional
+            Daily covariance matrix of log-returns, used instead of `prices`.
+        mean : array-like, optional
+            Daily mean log-return of each underlying (default is zero).
+
+        Returns:
+        -------
+        tuple[np.ndarray, None]
+            Log-returns of shape (scenarios, underlyings) and no volatility shifts.
+        """
+        if cov is None:
+            if prices is None:
+                raise ValueError("either prices or cov must be given")
+            daily = np.diff(np.log(np.asarray(prices, dtype=float).reshape(len(prices), -1)), axis=0)
+            cov = np.atleast_2d(np.cov(daily, rowvar=False))
+        cov = np.atleast_2d(np.asarray(cov, dtype=float))
+        mean = np.zeros(len(cov)) if mean is None else np.asarray(mean, dtype=float)
+
+        factor = np.linalg.cholesky(cov * horizon)
+        Z = np.random.normal(size=(n_scenarios, len(cov)))
+        return mean * horizon + Z @ factor.T, None
+
+    # --- Revaluation ---
+
+    def _shocked(self, book, returns, vol_shifts):
+        S = self.spot[book.underlying] * np.exp(returns[:, book.underlying])
+        sigma = book.sigma if vol_shifts is None else np.maximum(book.sigma + vol_shifts[:, book.underlying], 0)
+        return S, np.broadcast_to(sigma, S.shape)
+
+    def _full_pnl(self, returns, vol_shifts, dt):
+        pnl = np.zeros(len(returns))
+        for book, base in zip(self.books, self.base_values):
+            per_value = self.max_elements
+            if book.style[0] == 'american':
+                # Each value carries a whole tree of N + 1 nodes.
+                per_value = max(1, self.max_elements // ((self.N or BinomialAmerican.N) + 1))
+            position_block = max(1, min(len(book), per_value))
+            scenario_block = max(1, per_value // position_block)
+
+            for p in range(0, len(book), position_block):
+                block = book.select(slice(p, p + position_block))
+                block_base = base[p:p + position_block]
+                T = np.maximum(block.T - dt, 0)
+                for s in range(0, len(returns), scenario_block):
+                    vols = None if vol_shifts is None else vol_shifts[s:s + scenario_block]
+                    S, sigma = self._shocked(block, returns[s:s + scenario_block], vols)
+                    values = revalue(block, S, sigma, T, self.r, self.N)
+                    pnl[s:s + scenario_block] += (values - block_base) @ block.quantity
+        return pnl
+
+    def greeks(self, horizon=1, bump=0.01, vol_bump=0.01):
+        """
+        Per-underlying portfolio delta, gamma and vega, plus the P&L from the passage of `horizon` days.
+
+        Greeks come from central finite differences of the same pricers used for full revaluation,
+        so the two modes are directly comparable.
+
+        Returns:
+        -------
+        dict
+            'delta', 'gamma' and 'vega' arrays indexed by underlying, and the scalar 'theta' P&L.
+        """
+        n = len(self.spot)
+        delta, gamma, vega = np.zeros(n), np.zeros(n), np.zeros(n)
+        theta = 0.0
+        dt = horizon / self.trading_days
+
+        for book, base in zip(self.books, self.base_values):
+            S = self.spot[book.underlying]
+            h = bump * S
+            up = revalue(book, S + h, book.sigma, book.T, self.r, self.N)
+            down = revalue(book, S - h, book.sigma, book.T, self.r, self.N)
+            vol_up = revalue(book, S, book.sigma + vol_bump, book.T, self.r, self.N)
+            # Near zero volatility the down bump is one-sided, so the difference is over the actual spread
+            sigma_down = np.maximum(book.sigma - vol_bump, 0)
+            vol_down = revalue(book, S, sigma_down, book.T, self.r, self.N)
+            decayed = revalue(book, S, book.sigma, np.maximum(book.T - dt, 0), self.r, self.N)
+
+            q = book.quantity
+            delta += np.bincount(book.underlying, q * (up - down) / (2 * h), n)
+            gamma += np.bincount(book.underlying, q * (up - 2 * base + down) / h**2, n)
+            vega += np.bincount(book.underlying, q * (vol_up - vol_down) / (book.sigma + vol_bump - sigma_down), n)
+            theta += np.dot(q, decayed - base)
+
+        return {'delta': delta, 'gamma': gamma, 'vega': vega, 'theta': theta}
+
+    def pnl(self, returns, vol_shifts=None, horizon=1, method='full'):
+        """
+        Portfolio P&L under each scenario.
+
+        Parameters:
+        ----------
+        returns : np.ndarray
+            (scenarios, underlyings) log-returns.
+        vol_shifts : np.ndarray, optional
+            (scenarios, underlyings) absolute volatility shifts.
+        horizon : int, optional
+            Horizon in trading days, by which every maturity is shortened (default is 1).
+        method : str, optional
+            'full' (default) or 'delta-gamma'.
+
+        Returns:
+        -------
+        np.ndarray
+            P&L per scenario.
+        """
+        returns = np.asarray(returns, dtype=float).reshape(len(returns), -1)
+        if method == 'full':
+            return self._full_pnl(returns, vol_shifts, horizon / self.trading_days)
+        if method != 'delta-gamma':
+            raise ValueError("method must be 'full' or 'delta-gamma'")
+
+        g = self.greeks(horizon)
+        dS = self.spot * np.expm1(returns)
+        pnl = dS @ g['delta'] + 0.5 * dS**2 @ g['gamma'] + g['theta']
+        if vol_shifts is not None:
+            pnl += vol_shifts @ g['vega']
+        return pnl
+
+    # --- Risk measures ---
+
+    @staticmethod
+    def var_es(pnl, confidence=0.99):
+        """
+        Value-at-Risk and Expected Shortfall of a P&L sample, both reported as positive losses.
+
+        Returns:
+        -------
+        tuple[float, float]
+            VaR at the given confidence level and the mean loss beyond it.
+        """
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        losses = -np.asarray(pnl)
+        VaR = np.quantile(losses, confidence)
+        ES = losses[losses >= VaR].mean()
+        return VaR, ES
+
+    def report(self, returns, vol_shifts=None, horizon=1, confidence=(0.95, 0.99)):
+        """
+        VaR and ES under full revaluation and the delta-gamma(-vega) approximation, with their divergence.
+
+        Returns:
+        -------
+        dict
+            For each confidence level, the VaR and ES of both methods, plus the RMSE and maximum absolute
+            difference between the two P&L vectors.
+        """
+        full = self.pnl(returns, vol_shifts, horizon, 'full')
+        approx = self.pnl(returns, vol_shifts, horizon, 'delta-gamma')
+        difference = approx - full
+
+        report = {'horizon': horizon, 'scenarios': len(full),
+                  'rmse': np.sqrt(np.mean(difference**2)), 'max_abs_error': np.max(np.abs(difference))}
+        for level in np.atleast_1d(confidence):
+            VaR_full, ES_full = self.var_es(full, level)
+            VaR_approx, ES_approx = self.var_es(approx, level)
+            report[level] = {'VaR': VaR_full, 'ES': ES_full,
+                             'VaR_delta_gamma': VaR_approx, 'ES_delta_gamma': ES_approx}
+        return report
@@ -0,0 +1,6 @@
+from .Portfolio import Portfolio, revalue
+from .VaR import RiskEngine
+from .Pricing_Grid import PricingGrid
+from .Incremental import IncrementalBook
+
+__all__ = ['Portfolio', 'revalue', 'RiskEngine', 'PricingGrid', 'IncrementalBook']
\ No newline at end of file
@@ -71,3 +71,16 @@ def test_negative_stock_price():
 def test_zero_steps():
     with pytest.raises(ValueError):
         Binomial(100, 100, 1, 0.05, 0.2).price_options()
+
+def test_degenerate_trees_price_without_nan():
+    import warnings
+    import numpy as np
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert Binomial(120, 100, 0.2, 0.05, 0, 'call').price_options() == 20
+        assert Binomial(80, 100, 0.2, 0.05, 0, 'put').price_options() == 20
+        assert Binomial(105, 100, 0.0, 0.05, 1, 'call').price_options() == pytest.approx(105 - 100 * np.exp(-0.05))
+        assert Binomial(90, 100, 0.0, 0.05, 1, 'put').price_options() == pytest.approx(100 * np.exp(-0.05) - 90)
+    with pytest.raises(ValueError):
+        Binomial(100, 100, 0.2, 0.05, -1).price_options()
+
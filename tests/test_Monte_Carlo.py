@@ -36,3 +36,78 @@ def test_simulate_for_put():
     assert SE == pytest.approx(0.01, rel=1e-3)
 
 
+
+
+def test_float32_paths_price_within_standard_error(monkeypatch):
+    import numpy as np
+    from options_pricer_European.models.Heston import Heston
+    monkeypatch.setattr(MonteCarlo, 'N', 100)
+    monkeypatch.setattr(MonteCarlo, 'M', 20000)
+    single = MonteCarlo(100, 100, 0.2, 0.05, 1, 'call', dtype=np.float32)
+    assert single.calculate_stock_price()[0].dtype == np.float32
+    # Same seed, so the same draws: the difference is the rounding of the paths alone
+    price, SE = single.simulate(seed=1)
+    assert abs(price - MonteCarlo(100, 100, 0.2, 0.05, 1, 'call').simulate(seed=1)[0]) < 0.01 * SE
+
+    prices, errors = MonteCarlo.price_batch([100, 100], [90, 110], 0.2, 0.05, 1, [True, False], M=100000, seed=2,
+                                            dtype=np.float32)
+    exact, _ = MonteCarlo.price_batch([100, 100], [90, 110], 0.2, 0.05, 1, [True, False], M=100000, seed=2)
+    assert np.all(np.abs(prices - exact) < 0.01 * errors)
+
+    heston = dict(S0=100, v0=0.04, r=0.05, T=1, kappa=2, theta=0.04, xi=0.3, rho=-0.7, steps=50, paths=20000, K=100)
+    price, SE = Heston(**heston, dtype=np.float32).price(seed=3)
+    assert abs(price - Heston(**heston).price(seed=3)[0]) < 0.01 * SE
+
+def test_visualiser_reuses_one_simulation(monkeypatch, tmp_path):
+    import json
+    import numpy as np
+    from options_pricer_European.models.Black_Scholes import BlackScholes
+    from options_pricer_European.utils.Visualisation_Tools_Monte_Carlo import MC_Visualiser
+    monkeypatch.setattr(MonteCarlo, 'N', 20)
+    monkeypatch.setattr(MonteCarlo, 'M', 50000)
+    mc = MonteCarlo(100, 95, 0.25, 0.04, 1, 'put')
+    runs = []
+    simulate_paths = mc.calculate_stock_price
+    monkeypatch.setattr(mc, 'calculate_stock_price', lambda seed=None: runs.append(seed) or simulate_paths(seed))
+    vis = MC_Visualiser(mc, seed=3, max_paths=10)
+
+    curves = vis.greek_curves()
+    bs = BlackScholes(100, 95, 0.25, 0.04, 1)
+    assert curves['price'][-1] == pytest.approx(bs.price('put', None), abs=3 * curves['SE'][-1])
+    for name in ('delta', 'gamma', 'vega', 'theta', 'rho'):
+        expected = getattr(bs, name)() if name in ('gamma', 'vega') else getattr(bs, name)('put')
+        assert curves[name][-1] == pytest.approx(expected, rel=0.05)
+
+    histogram = vis.histogram_data(percentiles=(50, 95))
+    assert histogram['counts'].sum() == 50000 and histogram['percentiles'][50] <= histogram['percentiles'][95]
+    times, paths = vis.sample_paths()
+    assert paths.shape == (21, 10) and times[-1] == 1
+    vis.export(tmp_path / 'report.json')
+    assert json.load(open(tmp_path / 'report.json'))['price'] == pytest.approx(mc.simulate(seed=3)[0])
+    assert runs == [3, 3]       # the visualiser's run, then simulate's
+
+    # Changing the model or the seed runs a new simulation
+    mc.K = 105
+    assert vis.histogram_data()['mean'] > histogram['mean'] and runs == [3, 3, 3]
+    vis.seed = 4
+    vis.sample_paths()
+    assert runs == [3, 3, 3, 4]
+
+def test_visualiser_refuses_greeks_under_a_vol_term_structure(monkeypatch):
+    import numpy as np
+    from options_pricer_European.utils.Visualisation_Tools_Monte_Carlo import MC_Visualiser
+
+    class TermStructure:
+        def forward_volatility(self, t0, t1):
+            return np.full(np.shape(t0), 0.2)
+
+        def vol(self, K, T):
+            return 0.2
+
+    monkeypatch.setattr(MonteCarlo, 'N', 10)
+    monkeypatch.setattr(MonteCarlo, 'M', 1000)
+    vis = MC_Visualiser(MonteCarlo(100, 100, TermStructure(), 0.03, 1, 'call'), seed=1)
+    with pytest.raises(ValueError):
+        vis.greek_curves()
+    assert vis.report()['greeks'] is None
+
@@ -0,0 +1,48 @@
+from options_pricer_American.models.Binomial import BinomialAmerican
+from options_pricer_American.models.Monte_Carlo import MonteCarloAmerican
+from options_pricer_European.models.Black_Scholes import BlackScholes
+from options_pricer_European.models.Cache import seeded
+from options_pricer_European.models.Monte_Carlo import MonteCarlo
+
+
+def test_longstaff_schwartz_put_carries_early_exercise_premium(monkeypatch):
+    monkeypatch.setattr(MonteCarlo, 'N', 25)
+    monkeypatch.setattr(MonteCarlo, 'M', 2000)
+    with seeded(0):
+        price, SE = MonteCarloAmerican(100, 100, 0.2, 0.05, 1, 'put').simulate()
+    european = BlackScholes(100, 100, 0.2, 0.05, 1).price('put', None)
+    american = BinomialAmerican(100, 100, 0.2, 0.05, 1, 'put').price_options()
+    assert european < price < american + 3 * SE
+
+
+def test_longstaff_schwartz_float32_paths_within_standard_error(monkeypatch):
+    import numpy as np
+    monkeypatch.setattr(MonteCarlo, 'N', 25)
+    monkeypatch.setattr(MonteCarlo, 'M', 2000)
+    prices = {}
+    for dtype in (np.float64, np.float32):
+        with seeded(0):
+            model = MonteCarloAmerican(100, 100, 0.2, 0.05, 1, 'put', dtype=dtype)
+            prices[dtype] = model.simulate()
+        assert model.paths.dtype == dtype
+    # Rounding may flip the exercise decision of paths on the boundary, so the prices agree to a fraction of SE
+    assert abs(prices[np.float32][0] - prices[np.float64][0]) < 0.25 * prices[np.float64][1]
+
+
+def test_degenerate_american_trees_price_without_nan():
+    import warnings
+    import numpy as np
+    import pytest
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert BinomialAmerican(120, 100, 0.2, 0.05, 0, 'call').price_options() == 20
+        assert BinomialAmerican(80, 100, 0.2, 0.05, 0, 'put').price_options() == 20
+        assert BinomialAmerican(105, 100, 0.0, 0.05, 1, 'call').price_options() == pytest.approx(105 - 100 * np.exp(-0.05))
+        # Early exercise: the zero-volatility put is exercised at once rather than held to the forward
+        assert BinomialAmerican(90, 100, 0.0, 0.05, 1, 'put').price_options() == pytest.approx(10)
+        assert BinomialAmerican(90, 100, 0.0, 0.05, 1, 'put').price_options() == pytest.approx(
+            BinomialAmerican.price_batch(90, 100, 0.0, 0.05, 1, False)[()])
+        # Below sigma sqrt(dt) = r dt the probability would leave [0, 1]: the forward value, not an overflow
+        assert BinomialAmerican(105, 100, 0.001, 0.05, 1, 'call').price_options() == pytest.approx(105 - 100 * np.exp(-0.05))
+    with pytest.raises(ValueError):
+        BinomialAmerican(100, 100, 0.2, 0.05, -1).price_options()
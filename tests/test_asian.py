@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from options_pricer_Asian.models.Monte_Carlo import asian
+from options_pricer_Asian.models.Analytic import AsianAnalytic
+
+# -- Analytic Approximations --
+
+def test_geometric_below_arithmetic_call():
+    a = AsianAnalytic(100, 100, 0.2, 0.05, 1, 'call', N=252)
+    assert a.geometric() < a.levy()
+
+def test_levy_close_to_turnbull_wakeman():
+    a = AsianAnalytic(100, 100, 0.2, 0.05, 1, 'call', N=1000)
+    assert a.levy() == pytest.approx(a.turnbull_wakeman(), rel=1e-2)
+
+def test_invalid_option_type():
+    with pytest.raises(ValueError):
+        AsianAnalytic(100, 100, 0.2, 0.05, 1, 'straddle')
+
+# -- Control Variate --
+
+def test_control_variate_matches_levy():
+    np.random.seed(0)
+    price, SE = asian(100, 100, 0.2, 0.05, 1, 'call', N=252, M=20000).simulate()
+    assert price == pytest.approx(AsianAnalytic(100, 100, 0.2, 0.05, 1, 'call', N=252).levy(), abs=0.05)
+    assert SE < 0.01
+
+def test_control_variate_reduces_error():
+    np.random.seed(0)
+    _, SE_cv = asian(100, 100, 0.2, 0.05, 1, 'put', N=100, M=5000).simulate()
+    _, SE_plain = asian(100, 100, 0.2, 0.05, 1, 'put', N=100, M=5000, control_variate=False).simulate()
+    assert SE_cv < SE_plain / 10
+
+# -- Fixing Schedules and Seasoned Contracts --
+
+monthly = np.arange(1, 13) / 12
+
+def test_custom_fixings_match_levy():
+    np.random.seed(1)
+    price, SE = asian(100, 100, 0.2, 0.05, 1, 'call', M=20000, fixings=monthly).simulate()
+    levy = AsianAnalytic(100, 100, 0.2, 0.05, 1, 'call', fixings=monthly).levy()
+    assert price == pytest.approx(levy, abs=0.05)
+    assert SE < 0.01
+
+def test_seasoned_call_certain_exercise():
+    # Six fixings at 250 already guarantee the average exceeds the strike.
+    a = AsianAnalytic(100, 100, 0.2, 0.05, 1, 'call', fixings=monthly[6:], past_average=250, n_past=6)
+    M1, _ = a.arithmetic_moments()
+    expected = np.exp(-0.05) * ((6 * 250 + 6 * M1) / 12 - 100)
+    assert a.levy() == pytest.approx(expected)
+    assert AsianAnalytic(100, 100, 0.2, 0.05, 1, 'put', fixings=monthly[6:], past_average=250, n_past=6).levy() == 0.0
+
+def test_seasoned_simulation():
+    np.random.seed(2)
+    price, _ = asian(100, 100, 0.2, 0.05, 1, 'put', M=20000, fixings=monthly[6:], past_average=90, n_past=6).simulate()
+    levy = AsianAnalytic(100, 100, 0.2, 0.05, 1, 'put', fixings=monthly[6:], past_average=90, n_past=6).levy()
+    assert price == pytest.approx(levy, abs=0.05)
+
+def test_fixings_outside_maturity():
+    with pytest.raises(ValueError):
+        asian(100, 100, 0.2, 0.05, 1, 'call', fixings=[0.5, 1.5])
+
+
+def test_float32_paths_price_within_standard_error():
+    # The control variate's standard error is ~1e-3, the tightest test of the float32 rounding
+    for control_variate in (True, False):
+        prices = {}
+        for dtype in (np.float64, np.float32):
+            np.random.seed(4)
+            prices[dtype] = asian(100, 100, 0.2, 0.05, 1, 'call', N=252, M=20000, control_variate=control_variate,
+                                  dtype=dtype).simulate()
+        assert abs(prices[np.float32][0] - prices[np.float64][0]) < 0.01 * prices[np.float64][1]
+
+def test_control_variate_skipped_for_non_normal_shocks():
+    from scipy import stats
+    fat_tails = dict(N=50, M=20000, distribution=stats.t(df=3))
+    with_cv = asian(100, 100, 0.2, 0.05, 1, 'call', **fat_tails).simulate(seed=1)
+    without_cv = asian(100, 100, 0.2, 0.05, 1, 'call', control_variate=False, **fat_tails).simulate(seed=1)
+    assert with_cv == without_cv
+    _, SE_cv = asian(100, 100, 0.2, 0.05, 1, 'call', N=50, M=20000, distribution=stats.norm).simulate(seed=1)
+    _, SE_plain = asian(100, 100, 0.2, 0.05, 1, 'call', N=50, M=20000, control_variate=False).simulate(seed=1)
+    assert SE_cv < SE_plain / 10
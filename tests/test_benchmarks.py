@@ -0,0 +1,49 @@
+import copy
+
+from benchmarks.run import compare, main, run
+
+
+def test_benchmarks_record_and_compare(tmp_path, capsys):
+    results = run(['black_scholes.*', 'binomial.price*'], quick=True, repeat=2, min_time=0.001)
+    assert set(results['results']) == {'black_scholes.price', 'black_scholes.greeks', 'black_scholes.batch',
+                                       'binomial.price[N=50]', 'binomial.price[N=200]'}
+    batch = results['results']['black_scholes.batch']
+    assert batch['contracts'] == 10_000 and batch['peak_bytes'] > 10_000 * 8
+    assert batch['throughput'] == batch['contracts'] / batch['median']
+
+    slower = copy.deepcopy(results)
+    slower['results']['binomial.price[N=50]']['median'] *= 1.5
+    ratios, regressions = compare(slower, results, threshold=20)
+    assert regressions == ['binomial.price[N=50]'] and ratios['black_scholes.price'] == 1
+
+    baseline = tmp_path / 'baseline.json'
+    assert main(['--filter', 'black_scholes.price', '--repeat', '2', '--min-time', '0.001', '--output', str(baseline)]) == 0
+    assert main(['--filter', 'black_scholes.price', '--repeat', '2', '--min-time', '0.001', '--compare', str(baseline),
+                 '--threshold', '1000']) == 0
+    assert 'black_scholes.price' in capsys.readouterr().out
+
+
+def test_convergence_frontier_and_cheapest_settings():
+    from benchmarks.convergence import cheapest, contracts, converge, frontier
+    book = contracts(strikes=(100,), maturities=(0.5,))
+    result = converge(book, models=['binomial', 'binomial_american'], quick=True)
+    rows = [row for row in result['rows'] if row['model'] == 'binomial']
+    assert [row['resolution']['N'] for row in rows] == [25, 50, 100, 200]
+    # CRR converges at first order: doubling N about halves the error
+    errors = [row['max_error_bp'] for row in rows]
+    assert all(0.3 < b / a < 0.7 for a, b in zip(errors, errors[1:]))
+    assert all(row['contracts'] == 1 and row['peak_bytes'] > 0 for row in result['rows'] if row['model'] == 'binomial_american')
+
+    for front in frontier(result['rows']).values():
+        assert all(b['cpu_seconds'] >= a['cpu_seconds'] and b['max_error_bp'] < a['max_error_bp'] for a, b in zip(front, front[1:]))
+    best = cheapest(result['rows'], tolerance_bp=errors[2])
+    assert best['binomial']['resolution'] == {'N': 100}
+    assert cheapest(result['rows'], tolerance_bp=1e-9)['binomial'] is None
+
+
+def test_core_packages_import_without_heavy_libraries():
+    from benchmarks.imports import measure_import
+    for package in ('options_pricer_European.models', 'options_pricer_American.models', 'options_pricer_Asian.models',
+                    'options_pricer_European.utils'):
+        result = measure_import(package, repeat=1)
+        assert result['heavy'] == [] and result['median'] > 0
@@ -28,3 +28,20 @@ def test_visualizer_dataframe():
     assert not df.empty
     assert 'Price' in df.columns
 
+def test_visualizer_grid_matches_black_scholes(tmp_path):
+    vis = BSOptionsVisualizer(K=100, r=0.05, sigma=0.2)
+    df = vis.generate_data([30, 90], n_prices=11, S_range=(0.9, 1.1))
+    assert len(df) == 2 * 11 * 2
+    row = df[(df['T_days'] == 90) & (df['Option Type'] == 'put')].iloc[5]
+    bs = BlackScholes(row['Stock Price'], 100, 0.2, 0.05, 90 / 365)
+    assert row['Price'] == bs.price('put')
+    for name in ('Delta', 'Theta', 'Rho'):
+        assert row[name] == pytest.approx(getattr(bs, name.lower())('put'))
+    assert row['Gamma'] == pytest.approx(bs.gamma()) and row['Vega'] == pytest.approx(bs.vega())
+
+    exported = vis.export(str(tmp_path / 'grid.json'), [30], n_prices=5)
+    assert pd.read_json(tmp_path / 'grid.json').shape == exported.shape == (10, 9)
+
+    expiry = vis.generate_data([0], n_prices=10)
+    assert not expiry.isna().any().any()
+
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+from options_pricer_European.models import Binomial, BlackScholes, MonteCarlo, PricingCache
+from options_pricer_European.models.Cache import active_cache
+from options_pricer_European.utils import IV_Binomial_Bisection
+from options_pricer_American.models.Binomial import BinomialAmerican
+
+def test_quantized_inputs_share_entries():
+    with PricingCache(tolerance=1e-8) as cache:
+        first = BlackScholes(100, 100, 0.2, 0.05, 1).price('call', None)
+        assert BlackScholes(100 + 1e-10, 100, 0.2, 0.05, 1).price('call', None) == first
+        BlackScholes(100.01, 100, 0.2, 0.05, 1).price('call', None)
+        assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+    assert active_cache() is None
+
+def test_same_object_hits_on_its_second_call():
+    with PricingCache() as cache:
+        for model in (Binomial(100, 100, 0.2, 0.05, 1), BinomialAmerican(100, 100, 0.2, 0.05, 1, 'put')):
+            first = model.price_options()
+            assert model.price_options() == first
+        assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 2
+        # Changing an input after the first call still changes the key
+        model.K = 105
+        assert model.price_options() > first and cache.stats()['misses'] == 3
+
+def test_class_settings_are_part_of_the_key(monkeypatch):
+    with PricingCache() as cache:
+        monkeypatch.setattr(Binomial, 'N', 50)
+        coarse = Binomial(100, 100, 0.2, 0.05, 1).price_options()
+        monkeypatch.setattr(Binomial, 'N', 200)
+        assert Binomial(100, 100, 0.2, 0.05, 1).price_options() != coarse
+        assert cache.stats()['hits'] == 0
+
+def test_repeated_solver_calls_hit():
+    with PricingCache() as cache:
+        vol = IV_Binomial_Bisection(100, 100, 0.05, 1, 10.0)
+        misses = cache.stats()['misses']
+        assert IV_Binomial_Bisection(100, 100, 0.05, 1, 10.0) == vol
+        assert cache.stats()['misses'] == misses
+
+def test_seeded_monte_carlo_is_reproducible():
+    with PricingCache() as cache:
+        seeded = MonteCarlo(100, 100, 0.2, 0.05, 1, 'call').simulate(seed=3)
+        assert MonteCarlo(100, 100, 0.2, 0.05, 1, 'call').simulate(seed=3) == seeded
+        cache.clear()
+        assert MonteCarlo(100, 100, 0.2, 0.05, 1, 'call').simulate(seed=3) == seeded
+        MonteCarlo(100, 100, 0.2, 0.05, 1, 'call').simulate()
+        assert len(cache) == 1
+
+def test_size_ttl_and_memory_bounds():
+    cache = PricingCache(maxsize=3, ttl=0.05)
+    with cache:
+        for S in range(100, 105):
+            BlackScholes(S, 100, 0.2, 0.05, 1).delta('call')
+        time.sleep(0.06)
+        BlackScholes(104, 100, 0.2, 0.05, 1).delta('call')
+    assert cache.stats()['evictions'] == 2 and cache.stats()['expirations'] == 1
+    small = PricingCache(max_bytes=1200)
+    with small:
+        for S in (90.0, 100.0, 110.0):
+            BinomialAmerican.price_batch(np.full(50, S), 100, 0.2, 0.05, 1, False, N=20)
+        cached_prices = BinomialAmerican.price_batch(np.full(50, 110.0), 100, 0.2, 0.05, 1, False, N=20)
+    assert small.stats()['bytes'] <= 1200 and small.stats()['evictions'] > 0
+    # Cached arrays are read-only, so a caller cannot corrupt them
+    assert not cached_prices.flags.writeable
+
+def test_concurrent_handlers():
+    cache = PricingCache()
+    def handler():
+        for i in range(100):
+            BlackScholes(100 + i % 10, 100, 0.2, 0.05, 1).gamma()
+    with cache:
+        threads = [threading.Thread(target=handler) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    stats = cache.stats()
+    assert stats['hits'] + stats['misses'] == 400 and stats['entries'] == 10
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from options_pricer_Exotic.models import (PathEngine, BarrierAnalytic, VanillaPayoff, DigitalPayoff, BarrierPayoff,
+                                          LookbackPayoff, AsianPayoff, CliquetPayoff, MultiAssetMonteCarlo, BasketPayoff,
+                                          SpreadPayoff, RainbowPayoff, SpreadAnalytic)
+
+# -- Reiner-Rubinstein --
+
+@pytest.mark.parametrize('option_type', ['call', 'put'])
+@pytest.mark.parametrize('K', [90, 110])
+def test_in_out_parity(option_type, K):
+    for direction, H in [('down', 80), ('up', 120)]:
+        knock_in = BarrierAnalytic(100, K, H, 0.2, 0.05, 1, option_type, f'{direction}-and-in').price()
+        knock_out = BarrierAnalytic(100, K, H, 0.2, 0.05, 1, option_type, f'{direction}-and-out').price()
+        vanilla = VanillaPayoff(K, option_type).analytic(PathEngine(100, 0.2, 0.05, 1))
+        assert knock_in + knock_out == pytest.approx(vanilla)
+
+def test_barrier_vectorized():
+    prices = BarrierAnalytic(100, np.array([90, 100, 110]), 80, 0.2, 0.05, 1, 'call', 'down-and-out').price()
+    assert prices.shape == (3,)
+    assert np.all(np.diff(prices) < 0)
+
+def test_already_knocked_out():
+    assert BarrierAnalytic(75, 90, 80, 0.2, 0.05, 1, 'call', 'down-and-out').price() == 0.0
+
+# -- Shared Path Engine --
+
+def test_engine_prices_many_payoffs():
+    np.random.seed(0)
+    engine = PathEngine(100, 0.2, 0.05, 1, N=120, M=20000)
+    payoffs = [BarrierPayoff(100, 85, 'call', 'down-and-out'), BarrierPayoff(100, 115, 'put', 'up-and-in'),
+               DigitalPayoff(100, 'call'), LookbackPayoff('call'), AsianPayoff(100, 'call'),
+               CliquetPayoff(np.arange(1, 13) / 12, local_cap=0.02)]
+    results = engine.price(payoffs, control=VanillaPayoff(100, 'call'))
+
+    for payoff, (price, SE) in zip(payoffs[:3], results[:3]):
+        assert price == pytest.approx(payoff.analytic(engine), abs=4 * SE)
+    # A floating-strike lookback call is worth more than the at-the-money vanilla call
+    assert results[3][0] > VanillaPayoff(100, 'call').analytic(engine)
+    assert 0 < results[5][0] <= 0.24
+
+def test_fixings_must_fall_on_distinct_grid_steps():
+    np.random.seed(0)
+    monthly = np.arange(1, 13) / 12
+    with pytest.warns(UserWarning, match='nearest step'):
+        PathEngine(100, 0.2, 0.05, 1, N=100, M=100).price([CliquetPayoff(monthly)])
+    with pytest.raises(ValueError, match='same step'):
+        PathEngine(100, 0.2, 0.05, 1, N=6, M=100).price([AsianPayoff(100, 'call', fixings=monthly)])
+
+def test_discrete_barrier_has_no_closed_form():
+    with pytest.raises(NotImplementedError):
+        BarrierPayoff(100, 85, 'call', 'down-and-out', bridge=False).analytic(PathEngine(100, 0.2, 0.05, 1))
+
+# -- Multi-Asset --
+
+corr = [[1, 0.6], [0.6, 1]]
+
+def test_spread_matches_kirk():
+    np.random.seed(0)
+    mc = MultiAssetMonteCarlo([100, 95], [0.25, 0.2], corr, 0.03, 1, M=200000)
+    (price, SE), = mc.price([SpreadPayoff(5, 'call')])
+    assert price == pytest.approx(SpreadAnalytic(100, 95, 5, 0.25, 0.2, 0.6, 0.03, 1, 'call').kirk(), abs=4 * SE)
+
+def test_chunking_bounds_memory():
+    np.random.seed(0)
+    mc = MultiAssetMonteCarlo([100, 95], None, corr, 0.03, 1, N=50, M=5000, model='heston', max_memory=2**18,
+                              heston_params=dict(v0=[0.0625, 0.04], kappa=2, theta=[0.0625, 0.04], xi=0.3, rho=-0.5))
+    assert mc.chunk_size() < mc.M
+    best, worst = mc.price([RainbowPayoff(100, 'call', 'best'), RainbowPayoff(100, 'call', 'worst')])
+    assert best[0] > worst[0] > 0
+
+def test_basket_of_identical_assets():
+    np.random.seed(0)
+    mc = MultiAssetMonteCarlo([100, 100], [0.2, 0.2], [[1, 0.999999], [0.999999, 1]], 0.05, 1, M=100000)
+    (price, SE), = mc.price([BasketPayoff([0.5, 0.5], 100, 'call')])
+    assert price == pytest.approx(VanillaPayoff(100, 'call').analytic(PathEngine(100, 0.2, 0.05, 1)), abs=4 * SE)
+
+def test_invalid_correlation():
+    with pytest.raises(ValueError):
+        MultiAssetMonteCarlo([100, 95], [0.25, 0.2], [[1, 1.5], [1.5, 1]], 0.03, 1)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from options_pricer_European.models.Black_Scholes import BlackScholes
+from options_pricer_European.models.Black_76 import Black76
+from options_pricer_European.models.Bachelier import Bachelier
+from options_pricer_European.models.Kernel import greeks_batch, implied_vol_batch, price_batch
+from options_pricer_European.utils.IV import IV_Black76, IV_Bachelier
+
+def test_black76_on_forward_is_black_scholes():
+    F = 100 * np.exp(0.04 * 0.75)
+    bs = BlackScholes(100, 105, 0.25, 0.04, 0.75)
+    b76 = Black76(F, 105, 0.25, 0.04, 0.75)
+    assert b76.price('put', None) == pytest.approx(bs.price('put', None))
+    assert b76.vega() == pytest.approx(bs.vega())
+    assert b76.delta('call') * F / 100 == pytest.approx(bs.delta('call'))
+
+def test_bachelier_negative_forward_and_parity():
+    model = Bachelier(-0.002, 0.001, 0.006, 0.02, 2.0)
+    call, put = model.price('call', None), model.price('put', None)
+    assert call > 0
+    assert call - put == pytest.approx(np.exp(-0.04) * (-0.002 - 0.001))
+
+def test_mixed_book_in_one_pass():
+    model = ['black_scholes', 'black76', 'bachelier', 'black76']
+    S, K = [100, 50, 0.01, 80], [95, 55, 0.012, 70]
+    sigma, T, is_call = [0.2, 0.3, 0.004, 0.25], [0.5, 1, 3, 0.1], [True, False, True, True]
+    prices = price_batch(model, S, K, sigma, 0.03, T, is_call)
+    expected = [BlackScholes(100, 95, 0.2, 0.03, 0.5).price('call', None), Black76(50, 55, 0.3, 0.03, 1).price('put', None),
+                Bachelier(0.01, 0.012, 0.004, 0.03, 3).price('call', None), Black76(80, 70, 0.25, 0.03, 0.1).price('call', None)]
+    assert np.allclose(prices, expected)
+    assert np.allclose(implied_vol_batch(model, prices, S, K, 0.03, T, is_call), sigma)
+
+def test_greeks_match_finite_differences():
+    model = np.array([0, 1, 2])
+    S, K, sigma, T, is_call = np.array([100, 100, 0.02]), np.array([90, 110, 0.01]), np.array([0.2, 0.3, 0.01]), 1.5, np.array([True, False, False])
+    greeks = greeks_batch(model, S, K, sigma, 0.03, T, is_call, q=0.01)
+    h = 1e-6 * S
+    delta = (price_batch(model, S + h, K, sigma, 0.03, T, is_call, 0.01) - price_batch(model, S - h, K, sigma, 0.03, T, is_call, 0.01)) / (2 * h)
+    theta = -(price_batch(model, S, K, sigma, 0.03, T + 1e-6, is_call, 0.01) - price_batch(model, S, K, sigma, 0.03, T - 1e-6, is_call, 0.01)) / 2e-6 / 365
+    assert np.allclose(greeks['delta'], delta, rtol=1e-6)
+    assert np.allclose(greeks['theta'], theta, rtol=1e-6)
+
+def test_iv_wrappers():
+    assert IV_Black76(100, 105, 0.03, 0.5, Black76(100, 105, 0.35, 0.03, 0.5).price('call', None)) == pytest.approx(0.35)
+    prices = Bachelier(0.02, np.linspace(-0.01, 0.05, 7), 0.007, 0.03, 1.5).price('put', None)
+    assert np.allclose(IV_Bachelier(0.02, np.linspace(-0.01, 0.05, 7), 0.03, 1.5, prices, 'put'), 0.007)
+    assert np.isnan(IV_Black76(100, 90, 0.03, 0.5, 5.0))
+
+def test_greeks_at_zero_variance_are_limits():
+    import warnings
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        greeks = greeks_batch(['black_scholes', 'black_scholes', 'bachelier', 'black_scholes'], [105, 95, 105, 105], 100,
+                              [0.2, 0.2, 5, 0], 0.05, [0, 0, 0, 1], [True, False, True, True])
+    assert all(np.all(np.isfinite(value)) for value in greeks.values())
+    assert np.allclose(greeks['price'], [5, 5, 5, 105 - 100 * np.exp(-0.05)])
+    assert np.allclose(greeks['delta'], [1, -1, 1, 1]) and np.all(greeks['gamma'] == 0)
+    # Theta of the deterministic forward payoff: d/dt of S - K exp(-r(T - t)) is -r K exp(-rT)
+    assert np.allclose(greeks['theta'][[0, 3]], [-0.05 * 100 / 365, -0.05 * 100 * np.exp(-0.05) / 365])
+    near = greeks_batch('black_scholes', 105, 100, 1e-4, 0.05, 1, True)
+    assert greeks['rho'][3] == pytest.approx(near['rho']) and greeks['theta'][3] == pytest.approx(near['theta'])
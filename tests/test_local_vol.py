@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from options_pricer_European.models.Black_Scholes import BlackScholes
+from options_pricer_European.models.Monte_Carlo import MonteCarlo
+from options_pricer_European.models.Local_Vol import LocalVolatility, LocalVolMonteCarlo, LocalVolPDE
+from options_pricer_European.utils.Vol_Surface import VolSurface
+from options_pricer_American.models.Binomial import BinomialAmerican
+from options_pricer_Exotic.models import PathEngine, BarrierPayoff, BarrierAnalytic
+
+expiries = np.array([0.25, 0.5, 1.0, 2.0])
+flat = VolSurface(100, 0.03, expiries, [[0.04 * t, 0, 0, 0, 0.1] for t in expiries])
+
+def smile_surface():
+    K, T = np.meshgrid(np.linspace(50, 200, 25), expiries)
+    k = np.log(K / (100 * np.exp(0.03 * T)))
+    iv = np.sqrt(0.04 + 0.1 * (-0.4 * k + np.sqrt(k**2 + 0.05)))
+    return VolSurface.from_quotes(100, 0.03, K, T, iv)
+
+def test_flat_surface_gives_constant_local_vol():
+    assert np.allclose(LocalVolatility(flat, 1.0).grid, 0.2)
+
+def test_local_vol_is_not_taken_for_an_implied_vol():
+    local_vol = LocalVolatility.from_surface(flat, 1.0)
+    assert local_vol.local_vol(100, 0.5) == pytest.approx(0.2)
+    assert not hasattr(local_vol, 'vol')
+    with pytest.raises(TypeError):
+        BlackScholes(100, 100, local_vol, 0.03, 1)
+
+def test_grid_is_cached_per_surface():
+    assert LocalVolatility.from_surface(flat, 1.0) is LocalVolatility.from_surface(flat, 1.0)
+    assert LocalVolatility.from_surface(flat, 1.0) is not LocalVolatility.from_surface(flat, 1.0, n_x=100)
+
+def test_pde_matches_black_scholes_and_binomial(monkeypatch):
+    expected = BlackScholes(100, 100, 0.2, 0.03, 1).price('put', decimals=None)
+    assert LocalVolPDE(100, 100, flat, 0.03, 1, 'put').price() == pytest.approx(expected, abs=2e-3)
+    monkeypatch.setattr(BinomialAmerican, 'N', 1000)
+    american = BinomialAmerican(100, 100, 0.2, 0.03, 1, 'put').price_options()
+    assert LocalVolPDE(100, 100, flat, 0.03, 1, 'put', american=True).price() == pytest.approx(american, abs=5e-3)
+
+def test_pde_reprices_the_smile():
+    surface = smile_surface()
+    for K in (80, 100, 120):
+        expected = BlackScholes(100, K, surface.vol(K, 1.0), 0.03, 1).price('call', decimals=None)
+        assert LocalVolPDE(100, K, surface, 0.03, 1).price() == pytest.approx(expected, abs=5e-3)
+
+def test_monte_carlo_reprices_the_smile(monkeypatch):
+    monkeypatch.setattr(MonteCarlo, 'N', 50)
+    monkeypatch.setattr(MonteCarlo, 'M', 40000)
+    np.random.seed(0)
+    surface = smile_surface()
+    price, SE = LocalVolMonteCarlo(100, 90, surface, 0.03, 1, 'call').simulate()
+    assert price == pytest.approx(BlackScholes(100, 90, surface.vol(90, 1.0), 0.03, 1).price('call', decimals=None), abs=4 * SE)
+
+def test_path_engine_with_local_vol_barrier():
+    np.random.seed(1)
+    engine = PathEngine(100, LocalVolatility.from_surface(flat, 1.0), 0.03, 1, N=100, M=40000)
+    (price, SE), = engine.price([BarrierPayoff(100, 85, 'call', 'down-and-out')])
+    expected = BarrierAnalytic(100, 100, 85, 0.2, 0.03, 1, 'call', 'down-and-out').price()
+    assert price == pytest.approx(expected, abs=4 * SE)
@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+from options_pricer_American.models.Binomial import BinomialAmerican
+from options_pricer_American.models.Monte_Carlo import MonteCarloAmerican
+from options_pricer_European.models import Profiler
+from options_pricer_European.models.Monte_Carlo import MonteCarlo
+from options_pricer_European.models.Profiling import profiling, stage
+
+
+def test_disabled_profiling_is_a_shared_no_op():
+    assert profiling() is None
+    assert stage('rng', size=10) is stage('payoff')
+    reference = MonteCarlo(100, 100, 0.2, 0.05, 1, 'call').simulate(seed=3)
+    with Profiler() as profile:
+        assert profiling() is profile
+        assert MonteCarlo(100, 100, 0.2, 0.05, 1, 'call').simulate(seed=3) == reference
+    assert profiling() is None
+    stats = profile.to_dict()
+    assert stats['monte_carlo.simulate/rng']['calls'] == 1
+    assert stats['monte_carlo.simulate/rng']['items'] == MonteCarlo.N * MonteCarlo.M
+
+
+def test_backtrack_reports_regression_cost_per_time_step(monkeypatch):
+    monkeypatch.setattr(MonteCarlo, 'N', 10)
+    monkeypatch.setattr(MonteCarlo, 'M', 300)
+    with Profiler(memory=True) as profile:
+        MonteCarloAmerican(100, 100, 0.2, 0.05, 1, 'put').simulate()
+        BinomialAmerican.price_batch([90, 100], 100, 0.2, 0.05, 1, False, N=50)
+
+    stats = profile.to_dict()
+    backtrack = 'monte_carlo_american.simulate/monte_carlo_american.backtrack'
+    steps = [key for key in stats if key.startswith(backtrack + '/regression{step=')]
+    assert len(steps) == 9 and all(stats[key]['calls'] == 1 and 0 < stats[key]['items'] <= 300 for key in steps)
+    assert profile.total('regression')['calls'] == 9
+    assert stats[backtrack]['seconds'] >= profile.total('regression')['seconds']
+    assert stats[backtrack]['peak_bytes'] >= stats[backtrack + '/path_build']['peak_bytes'] > 10 * 301 * 8
+    assert stats['binomial_american.price_batch/tree_sweep']['items'] == 2 * 51 * 52 // 2
+
+    text = profile.prometheus()
+    assert f'options_pricer_stage_seconds_total{{stage="{backtrack}/regression",step="5"}}' in text
+    assert '# TYPE options_pricer_stage_peak_bytes gauge' in text
+    trace = json.loads(json.dumps(profile.chrome_trace()))['traceEvents']
+    assert len(trace) == sum(entry['calls'] for entry in stats.values())
+    regressions = [event for event in trace if event['name'] == 'regression']
+    # Steps are recorded from maturity backwards, nested inside the backtrack event
+    assert [event['args']['step'] for event in regressions] == list(range(9, 0, -1))
+    outer = next(event for event in trace if event['cat'] == backtrack)
+    assert all(outer['ts'] <= event['ts'] and event['ts'] + event['dur'] <= outer['ts'] + outer['dur'] for event in regressions)
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+from options_pricer_European.models.Black_Scholes import BlackScholes
+from options_pricer_American.models.Binomial import BinomialAmerican
+from options_pricer_European.models.Kernel import greeks_batch, price_batch
+from options_pricer_European.models.Monte_Carlo import MonteCarlo
+from options_pricer_Risk.models import IncrementalBook, Portfolio, PricingGrid, RiskEngine
+from options_pricer_Risk.models.Portfolio import revalue
+
+portfolio = Portfolio(['european', 'american', 'asian', 'european'], ['call', 'put', 'call', 'put'],
+                      [100, 95, 105, 90], [0.5, 1, 1, 0.25], [0.2, 0.25, 0.3, 0.2], [10, -5, 3, 7], [0, 0, 1, 1])
+spot = [100, 98]
+
+def test_base_values_match_pricers(monkeypatch):
+    monkeypatch.setattr(BinomialAmerican, 'N', 50)
+    engine = RiskEngine(portfolio, spot, 0.03, N=50)
+    european, american, asian = engine.base_values
+    assert european[0] == pytest.approx(BlackScholes(100, 100, 0.2, 0.03, 0.5).price('call', decimals=None))
+    assert american[0] == pytest.approx(BinomialAmerican(100, 95, 0.25, 0.03, 1, 'put').price_options())
+
+def test_batch_matches_scalar_tree():
+    prices = BinomialAmerican.price_batch([90, 100, 110], 100, 0.2, 0.05, 1, [False, False, True])
+    expected = [BinomialAmerican(S, 100, 0.2, 0.05, 1, t).price_options() for S, t in [(90, 'put'), (100, 'put'), (110, 'call')]]
+    assert prices == pytest.approx(expected)
+
+def test_delta_gamma_tracks_full_revaluation():
+    np.random.seed(0)
+    engine = RiskEngine(portfolio, spot, 0.03, N=50, max_elements=64)
+    returns, _ = engine.monte_carlo_scenarios(cov=np.diag([1e-4, 1e-4]), n_scenarios=500)
+    full = engine.pnl(returns, method='full')
+    approx = engine.pnl(returns, method='delta-gamma')
+    assert np.max(np.abs(full - approx)) < 0.02 * np.max(np.abs(full))
+
+def test_var_es_from_history():
+    rng = np.random.default_rng(0)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (300, 2)), axis=0))
+    engine = RiskEngine(portfolio, prices[-1], 0.03, N=50)
+    returns, vol_shifts = engine.historical_scenarios(prices, horizon=5)
+    assert returns.shape == (295, 2) and vol_shifts is None
+    report = engine.report(returns, horizon=5, confidence=(0.95, 0.99))
+    assert 0 < report[0.95]['VaR'] <= report[0.99]['VaR'] <= report[0.99]['ES']
+
+def test_large_negative_vol_shift_stays_finite():
+    book = Portfolio(['american', 'european', 'american'], 'put', [100, 100, 110], [1, 1, 0.5], [0.2, 0.2, 0.3])
+    engine = RiskEngine(book, [105], 0.05, N=50)
+    returns = np.array([[0.0], [-0.05], [0.05]])
+    report = engine.report(returns, np.full((3, 1), -0.25))
+    assert np.isfinite(report['rmse']) and np.all(np.isfinite(engine.pnl(returns, np.full((3, 1), -0.25))))
+
+    # At zero volatility the contracts follow the forward: the European put is worthless, the American put
+    # is exercised at once, and a call is worth its discounted forward payoff rather than its intrinsic value
+    values = revalue(book, 105.0, 0.0, book.T, 0.05, 50)
+    assert values == pytest.approx([0, 0, 5])
+    assert BinomialAmerican.price_batch(105, 100, [0, 1e-6], 0.05, 1, True) == pytest.approx(105 - 100 * np.exp(-0.05))
+
+def test_incremental_book_prices_zero_volatility_on_the_forward():
+    book = Portfolio(['european', 'european', 'american'], ['call', 'put', 'put'], 100, 1, 0.2)
+    expected = [105 - 100 * np.exp(-0.05), 0, 0]
+    for european in ('black_scholes', 'monte_carlo'):
+        incremental = IncrementalBook(book, [105], 0.05, N=50, european=european, M=100)
+        incremental.tick(sigma=0.0)
+        assert np.all(np.isfinite(incremental.values)) and incremental.values == pytest.approx(expected)
+        incremental.tick(spot=[95])
+        assert incremental.values == pytest.approx([0, 100 * np.exp(-0.05) - 95, 5])
+
+def test_invalid_style():
+    with pytest.raises(ValueError):
+        Portfolio('bermudan', 'call', 100, 1, 0.2)
+
+def black_scholes_put(S, sigma, T):
+    return price_batch('black_scholes', S, 100, sigma, 0.03, T, False)
+
+def test_pricing_grid_interpolates_prices_and_greeks():
+    grid = PricingGrid(black_scholes_put, 100, 0.03, 'put', S_range=(60, 160), sigma_range=(0.1, 0.5), T_range=(0.1, 2))
+    rng = np.random.default_rng(0)
+    S, sigma, T = rng.uniform(60, 160, 1000), rng.uniform(0.1, 0.5, 1000), rng.uniform(0.1, 2, 1000)
+    greeks, exact = grid.greeks(S, sigma, T), greeks_batch('black_scholes', S, 100, sigma, 0.03, T, False)
+    for name in ('price', 'delta', 'gamma', 'vega', 'theta'):
+        assert np.allclose(greeks[name], exact[name], atol=0.02)
+    assert grid.validate(50, seed=1) < 0.02
+    assert np.isnan(grid.price(200, 0.2, 1.0))
+
+def test_pricing_grid_reuses_nodes_when_one_axis_changes():
+    grid = PricingGrid(black_scholes_put, 100, 0.03, 'put', S_range=(60, 160), n=(41, 6, 6), method='cubic')
+    priced = grid.stats['nodes_priced']
+    grid.update(S_range=(70, 170))
+    assert grid.stats['nodes_priced'] - priced == 4 * 6 * 6
+    assert grid.nodes[0][-1] == pytest.approx(170)
+    assert grid.price(165, 0.3, 1.0) == pytest.approx(black_scholes_put(165, 0.3, 1.0), abs=0.05)
+
+    chebyshev = PricingGrid(black_scholes_put, 100, 0.03, 'put', n=(17, 9, 9))
+    priced = chebyshev.stats['nodes_priced']
+    chebyshev.update(n=(33, 9, 9))
+    assert chebyshev.stats['nodes_priced'] - priced == 16 * 9 * 9
+    chebyshev.update(K=110)
+    assert chebyshev.stats['nodes_priced'] - priced == 16 * 9 * 9 + 33 * 9 * 9
+
+def test_american_pricing_grid_matches_tree(monkeypatch):
+    monkeypatch.setattr(BinomialAmerican, 'N', 50)
+    grid = PricingGrid('american', 100, 0.05, 'put', S_range=(70, 140), sigma_range=(0.15, 0.4), T_range=(0.1, 1), n=(25, 7, 7))
+    assert grid.price(100, 0.2, 0.5) == pytest.approx(BinomialAmerican(100, 100, 0.2, 0.05, 0.5, 'put').price_options(), abs=0.03)
+
+def full_values(S, elapsed=0.0):
+    positions = [portfolio.select([i]) for i in range(len(portfolio))]
+    return [revalue(p, np.asarray(S)[p.underlying], p.sigma, p.T - elapsed, 0.03, 50)[0] for p in positions]
+
+def test_incremental_book_revalues_only_affected_positions():
+    book = IncrementalBook(portfolio, spot, 0.03, N=50)
+    assert book.values == pytest.approx(full_values(spot))
+    assert list(book.tick(spot={1: 99})) == [2, 3]
+    assert book.values == pytest.approx(full_values([100, 99]))
+    assert list(book.tick(spot=[100, 99])) == []
+    assert len(book.tick(elapsed=0.1)) == 4
+    assert book.values == pytest.approx(full_values([100, 99], elapsed=0.1))
+    assert book.value() == pytest.approx(float(portfolio.quantity @ book.values))
+    assert book.ticks == 3 and book.revalued == 6
+
+def test_incremental_monte_carlo_rescales_cached_paths():
+    european = portfolio.select(portfolio.style == 'european')
+    book = IncrementalBook(european, spot, 0.03, european='monte_carlo', M=5000, seed=3)
+    book.tick(spot={0: 103})
+    expected, _ = MonteCarlo.price_batch([103, 98], european.K, european.sigma, 0.03, european.T, european.is_call, M=5000, seed=3)
+    assert book.values == pytest.approx(expected)
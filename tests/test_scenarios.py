@@ -0,0 +1,88 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from options_pricer_European.models import Heston, MonteCarlo, ScenarioStore, enable_scenarios
+from options_pricer_European.models.Scenarios import active_scenarios
+from options_pricer_American.models.Monte_Carlo import MonteCarloAmerican
+from options_pricer_Asian.models import asian
+
+
+def _price_book(monkeypatch):
+    monkeypatch.setattr(MonteCarlo, 'N', 20)
+    monkeypatch.setattr(MonteCarlo, 'M', 2000)
+    european = [MonteCarlo(100, K, 0.2, 0.05, 1, option_type).simulate(seed=7)
+                for K in (90, 100, 110) for option_type in ('call', 'put')]
+    american = MonteCarloAmerican(100, 100, 0.2, 0.05, 1, 'put').simulate(seed=7)
+    heston = [Heston(100, 0.04, 0.05, 1, 2, 0.04, 0.3, -0.7, steps=20, paths=2000, K=K).price(seed=1) for K in (90, 110)]
+    average = [asian(100, K, 0.2, 0.05, 1, 'call', N=20, M=2000).simulate(seed=2) for K in (90, 110)]
+    return european, american, heston, average
+
+
+def test_contracts_on_one_underlying_share_paths(monkeypatch):
+    reference = _price_book(monkeypatch)
+    with ScenarioStore() as store:
+        assert active_scenarios() is store
+        assert _price_book(monkeypatch) == reference
+        # One scenario per model: the European strikes and the American put share the GBM paths
+        assert store.stats()['misses'] == 3 and store.stats()['hits'] == 5 + 1 + 1 + 1
+        assert len(os.listdir(store.path)) == 3
+        # Unseeded runs draw fresh paths and leave the store alone
+        MonteCarlo(100, 100, 0.2, 0.05, 1, 'call').simulate()
+        assert store.stats()['misses'] == 3
+    assert active_scenarios() is None and not os.path.exists(store.path)
+
+
+def _worker_batch(seed):
+    return MonteCarlo.price_batch([100, 100], [95, 105], 0.2, 0.05, 1, [True, False], M=5000, seed=seed)[0]
+
+
+def test_worker_processes_reuse_the_parents_draws():
+    with ScenarioStore(max_bytes=10**6) as store:
+        parent = _worker_batch(11)
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(1, mp_context=context, initializer=enable_scenarios, initargs=(store,)) as pool:
+            assert np.array_equal(pool.submit(_worker_batch, 11).result(), parent)
+            pool.submit(_worker_batch, 12).result()
+        # The worker found seed 11 on disk and stored seed 12 for everyone
+        assert store.stats()['misses'] == 1 and len(os.listdir(store.path)) == 2
+
+
+def test_out_of_core_sets_price_in_chunks(tmp_path, monkeypatch):
+    import threading
+    from options_pricer_European.models import BlackScholes, ScenarioSet
+    monkeypatch.setattr(MonteCarlo, 'N', 20)
+    call = MonteCarlo(100, 100, 0.2, 0.05, 1, 'call')
+    sets = {layout: call.write_scenarios(tmp_path / layout, M=20000, layout=layout, chunk_bytes=200_000, seed=1)
+            for layout in ('path', 'time')}
+    assert all(len(s.bounds) > 3 for s in sets.values())
+    reopened = ScenarioSet(tmp_path / 'time')
+    assert reopened.shape == (20000, 21) and reopened.attrs['seed'] == 1
+    assert np.all(reopened.load()[:, 0] == 100)
+    exact = BlackScholes(100, 100, 0.2, 0.05, 1).price('call', None)
+    for scenarios in sets.values():
+        price, SE = call.price_scenarios(scenarios)
+        assert abs(price - exact) < 4 * SE
+    # A set simulated for another underlying is refused, whatever the strike
+    assert MonteCarlo(100, 120, 0.2, 0.05, 1, 'put').price_scenarios(reopened)[0] > 0
+    for other in (MonteCarlo(105, 100, 0.2, 0.05, 1, 'call'), MonteCarlo(100, 100, 0.2, 0.05, 2, 'call'),
+                  MonteCarloAmerican(100, 100, 0.3, 0.05, 1, 'put')):
+        with pytest.raises(ValueError):
+            (other.price_scenarios if isinstance(other, MonteCarlo) else other.simulate_scenarios)(reopened)
+
+    # Stopping early releases the read-ahead thread
+    for _ in reopened.slices(reverse=True):
+        break
+    assert not any(thread.name == 'scenario-read-ahead' for thread in threading.enumerate())
+
+    # The chunked backward sweep is the in-memory Longstaff-Schwartz on the same paths
+    monkeypatch.setattr(MonteCarlo, 'M', 2000)
+    put = MonteCarloAmerican(100, 100, 0.2, 0.05, 1, 'put')
+    scenarios = MonteCarlo(100, 100, 0.2, 0.05, 1, 'put').write_scenarios(tmp_path / 'american', layout='time',
+                                                                          chunk_bytes=50_000, seed=2)
+    streamed = put.simulate_scenarios(scenarios)
+    paths = scenarios.load()
+    monkeypatch.setattr(put, 'calculate_stock_price_ame', lambda seed=None: (paths, None))
+    assert put.simulate() == streamed
@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from options_pricer import price_columns
+from options_pricer.server import PricingServer
+from options_pricer_European.models.Binomial import Binomial
+from options_pricer_European.models.Black_Scholes import BlackScholes
+from options_pricer_European.models.Black_76 import Black76
+from options_pricer_American.models.Binomial import BinomialAmerican
+
+def test_mixed_book_is_priced_per_engine():
+    book = {'model': ['black_scholes', 'black76', 'binomial', 'binomial', 'monte_carlo'],
+            'style': ['european', 'european', 'european', 'american', 'european'],
+            'type': ['call', 'put', 'call', 'put', 'call'], 'S': [100, 50, 90, 95, 100], 'K': [100, 55, 100, 100, 100],
+            'T': [1, 0.5, 1, 0.5, 1], 'r': 0.05, 'sigma': [0.2, 0.3, 0.25, 0.2, 0.2], 'paths': 200000, 'seed': 1}
+    result = price_columns(book)
+    expected = [BlackScholes(100, 100, 0.2, 0.05, 1).price('call', None), Black76(50, 55, 0.3, 0.05, 0.5).price('put', None),
+                Binomial(90, 100, 0.25, 0.05, 1, 'call').price_options(), BinomialAmerican(95, 100, 0.2, 0.05, 0.5, 'put').price_options()]
+    assert np.allclose(result['price'][:4], expected)
+    assert abs(result['price'][4] - expected[0]) < 4 * result['standard_error'][4]
+    assert np.isnan(result['standard_error'][:4]).all()
+
+def test_engines_agree_at_zero_volatility():
+    models = ['black_scholes', 'binomial', 'monte_carlo', 'black_scholes', 'binomial']
+    styles = ['european', 'european', 'european', 'american', 'american']
+    call = price_columns({'model': models, 'style': styles, 'type': 'call', 'S': [105] * 5, 'K': 100, 'T': 1,
+                          'r': 0.05, 'sigma': 0, 'seed': 1})
+    assert np.allclose(call['price'], 105 - 100 * np.exp(-0.05))
+    put = price_columns({'model': models, 'style': styles, 'type': 'put', 'S': [95] * 5, 'K': 100, 'T': 1,
+                         'r': 0.05, 'sigma': 0, 'seed': 1})
+    assert np.allclose(put['price'][:3], 100 * np.exp(-0.05) - 95) and np.allclose(put['price'][3:], 5)
+    assert Binomial(105, 100, 0, 0.05, 1, 'call').price_options() == pytest.approx(call['price'][0])
+
+def test_scalar_spot_broadcasts_against_strike_column():
+    result = price_columns({'model': 'black_scholes', 'type': 'call', 'S': 100, 'K': [95, 100, 105], 'T': 1,
+                            'r': 0.05, 'sigma': 0.2})
+    assert np.allclose(result['price'], [BlackScholes(100, K, 0.2, 0.05, 1).price('call', None) for K in (95, 100, 105)])
+
+def test_invalid_book():
+    with pytest.raises(ValueError):
+        price_columns({'model': 'heston', 'type': 'call', 'S': 1, 'K': 1, 'T': 1, 'r': 0, 'sigma': 0.1})
+    with pytest.raises(ValueError, match='common length'):
+        price_columns({'model': 'black_scholes', 'type': 'call', 'S': [1, 2], 'K': [1, 2, 3], 'T': 1, 'r': 0, 'sigma': 0.1})
+    with pytest.raises(ValueError):
+        price_columns({'model': 'black76', 'style': 'american', 'type': 'call', 'S': 1, 'K': 1, 'T': 1, 'r': 0, 'sigma': 0.1})
+
+async def request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = b'' if payload is None else json.dumps(payload).encode()
+    writer.write(f'{method} {path} HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body)
+    await writer.drain()
+    head, _, body = (await reader.read()).partition(b'\r\n\r\n')
+    writer.close()
+    return int(head.split()[1]), body
+
+def test_server_batches_concurrent_requests():
+    async def run():
+        server = PricingServer(window=0.005, processes=0)
+        listener = await server.start('127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        spots = np.linspace(80, 120, 40)
+        quotes = [{'model': 'black_scholes', 'type': 'put', 'S': float(S), 'K': 100, 'T': 0.5, 'r': 0.03, 'sigma': 0.2} for S in spots]
+        american = {'model': 'binomial', 'style': 'american', 'type': 'put', 'S': [90, 100], 'K': 100, 'T': 0.5, 'r': 0.03, 'sigma': 0.2}
+        replies = await asyncio.gather(*(request(port, 'POST', '/price', quote) for quote in quotes),
+                                       request(port, 'POST', '/price', american),
+                                       request(port, 'POST', '/price', {'model': 'nope', 'S': 1}))
+        stats = json.loads((await request(port, 'GET', '/stats'))[1])
+        metrics = (await request(port, 'GET', '/metrics'))[1].decode()
+        listener.close()
+        await listener.wait_closed()
+        return spots, replies, stats, metrics
+
+    spots, replies, stats, metrics = asyncio.run(run())
+    prices = [json.loads(body)['price'] for status, body in replies[:40]]
+    assert np.allclose(prices, [BlackScholes(S, 100, 0.2, 0.03, 0.5).price('put', None) for S in spots])
+    assert json.loads(replies[40][1])['price'] == pytest.approx([BinomialAmerican(S, 100, 0.2, 0.03, 0.5, 'put').price_options() for S in (90, 100)])
+    assert replies[41][0] == 400
+    assert stats['requests'] == 42 and stats['errors'] == 1 and stats['queue_depth'] == 0
+    # 40 single-quote requests arriving together are priced in far fewer kernel calls
+    assert stats['batch_size']['count'] < 10
+    assert 'pricing_request_latency_ms_count 42' in metrics
+
+def test_server_isolates_failing_requests():
+    async def run():
+        server = PricingServer(window=0.005, processes=0)
+
+        async def fragile(key, columns):
+            if np.any(columns['S'] == 13):
+                raise ZeroDivisionError('bad row')
+            return price_columns(columns)
+
+        server.batcher.run = fragile
+        listener = await server.start('127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        quote = {'model': 'black_scholes', 'type': 'call', 'K': 100, 'T': 0.5, 'r': 0.03, 'sigma': 0.2}
+        replies = await asyncio.gather(request(port, 'POST', '/price', dict(quote, S=100)),
+                                       request(port, 'POST', '/price', dict(quote, S=13)),
+                                       request(port, 'POST', '/price', dict(quote, S=110)))
+        listener.close()
+        await listener.wait_closed()
+        return server, replies
+
+    server, replies = asyncio.run(run())
+    assert [status for status, _ in replies] == [200, 500, 200]
+    assert json.loads(replies[0][1])['price'] == pytest.approx(BlackScholes(100, 100, 0.2, 0.03, 0.5).price('call', None))
+    assert 'ZeroDivisionError' in json.loads(replies[1][1])['error']
+    assert server.batcher.batch_sizes.count == 1 and server.errors == 1
+
+def test_cli_prices_file_in_chunks(tmp_path, capsys):
+    from options_pricer.cli import main, price_file
+    rng = np.random.default_rng(0)
+    n = 250
+    book = pd.DataFrame({'id': np.arange(n), 'model': rng.choice(['black_scholes', 'bachelier', 'binomial'], n),
+                         'type': rng.choice(['call', 'put'], n), 'S': rng.uniform(80, 120, n), 'K': 100.0,
+                         'T': rng.uniform(0.1, 2, n), 'r': 0.03, 'sigma': rng.uniform(0.1, 0.4, n), 'steps': 50})
+    book.loc[book['model'] == 'bachelier', 'sigma'] *= 100
+    book.to_csv(tmp_path / 'book.csv', index=False)
+    expected = price_columns(book.to_dict('list'))['price']
+
+    assert main([str(tmp_path / 'book.csv'), str(tmp_path / 'out.csv'), '--chunksize', '64', '--workers', '0']) == 0
+    assert 'priced 250 contracts in 4 chunks' in capsys.readouterr().err
+    out = pd.read_csv(tmp_path / 'out.csv')
+    assert list(out['id']) == list(range(n)) and np.allclose(out['price'], expected)
+
+    totals = price_file(str(tmp_path / 'book.csv'), str(tmp_path / 'pooled.csv'), chunksize=32, workers=2)
+    assert totals['rows'] == n and totals['chunks'] == 8
+    assert np.allclose(pd.read_csv(tmp_path / 'pooled.csv')['price'], expected)
+
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / 'missing.csv'), '--workers', '0'])
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from options_pricer_European.models.Term_Structure import YieldCurve, Dividends
+from options_pricer_European.models.Black_Scholes import BlackScholes
+from options_pricer_European.models.Binomial import Binomial
+from options_pricer_European.models.Monte_Carlo import MonteCarlo
+from options_pricer_European.models.Heston import Heston
+from options_pricer_American.models.Binomial import BinomialAmerican
+from options_pricer_Asian.models.Monte_Carlo import asian
+
+curve = YieldCurve([0.25, 0.5, 1, 2], [0.02, 0.03, 0.035, 0.04])
+dividends = Dividends(q=0.01, times=[0.3, 0.8], amounts=[1.0, 1.5])
+
+def test_curve_interpolates_log_discount():
+    assert curve.discount(0.25) == pytest.approx(np.exp(-0.02 * 0.25))
+    assert curve.forward_rate(0.5, 1) == pytest.approx(0.04)
+    assert curve.zero_rate(3) == pytest.approx((0.04 * 2 + 0.045) / 3)
+    assert np.allclose(curve.step_forwards(1, 4), [0.02, 0.04, 0.04, 0.04])
+    assert curve.step_forwards(1, 4) is curve.step_forwards(1, 4)
+
+def test_flat_curve_matches_scalar_rate():
+    expected = BlackScholes(100, 95, 0.2, 0.05, 0.5).price('call', decimals=None)
+    assert BlackScholes(100, 95, 0.2, YieldCurve.flat(0.05), 0.5).price('call', decimals=None) == pytest.approx(expected)
+
+def test_put_call_parity_with_dividends():
+    bs = BlackScholes(100, 100, 0.2, curve, 1, dividends)
+    forward_value = (100 - dividends.present_value(curve, 0, 1)) * np.exp(-0.01)
+    assert bs.price('call', None) - bs.price('put', None) == pytest.approx(forward_value - 100 * curve.discount(1))
+
+def test_trees_use_per_level_rates(monkeypatch):
+    monkeypatch.setattr(Binomial, 'N', 1000)
+    monkeypatch.setattr(BinomialAmerican, 'N', 1000)
+    for option_type in ('call', 'put'):
+        expected = BlackScholes(100, 100, 0.2, curve, 1, dividends).price(option_type, None)
+        assert Binomial(100, 100, 0.2, curve, 1, option_type, dividends=dividends).price_options() == pytest.approx(expected, abs=5e-3)
+    # A cash dividend makes early exercise of a call worthwhile
+    european = BlackScholes(100, 100, 0.2, curve, 1, dividends).price('call', None)
+    assert BinomialAmerican(100, 100, 0.2, curve, 1, 'call', dividends=dividends).price_options() > european + 0.1
+
+def test_batch_tree_dividend_yield():
+    american = BinomialAmerican.price_batch(100, 100, 0.2, 0.03, 1, False, N=500, q=0.02)
+    european = BlackScholes(100, 100, 0.2, 0.03, 1, 0.02).price('put', None)
+    assert american > european
+
+def test_monte_carlo_engines_with_curve(monkeypatch):
+    expected = BlackScholes(100, 100, 0.2, curve, 1, dividends).price('call', None)
+    monkeypatch.setattr(MonteCarlo, 'N', 50)
+    monkeypatch.setattr(MonteCarlo, 'M', 100000)
+    np.random.seed(0)
+    price, SE = MonteCarlo(100, 100, 0.2, curve, 1, 'call', dividends=dividends).simulate()
+    assert price == pytest.approx(expected, abs=4 * SE)
+    # Heston with (almost) no vol-of-vol is Black-Scholes
+    np.random.seed(1)
+    price, SE = Heston(100, 0.04, curve, 1, 2.0, 0.04, 1e-4, 0, steps=50, paths=50000, K=100, dividends=dividends).price()
+    assert price == pytest.approx(expected, abs=4 * SE)
+
+def test_asian_with_flat_curve():
+    np.random.seed(2)
+    expected, _ = asian(100, 100, 0.2, 0.03, 1, 'call', N=50, M=20000).simulate()
+    price, SE = asian(100, 100, 0.2, YieldCurve.flat(0.03), 1, 'call', N=50, M=20000).simulate()
+    assert price == pytest.approx(expected, abs=4 * SE)
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import pytest
+from options_pricer_European.models.Monte_Carlo import MonteCarlo
+from options_pricer_European.utils.Market_Data import MarketData
+from options_pricer_European.models.Black_Scholes import BlackScholes
+from options_pricer_European.utils import Volatility
+from options_pricer_European.utils.GARCH import GARCH, fit_many
+from options_pricer_European.utils.Vol_Surface import VolSurface
+
+rng = np.random.default_rng(0)
+close = 100 * np.exp(np.cumsum(rng.normal(0, 0.2 / np.sqrt(252), (1000, 3)), axis=0))
+
+def test_close_to_close_recovers_sigma():
+    assert Volatility.close_to_close(close) == pytest.approx([0.2] * 3, rel=0.1)
+
+def test_rolling_matches_pandas():
+    rolling = Volatility.close_to_close(close, window=20)
+    expected = pd.DataFrame(np.diff(np.log(close), axis=0)).rolling(20).std().to_numpy() * np.sqrt(252)
+    assert np.allclose(rolling[19:], expected[19:])
+    assert np.isnan(rolling[:19]).all()
+
+def test_ewma_matches_recursion():
+    returns_sq = np.diff(np.log(close[:, 0])) ** 2
+    variance = [returns_sq[0]]
+    for x in returns_sq[1:]:
+        variance.append(0.94 * variance[-1] + 0.06 * x)
+    assert np.allclose(Volatility.ewma(close[:, 0])[:, 0], np.sqrt(np.array(variance) * 252))
+
+def test_range_estimators_without_intraday_moves():
+    # With open = high = low = close every range estimator is zero.
+    flat = close[:, :1]
+    assert Volatility.parkinson(flat, flat) == pytest.approx(0)
+    assert Volatility.rogers_satchell(flat, flat, flat, flat) == pytest.approx(0)
+
+def test_from_csv_simulate(tmp_path):
+    path = tmp_path / 'prices.csv'
+    dates = pd.bdate_range('2024-01-01', periods=len(close)).strftime('%Y-%m-%d')
+    pd.DataFrame({'Date': dates, 'Close': close[:, 0]}).to_csv(path, index=False)
+
+    data = MarketData.from_csv(path, chunksize=100)
+    assert data.close.shape == (1000, 1)
+    settings = MonteCarlo.N, MonteCarlo.M
+    C0, SE = MonteCarlo.from_csv_simulate(path, K=close[-1, 0], r=0.01, T=0.5, option_type='call', N=20, M=500)
+    assert C0 > 0 and SE > 0
+    assert (MonteCarlo.N, MonteCarlo.M) == settings
+
+def test_from_csv_keeps_selected_rows(tmp_path):
+    path = tmp_path / 'long.csv'
+    dates = pd.bdate_range('2024-01-01', periods=len(close)).strftime('%Y-%m-%d')
+    frame = pd.DataFrame({'Date': np.repeat(dates, 3), 'Ticker': np.tile(['A', 'B', 'C'], len(dates)),
+                          'Close': close[:, :3].ravel()})
+    frame.to_csv(path, index=False)
+    data = MarketData.from_csv(path, ticker_column='Ticker', chunksize=250, tickers=['C', 'A'],
+                               start='2024-02-01', end='2024-06-28')
+    rows = (dates >= '2024-02-01') & (dates <= '2024-06-28')
+    assert data.tickers == ['A', 'C']
+    assert np.allclose(data.close, close[rows][:, [0, 2]])
+
+def test_missing_column(tmp_path):
+    path = tmp_path / 'prices.csv'
+    pd.DataFrame({'Date': ['2024-01-01'], 'Price': [1.0]}).to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        MarketData.from_csv(path)
+
+def simulate_garch(n, omega, alpha, beta, gamma=0.0, seed=0):
+    noise = np.random.default_rng(seed).standard_normal(n)
+    returns = np.empty(n)
+    variance = omega / (1 - alpha - beta - gamma / 2)
+    for t in range(n):
+        returns[t] = np.sqrt(variance) * noise[t]
+        variance = omega + (alpha + gamma * (returns[t] < 0)) * returns[t] ** 2 + beta * variance
+    return returns
+
+def test_garch_recovers_parameters():
+    model = GARCH.fit(simulate_garch(3000, 2e-6, 0.08, 0.9))
+    assert model.alpha == pytest.approx(0.08, abs=0.03)
+    assert model.beta == pytest.approx(0.9, abs=0.03)
+
+def test_gjr_finds_leverage():
+    model = GARCH.fit(simulate_garch(3000, 2e-6, 0.03, 0.88, gamma=0.12, seed=1), model='gjr')
+    assert model.gamma > model.alpha
+
+def test_garch_term_structure_reverts():
+    model = GARCH(omega=2e-6, alpha=0.08, beta=0.9, next_variance=4e-4)
+    vols = model.term_volatility(np.array([0, 0.25, 1, 50]))
+    assert vols[0] == pytest.approx(np.sqrt(252 * 4e-4))
+    assert np.all(np.diff(vols) < 0)
+    assert vols[-1] == pytest.approx(np.sqrt(252 * model.long_run_variance), rel=0.01)
+    # forward variances integrate back to the term variance
+    forward = model.forward_volatility(0.25, 1)
+    assert 0.25 * vols[1] ** 2 + 0.75 * forward**2 == pytest.approx(vols[2] ** 2)
+
+def test_garch_prices_with_term_volatility():
+    model = GARCH(omega=2e-6, alpha=0.08, beta=0.9, next_variance=4e-4)
+    assert BlackScholes(100, 100, model, 0.05, 0.5).price('call') == BlackScholes(100, 100, model.term_volatility(0.5), 0.05, 0.5).price('call')
+
+def test_fit_many_matches_single_fits():
+    panel = np.column_stack([simulate_garch(1000, 2e-6, 0.08, 0.9, seed=s) for s in range(3)])
+    fits = fit_many(panel, processes=1)
+    assert [f.beta for f in fits] == pytest.approx([GARCH.fit(panel[:, k]).beta for k in range(3)])
+
+def smile_quotes(S=100, r=0.02):
+    K, T = np.meshgrid(np.linspace(60, 150, 15), [0.1, 0.25, 0.5, 1, 2])
+    k = np.log(K / (S * np.exp(r * T)))
+    iv = np.sqrt(0.04 + 0.1 * (-0.4 * k + np.sqrt(k**2 + 0.05)))
+    return K, T, iv
+
+def test_svi_surface_fits_smile():
+    K, T, iv = smile_quotes()
+    surface = VolSurface.from_quotes(100, 0.02, K, T, iv)
+    assert np.allclose(surface.vol(K, T), iv, atol=1e-3)
+    assert surface.check_arbitrage()['arbitrage_free']
+
+def test_surface_from_prices_and_ssvi():
+    K, T, iv = smile_quotes()
+    prices = BlackScholes(100, K, iv, 0.02, T).price('call', decimals=None)
+    assert np.allclose(VolSurface.from_prices(100, 0.02, K, T, prices).vol(K, T), iv, atol=1e-3)
+    ssvi = VolSurface.from_quotes(100, 0.02, K, T, iv, model='ssvi')
+    assert np.allclose(ssvi.vol(K, T), iv, atol=0.02)
+    assert ssvi.check_arbitrage()['arbitrage_free']
+
+def test_surface_interpolates_total_variance():
+    K, T, iv = smile_quotes()
+    surface = VolSurface.from_quotes(100, 0.02, K, T, iv)
+    F = 100 * np.exp(0.02 * 0.75)
+    w = surface.vol(F, 0.75) ** 2 * 0.75
+    w_lo, w_hi = (surface.total_variance(0.0, t) for t in (0.5, 1.0))
+    assert w == pytest.approx((w_lo + w_hi) / 2)
+    # flat extrapolation in volatility beyond the last expiry
+    assert surface.vol(surface.forward(3.0), 3.0) == pytest.approx(np.sqrt(surface.total_variance(0.0, 2.0) / 2), rel=1e-6)
+
+def test_surface_detects_calendar_arbitrage():
+    params = [[0.04, 0.1, -0.4, 0.0, 0.2], [0.02, 0.1, -0.4, 0.0, 0.2]]
+    assert not VolSurface(100, 0.02, [0.5, 1.0], params).check_arbitrage()['arbitrage_free']
+
+def test_pricers_accept_surface():
+    K, T, iv = smile_quotes()
+    surface = VolSurface.from_quotes(100, 0.02, K, T, iv)
+    strikes = np.array([80.0, 100.0, 120.0])
+    assert np.allclose(BlackScholes(100, strikes, surface, 0.02, 0.5).price('call', decimals=None),
+                       BlackScholes(100, strikes, surface.vol(strikes, 0.5), 0.02, 0.5).price('call', decimals=None))